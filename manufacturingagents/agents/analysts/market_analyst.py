@@ -1,6 +1,6 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.agents import create_react_agent, AgentExecutor
-from langchain import hub
+from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
 import time
 import json
 
@@ -153,7 +153,7 @@ def create_market_analyst_react(llm, toolkit):
 
             try:
                 # 创建ReAct Agent
-                prompt = hub.pull("hwchase17/react")
+                prompt = prompt_manager.get_react_prompt()
                 agent = create_react_agent(llm, tools, prompt)
                 agent_executor = AgentExecutor(
                     agent=agent,
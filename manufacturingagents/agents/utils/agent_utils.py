@@ -634,7 +634,7 @@ class Toolkit:
                 
         except Exception as e:
             print(f"❌ [TOOLKIT] 天气数据获取失败: {str(e)}")
-            return f"天气数据获取失败: {str(e)}"
+            return f"❌ 天气数据获取失败: {str(e)}"
 
     @staticmethod
     @tool
@@ -670,7 +670,7 @@ class Toolkit:
                 
         except Exception as e:
             print(f"❌ [TOOLKIT] 新闻数据获取失败: {str(e)}")
-            return f"新闻数据获取失败: {str(e)}"
+            return f"❌ 新闻数据获取失败: {str(e)}"
 
     @staticmethod
     @tool
@@ -702,7 +702,7 @@ class Toolkit:
                 
         except Exception as e:
             print(f"❌ [TOOLKIT] 节假日数据获取失败: {str(e)}")
-            return f"节假日数据获取失败: {str(e)}"
+            return f"❌ 节假日数据获取失败: {str(e)}"
 
     @staticmethod
     @tool
@@ -729,7 +729,7 @@ class Toolkit:
                 
         except Exception as e:
             print(f"❌ [TOOLKIT] PMI数据获取失败: {str(e)}")
-            return f"PMI数据获取失败: {str(e)}"
+            return f"❌ PMI数据获取失败: {str(e)}"
 
     @staticmethod
     @tool
@@ -756,7 +756,7 @@ class Toolkit:
 
         except Exception as e:
             print(f"❌ [TOOLKIT] PPI数据获取失败: {str(e)}")
-            return f"PPI数据获取失败: {str(e)}"
+            return f"❌ PPI数据获取失败: {str(e)}"
 
     @staticmethod
     @tool
@@ -788,4 +788,101 @@ class Toolkit:
                 
         except Exception as e:
             print(f"❌ [TOOLKIT] 期货数据获取失败: {str(e)}")
-            return f"期货数据获取失败: {str(e)}"
+            return f"❌ 期货数据获取失败: {str(e)}"
+
+
+# === 制造业工具异步实现 ===
+# @tool装饰的同步工具在ainvoke时默认放入线程池执行；这里为其绑定协程实现，
+# 异步调用时直接使用interface层的异步接口，等待Coze请求期间不占用线程
+
+# 制造业工具和interface层捕获异常后返回以该前缀开头的错误消息代替数据
+MANUFACTURING_ERROR_PREFIX = "❌"
+
+
+def is_manufacturing_error_result(result) -> bool:
+    """判断制造业工具结果是否为错误消息
+
+    只按错误前缀判断：新闻、政策等正常数据中也常出现"失败"、"错误"等字样
+    """
+    return isinstance(result, str) and result.startswith(MANUFACTURING_ERROR_PREFIX)
+
+
+def _log_manufacturing_result(result: str, label: str) -> str:
+    """记录工具结果，错误消息原样返回，不使用降级"""
+    if result.startswith("❌") or "失败" in result or "错误" in result:
+        print(f"❌ [TOOLKIT] {label}获取失败")
+    else:
+        print(f"✅ [TOOLKIT] {label}获取成功")
+    return result
+
+
+async def _aget_manufacturing_weather_data(city_name: str) -> str:
+    print(f"🌤️ [TOOLKIT] get_manufacturing_weather_data 异步调用: city={city_name}")
+    try:
+        curr_date = datetime.now().strftime('%Y-%m-%d')
+        result = await interface.aget_manufacturing_weather_interface(city_name, curr_date)
+        return _log_manufacturing_result(result, f"天气数据: {city_name}")
+    except Exception as e:
+        print(f"❌ [TOOLKIT] 天气数据获取失败: {str(e)}")
+        return f"❌ 天气数据获取失败: {str(e)}"
+
+
+async def _aget_manufacturing_news_data(query_params: Union[str, dict]) -> str:
+    print(f"📰 [TOOLKIT] get_manufacturing_news_data 异步调用: query={query_params}")
+    try:
+        curr_date = datetime.now().strftime('%Y-%m-%d')
+        result = await interface.aget_manufacturing_news_interface(query_params, curr_date)
+        return _log_manufacturing_result(result, "新闻数据")
+    except Exception as e:
+        print(f"❌ [TOOLKIT] 新闻数据获取失败: {str(e)}")
+        return f"❌ 新闻数据获取失败: {str(e)}"
+
+
+async def _aget_manufacturing_holiday_data(date_range: str) -> str:
+    print(f"📅 [TOOLKIT] get_manufacturing_holiday_data 异步调用: range={date_range}")
+    try:
+        result = await interface.aget_manufacturing_holiday_interface(date_range)
+        return _log_manufacturing_result(result, "节假日数据")
+    except Exception as e:
+        print(f"❌ [TOOLKIT] 节假日数据获取失败: {str(e)}")
+        return f"❌ 节假日数据获取失败: {str(e)}"
+
+
+async def _aget_manufacturing_pmi_data(time_range: str) -> str:
+    print(f"📈 [TOOLKIT] get_manufacturing_pmi_data 异步调用: range={time_range}")
+    try:
+        result = await interface.aget_manufacturing_economic_interface('pmi', time_range)
+        print(f"✅ [TOOLKIT] PMI数据获取成功")
+        return result
+    except Exception as e:
+        print(f"❌ [TOOLKIT] PMI数据获取失败: {str(e)}")
+        return f"❌ PMI数据获取失败: {str(e)}"
+
+
+async def _aget_manufacturing_ppi_data(time_range: str) -> str:
+    print(f"📈 [TOOLKIT] get_manufacturing_ppi_data 异步调用: range={time_range}")
+    try:
+        result = await interface.aget_manufacturing_economic_interface('ppi', time_range)
+        print(f"✅ [TOOLKIT] PPI数据获取成功")
+        return result
+    except Exception as e:
+        print(f"❌ [TOOLKIT] PPI数据获取失败: {str(e)}")
+        return f"❌ PPI数据获取失败: {str(e)}"
+
+
+async def _aget_manufacturing_commodity_data(commodity_type: str) -> str:
+    print(f"📈 [TOOLKIT] get_manufacturing_commodity_data 异步调用: type={commodity_type}")
+    try:
+        result = await interface.aget_manufacturing_economic_interface('commodity', '最近1个月', commodity_type)
+        return _log_manufacturing_result(result, "期货数据")
+    except Exception as e:
+        print(f"❌ [TOOLKIT] 期货数据获取失败: {str(e)}")
+        return f"❌ 期货数据获取失败: {str(e)}"
+
+
+Toolkit.get_manufacturing_weather_data.coroutine = _aget_manufacturing_weather_data
+Toolkit.get_manufacturing_news_data.coroutine = _aget_manufacturing_news_data
+Toolkit.get_manufacturing_holiday_data.coroutine = _aget_manufacturing_holiday_data
+Toolkit.get_manufacturing_pmi_data.coroutine = _aget_manufacturing_pmi_data
+Toolkit.get_manufacturing_ppi_data.coroutine = _aget_manufacturing_ppi_data
+Toolkit.get_manufacturing_commodity_data.coroutine = _aget_manufacturing_commodity_data
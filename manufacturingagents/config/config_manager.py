@@ -6,12 +6,15 @@
 
 import json
 import os
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from pathlib import Path
 from dotenv import load_dotenv
 
+from .usage_log import UsageLog
+
 try:
     from .mongodb_storage import MongoDBStorage
     MONGODB_AVAILABLE = True
@@ -53,6 +56,9 @@ class UsageRecord:
     cost: float  # 成本
     session_id: str  # 会话ID
     analysis_type: str  # 分析类型
+    node_name: str = ""  # 图节点名称（按节点汇总时记录）
+    latency_seconds: float = 0.0  # LLM调用总耗时（秒）
+    request_count: int = 1  # 本记录汇总的LLM调用次数
 
 
 class ConfigManager:
@@ -64,9 +70,14 @@ class ConfigManager:
 
         self.models_file = self.config_dir / "models.json"
         self.pricing_file = self.config_dir / "pricing.json"
-        self.usage_file = self.config_dir / "usage.json"
+        self.usage_file = self.config_dir / "usage.json"  # 旧版使用记录，首次启动时导入usage_log
+        self.usage_log_file = self.config_dir / "usage.sqlite"
         self.settings_file = self.config_dir / "settings.json"
 
+        # 配置文件解析结果缓存：{路径: ((mtime_ns, size), 解析结果)}，文件变化时自动失效
+        self._config_cache: Dict[Path, Any] = {}
+        self._config_cache_lock = threading.Lock()
+
         # 加载.env文件（保持向后兼容）
         self._load_env_file()
 
@@ -76,6 +87,53 @@ class ConfigManager:
 
         self._init_default_configs()
 
+        # 本地使用记录：只追加的SQLite日志，后台批量写入
+        self.usage_log = UsageLog(
+            self.usage_log_file,
+            legacy_json_path=self.usage_file,
+            max_records=lambda: self.load_settings().get("max_usage_records", 10000),
+        )
+
+        # 今日成本累计（成本警告使用，避免每次调用重新统计）
+        self._daily_cost_lock = threading.Lock()
+        self._daily_cost_date = None
+        self._daily_cost = 0.0
+
+    def _read_config(self, path: Path, parse=None) -> Any:
+        """读取JSON配置文件并缓存解析结果，按文件mtime和大小判断是否需要重新读取
+
+        Args:
+            path: 配置文件路径
+            parse: 对JSON数据的进一步解析（结果一并缓存），默认直接返回JSON数据
+        """
+        stat = path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._config_cache_lock:
+            cached = self._config_cache.get(path)
+            if cached and cached[0] == version:
+                return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if parse:
+            data = parse(data)
+
+        with self._config_cache_lock:
+            self._config_cache[path] = (version, data)
+        return data
+
+    def _write_config(self, path: Path, data: Any):
+        """写入JSON配置文件并使缓存失效"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        with self._config_cache_lock:
+            self._config_cache.pop(path, None)
+
+    def reload_config(self):
+        """清空配置缓存，下次读取时重新加载全部配置文件"""
+        with self._config_cache_lock:
+            self._config_cache.clear()
+
     def _load_env_file(self):
         """加载.env文件（保持向后兼容）"""
         # 尝试从项目根目录加载.env文件
@@ -218,20 +276,19 @@ class ConfigManager:
     def load_models(self) -> List[ModelConfig]:
         """加载模型配置，优先使用.env中的API密钥"""
         try:
-            with open(self.models_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                models = [ModelConfig(**item) for item in data]
-
-                # 合并.env中的API密钥（优先级更高）
-                for model in models:
-                    env_api_key = self._get_env_api_key(model.provider)
-                    if env_api_key:
-                        model.api_key = env_api_key
-                        # 如果.env中有API密钥，自动启用该模型
-                        if not model.enabled:
-                            model.enabled = True
-
-                return models
+            data = self._read_config(self.models_file)
+            models = [ModelConfig(**item) for item in data]
+
+            # 合并.env中的API密钥（优先级更高）
+            for model in models:
+                env_api_key = self._get_env_api_key(model.provider)
+                if env_api_key:
+                    model.api_key = env_api_key
+                    # 如果.env中有API密钥，自动启用该模型
+                    if not model.enabled:
+                        model.enabled = True
+
+            return models
         except Exception as e:
             print(f"加载模型配置失败: {e}")
             return []
@@ -240,17 +297,32 @@ class ConfigManager:
         """保存模型配置"""
         try:
             data = [asdict(model) for model in models]
-            with open(self.models_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._write_config(self.models_file, data)
         except Exception as e:
             print(f"保存模型配置失败: {e}")
     
+    @staticmethod
+    def _parse_pricing(data: List[Dict[str, Any]]):
+        """解析定价配置，返回(定价列表, {(供应商, 模型): 定价})，重复项以第一条为准"""
+        pricing = [PricingConfig(**item) for item in data]
+        index = {}
+        for price in pricing:
+            index.setdefault((price.provider, price.model_name), price)
+        return pricing, index
+
+    def _load_pricing_index(self) -> Dict[tuple, PricingConfig]:
+        try:
+            return self._read_config(self.pricing_file, self._parse_pricing)[1]
+        except Exception as e:
+            print(f"加载定价配置失败: {e}")
+            return {}
+
     def load_pricing(self) -> List[PricingConfig]:
         """加载定价配置"""
         try:
-            with open(self.pricing_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [PricingConfig(**item) for item in data]
+            pricing, _index = self._read_config(self.pricing_file, self._parse_pricing)
+            # 返回副本，调用方修改后通过save_pricing保存
+            return [replace(price) for price in pricing]
         except Exception as e:
             print(f"加载定价配置失败: {e}")
             return []
@@ -259,34 +331,31 @@ class ConfigManager:
         """保存定价配置"""
         try:
             data = [asdict(price) for price in pricing]
-            with open(self.pricing_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._write_config(self.pricing_file, data)
         except Exception as e:
             print(f"保存定价配置失败: {e}")
     
-    def load_usage_records(self) -> List[UsageRecord]:
-        """加载使用记录"""
+    def load_usage_records(self, days: int = None, session_id: str = None) -> List[UsageRecord]:
+        """加载使用记录，可按最近N天和会话过滤（按索引查询）"""
+        since = (datetime.now() - timedelta(days=days)).isoformat() if days else None
         try:
-            if not self.usage_file.exists():
-                return []
-            with open(self.usage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [UsageRecord(**item) for item in data]
+            return [UsageRecord(**item) for item in self.usage_log.load_records(since, session_id)]
         except Exception as e:
             print(f"加载使用记录失败: {e}")
             return []
     
     def save_usage_records(self, records: List[UsageRecord]):
-        """保存使用记录"""
+        """用给定记录替换全部使用记录（传入空列表即清空）"""
         try:
-            data = [asdict(record) for record in records]
-            with open(self.usage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.usage_log.replace_all([asdict(record) for record in records])
+            with self._daily_cost_lock:
+                self._daily_cost_date = None
         except Exception as e:
             print(f"保存使用记录失败: {e}")
     
     def add_usage_record(self, provider: str, model_name: str, input_tokens: int, 
-                        output_tokens: int, session_id: str, analysis_type: str = "stock_analysis"):
+                        output_tokens: int, session_id: str, analysis_type: str = "stock_analysis",
+                        node_name: str = "", latency_seconds: float = 0.0, request_count: int = 1):
         """添加使用记录"""
         # 计算成本
         cost = self.calculate_cost(provider, model_name, input_tokens, output_tokens)
@@ -299,47 +368,86 @@ class ConfigManager:
             output_tokens=output_tokens,
             cost=cost,
             session_id=session_id,
-            analysis_type=analysis_type
+            analysis_type=analysis_type,
+            node_name=node_name,
+            latency_seconds=round(latency_seconds, 3),
+            request_count=request_count
         )
         
         # 优先使用MongoDB存储
+        saved = False
         if self.mongodb_storage and self.mongodb_storage.is_connected():
-            success = self.mongodb_storage.save_usage_record(record)
-            if success:
-                return record
-            else:
-                print("⚠️ MongoDB保存失败，回退到JSON文件存储")
-        
-        # 回退到JSON文件存储
-        records = self.load_usage_records()
-        records.append(record)
+            saved = self.mongodb_storage.save_usage_record(record)
+            if not saved:
+                print("⚠️ MongoDB保存失败，回退到本地使用记录")
         
-        # 限制记录数量
-        settings = self.load_settings()
-        max_records = settings.get("max_usage_records", 10000)
-        if len(records) > max_records:
-            records = records[-max_records:]
+        # 回退到本地使用记录（入队后由后台线程批量写入）
+        if not saved:
+            self.usage_log.append(asdict(record))
         
-        self.save_usage_records(records)
+        self._add_daily_cost(cost or 0.0)
         return record
     
+    def _add_daily_cost(self, cost: float):
+        with self._daily_cost_lock:
+            if self._daily_cost_date == datetime.now().date():
+                self._daily_cost += cost
+    
+    def get_today_cost(self) -> float:
+        """获取今日总成本：每天首次调用时从存储统计，之后随新增记录累加"""
+        with self._daily_cost_lock:
+            today = datetime.now().date()
+            if self._daily_cost_date != today:
+                self._daily_cost = self._load_cost_since(datetime.combine(today, datetime.min.time()))
+                self._daily_cost_date = today
+            return self._daily_cost
+    
+    def _load_cost_since(self, since: datetime) -> float:
+        if self.mongodb_storage and self.mongodb_storage.is_connected():
+            try:
+                return self.mongodb_storage.get_cost_since(since.isoformat())
+            except Exception as e:
+                print(f"⚠️ MongoDB统计获取失败，回退到本地使用记录: {e}")
+        return self.usage_log.get_cost_since(since.isoformat())
+    
+    def get_session_cost(self, session_id: str) -> float:
+        """获取会话总成本（读会话汇总）"""
+        if self.mongodb_storage and self.mongodb_storage.is_connected():
+            try:
+                return self.mongodb_storage.get_session_cost(session_id)
+            except Exception as e:
+                print(f"⚠️ MongoDB统计获取失败，回退到本地使用记录: {e}")
+        return self.usage_log.get_session_cost(session_id)
+    
+    def get_usage_rollups(self, days: int = 30, granularity: str = "day") -> List[Dict[str, Any]]:
+        """获取最近N天按时间桶（day/hour）、供应商、模型、分析类型汇总的用量，供统计图表使用"""
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        if self.mongodb_storage and self.mongodb_storage.is_connected():
+            try:
+                return self.mongodb_storage.get_rollups(since, granularity)
+            except Exception as e:
+                print(f"⚠️ MongoDB统计获取失败，回退到本地使用记录: {e}")
+        try:
+            return self.usage_log.get_rollups(since, granularity)
+        except Exception as e:
+            print(f"❌ 使用记录汇总失败: {e}")
+            return []
+    
     def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> float:
         """计算使用成本"""
-        pricing_configs = self.load_pricing()
-        
-        for pricing in pricing_configs:
-            if pricing.provider == provider and pricing.model_name == model_name:
-                input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
-                output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
-                return round(input_cost + output_cost, 6)
+        # 按(供应商, 模型)索引查找，定价文件未变化时不重新读取
+        pricing = self._load_pricing_index().get((provider, model_name))
+        if pricing is None:
+            return 0.0
         
-        return 0.0
+        input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
+        output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
+        return round(input_cost + output_cost, 6)
     
     def load_settings(self) -> Dict[str, Any]:
         """加载设置，合并.env中的配置"""
         try:
-            with open(self.settings_file, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
+            settings = dict(self._read_config(self.settings_file))
         except Exception as e:
             print(f"加载设置失败: {e}")
             settings = {}
@@ -384,8 +492,7 @@ class ConfigManager:
     def save_settings(self, settings: Dict[str, Any]):
         """保存设置"""
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
+            self._write_config(self.settings_file, settings)
         except Exception as e:
             print(f"保存设置失败: {e}")
     
@@ -414,56 +521,21 @@ class ConfigManager:
                 
                 if stats:
                     stats["provider_stats"] = provider_stats
-                    stats["records_count"] = stats.get("total_requests", 0)
                     return stats
             except Exception as e:
                 print(f"⚠️ MongoDB统计获取失败，回退到JSON文件: {e}")
         
-        # 回退到JSON文件统计
-        records = self.load_usage_records()
-        
-        # 过滤最近N天的记录
-        from datetime import datetime, timedelta
+        # 回退到本地使用记录：读SQLite汇总表
         cutoff_date = datetime.now() - timedelta(days=days)
-        
-        recent_records = []
-        for record in records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    recent_records.append(record)
-            except:
-                continue
-        
-        # 统计数据
-        total_cost = sum(record.cost for record in recent_records)
-        total_input_tokens = sum(record.input_tokens for record in recent_records)
-        total_output_tokens = sum(record.output_tokens for record in recent_records)
-        
-        # 按供应商统计
-        provider_stats = {}
-        for record in recent_records:
-            if record.provider not in provider_stats:
-                provider_stats[record.provider] = {
-                    "cost": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "requests": 0
-                }
-            provider_stats[record.provider]["cost"] += record.cost
-            provider_stats[record.provider]["input_tokens"] += record.input_tokens
-            provider_stats[record.provider]["output_tokens"] += record.output_tokens
-            provider_stats[record.provider]["requests"] += 1
-        
-        return {
-            "period_days": days,
-            "total_cost": round(total_cost, 4),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_requests": len(recent_records),
-            "provider_stats": provider_stats,
-            "records_count": len(recent_records)
-        }
+        try:
+            stats = self.usage_log.get_statistics(cutoff_date.isoformat())
+        except Exception as e:
+            print(f"❌ 使用记录统计失败: {e}")
+            stats = {
+                "total_cost": 0.0, "total_input_tokens": 0, "total_output_tokens": 0,
+                "total_requests": 0, "provider_stats": {}, "records_count": 0
+            }
+        return {"period_days": days, **stats}
     
     def get_data_dir(self) -> str:
         """获取数据目录路径"""
@@ -514,10 +586,17 @@ class TokenTracker:
 
     def __init__(self, config_manager: ConfigManager):
         self.config_manager = config_manager
+        # LLM响应缓存统计（进程内）
+        self._cache_lock = threading.Lock()
+        self._cache_stats = {"hits": 0, "misses": 0, "saved_input_tokens": 0, "saved_output_tokens": 0}
 
     def track_usage(self, provider: str, model_name: str, input_tokens: int,
-                   output_tokens: int, session_id: str = None, analysis_type: str = "stock_analysis"):
-        """跟踪Token使用"""
+                   output_tokens: int, session_id: str = None, analysis_type: str = "stock_analysis",
+                   node_name: str = "", latency_seconds: float = 0.0, request_count: int = 1):
+        """跟踪Token使用
+        
+        node_name/latency_seconds/request_count 由按图节点汇总的调用（TokenUsageCallbackHandler）传入
+        """
         if session_id is None:
             session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
@@ -533,7 +612,10 @@ class TokenTracker:
             input_tokens=input_tokens,
             output_tokens=output_tokens,
             session_id=session_id,
-            analysis_type=analysis_type
+            analysis_type=analysis_type,
+            node_name=node_name,
+            latency_seconds=latency_seconds,
+            request_count=request_count
         )
 
         # 检查成本警告
@@ -546,18 +628,47 @@ class TokenTracker:
         settings = self.config_manager.load_settings()
         threshold = settings.get("cost_alert_threshold", 100.0)
 
-        # 获取今日总成本
-        today_stats = self.config_manager.get_usage_statistics(1)
-        total_today = today_stats["total_cost"]
+        # 获取今日总成本（内存中累计，不重新统计全部记录）
+        total_today = self.config_manager.get_today_cost()
 
         if total_today >= threshold:
             print(f"⚠️ 成本警告: 今日成本已达到 ¥{total_today:.4f}，超过阈值 ¥{threshold}")
 
     def get_session_cost(self, session_id: str) -> float:
         """获取会话成本"""
-        records = self.config_manager.load_usage_records()
-        session_cost = sum(record.cost for record in records if record.session_id == session_id)
-        return session_cost
+        return self.config_manager.get_session_cost(session_id)
+
+    def get_session_node_usage(self, session_id: str) -> Dict[str, Dict[str, Any]]:
+        """获取会话中各图节点的Token、成本和耗时汇总"""
+        node_usage = {}
+        for record in self.config_manager.load_usage_records(session_id=session_id):
+            usage = node_usage.setdefault(record.node_name or "unknown", {
+                "requests": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0, "latency_seconds": 0.0
+            })
+            usage["requests"] += record.request_count
+            usage["input_tokens"] += record.input_tokens
+            usage["output_tokens"] += record.output_tokens
+            usage["cost"] += record.cost
+            usage["latency_seconds"] += record.latency_seconds
+        return node_usage
+
+    def record_cache_lookup(self, hit: bool, saved_input_tokens: int = 0, saved_output_tokens: int = 0):
+        """记录一次LLM响应缓存查询，命中时累计节省的Token数"""
+        with self._cache_lock:
+            if hit:
+                self._cache_stats["hits"] += 1
+                self._cache_stats["saved_input_tokens"] += saved_input_tokens
+                self._cache_stats["saved_output_tokens"] += saved_output_tokens
+            else:
+                self._cache_stats["misses"] += 1
+
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """获取LLM响应缓存统计"""
+        with self._cache_lock:
+            stats = dict(self._cache_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
 
     def estimate_cost(self, provider: str, model_name: str, estimated_input_tokens: int,
                      estimated_output_tokens: int) -> float:
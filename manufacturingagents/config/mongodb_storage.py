@@ -2,6 +2,9 @@
 """
 MongoDB存储适配器
 用于将token使用记录存储到MongoDB数据库
+
+写入记录时用$inc upsert增量维护按小时/按天的汇总集合（token_usage_hourly / token_usage_daily，
+按时间桶、供应商、模型、分析类型）和按会话的汇总集合（token_usage_sessions），统计查询只读汇总集合
 """
 
 import os
@@ -9,6 +12,10 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import asdict
 from .config_manager import UsageRecord
+from .usage_log import (
+    ROLLUP_BUCKET_LENGTHS, ROLLUP_DIMENSIONS, ROLLUP_MEASURES, aggregate_rollups, aggregate_session_totals,
+    rollup_window
+)
 
 try:
     from pymongo import MongoClient
@@ -38,10 +45,14 @@ class MongoDBStorage:
         
         self.database_name = database_name
         self.collection_name = "token_usage"
+        self.rollup_collection_names = {"hour": "token_usage_hourly", "day": "token_usage_daily"}
+        self.session_collection_name = "token_usage_sessions"
         
         self.client = None
         self.db = None
         self.collection = None
+        self.rollup_collections = {}
+        self.session_collection = None
         self._connected = False
         
         # 尝试连接
@@ -59,9 +70,14 @@ class MongoDBStorage:
             
             self.db = self.client[self.database_name]
             self.collection = self.db[self.collection_name]
+            self.rollup_collections = {
+                granularity: self.db[name] for granularity, name in self.rollup_collection_names.items()
+            }
+            self.session_collection = self.db[self.session_collection_name]
             
             # 创建索引以提高查询性能
             self._create_indexes()
+            self._rebuild_rollups_if_missing()
             
             self._connected = True
             print(f"✅ MongoDB连接成功: {self.database_name}.{self.collection_name}")
@@ -90,9 +106,96 @@ class MongoDBStorage:
             # 创建分析类型索引
             self.collection.create_index("analysis_type")
             
+            # 汇总集合：每个(时间桶, 维度)唯一，会话汇总每个会话唯一
+            for rollup_collection in self.rollup_collections.values():
+                rollup_collection.create_index(
+                    [("bucket", 1)] + [(dimension, 1) for dimension in ROLLUP_DIMENSIONS], unique=True
+                )
+            self.session_collection.create_index("session_id", unique=True)
+            
         except Exception as e:
             print(f"创建MongoDB索引失败: {e}")
     
+    def _rebuild_rollups_if_missing(self):
+        """已有明细记录但汇总集合为空时（升级前的数据），从明细记录重建汇总"""
+        try:
+            if (self.rollup_collections["day"].estimated_document_count() > 0
+                    or self.collection.estimated_document_count() == 0):
+                return
+            measures = {
+                'cost': {'$sum': '$cost'},
+                'input_tokens': {'$sum': '$input_tokens'},
+                'output_tokens': {'$sum': '$output_tokens'},
+                'requests': {'$sum': {'$ifNull': ['$request_count', 1]}},
+                'records': {'$sum': 1}
+            }
+            for granularity, rollup_collection in self.rollup_collections.items():
+                group_id = {dimension: {'$ifNull': [f'${dimension}', '']} for dimension in ROLLUP_DIMENSIONS}
+                group_id['bucket'] = {'$substrCP': ['$timestamp', 0, ROLLUP_BUCKET_LENGTHS[granularity]]}
+                self.collection.aggregate([
+                    {'$group': {'_id': group_id, **measures}},
+                    {'$replaceRoot': {'newRoot': {'$mergeObjects': ['$_id', {
+                        measure: f'${measure}' for measure in ROLLUP_MEASURES
+                    }]}}},
+                    {'$merge': {
+                        'into': self.rollup_collection_names[granularity],
+                        'on': ['bucket', *ROLLUP_DIMENSIONS],
+                        'whenMatched': 'replace',
+                        'whenNotMatched': 'insert'
+                    }}
+                ])
+            self.collection.aggregate([
+                {'$match': {'session_id': {'$nin': [None, '']}}},
+                {'$group': {'_id': '$session_id', **measures}},
+                {'$replaceRoot': {'newRoot': {'$mergeObjects': [{'session_id': '$_id'}, {
+                    measure: f'${measure}' for measure in ROLLUP_MEASURES
+                }]}}},
+                {'$merge': {
+                    'into': self.session_collection_name,
+                    'on': 'session_id',
+                    'whenMatched': 'replace',
+                    'whenNotMatched': 'insert'
+                }}
+            ])
+            print("📊 MongoDB汇总集合已从现有记录重建")
+        except Exception as e:
+            print(f"重建MongoDB汇总集合失败: {e}")
+    
+    def _update_rollups(self, record_dict: Dict[str, Any]):
+        """按小时/按天累加汇总（$inc upsert）"""
+        for key, totals in aggregate_rollups([record_dict]).items():
+            granularity, bucket = key[0], key[1]
+            query = {'bucket': bucket, **dict(zip(ROLLUP_DIMENSIONS, key[2:]))}
+            self.rollup_collections[granularity].update_one(query, {'$inc': totals}, upsert=True)
+        for session_id, totals in aggregate_session_totals([record_dict]).items():
+            self.session_collection.update_one({'session_id': session_id}, {'$inc': totals}, upsert=True)
+    
+    def _aggregate_rollups(self, group_id: Any, since: str = None, hourly: bool = False) -> List[Dict[str, Any]]:
+        """从汇总集合按group_id分组求和：起始当天读小时汇总，之后读天汇总"""
+        if hourly:
+            sources = [("hour", {'bucket': {'$gte': since[:ROLLUP_BUCKET_LENGTHS["hour"]] if since else ""}})]
+        elif since:
+            hour_start, day_start = rollup_window(since)
+            sources = [
+                ("hour", {'bucket': {'$gte': hour_start, '$lt': day_start}}),
+                ("day", {'bucket': {'$gte': day_start}}),
+            ]
+        else:
+            sources = [("day", {})]
+        
+        totals: Dict[Any, Dict[str, Any]] = {}
+        for granularity, match in sources:
+            pipeline = [
+                {'$match': match},
+                {'$group': {'_id': group_id, **{measure: {'$sum': f'${measure}'} for measure in ROLLUP_MEASURES}}}
+            ]
+            for result in self.rollup_collections[granularity].aggregate(pipeline):
+                key = tuple(sorted(result['_id'].items())) if isinstance(result['_id'], dict) else result['_id']
+                group = totals.setdefault(key, {'_id': result['_id'], **dict.fromkeys(ROLLUP_MEASURES, 0)})
+                for measure in ROLLUP_MEASURES:
+                    group[measure] += result.get(measure, 0)
+        return list(totals.values())
+    
     def is_connected(self) -> bool:
         """检查是否连接到MongoDB"""
         return self._connected
@@ -113,6 +216,7 @@ class MongoDBStorage:
             result = self.collection.insert_one(record_dict)
             
             if result.inserted_id:
+                self._update_rollups(asdict(record))
                 return True
             else:
                 print("MongoDB插入失败：未返回插入ID")
@@ -159,7 +263,7 @@ class MongoDBStorage:
             return []
     
     def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
-        """从MongoDB获取使用统计"""
+        """从MongoDB汇总集合获取使用统计"""
         if not self._connected:
             return {}
         
@@ -167,50 +271,23 @@ class MongoDBStorage:
             from datetime import timedelta
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            # 聚合查询
-            pipeline = [
-                {
-                    '$match': {
-                        'timestamp': {'$gte': cutoff_date.isoformat()}
-                    }
-                },
-                {
-                    '$group': {
-                        '_id': None,
-                        'total_cost': {'$sum': '$cost'},
-                        'total_input_tokens': {'$sum': '$input_tokens'},
-                        'total_output_tokens': {'$sum': '$output_tokens'},
-                        'total_requests': {'$sum': 1}
-                    }
-                }
-            ]
-            
-            result = list(self.collection.aggregate(pipeline))
-            
-            if result:
-                stats = result[0]
-                return {
-                    'period_days': days,
-                    'total_cost': round(stats.get('total_cost', 0), 4),
-                    'total_input_tokens': stats.get('total_input_tokens', 0),
-                    'total_output_tokens': stats.get('total_output_tokens', 0),
-                    'total_requests': stats.get('total_requests', 0)
-                }
-            else:
-                return {
-                    'period_days': days,
-                    'total_cost': 0,
-                    'total_input_tokens': 0,
-                    'total_output_tokens': 0,
-                    'total_requests': 0
-                }
+            result = self._aggregate_rollups(None, cutoff_date.isoformat())
+            stats = result[0] if result else {}
+            return {
+                'period_days': days,
+                'total_cost': round(stats.get('cost', 0), 4),
+                'total_input_tokens': stats.get('input_tokens', 0),
+                'total_output_tokens': stats.get('output_tokens', 0),
+                'total_requests': stats.get('requests', 0),
+                'records_count': stats.get('records', 0)
+            }
                 
         except Exception as e:
             print(f"获取MongoDB统计失败: {e}")
             return {}
     
     def get_provider_statistics(self, days: int = 30) -> Dict[str, Dict[str, Any]]:
-        """按供应商获取统计信息"""
+        """按供应商获取统计信息（读汇总集合）"""
         if not self._connected:
             return {}
         
@@ -218,30 +295,9 @@ class MongoDBStorage:
             from datetime import timedelta
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            # 按供应商聚合
-            pipeline = [
-                {
-                    '$match': {
-                        'timestamp': {'$gte': cutoff_date.isoformat()}
-                    }
-                },
-                {
-                    '$group': {
-                        '_id': '$provider',
-                        'cost': {'$sum': '$cost'},
-                        'input_tokens': {'$sum': '$input_tokens'},
-                        'output_tokens': {'$sum': '$output_tokens'},
-                        'requests': {'$sum': 1}
-                    }
-                }
-            ]
-            
-            results = list(self.collection.aggregate(pipeline))
-            
             provider_stats = {}
-            for result in results:
-                provider = result['_id']
-                provider_stats[provider] = {
+            for result in self._aggregate_rollups('$provider', cutoff_date.isoformat()):
+                provider_stats[result['_id']] = {
                     'cost': round(result.get('cost', 0), 4),
                     'input_tokens': result.get('input_tokens', 0),
                     'output_tokens': result.get('output_tokens', 0),
@@ -254,6 +310,35 @@ class MongoDBStorage:
             print(f"获取供应商统计失败: {e}")
             return {}
     
+    def get_rollups(self, since: str, granularity: str = "day") -> List[Dict[str, Any]]:
+        """按时间桶、供应商、模型、分析类型汇总的用量，按时间桶排序"""
+        if not self._connected:
+            return []
+        
+        try:
+            group_id = {
+                'bucket': {'$substrCP': ['$bucket', 0, ROLLUP_BUCKET_LENGTHS[granularity]]},
+                **{dimension: f'${dimension}' for dimension in ROLLUP_DIMENSIONS}
+            }
+            rollups = [
+                {**result.pop('_id'), **result}
+                for result in self._aggregate_rollups(group_id, since, hourly=granularity == "hour")
+            ]
+            return sorted(rollups, key=lambda rollup: rollup['bucket'])
+        except Exception as e:
+            print(f"获取MongoDB汇总失败: {e}")
+            return []
+    
+    def get_cost_since(self, since: str) -> float:
+        """起始时间之后的总成本（读汇总集合）"""
+        result = self._aggregate_rollups(None, since) if self._connected else []
+        return result[0]['cost'] if result else 0.0
+    
+    def get_session_cost(self, session_id: str) -> float:
+        """会话总成本（读会话汇总集合）"""
+        result = self.session_collection.find_one({'session_id': session_id}) if self._connected else None
+        return result['cost'] if result else 0.0
+    
     def cleanup_old_records(self, days: int = 90) -> int:
         """清理旧记录"""
         if not self._connected:
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Token使用记录日志
+Usage Record Log
+
+替代每次LLM调用都整体读写usage.json的存储方式：
+- 只追加的SQLite表，timestamp和session_id建索引
+- 后台线程批量写入：add只入队，写线程每批一个事务提交
+- 写入时增量维护按小时/按天的汇总表（时间桶、供应商、模型、分析类型）和按会话的汇总表，统计查询只读汇总表，
+  复杂度与时间桶数量相关，与记录数和会话数无关；查询前先等待队列中的记录写完
+- 首次使用时导入已有的usage.json记录
+"""
+
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+USAGE_COLUMNS = (
+    "timestamp", "provider", "model_name", "input_tokens", "output_tokens", "cost",
+    "session_id", "analysis_type", "node_name", "latency_seconds", "request_count",
+)
+# 旧记录中没有的字段
+USAGE_DEFAULTS = {"node_name": "", "latency_seconds": 0.0, "request_count": 1}
+
+# 汇总维度和指标
+ROLLUP_DIMENSIONS = ("provider", "model_name", "analysis_type")
+ROLLUP_MEASURES = ("cost", "input_tokens", "output_tokens", "requests", "records")
+# 汇总粒度 -> ISO时间戳前缀长度（小时桶 "2025-07-01T09"，天桶 "2025-07-01"）
+ROLLUP_BUCKET_LENGTHS = {"hour": 13, "day": 10}
+ROLLUP_TABLES = {"hour": "usage_rollup_hourly", "day": "usage_rollup_daily"}
+# 会话汇总单独保存，时间桶汇总的行数不随会话数增长
+SESSION_TOTALS_TABLE = "usage_session_totals"
+
+# 后台写入参数
+DEFAULT_FLUSH_INTERVAL = 0.5   # 秒
+DEFAULT_MAX_BATCH_SIZE = 500
+
+
+def _add_to_totals(totals: Dict[str, float], record: Dict[str, Any]):
+    totals["cost"] += record.get("cost") or 0.0
+    totals["input_tokens"] += record.get("input_tokens") or 0
+    totals["output_tokens"] += record.get("output_tokens") or 0
+    totals["requests"] += record.get("request_count", USAGE_DEFAULTS["request_count"])
+    totals["records"] += 1
+
+
+def aggregate_rollups(records: List[Dict[str, Any]]) -> Dict[Tuple[str, ...], Dict[str, float]]:
+    """将记录按(粒度, 时间桶, 维度...)聚合为汇总增量"""
+    rollups: Dict[Tuple[str, ...], Dict[str, float]] = {}
+    for record in records:
+        dimensions = tuple(record.get(dimension) or "" for dimension in ROLLUP_DIMENSIONS)
+        for granularity, length in ROLLUP_BUCKET_LENGTHS.items():
+            totals = rollups.setdefault(
+                (granularity, record["timestamp"][:length]) + dimensions,
+                dict.fromkeys(ROLLUP_MEASURES, 0),
+            )
+            _add_to_totals(totals, record)
+    return rollups
+
+
+def aggregate_session_totals(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """将记录按会话聚合为汇总增量（没有会话ID的记录不计入）"""
+    sessions: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        if record.get("session_id"):
+            _add_to_totals(sessions.setdefault(record["session_id"], dict.fromkeys(ROLLUP_MEASURES, 0)), record)
+    return sessions
+
+
+def rollup_window(since: str) -> Tuple[str, str]:
+    """起始时间对应的汇总查询窗口：起始当天用小时桶[hour_start, day_start)，之后用天桶[day_start, ...)
+
+    统计精确到小时：起始时间所在小时内早于起始时间的记录也会计入。
+    """
+    day_start = (date.fromisoformat(since[:10]) + timedelta(days=1)).isoformat()
+    return since[:ROLLUP_BUCKET_LENGTHS["hour"]], day_start
+
+
+class UsageLog:
+    """SQLite使用记录日志（线程安全）"""
+
+    def __init__(
+        self,
+        path: Path,
+        legacy_json_path: Optional[Path] = None,
+        max_records: Callable[[], int] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        """
+        Args:
+            path: SQLite文件路径
+            legacy_json_path: 旧的usage.json，表为空时导入一次
+            max_records: 返回最多保留记录数的函数（设置项max_usage_records），写入后删除最早的记录
+            flush_interval: 后台线程等待凑批的最长时间（秒）
+            max_batch_size: 每批最多写入的记录数
+        """
+        self.path = Path(path)
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage_records ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, provider TEXT, model_name TEXT, "
+            "input_tokens INTEGER, output_tokens INTEGER, cost REAL, session_id TEXT, analysis_type TEXT, "
+            "node_name TEXT DEFAULT '', latency_seconds REAL DEFAULT 0, request_count INTEGER DEFAULT 1)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage_records (timestamp)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_session ON usage_records (session_id)")
+        measures = (
+            "cost REAL NOT NULL DEFAULT 0, input_tokens INTEGER NOT NULL DEFAULT 0, "
+            "output_tokens INTEGER NOT NULL DEFAULT 0, requests INTEGER NOT NULL DEFAULT 0, "
+            "records INTEGER NOT NULL DEFAULT 0"
+        )
+        dimensions = ", ".join(f"{dimension} TEXT NOT NULL" for dimension in ROLLUP_DIMENSIONS)
+        for table in ROLLUP_TABLES.values():
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (bucket TEXT NOT NULL, {dimensions}, {measures}, "
+                f"PRIMARY KEY (bucket, {', '.join(ROLLUP_DIMENSIONS)}))"
+            )
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {SESSION_TOTALS_TABLE} (session_id TEXT PRIMARY KEY, {measures})"
+        )
+        self._conn.commit()
+        self._rebuild_rollups_if_missing()
+
+        if legacy_json_path is not None:
+            self._import_legacy_json(Path(legacy_json_path))
+
+    def _import_legacy_json(self, json_path: Path):
+        if not json_path.exists() or self._count() > 0:
+            return
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except Exception as e:
+            print(f"⚠️ [使用记录] 读取旧的usage.json失败: {e}")
+            return
+        if records:
+            with self._lock:
+                self._insert(records)
+                self._conn.commit()
+            print(f"📥 [使用记录] 已导入usage.json中的 {len(records)} 条记录")
+
+    def _count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM usage_records").fetchone()[0]
+
+    def _insert(self, records: List[Dict[str, Any]]):
+        """写入记录并累加到汇总表（调用方持有锁并提交事务）"""
+        rows = [tuple(record.get(column, USAGE_DEFAULTS.get(column)) for column in USAGE_COLUMNS) for record in records]
+        self._conn.executemany(
+            f"INSERT INTO usage_records ({', '.join(USAGE_COLUMNS)}) VALUES ({', '.join('?' * len(USAGE_COLUMNS))})",
+            rows,
+        )
+
+        rollups = aggregate_rollups([dict(zip(USAGE_COLUMNS, row)) for row in rows])
+        columns = ("bucket",) + ROLLUP_DIMENSIONS + ROLLUP_MEASURES
+        updates = ", ".join(f"{measure} = {measure} + excluded.{measure}" for measure in ROLLUP_MEASURES)
+        for granularity, table in ROLLUP_TABLES.items():
+            self._conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (bucket, {', '.join(ROLLUP_DIMENSIONS)}) DO UPDATE SET {updates}",
+                [key[1:] + tuple(totals[measure] for measure in ROLLUP_MEASURES)
+                 for key, totals in rollups.items() if key[0] == granularity],
+            )
+
+        session_columns = ("session_id",) + ROLLUP_MEASURES
+        self._conn.executemany(
+            f"INSERT INTO {SESSION_TOTALS_TABLE} ({', '.join(session_columns)}) "
+            f"VALUES ({', '.join('?' * len(session_columns))}) ON CONFLICT (session_id) DO UPDATE SET {updates}",
+            [(session_id,) + tuple(totals[measure] for measure in ROLLUP_MEASURES)
+             for session_id, totals in aggregate_session_totals([dict(zip(USAGE_COLUMNS, row)) for row in rows]).items()],
+        )
+
+    def _rebuild_rollups_if_missing(self):
+        """旧版本的日志没有汇总表数据时，从已有记录重建一次"""
+        with self._lock:
+            has_records = self._conn.execute("SELECT 1 FROM usage_records LIMIT 1").fetchone()
+            has_rollups = self._conn.execute(f"SELECT 1 FROM {ROLLUP_TABLES['day']} LIMIT 1").fetchone()
+            if not has_records or has_rollups:
+                return
+            sums = "SUM(cost), SUM(input_tokens), SUM(output_tokens), SUM(request_count), COUNT(*)"
+            for granularity, table in ROLLUP_TABLES.items():
+                length = ROLLUP_BUCKET_LENGTHS[granularity]
+                dimensions = ", ".join(f"COALESCE({dimension}, '')" for dimension in ROLLUP_DIMENSIONS)
+                self._conn.execute(
+                    f"INSERT INTO {table} (bucket, {', '.join(ROLLUP_DIMENSIONS)}, {', '.join(ROLLUP_MEASURES)}) "
+                    f"SELECT substr(timestamp, 1, {length}), {dimensions}, {sums} FROM usage_records "
+                    f"GROUP BY {', '.join(str(i) for i in range(1, len(ROLLUP_DIMENSIONS) + 2))}"
+                )
+            self._conn.execute(f"DELETE FROM {SESSION_TOTALS_TABLE}")
+            self._conn.execute(
+                f"INSERT INTO {SESSION_TOTALS_TABLE} (session_id, {', '.join(ROLLUP_MEASURES)}) "
+                f"SELECT session_id, {sums} FROM usage_records WHERE session_id != '' GROUP BY 1"
+            )
+            self._conn.commit()
+        print("📊 [使用记录] 已从现有记录重建汇总表")
+
+    def _trim(self):
+        """只删除明细记录，汇总表保留全部历史"""
+        max_records = self.max_records() if self.max_records else None
+        if max_records:
+            self._conn.execute(
+                "DELETE FROM usage_records WHERE id <= (SELECT MAX(id) FROM usage_records) - ?", (max_records,)
+            )
+
+    # ---- 后台批量写入 ----
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="usage_log_writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.max_batch_size:
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+
+            try:
+                with self._lock:
+                    self._insert(batch)
+                    self._trim()
+                    self._conn.commit()
+            except Exception as e:
+                print(f"❌ [使用记录] 批量写入失败，丢弃 {len(batch)} 条记录: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def append(self, record: Dict[str, Any]):
+        """追加一条使用记录（入队后立即返回，由后台线程批量写入）"""
+        self._ensure_writer()
+        self._queue.put(record)
+
+    def flush(self):
+        """等待队列中的记录全部写入"""
+        if self._writer is not None:
+            self._queue.join()
+
+    # ---- 查询 ----
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        self.flush()
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def load_records(self, since: str = None, session_id: str = None) -> List[Dict[str, Any]]:
+        """按时间顺序读取记录，可按起始时间（ISO格式）和会话过滤"""
+        conditions, params = [], []
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if session_id:
+            conditions.append("session_id = ?")
+            params.append(session_id)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._query(f"SELECT {', '.join(USAGE_COLUMNS)} FROM usage_records{where} ORDER BY id", tuple(params))
+        return [dict(zip(USAGE_COLUMNS, row)) for row in rows]
+
+    def replace_all(self, records: List[Dict[str, Any]]):
+        """用给定记录替换全部记录（清空时传入空列表）"""
+        self.flush()
+        with self._lock:
+            self._conn.execute("DELETE FROM usage_records")
+            for table in tuple(ROLLUP_TABLES.values()) + (SESSION_TOTALS_TABLE,):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._insert(records)
+            self._conn.commit()
+
+    def _rollup_rows(self, group_by: List[str], since: str = None, hourly: bool = False) -> List[tuple]:
+        """从汇总表按group_by分组求和，每行为group_by各列 + ROLLUP_MEASURES
+
+        hourly=True时只读小时汇总表（需要小时粒度的结果）
+        """
+        if hourly:
+            source = f"SELECT * FROM {ROLLUP_TABLES['hour']} WHERE bucket >= ?"
+            params = [since[:ROLLUP_BUCKET_LENGTHS["hour"]] if since else ""]
+        elif since:
+            hour_start, day_start = rollup_window(since)
+            source = (f"SELECT * FROM {ROLLUP_TABLES['hour']} WHERE bucket >= ? AND bucket < ? "
+                      f"UNION ALL SELECT * FROM {ROLLUP_TABLES['day']} WHERE bucket >= ?")
+            params = [hour_start, day_start, day_start]
+        else:
+            source = f"SELECT * FROM {ROLLUP_TABLES['day']}"
+            params = []
+
+        select = ", ".join(group_by + [f"SUM({measure})" for measure in ROLLUP_MEASURES])
+        group = f" GROUP BY {', '.join(group_by)}" if group_by else ""
+        return self._query(f"SELECT {select} FROM ({source}){group}", tuple(params))
+
+    def get_statistics(self, since: str) -> Dict[str, Any]:
+        """统计起始时间之后的成本、Token和调用次数，按供应商分组（读汇总表）"""
+        rows = self._rollup_rows(["provider"], since)
+        provider_stats = {
+            provider: {
+                "cost": cost or 0.0,
+                "input_tokens": input_tokens or 0,
+                "output_tokens": output_tokens or 0,
+                "requests": requests or 0,
+            }
+            for provider, cost, input_tokens, output_tokens, requests, _records in rows
+        }
+        return {
+            "total_cost": round(sum(row[1] or 0.0 for row in rows), 4),
+            "total_input_tokens": sum(row[2] or 0 for row in rows),
+            "total_output_tokens": sum(row[3] or 0 for row in rows),
+            "total_requests": sum(row[4] or 0 for row in rows),
+            "provider_stats": provider_stats,
+            "records_count": sum(row[5] or 0 for row in rows),
+        }
+
+    def get_rollups(self, since: str, granularity: str = "day") -> List[Dict[str, Any]]:
+        """按时间桶、供应商、模型、分析类型汇总的用量，按时间桶排序"""
+        if granularity not in ROLLUP_TABLES:
+            raise ValueError(f"不支持的汇总粒度: {granularity}")
+        bucket = f"substr(bucket, 1, {ROLLUP_BUCKET_LENGTHS[granularity]})"
+        rows = self._rollup_rows([bucket] + list(ROLLUP_DIMENSIONS), since, hourly=granularity == "hour")
+        columns = ("bucket",) + ROLLUP_DIMENSIONS + ROLLUP_MEASURES
+        return sorted((dict(zip(columns, row)) for row in rows), key=lambda rollup: rollup["bucket"])
+
+    def get_cost_since(self, since: str) -> float:
+        """起始时间之后的总成本"""
+        return self._rollup_rows([], since)[0][0] or 0.0
+
+    def get_session_cost(self, session_id: str) -> float:
+        """会话总成本（读会话汇总表）"""
+        row = self._query(f"SELECT cost FROM {SESSION_TOTALS_TABLE} WHERE session_id = ?", (session_id,))
+        return row[0][0] if row else 0.0
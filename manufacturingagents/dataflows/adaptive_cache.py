@@ -58,6 +58,14 @@ class AdaptiveCacheSystem:
         ttl_seconds = self.cache_config["ttl_settings"].get(ttl_key, 7200)
         return ttl_seconds
     
+    def _get_metadata_ttl(self, metadata: Dict) -> int:
+        """获取缓存条目的TTL：优先使用保存时指定的TTL"""
+        if metadata.get('ttl_seconds'):
+            return metadata['ttl_seconds']
+        symbol = metadata.get('symbol', '')
+        data_type = metadata.get('data_type', 'stock_data')
+        return self._get_ttl_seconds(symbol, data_type)
+    
     def _is_cache_valid(self, cache_time: datetime, ttl_seconds: int) -> bool:
         """检查缓存是否有效"""
         if cache_time is None:
@@ -246,7 +254,24 @@ class AdaptiveCacheSystem:
         # 获取TTL
         ttl_seconds = self._get_ttl_seconds(symbol, data_type)
         
-        # 根据主要后端保存
+        success = self._save_to_backends(cache_key, data, metadata, ttl_seconds)
+        
+        if success:
+            self.logger.info(f"数据缓存成功: {symbol} -> {cache_key} (后端: {self.primary_backend})")
+        else:
+            self.logger.error(f"数据缓存失败: {symbol}")
+        
+        return cache_key
+    
+    def save_data_with_key(self, cache_key: str, data: Any, ttl_seconds: int,
+                           metadata: Dict = None) -> bool:
+        """使用调用方指定的缓存键和TTL保存数据"""
+        metadata = dict(metadata or {})
+        metadata['ttl_seconds'] = ttl_seconds
+        return self._save_to_backends(cache_key, data, metadata, ttl_seconds)
+    
+    def _save_to_backends(self, cache_key: str, data: Any, metadata: Dict, ttl_seconds: int) -> bool:
+        """按主要后端保存，失败时降级到文件缓存"""
         success = False
         
         if self.primary_backend == "redis":
@@ -261,12 +286,7 @@ class AdaptiveCacheSystem:
             self.logger.warning(f"主要后端({self.primary_backend})保存失败，使用文件缓存降级")
             success = self._save_to_file(cache_key, data, metadata)
         
-        if success:
-            self.logger.info(f"数据缓存成功: {symbol} -> {cache_key} (后端: {self.primary_backend})")
-        else:
-            self.logger.error(f"数据缓存失败: {symbol}")
-        
-        return cache_key
+        return success
     
     def load_data(self, cache_key: str) -> Optional[Any]:
         """从缓存加载数据"""
@@ -290,9 +310,7 @@ class AdaptiveCacheSystem:
         
         # 检查缓存是否有效（仅对文件缓存，数据库缓存有自己的TTL机制）
         if cache_data.get('backend') == 'file':
-            symbol = cache_data['metadata'].get('symbol', '')
-            data_type = cache_data['metadata'].get('data_type', 'stock_data')
-            ttl_seconds = self._get_ttl_seconds(symbol, data_type)
+            ttl_seconds = self._get_metadata_ttl(cache_data['metadata'])
             
             if not self._is_cache_valid(cache_data['timestamp'], ttl_seconds):
                 self.logger.debug(f"文件缓存已过期: {cache_key}")
@@ -355,9 +373,7 @@ class AdaptiveCacheSystem:
                 with open(cache_file, 'rb') as f:
                     cache_data = pickle.load(f)
                 
-                symbol = cache_data['metadata'].get('symbol', '')
-                data_type = cache_data['metadata'].get('data_type', 'stock_data')
-                ttl_seconds = self._get_ttl_seconds(symbol, data_type)
+                ttl_seconds = self._get_metadata_ttl(cache_data['metadata'])
                 
                 if not self._is_cache_valid(cache_data['timestamp'], ttl_seconds):
                     cache_file.unlink()
@@ -39,12 +39,14 @@ class StockDataCache:
         self.china_news_dir = self.cache_dir / "china_news"
         self.us_fundamentals_dir = self.cache_dir / "us_fundamentals"
         self.china_fundamentals_dir = self.cache_dir / "china_fundamentals"
+        self.manufacturing_dir = self.cache_dir / "manufacturing"
         self.metadata_dir = self.cache_dir / "metadata"
 
         # 创建所有目录
         for dir_path in [self.us_stock_dir, self.china_stock_dir, self.us_news_dir,
                         self.china_news_dir, self.us_fundamentals_dir,
-                        self.china_fundamentals_dir, self.metadata_dir]:
+                        self.china_fundamentals_dir, self.manufacturing_dir,
+                        self.metadata_dir]:
             dir_path.mkdir(exist_ok=True)
 
         # 缓存配置 - 针对不同市场设置不同的TTL
@@ -122,6 +124,8 @@ class StockDataCache:
             base_dir = self.china_news_dir if market_type == 'china' else self.us_news_dir
         elif data_type == "fundamentals":
             base_dir = self.china_fundamentals_dir if market_type == 'china' else self.us_fundamentals_dir
+        elif data_type == "manufacturing":
+            base_dir = self.manufacturing_dir
         else:
             base_dir = self.cache_dir
 
@@ -429,6 +433,45 @@ class StockDataCache:
         print(f"❌ 未找到有效的{desc}缓存: {symbol} ({data_source})")
         return None
     
+    def save_manufacturing_data(self, cache_key: str, data: Any, data_type: str,
+                                ttl_seconds: int) -> str:
+        """保存制造业外部数据（天气、新闻、节假日、宏观经济）到缓存，使用调用方指定的缓存键和TTL"""
+        cache_path = self._get_cache_path("manufacturing", cache_key, "pkl")
+        with open(cache_path, 'wb') as f:
+            pickle.dump(data, f)
+
+        metadata = {
+            'symbol': data_type,
+            'data_type': 'manufacturing',
+            'ttl_hours': ttl_seconds / 3600,
+            'file_path': str(cache_path),
+            'file_format': 'pkl'
+        }
+        self._save_metadata(cache_key, metadata)
+
+        print(f"🏭 制造业数据已缓存: {data_type} -> {cache_key}")
+        return cache_key
+
+    def load_manufacturing_data(self, cache_key: str) -> Optional[Any]:
+        """从缓存加载制造业外部数据，过期时返回None"""
+        metadata = self._load_metadata(cache_key)
+        if not metadata:
+            return None
+
+        if not self.is_cache_valid(cache_key, max_age_hours=metadata.get('ttl_hours', 1)):
+            return None
+
+        cache_path = Path(metadata['file_path'])
+        if not cache_path.exists():
+            return None
+
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ 加载制造业缓存数据失败: {e}")
+            return None
+
     def clear_old_cache(self, max_age_days: int = 7):
         """清理过期缓存"""
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+离线数据列式存储
+Columnar Storage for Offline Data
+
+离线SimFin财报（分号分隔的us-balance/us-cashflow/us-income CSV）、YFin价格CSV和Finnhub JSON每次工具调用都要
+整体解析，并对全部Report/Publish Date重新执行pd.to_datetime。本模块提供一次性转换和对应的读取：
+- SimFin财报按股票代码拆分为Feather文件，日期列预先解析为UTC日期：
+  us-balance-annual.csv -> us-balance-annual/<TICKER>.feather
+- 价格CSV转换为同名的.feather文件
+- Finnhub离线JSON（{ticker}_data_formatted.json）转换为按日期排序的同名.feather文件，
+  每个日期的数据保存为JSON文本，按日期范围切片后才解析
+- 读取时内存映射Feather文件，只读取需要的列
+- 转换完成后写入_converted.json记录源文件的mtime；源文件更新后列式数据视为过期，回退读取源文件
+
+依赖pyarrow（可选）；未安装或未转换时由调用方回退到CSV/JSON。
+转换工具: python scripts/setup/convert_offline_data.py
+"""
+
+import json
+import os
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+    COLUMNAR_AVAILABLE = True
+except ImportError:
+    feather = None
+    COLUMNAR_AVAILABLE = False
+
+
+SIMFIN_DATE_COLUMNS = ("Report Date", "Publish Date")
+FINNHUB_COLUMNS = ("date", "position", "payload")
+MANIFEST_FILE = "_converted.json"
+# 保留原CSV的行号，使输出（如Series的Name）与读取CSV时一致
+ROW_INDEX_COLUMN = "__row__"
+
+
+def _partition_file(ticker: str) -> str:
+    return f"{str(ticker).replace('/', '_')}.feather"
+
+
+def simfin_partition_dir(csv_path: str) -> str:
+    """SimFin CSV对应的按股票代码分区目录"""
+    return os.path.splitext(csv_path)[0]
+
+
+def price_feather_path(csv_path: str) -> str:
+    """价格CSV对应的Feather文件"""
+    return os.path.splitext(csv_path)[0] + ".feather"
+
+
+def parse_simfin_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """将Report/Publish Date解析为UTC日期（去掉时间部分）"""
+    for column in SIMFIN_DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], utc=True).dt.normalize()
+    return df
+
+
+def _write_feather(df: pd.DataFrame, path: str):
+    tmp_path = path + ".tmp"
+    df.to_feather(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(manifest_path: str, csv_path: str) -> bool:
+    """列式数据存在，且源CSV（如仍存在）在转换后没有更新"""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.stat(csv_path).st_mtime_ns <= manifest.get("source_mtime_ns", 0)
+
+
+def _write_manifest(manifest_path: str, csv_path: str, **extra):
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"source": os.path.basename(csv_path),
+                   "source_mtime_ns": os.stat(csv_path).st_mtime_ns, **extra}, f, ensure_ascii=False)
+
+
+def convert_simfin_csv(csv_path: str) -> int:
+    """将SimFin CSV转换为按股票代码分区的Feather文件，返回股票数量"""
+    if not COLUMNAR_AVAILABLE:
+        raise ImportError("pyarrow is not installed. Please install it with: pip install pyarrow")
+
+    df = parse_simfin_dates(pd.read_csv(csv_path, sep=";"))
+    df = df.reset_index(names=ROW_INDEX_COLUMN)
+
+    partition_dir = simfin_partition_dir(csv_path)
+    os.makedirs(partition_dir, exist_ok=True)
+    manifest_path = os.path.join(partition_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    tickers = 0
+    for ticker, part in df.groupby("Ticker", sort=False):
+        _write_feather(part.reset_index(drop=True), os.path.join(partition_dir, _partition_file(ticker)))
+        tickers += 1
+
+    _write_manifest(manifest_path, csv_path, tickers=tickers, columns=list(df.columns))
+    return tickers
+
+
+def simfin_partitions_available(csv_path: str) -> bool:
+    """SimFin CSV是否已转换为列式分区且未过期"""
+    manifest_path = os.path.join(simfin_partition_dir(csv_path), MANIFEST_FILE)
+    return COLUMNAR_AVAILABLE and _is_fresh(manifest_path, csv_path)
+
+
+def load_simfin_partition(csv_path: str, ticker: str,
+                          columns: Optional[Iterable[str]] = None) -> Optional[pd.DataFrame]:
+    """
+    读取某只股票的SimFin财报（日期已解析），行号与原CSV一致
+
+    Returns:
+        DataFrame；该股票没有记录时返回空DataFrame；未转换、已过期或未安装pyarrow时返回None
+    """
+    if not simfin_partitions_available(csv_path):
+        return None
+    partition_dir = simfin_partition_dir(csv_path)
+    manifest_path = os.path.join(partition_dir, MANIFEST_FILE)
+
+    path = os.path.join(partition_dir, _partition_file(ticker))
+    if not os.path.exists(path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            all_columns = json.load(f).get("columns", [])
+        names = [column for column in all_columns if column != ROW_INDEX_COLUMN]
+        return pd.DataFrame(columns=list(columns) if columns else names)
+
+    read_columns: Optional[List[str]] = None
+    if columns is not None:
+        read_columns = [ROW_INDEX_COLUMN] + [column for column in columns if column != ROW_INDEX_COLUMN]
+    table = feather.read_table(path, columns=read_columns, memory_map=True)
+    df = table.to_pandas()
+    df = df.set_index(ROW_INDEX_COLUMN)
+    df.index.name = None
+    return df
+
+
+def convert_price_csv(csv_path: str) -> int:
+    """将YFin价格CSV转换为Feather文件（列和值保持不变），返回行数"""
+    if not COLUMNAR_AVAILABLE:
+        raise ImportError("pyarrow is not installed. Please install it with: pip install pyarrow")
+
+    df = pd.read_csv(csv_path)
+    path = price_feather_path(csv_path)
+    _write_feather(df, path)
+    _write_manifest(path + ".json", csv_path, rows=len(df))
+    return len(df)
+
+
+def resolve_price_data_path(csv_path: str) -> str:
+    """价格数据的实际读取路径：有新鲜的Feather文件时用Feather，否则用CSV"""
+    path = price_feather_path(csv_path)
+    if COLUMNAR_AVAILABLE and os.path.exists(path) and _is_fresh(path + ".json", csv_path):
+        return path
+    return csv_path
+
+
+def read_price_data(path: str) -> pd.DataFrame:
+    """读取价格数据（Feather内存映射读取，或CSV）"""
+    if path.endswith(".feather"):
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return pd.read_csv(path)
+
+
+def finnhub_feather_path(json_path: str) -> str:
+    """Finnhub JSON对应的Feather文件"""
+    return os.path.splitext(json_path)[0] + ".feather"
+
+
+def convert_finnhub_json(json_path: str) -> int:
+    """
+    将Finnhub离线JSON转换为Feather文件，返回非空日期数
+
+    每行为一个日期：date（原JSON键）、position（在原JSON中的顺序）、payload（该日期数据的JSON文本），按date排序；
+    空数据的日期不保存（查询时本就会被过滤）。
+    """
+    if not COLUMNAR_AVAILABLE:
+        raise ImportError("pyarrow is not installed. Please install it with: pip install pyarrow")
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    rows = sorted(
+        (key, position, json.dumps(value, ensure_ascii=False))
+        for position, (key, value) in enumerate(data.items())
+        if len(value) > 0
+    )
+    df = pd.DataFrame(rows, columns=list(FINNHUB_COLUMNS))
+    path = finnhub_feather_path(json_path)
+    _write_feather(df, path)
+    _write_manifest(path + ".json", json_path, rows=len(df))
+    return len(df)
+
+
+def finnhub_columnar_available(json_path: str) -> bool:
+    """Finnhub JSON是否已转换为Feather且未过期"""
+    path = finnhub_feather_path(json_path)
+    return COLUMNAR_AVAILABLE and os.path.exists(path) and _is_fresh(path + ".json", json_path)
+
+
+def read_finnhub_table(json_path: str):
+    """内存映射读取转换后的Finnhub数据（pyarrow.Table，列见FINNHUB_COLUMNS）"""
+    return feather.read_table(finnhub_feather_path(json_path), memory_map=True)
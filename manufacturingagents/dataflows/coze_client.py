@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Coze工作流客户端
+Coze Workflow Client
+
+所有Coze工作流调用（天气、新闻、节假日）共享同一个连接池：
+- requests.Session 保持长连接，避免每次调用重新进行TCP+TLS握手
+- 信号量限制同时进行的工作流调用数量
+- 429/5xx 和连接失败时指数退避重试（优先使用Retry-After）
+- 连接超时与读取超时分别设置
+- AsyncCozeClient 基于 httpx.AsyncClient 提供同样策略的异步版本，每个事件循环一个实例
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+COZE_WORKFLOW_URL = "https://api.coze.cn/v1/workflow/run"
+
+# 需要重试的HTTP状态码
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class BaseCozeClient:
+    """Coze工作流客户端公共配置：超时、重试和退避策略"""
+
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        pool_size: int = None,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+        max_retries: int = None,
+        backoff_factor: float = None,
+        max_backoff: float = 30.0,
+    ):
+        """
+        初始化Coze客户端，未指定的参数从环境变量读取
+
+        Args:
+            max_concurrency: 同时进行的工作流调用上限 (COZE_MAX_CONCURRENCY，默认8)
+            pool_size: 连接池大小 (COZE_POOL_SIZE，默认与并发上限一致)
+            connect_timeout: 连接超时秒数 (COZE_CONNECT_TIMEOUT，默认10)
+            read_timeout: 读取超时秒数 (COZE_READ_TIMEOUT，默认180，工作流执行较慢)
+            max_retries: 最大重试次数 (COZE_MAX_RETRIES，默认3)
+            backoff_factor: 退避基数秒数 (COZE_BACKOFF_FACTOR，默认1.0)
+            max_backoff: 单次退避等待上限秒数
+        """
+        self.max_concurrency = max_concurrency or _env_int("COZE_MAX_CONCURRENCY", 8)
+        self.pool_size = pool_size or _env_int("COZE_POOL_SIZE", self.max_concurrency)
+        self.connect_timeout = connect_timeout or _env_float("COZE_CONNECT_TIMEOUT", 10.0)
+        self.read_timeout = read_timeout or _env_float("COZE_READ_TIMEOUT", 180.0)  # 工作流最长3分钟
+        self.max_retries = max_retries if max_retries is not None else _env_int("COZE_MAX_RETRIES", 3)
+        self.backoff_factor = backoff_factor if backoff_factor is not None else _env_float("COZE_BACKOFF_FACTOR", 1.0)
+        self.max_backoff = max_backoff
+
+    def _build_request(self, api_key: str, workflow_id: str, parameters: Dict[str, Any]):
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "workflow_id": workflow_id,
+            "parameters": parameters
+        }
+        return headers, payload
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+    def _backoff_seconds(self, attempt: int, response: Any = None) -> float:
+        """计算第attempt次重试前的等待时间"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After") if response.headers else None
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_backoff)
+                except ValueError:
+                    pass
+        delay = self.backoff_factor * (2 ** attempt)
+        # 加入随机抖动，避免大量并发请求同时重试
+        return min(delay + random.uniform(0, self.backoff_factor), self.max_backoff)
+
+
+class CozeClient(BaseCozeClient):
+    """Coze工作流HTTP客户端：连接池 + 并发限制 + 退避重试"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self.session = self._create_session()
+
+        print(f"🔌 [Coze客户端] 初始化完成: 并发上限={self.max_concurrency}, "
+              f"超时=({self.connect_timeout}s, {self.read_timeout}s), 重试={self.max_retries}")
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def run_workflow(self, api_key: str, workflow_id: str, parameters: Dict[str, Any]) -> requests.Response:
+        """
+        执行Coze工作流
+
+        Args:
+            api_key: Coze API密钥
+            workflow_id: 工作流ID
+            parameters: 工作流参数
+
+        Returns:
+            最后一次请求的响应（重试耗尽时返回最后一次的错误响应）
+
+        Raises:
+            requests.RequestException: 重试耗尽后仍无法建立连接，或读取超时
+        """
+        headers, payload = self._build_request(api_key, workflow_id, parameters)
+
+        attempt = 0
+        while True:
+            try:
+                with self._semaphore:
+                    response = self.session.post(
+                        COZE_WORKFLOW_URL, headers=headers, json=payload, timeout=self.timeout
+                    )
+            except requests.ConnectionError as e:
+                # 只重试连接失败（含连接超时）；读取超时不重试：工作流可能已在服务端执行，重试会使耗时成倍增加
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_seconds(attempt)
+                print(f"⚠️ [Coze客户端] 连接失败，{delay:.1f}s后重试 ({attempt + 1}/{self.max_retries}): {e}")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = self._backoff_seconds(attempt, response)
+                print(f"⚠️ [Coze客户端] HTTP {response.status_code}，{delay:.1f}s后重试 ({attempt + 1}/{self.max_retries})")
+
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+
+class AsyncCozeClient(BaseCozeClient):
+    """Coze工作流异步HTTP客户端：httpx连接池 + asyncio并发限制 + 退避重试
+
+    httpx.AsyncClient和asyncio.Semaphore绑定创建时的事件循环，请通过get_async_coze_client()获取当前循环的实例。
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+        )
+
+    async def run_workflow(self, api_key: str, workflow_id: str, parameters: Dict[str, Any]) -> httpx.Response:
+        """
+        异步执行Coze工作流，重试策略与CozeClient.run_workflow一致
+
+        Raises:
+            httpx.HTTPError: 重试耗尽后仍无法建立连接，或读取超时
+        """
+        headers, payload = self._build_request(api_key, workflow_id, parameters)
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self.client.post(COZE_WORKFLOW_URL, headers=headers, json=payload)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_seconds(attempt)
+                print(f"⚠️ [Coze异步客户端] 连接失败，{delay:.1f}s后重试 ({attempt + 1}/{self.max_retries}): {e}")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = self._backoff_seconds(attempt, response)
+                print(f"⚠️ [Coze异步客户端] HTTP {response.status_code}，{delay:.1f}s后重试 ({attempt + 1}/{self.max_retries})")
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        """关闭连接池"""
+        await self.client.aclose()
+
+
+# 全局Coze客户端实例
+_coze_client = None
+_coze_client_lock = threading.Lock()
+
+def get_coze_client() -> CozeClient:
+    """获取全局Coze客户端实例"""
+    global _coze_client
+    if _coze_client is None:
+        with _coze_client_lock:
+            if _coze_client is None:
+                _coze_client = CozeClient()
+    return _coze_client
+
+
+# 每个事件循环一个异步客户端实例
+_async_coze_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncCozeClient]" = weakref.WeakKeyDictionary()
+
+def get_async_coze_client() -> AsyncCozeClient:
+    """获取当前事件循环的异步Coze客户端实例（需在协程中调用）"""
+    loop = asyncio.get_running_loop()
+    client = _async_coze_clients.get(loop)
+    if client is None:
+        client = AsyncCozeClient()
+        _async_coze_clients[loop] = client
+    return client
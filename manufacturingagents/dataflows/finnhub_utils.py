@@ -1,10 +1,159 @@
+import bisect
 import json
 import os
+import threading
+from collections import OrderedDict
+
+from .columnar_store import finnhub_columnar_available, finnhub_feather_path, read_finnhub_table
+
+
+DEFAULT_STORE_MAX_MB = 256
+
+
+class _FinnhubDateIndex:
+    """
+    Non-empty entries of one formatted Finnhub file, sorted by date key.
+    Values are either the parsed JSON values, or a memory-mapped Feather table
+    (see columnar_store.convert_finnhub_json) whose payloads are parsed per range.
+    """
+
+    def __init__(self, dates, positions, values=None, table=None, size=0):
+        self.dates = dates
+        self.positions = positions
+        self.values = values
+        self.table = table
+        self.size = size
+
+    @classmethod
+    def from_json(cls, data_path):
+        with open(data_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        entries = sorted(
+            (key, position)
+            for position, (key, value) in enumerate(data.items())
+            if len(value) > 0
+        )
+        return cls(
+            dates=[key for key, _ in entries],
+            positions=[position for _, position in entries],
+            values=[data[key] for key, _ in entries],
+            size=os.path.getsize(data_path),
+        )
+
+    @classmethod
+    def from_table(cls, table):
+        dates = table.column("date")
+        positions = table.column("position")
+        return cls(
+            dates=dates.to_pylist(),
+            positions=positions.to_pylist(),
+            table=table,
+            size=dates.nbytes + positions.nbytes,
+        )
+
+    def get_range(self, start_date, end_date):
+        # same bounds as `start_date <= key <= end_date` on the string keys
+        lo = bisect.bisect_left(self.dates, start_date)
+        hi = bisect.bisect_right(self.dates, end_date)
+        if lo >= hi:
+            return {}
+
+        if self.values is not None:
+            values = self.values[lo:hi]
+        else:
+            payloads = self.table.column("payload").slice(lo, hi - lo).to_pylist()
+            values = [json.loads(payload) for payload in payloads]
+
+        # keep the order of the keys in the original file
+        entries = sorted(zip(self.positions[lo:hi], self.dates[lo:hi], values), key=lambda entry: entry[0])
+        return {date: value for _, date, value in entries}
+
+
+class FinnhubStore:
+    """
+    Thread-safe, in-process cache of date indexes per Finnhub data file,
+    invalidated when the file (or its Feather conversion) changes and evicted
+    LRU within a memory budget (FINNHUB_STORE_MAX_MB, default 256MB).
+    """
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            try:
+                max_mb = float(os.getenv("FINNHUB_STORE_MAX_MB", DEFAULT_STORE_MAX_MB))
+            except ValueError:
+                max_mb = DEFAULT_STORE_MAX_MB
+            max_bytes = int(max_mb * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+
+    @staticmethod
+    def _version(data_path):
+        feather_path = finnhub_feather_path(data_path)
+        return tuple(
+            os.stat(path).st_mtime_ns if os.path.exists(path) else None
+            for path in (data_path, feather_path)
+        ) + (finnhub_columnar_available(data_path),)
+
+    def get_index(self, data_path):
+        """Date index of a data file, or None if neither the file nor its conversion exists."""
+        version = self._version(data_path)
+        columnar = version[-1]
+        if not columnar and version[0] is None:
+            return None
+
+        with self._lock:
+            cached = self._entries.get(data_path)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(data_path)
+                return cached[1]
+
+        # load outside the lock; failed loads are not cached
+        if columnar:
+            index = _FinnhubDateIndex.from_table(read_finnhub_table(data_path))
+        else:
+            index = _FinnhubDateIndex.from_json(data_path)
+
+        with self._lock:
+            previous = self._entries.pop(data_path, None)
+            if previous is not None:
+                self._total_bytes -= previous[1].size
+            self._entries[data_path] = (version, index)
+            self._total_bytes += index.size
+            # keep at least the most recently used index, even if it exceeds the budget
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _path, (_, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.size
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+_finnhub_store = None
+_finnhub_store_lock = threading.Lock()
+
+
+def get_finnhub_store():
+    """Get the global Finnhub store."""
+    global _finnhub_store
+    if _finnhub_store is None:
+        with _finnhub_store_lock:
+            if _finnhub_store is None:
+                _finnhub_store = FinnhubStore()
+    return _finnhub_store
 
 
 def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=None):
     """
     Gets finnhub data saved and processed on disk.
+    Each file is parsed once per process and kept as a sorted date index, so
+    repeated calls only slice the requested range. The returned values are
+    shared with the cache and must not be modified.
     Args:
         start_date (str): Start date in YYYY-MM-DD format.
         end_date (str): End date in YYYY-MM-DD format.
@@ -26,13 +175,11 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
         )
 
     try:
-        if not os.path.exists(data_path):
+        index = get_finnhub_store().get_index(data_path)
+        if index is None:
             print(f"⚠️ [DEBUG] 数据文件不存在: {data_path}")
             print(f"⚠️ [DEBUG] 请确保已下载相关数据或检查数据目录配置")
             return {}
-        
-        with open(data_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
     except FileNotFoundError:
         print(f"❌ [ERROR] 文件未找到: {data_path}")
         return {}
@@ -44,8 +191,4 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
         return {}
 
     # filter keys (date, str in format YYYY-MM-DD) by the date range (str, str in format YYYY-MM-DD)
-    filtered_data = {}
-    for key, value in data.items():
-        if start_date <= key <= end_date and len(value) > 0:
-            filtered_data[key] = value
-    return filtered_data
+    return index.get_range(start_date, end_date)
@@ -187,6 +187,27 @@ class IntegratedCacheManager:
         else:
             return self.legacy_cache.load_fundamentals_data(cache_key)
     
+    def save_manufacturing_data(self, cache_key: str, data: Any, data_type: str,
+                                ttl_seconds: int) -> str:
+        """保存制造业外部数据，使用调用方指定的缓存键和TTL"""
+        if self.use_adaptive:
+            self.adaptive_cache.save_data_with_key(
+                cache_key,
+                data,
+                ttl_seconds,
+                metadata={'symbol': data_type, 'data_type': data_type}
+            )
+            return cache_key
+        else:
+            return self.legacy_cache.save_manufacturing_data(cache_key, data, data_type, ttl_seconds)
+    
+    def load_manufacturing_data(self, cache_key: str) -> Optional[Any]:
+        """加载制造业外部数据，不存在或已过期时返回None"""
+        if self.use_adaptive:
+            return self.adaptive_cache.load_data(cache_key)
+        else:
+            return self.legacy_cache.load_manufacturing_data(cache_key)
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         if self.use_adaptive:
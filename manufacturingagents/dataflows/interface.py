@@ -5,6 +5,7 @@ from .yfin_utils import *
 from .stockstats_utils import *
 from .googlenews_utils import *
 from .finnhub_utils import get_data_in_range
+from .simfin_index import get_simfin_index
 from dateutil.relativedelta import relativedelta
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
@@ -149,43 +150,39 @@ def get_finnhub_company_insider_transactions(
     )
 
 
-def get_simfin_balance_sheet(
-    ticker: Annotated[str, "ticker symbol"],
-    freq: Annotated[
-        str,
-        "reporting frequency of the company's financial history: annual / quarterly",
-    ],
-    curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
-):
+def _latest_simfin_report(statement: str, file_name: str, ticker: str, curr_date: str):
+    """
+    Latest report of a ticker published on or before curr_date, or None.
+    Looks up the shared in-process SimFin index (binary search on Publish Date).
+    """
     data_path = os.path.join(
         DATA_DIR,
         "fundamental_data",
         "simfin_data_all",
-        "balance_sheet",
+        statement,
         "companies",
         "us",
-        f"us-balance-{freq}.csv",
+        file_name,
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
+    return get_simfin_index().latest_report(data_path, ticker, curr_date)
 
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
 
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
+def get_simfin_balance_sheet(
+    ticker: Annotated[str, "ticker symbol"],
+    freq: Annotated[
+        str,
+        "reporting frequency of the company's financial history: annual / quarterly",
+    ],
+    curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
+):
+    # Get the most recent balance sheet published on or before the current date
+    latest_balance_sheet = _latest_simfin_report("balance_sheet", f"us-balance-{freq}.csv", ticker, curr_date)
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_balance_sheet is None:
         print("No balance sheet available before the given current date.")
         return ""
 
-    # Get the most recent balance sheet by selecting the row with the latest Publish Date
-    latest_balance_sheet = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_balance_sheet = latest_balance_sheet.drop("SimFinId")
 
@@ -204,35 +201,14 @@ def get_simfin_cashflow(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "cash_flow",
-        "companies",
-        "us",
-        f"us-cashflow-{freq}.csv",
-    )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
+    # Get the most recent cash flow statement published on or before the current date
+    latest_cash_flow = _latest_simfin_report("cash_flow", f"us-cashflow-{freq}.csv", ticker, curr_date)
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_cash_flow is None:
         print("No cash flow statement available before the given current date.")
         return ""
 
-    # Get the most recent cash flow statement by selecting the row with the latest Publish Date
-    latest_cash_flow = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_cash_flow = latest_cash_flow.drop("SimFinId")
 
@@ -251,35 +227,14 @@ def get_simfin_income_statements(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "income_statements",
-        "companies",
-        "us",
-        f"us-income-{freq}.csv",
-    )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
+    # Get the most recent income statement published on or before the current date
+    latest_income = _latest_simfin_report("income_statements", f"us-income-{freq}.csv", ticker, curr_date)
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_income is None:
         print("No income statement available before the given current date.")
         return ""
 
-    # Get the most recent income statement by selecting the row with the latest Publish Date
-    latest_income = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_income = latest_income.drop("SimFinId")
 
@@ -518,40 +473,38 @@ def get_stock_stats_indicators_window(
     end_date = curr_date
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
+    start_date = before.strftime("%Y-%m-%d")
 
-    if not online:
-        # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
+    # Load the price data and compute the indicator once for the whole window
+    missing_value = "N/A: Not a trading day (weekend or holiday)"
+    try:
+        indicator_values = StockstatsUtils.get_stock_stats_window(
+            symbol,
+            indicator,
+            start_date,
+            end_date,
+            os.path.join(DATA_DIR, "market_data", "price_data"),
+            online=online,
         )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
-    else:
-        # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-            )
+    except Exception as e:
+        if not online:
+            raise
+        print(
+            f"Error getting stockstats indicator data for indicator {indicator} from {start_date} to {end_date}: {e}"
+        )
+        indicator_values = {}
+        missing_value = ""
 
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+    ind_string = ""
+    while curr_date >= before:
+        date_str = curr_date.strftime("%Y-%m-%d")
+        if date_str in indicator_values:
+            ind_string += f"{date_str}: {indicator_values[date_str]}\n"
+        elif online:
+            # online output lists every calendar day, offline only the trading dates
+            ind_string += f"{date_str}: {missing_value}\n"
 
-            curr_date = curr_date - relativedelta(days=1)
+        curr_date = curr_date - relativedelta(days=1)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -602,24 +555,16 @@ def get_YFin_data_window(
     before = date_obj - relativedelta(days=look_back_days)
     start_date = before.strftime("%Y-%m-%d")
 
-    # read in data
-    data = pd.read_csv(
-        os.path.join(
-            DATA_DIR,
-            f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-        )
+    # read in data (shared frame from the price frame store, do not modify it)
+    data = load_offline_price_data(
+        symbol, os.path.join(DATA_DIR, "market_data", "price_data")
     )
 
     # Extract just the date part for comparison
-    data["DateOnly"] = data["Date"].str[:10]
+    date_only = data["Date"].str[:10]
 
     # Filter data between the start and end dates (inclusive)
-    filtered_data = data[
-        (data["DateOnly"] >= start_date) & (data["DateOnly"] <= curr_date)
-    ]
-
-    # Drop the temporary column we created
-    filtered_data = filtered_data.drop("DateOnly", axis=1)
+    filtered_data = data[(date_only >= start_date) & (date_only <= curr_date)]
 
     # Set pandas display options to show the full DataFrame
     with pd.option_context(
@@ -680,12 +625,9 @@ def get_YFin_data(
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
 ) -> str:
-    # read in data
-    data = pd.read_csv(
-        os.path.join(
-            DATA_DIR,
-            f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-        )
+    # read in data (shared frame from the price frame store, do not modify it)
+    data = load_offline_price_data(
+        symbol, os.path.join(DATA_DIR, "market_data", "price_data")
     )
 
     if end_date > "2025-03-25":
@@ -694,15 +636,10 @@ def get_YFin_data(
         )
 
     # Extract just the date part for comparison
-    data["DateOnly"] = data["Date"].str[:10]
+    date_only = data["Date"].str[:10]
 
     # Filter data between the start and end dates (inclusive)
-    filtered_data = data[
-        (data["DateOnly"] >= start_date) & (data["DateOnly"] <= end_date)
-    ]
-
-    # Drop the temporary column we created
-    filtered_data = filtered_data.drop("DateOnly", axis=1)
+    filtered_data = data[(date_only >= start_date) & (date_only <= end_date)]
 
     # remove the index from the dataframe
     filtered_data = filtered_data.reset_index(drop=True)
@@ -1001,13 +938,97 @@ def get_fundamentals_openai(ticker, curr_date):
 # Manufacturing Data Interface Functions
 # =================================
 
+class ManufacturingAPIError(Exception):
+    """制造业外部数据API返回错误，错误信息可直接返回给调用方"""
+
+
+# Coze工作流ID
+WEATHER_WORKFLOW_ID = "7528239823611281448"
+NEWS_WORKFLOW_ID = "7528253601837481984"
+HOLIDAY_WORKFLOW_ID = "7528250308326260762"
+
+
+def _parse_coze_response(response, api_label: str):
+    """解析Coze工作流响应（requests或httpx响应），API返回错误时抛出ManufacturingAPIError"""
+    if response.status_code != 200:
+        raise ManufacturingAPIError(f"❌ {api_label}API调用失败: HTTP {response.status_code}")
+
+    result = response.json()
+    if result.get('code') != 0:
+        raise ManufacturingAPIError(f"❌ {api_label}API返回错误: {result}")
+
+    data_str = result.get('data', '{}')
+    if isinstance(data_str, str):
+        return json.loads(data_str)
+    return data_str
+
+
+def _call_coze_workflow(coze_api_key: str, workflow_id: str, parameters: Dict, api_label: str):
+    """通过共享的Coze客户端调用工作流并解析返回数据"""
+    from .coze_client import get_coze_client
+
+    response = get_coze_client().run_workflow(coze_api_key, workflow_id, parameters)
+    return _parse_coze_response(response, api_label)
+
+
+async def _acall_coze_workflow(coze_api_key: str, workflow_id: str, parameters: Dict, api_label: str):
+    """_call_coze_workflow的异步版本，使用当前事件循环的异步Coze客户端"""
+    from .coze_client import get_async_coze_client
+
+    response = await get_async_coze_client().run_workflow(coze_api_key, workflow_id, parameters)
+    return _parse_coze_response(response, api_label)
+
+
+def _build_weather_api_params(city_name: str) -> Dict:
+    """生成天气工作流参数（简化版，避免复杂的预处理逻辑）"""
+    return {
+        'dailyForecast': True,
+        'hourlyForecast': False,
+        'nowcasting': False,
+        'place': city_name,
+        'realtime': False
+    }
+
+
+def _build_news_api_params(query_params) -> Dict:
+    """生成新闻工作流参数，支持结构化字典或字符串查询"""
+    # 🎯 修复：支持结构化查询参数
+    if isinstance(query_params, dict):
+        # 使用结构化查询（符合预期格式）
+        news_params = {
+            'activity_query': query_params.get('activity_query', ''),
+            'area_news_query': query_params.get('area_news_query', ''),
+            'new_building_query': query_params.get('new_building_query', ''),
+            'policy_query': query_params.get('policy_query', '')
+        }
+        print(f"📰 [INTERFACE] 使用结构化查询参数: {news_params}")
+    else:
+        # 降级到简单字符串查询（兼容性）
+        news_params = {
+            'activity_query': f"{query_params} 促销活动",
+            'area_news_query': query_params,
+            'new_building_query': f"{query_params} 新项目",
+            'policy_query': f"{query_params} 政策"
+        }
+        print(f"📰 [INTERFACE] 使用简单字符串查询，自动生成结构化参数")
+    return news_params
+
+
+def _build_holiday_api_params() -> Dict:
+    """生成节假日工作流参数（简化版）"""
+    return {
+        'start_date': '2025-7-1',
+        'end_date': '2025-10-31'
+    }
+
+
 def get_manufacturing_weather_interface(
     city_name: str,
     curr_date: str,
 ) -> str:
     """
     获取制造业相关的天气预报数据，用于分析天气对产品需求的影响
-    复用原有的缓存和降级机制
+    相同城市的天气数据缓存1小时
     
     Args:
         city_name (str): 城市名称
@@ -1019,13 +1040,7 @@ def get_manufacturing_weather_interface(
     print(f"🌤️ [INTERFACE] 获取制造业天气数据: {city_name} ({curr_date})")
     
     try:
-        # 1. 检查缓存 (复用原有缓存机制)
-        cache_key = f"manufacturing_weather_{city_name}_{curr_date}"
-        
-        # 2. 调用外部API获取数据
-        import os
-        import requests
-        from datetime import datetime
+        from .manufacturing_cache import cached_manufacturing_data
         
         # 获取API密钥
         coze_api_key = os.getenv('COZE_API_KEY')
@@ -1034,56 +1049,27 @@ def get_manufacturing_weather_interface(
             print(f"🌤️ [INTERFACE ERROR] {error_msg}")
             return error_msg
         
-        # 生成API参数（简化版，避免复杂的预处理逻辑）
-        api_params = {
-            'weather': {
-                'dailyForecast': True,
-                'hourlyForecast': False,
-                'nowcasting': False,
-                'place': city_name,
-                'realtime': False
-            }
-        }
+        # 1. 读穿透缓存，未命中时调用Coze天气API
+        api_params = _build_weather_api_params(city_name)
+        data = cached_manufacturing_data(
+            'weather',
+            {'workflow_id': WEATHER_WORKFLOW_ID, 'parameters': api_params},
+            lambda: _call_coze_workflow(coze_api_key, WEATHER_WORKFLOW_ID, api_params, "天气"),
+        )
         
-        # 调用Coze天气API
-        headers = {
-            "Authorization": f"Bearer {coze_api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "workflow_id": "7528239823611281448",
-            "parameters": api_params['weather']
-        }
+        # 2. 格式化数据 (类似原有函数的格式化方式)
+        formatted_result = f"## {city_name}制造业天气预报数据 ({curr_date})\n\n"
+        formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
         
-        response = requests.post("https://api.coze.cn/v1/workflow/run", headers=headers, json=payload, timeout=180)  # 增加到3分钟
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('code') == 0:
-                import json
-                data_str = result.get('data', '{}')
-                if isinstance(data_str, str):
-                    data = json.loads(data_str)
-                else:
-                    data = data_str
-                
-                # 3. 格式化数据 (类似原有函数的格式化方式)
-                formatted_result = f"## {city_name}制造业天气预报数据 ({curr_date})\n\n"
-                formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
-                
-                print(f"✅ [INTERFACE] 天气数据获取成功: {city_name}")
-                return formatted_result
-            else:
-                error_msg = f"❌ 天气API返回错误: {result}"
-                print(f"🌤️ [INTERFACE ERROR] {error_msg}")
-                return error_msg
-        else:
-            error_msg = f"❌ 天气API调用失败: HTTP {response.status_code}"
-            print(f"🌤️ [INTERFACE ERROR] {error_msg}")
-            return error_msg
-            
+        print(f"✅ [INTERFACE] 天气数据获取成功: {city_name}")
+        return formatted_result
+        
+    except ManufacturingAPIError as e:
+        error_msg = str(e)
+        print(f"🌤️ [INTERFACE ERROR] {error_msg}")
+        return error_msg
     except Exception as e:
-        error_msg = f"制造业天气数据获取失败: {str(e)}"
+        error_msg = f"❌ 制造业天气数据获取失败: {str(e)}"
         print(f"❌ [INTERFACE ERROR] {error_msg}")
         return error_msg
 
@@ -1094,6 +1080,7 @@ def get_manufacturing_news_interface(
 ) -> str:
     """
     获取制造业相关的新闻数据，用于分析市场动态和政策影响
+    相同查询参数的新闻数据缓存4小时
     
     Args:
         query_params (dict|str): 新闻查询参数，可以是结构化字典或字符串
@@ -1105,12 +1092,7 @@ def get_manufacturing_news_interface(
     print(f"📰 [INTERFACE] 获取制造业新闻数据: {query_params} ({curr_date})")
     
     try:
-        # 1. 检查缓存
-        cache_key = f"manufacturing_news_{hash(str(query_params))}_{curr_date}"
-        
-        # 2. 调用外部API
-        import os
-        import requests
+        from .manufacturing_cache import cached_manufacturing_data
         
         # 获取API密钥
         coze_api_key = os.getenv('COZE_API_KEY')
@@ -1119,69 +1101,27 @@ def get_manufacturing_news_interface(
             print(f"📰 [INTERFACE ERROR] {error_msg}")
             return error_msg
         
-        # 🎯 修复：支持结构化查询参数
-        if isinstance(query_params, dict):
-            # 使用结构化查询（符合预期格式）
-            api_params = {
-                'news': {
-                    'activity_query': query_params.get('activity_query', ''),
-                    'area_news_query': query_params.get('area_news_query', ''),
-                    'new_building_query': query_params.get('new_building_query', ''),
-                    'policy_query': query_params.get('policy_query', '')
-                }
-            }
-            print(f"📰 [INTERFACE] 使用结构化查询参数: {api_params['news']}")
-        else:
-            # 降级到简单字符串查询（兼容性）
-            api_params = {
-                'news': {
-                    'activity_query': f"{query_params} 促销活动",
-                    'area_news_query': query_params,
-                    'new_building_query': f"{query_params} 新项目",
-                    'policy_query': f"{query_params} 政策"
-                }
-            }
-            print(f"📰 [INTERFACE] 使用简单字符串查询，自动生成结构化参数")
+        # 1. 读穿透缓存，未命中时调用Coze新闻API
+        api_params = _build_news_api_params(query_params)
+        data = cached_manufacturing_data(
+            'news',
+            {'workflow_id': NEWS_WORKFLOW_ID, 'parameters': api_params},
+            lambda: _call_coze_workflow(coze_api_key, NEWS_WORKFLOW_ID, api_params, "新闻"),
+        )
         
-        # 调用Coze新闻API
-        headers = {
-            "Authorization": f"Bearer {coze_api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "workflow_id": "7528253601837481984",
-            "parameters": api_params['news']
-        }
+        # 2. 格式化数据
+        formatted_result = f"## 制造业新闻数据 - {query_params} ({curr_date})\n\n"
+        formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
         
-        response = requests.post("https://api.coze.cn/v1/workflow/run", headers=headers, json=payload, timeout=180)  # 增加到3分钟
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('code') == 0:
-                import json
-                data_str = result.get('data', '{}')
-                if isinstance(data_str, str):
-                    data = json.loads(data_str)
-                else:
-                    data = data_str
-                
-                # 3. 格式化数据
-                formatted_result = f"## 制造业新闻数据 - {query_params} ({curr_date})\n\n"
-                formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
-                
-                print(f"✅ [INTERFACE] 新闻数据获取成功: {query_params}")
-                return formatted_result
-            else:
-                error_msg = f"❌ 新闻API返回错误: {result}"
-                print(f"📰 [INTERFACE ERROR] {error_msg}")
-                return error_msg
-        else:
-            error_msg = f"❌ 新闻API调用失败: HTTP {response.status_code}"
-            print(f"📰 [INTERFACE ERROR] {error_msg}")
-            return error_msg
-            
+        print(f"✅ [INTERFACE] 新闻数据获取成功: {query_params}")
+        return formatted_result
+        
+    except ManufacturingAPIError as e:
+        error_msg = str(e)
+        print(f"📰 [INTERFACE ERROR] {error_msg}")
+        return error_msg
     except Exception as e:
-        error_msg = f"制造业新闻数据获取失败: {str(e)}"
+        error_msg = f"❌ 制造业新闻数据获取失败: {str(e)}"
         print(f"❌ [INTERFACE ERROR] {error_msg}")
         return error_msg
 
@@ -1193,7 +1133,8 @@ def get_manufacturing_economic_interface(
 ) -> str:
     """
     获取制造业经济数据（PMI、PPI、期货数据）
-    集成智能参数处理器和数据验证器
+    集成智能参数处理器和数据验证器，PMI/PPI数据缓存到下月，期货数据缓存6小时
+    TuShare客户端、数据验证器和数据策略均为进程内共享实例
     
     Args:
         data_type (str): 数据类型 - 'pmi', 'ppi', 'commodity'
@@ -1206,20 +1147,20 @@ def get_manufacturing_economic_interface(
     print(f"📈 [INTERFACE] 获取制造业经济数据: {data_type} ({time_range})")
     
     try:
-        # 1. 检查缓存
-        cache_key = f"manufacturing_economic_{data_type}_{hash(time_range)}_{hash(str(commodity_type))}"
+        from .manufacturing_cache import cached_manufacturing_data
+        from .tushare_client import get_tushare_client_manager
         
-        # 2. ✨ 使用智能参数处理器生成动态参数
+        # 1. ✨ 使用智能参数处理器生成动态参数
         try:
             from manufacturingagents.manufacturingagents.utils.parameter_processor import get_parameter_processor
-            from manufacturingagents.manufacturingagents.utils.data_validator import ManufacturingDataValidator
-            from manufacturingagents.manufacturingagents.utils.strict_data_policy import StrictDataPolicy
+            from manufacturingagents.manufacturingagents.utils.data_validator import get_data_validator
+            from manufacturingagents.manufacturingagents.utils.strict_data_policy import get_strict_data_policy
             from manufacturingagents.default_config import DEFAULT_CONFIG
             
-            # 初始化组件
+            # 获取共享组件实例
             param_processor = get_parameter_processor(DEFAULT_CONFIG)
-            data_validator = ManufacturingDataValidator()
-            data_policy = StrictDataPolicy()
+            data_validator = get_data_validator()
+            data_policy = get_strict_data_policy()
             
             print(f"✅ [INTERFACE] 智能组件初始化成功")
         except Exception as e:
@@ -1228,12 +1169,7 @@ def get_manufacturing_economic_interface(
             data_validator = None
             data_policy = None
         
-        # 3. 调用TuShare API
-        import os
-        import tushare as ts
-        import pandas as pd
-        from datetime import datetime
-        
+        # 2. 调用TuShare API
         # 获取TuShare token
         tushare_token = os.getenv('TUSHARE_TOKEN')
         if not tushare_token:
@@ -1241,10 +1177,10 @@ def get_manufacturing_economic_interface(
             print(f"📈 [INTERFACE ERROR] {error_msg}")
             return error_msg
         
-        ts.set_token(tushare_token)
-        pro = ts.pro_api()
+        # 复用进程内的pro_api客户端（token变化时自动重建，按接口限流）
+        pro = get_tushare_client_manager().get_pro_api(tushare_token)
         
-        # 4. 🎯 根据数据类型获取智能生成的参数
+        # 3. 🎯 根据数据类型获取智能生成的参数，按实际API参数读穿透缓存
         current_date = datetime.now().strftime('%Y-%m-%d')
         
         if data_type == 'pmi':
@@ -1259,10 +1195,14 @@ def get_manufacturing_economic_interface(
                 # 降级方案：硬编码参数
                 api_params = {"start_m": "202505", "end_m": "202507", "fields": "month,pmi010000"}
                 
-            result = pro.cn_pmi(
-                start_m=api_params['start_m'],
-                end_m=api_params['end_m'],
-                fields=api_params['fields']
+            result = cached_manufacturing_data(
+                'pmi',
+                api_params,
+                lambda: pro.cn_pmi(
+                    start_m=api_params['start_m'],
+                    end_m=api_params['end_m'],
+                    fields=api_params['fields']
+                ),
             )
             formatted_result = f"## PMI制造业采购经理指数 ({time_range})\n\n"
             
@@ -1278,21 +1218,23 @@ def get_manufacturing_economic_interface(
                 # 降级方案：硬编码参数
                 api_params = {"start_m": "202505", "end_m": "202507", "fields": "month,ppi_yoy,ppi_mp"}
                 
-            result = pro.cn_ppi(
-                start_m=api_params['start_m'],
-                end_m=api_params['end_m'],
-                fields=api_params['fields']
+            result = cached_manufacturing_data(
+                'ppi',
+                api_params,
+                lambda: pro.cn_ppi(
+                    start_m=api_params['start_m'],
+                    end_m=api_params['end_m'],
+                    fields=api_params['fields']
+                ),
             )
             formatted_result = f"## PPI工业生产者价格指数 ({time_range})\n\n"
             
         elif data_type == 'commodity':
             # 🎯 修复：获取本月和下月两个期货合约数据
-            from datetime import datetime, timedelta
-            
             # 计算当前月份和下个月份
-            current_date = datetime.now()
-            current_month = current_date.month
-            current_year = current_date.year
+            now = datetime.now()
+            current_month = now.month
+            current_year = now.year
             
             # 🎯 修复：使用正确的期货代码格式 (年份2位+月份2位)
             # 生成本月和下月的期货代码
@@ -1305,51 +1247,11 @@ def get_manufacturing_economic_interface(
             
             print(f"🧠 [INTERFACE] 获取期货数据: 本月={current_month_code}, 下月={next_month_code}")
             
-            # 🎯 修复：按照22-tushare-api-input.md获取完整字段
-            # 获取本月数据
-            try:
-                print(f"🔍 [DEBUG] 尝试获取本月期货数据: {current_month_code}")
-                current_result = pro.fut_weekly_monthly(
-                    ts_code=current_month_code,
-                    freq='week',
-                    fields='ts_code,trade_date,freq,open,high,low,close,vol,amount'
-                ).head(5)
-                print(f"🔍 [DEBUG] 本月数据形状: {current_result.shape}")
-            except Exception as e:
-                print(f"❌ [DEBUG] 本月期货数据获取失败: {e}")
-                current_result = pd.DataFrame()
-            
-            # 获取下月数据
-            try:
-                print(f"🔍 [DEBUG] 尝试获取下月期货数据: {next_month_code}")
-                next_result = pro.fut_weekly_monthly(
-                    ts_code=next_month_code,
-                    freq='week',
-                    fields='ts_code,trade_date,freq,open,high,low,close,vol,amount'
-                ).head(5)
-                print(f"🔍 [DEBUG] 下月数据形状: {next_result.shape}")
-            except Exception as e:
-                print(f"❌ [DEBUG] 下月期货数据获取失败: {e}")
-                next_result = pd.DataFrame()
-            
-            # 合并数据
-            if not current_result.empty:
-                current_result['month_type'] = '本月'
-            if not next_result.empty:
-                next_result['month_type'] = '下月'
-                
-            # 🎯 修复：处理空数据情况
-            if not current_result.empty and not next_result.empty:
-                result = pd.concat([current_result, next_result], ignore_index=True)
-            elif not current_result.empty:
-                result = current_result
-                print("⚠️ [DEBUG] 只获取到本月期货数据")
-            elif not next_result.empty:
-                result = next_result
-                print("⚠️ [DEBUG] 只获取到下月期货数据")
-            else:
-                result = pd.DataFrame(columns=['ts_code', 'trade_date', 'freq', 'open', 'high', 'low', 'close', 'vol', 'amount', 'month_type'])
-                print("⚠️ [DEBUG] 未获取到任何期货数据，返回空DataFrame")
+            result = cached_manufacturing_data(
+                'commodity',
+                {'contracts': [current_month_code, next_month_code], 'freq': 'week'},
+                lambda: _fetch_commodity_contracts(pro, current_month_code, next_month_code),
+            )
             
             formatted_result = f"## {commodity_type or '铜期货'}数据 (本月和下月对比)\n\n"
             
@@ -1358,7 +1260,7 @@ def get_manufacturing_economic_interface(
             print(f"📈 [INTERFACE ERROR] {error_msg}")
             return error_msg
         
-        # 5. 📊 数据验证（如果可用）
+        # 4. 📊 数据验证（如果可用）
         if data_validator:
             try:
                 is_valid, quality_score, issues = data_validator.validate_api_data(
@@ -1376,24 +1278,73 @@ def get_manufacturing_economic_interface(
             except Exception as e:
                 print(f"⚠️ [INTERFACE] 数据验证失败: {e}")
         
-        # 6. 格式化数据
+        # 5. 格式化数据
         formatted_result += result.to_string()
         
         print(f"✅ [INTERFACE] {data_type}数据获取成功: {len(result)} 条记录")
         return formatted_result
         
     except Exception as e:
-        error_msg = f"制造业经济数据获取失败: {str(e)}"
+        error_msg = f"❌ 制造业经济数据获取失败: {str(e)}"
         print(f"❌ [INTERFACE ERROR] {error_msg}")
         return error_msg
 
 
+def _fetch_commodity_contracts(pro, current_month_code: str, next_month_code: str) -> pd.DataFrame:
+    """获取本月和下月期货合约的周线数据并合并"""
+    # 🎯 修复：按照22-tushare-api-input.md获取完整字段
+    # 获取本月数据
+    try:
+        print(f"🔍 [DEBUG] 尝试获取本月期货数据: {current_month_code}")
+        current_result = pro.fut_weekly_monthly(
+            ts_code=current_month_code,
+            freq='week',
+            fields='ts_code,trade_date,freq,open,high,low,close,vol,amount'
+        ).head(5)
+        print(f"🔍 [DEBUG] 本月数据形状: {current_result.shape}")
+    except Exception as e:
+        print(f"❌ [DEBUG] 本月期货数据获取失败: {e}")
+        current_result = pd.DataFrame()
+    
+    # 获取下月数据
+    try:
+        print(f"🔍 [DEBUG] 尝试获取下月期货数据: {next_month_code}")
+        next_result = pro.fut_weekly_monthly(
+            ts_code=next_month_code,
+            freq='week',
+            fields='ts_code,trade_date,freq,open,high,low,close,vol,amount'
+        ).head(5)
+        print(f"🔍 [DEBUG] 下月数据形状: {next_result.shape}")
+    except Exception as e:
+        print(f"❌ [DEBUG] 下月期货数据获取失败: {e}")
+        next_result = pd.DataFrame()
+    
+    # 合并数据
+    if not current_result.empty:
+        current_result['month_type'] = '本月'
+    if not next_result.empty:
+        next_result['month_type'] = '下月'
+        
+    # 🎯 修复：处理空数据情况（空结果不会写入缓存）
+    if not current_result.empty and not next_result.empty:
+        return pd.concat([current_result, next_result], ignore_index=True)
+    elif not current_result.empty:
+        print("⚠️ [DEBUG] 只获取到本月期货数据")
+        return current_result
+    elif not next_result.empty:
+        print("⚠️ [DEBUG] 只获取到下月期货数据")
+        return next_result
+    else:
+        print("⚠️ [DEBUG] 未获取到任何期货数据，返回空DataFrame")
+        return pd.DataFrame(columns=['ts_code', 'trade_date', 'freq', 'open', 'high', 'low', 'close', 'vol', 'amount', 'month_type'])
+
+
 def get_manufacturing_holiday_interface(
     date_range: str,
 ) -> str:
     """
     获取制造业相关的节假日数据，用于分析节假日对制造业需求的影响
-    复用原有的缓存和降级机制
+    节假日安排全年固定，缓存到年底
     
     Args:
         date_range (str): 日期范围，如'2025-07到2025-10'
@@ -1404,13 +1355,7 @@ def get_manufacturing_holiday_interface(
     print(f"📅 [INTERFACE] 获取制造业节假日数据: {date_range}")
     
     try:
-        # 1. 检查缓存
-        cache_key = f"manufacturing_holiday_{hash(date_range)}"
-        
-        # 2. 调用外部API
-        import os
-        import requests
-        from datetime import datetime
+        from .manufacturing_cache import cached_manufacturing_data
         
         # 获取API密钥
         coze_api_key = os.getenv('COZE_API_KEY')
@@ -1419,52 +1364,195 @@ def get_manufacturing_holiday_interface(
             print(f"📅 [INTERFACE ERROR] {error_msg}")
             return error_msg
         
-        # 生成API参数（简化版）
-        api_params = {
-            'holiday': {
-                'start_date': '2025-7-1',
-                'end_date': '2025-10-31'
-            }
-        }
+        # 1. 读穿透缓存，未命中时调用Coze节假日API
+        api_params = _build_holiday_api_params()
+        data = cached_manufacturing_data(
+            'holiday',
+            {'workflow_id': HOLIDAY_WORKFLOW_ID, 'parameters': api_params},
+            lambda: _call_coze_workflow(coze_api_key, HOLIDAY_WORKFLOW_ID, api_params, "节假日"),
+        )
         
-        # 调用Coze节假日API
-        headers = {
-            "Authorization": f"Bearer {coze_api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "workflow_id": "7528250308326260762",
-            "parameters": api_params['holiday']
-        }
+        # 2. 格式化数据
+        formatted_result = f"## 制造业节假日数据 ({date_range})\n\n"
+        formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
         
-        response = requests.post("https://api.coze.cn/v1/workflow/run", headers=headers, json=payload, timeout=180)  # 增加到3分钟
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('code') == 0:
-                import json
-                data_str = result.get('data', '{}')
-                if isinstance(data_str, str):
-                    data = json.loads(data_str)
-                else:
-                    data = data_str
-                
-                # 3. 格式化数据
-                formatted_result = f"## 制造业节假日数据 ({date_range})\n\n"
-                formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
-                
-                print(f"✅ [INTERFACE] 节假日数据获取成功: {date_range}")
-                return formatted_result
-            else:
-                error_msg = f"❌ 节假日API返回错误: {result}"
-                print(f"📅 [INTERFACE ERROR] {error_msg}")
-                return error_msg
-        else:
-            error_msg = f"❌ 节假日API调用失败: HTTP {response.status_code}"
+        print(f"✅ [INTERFACE] 节假日数据获取成功: {date_range}")
+        return formatted_result
+        
+    except ManufacturingAPIError as e:
+        error_msg = str(e)
+        print(f"📅 [INTERFACE ERROR] {error_msg}")
+        return error_msg
+    except Exception as e:
+        error_msg = f"❌ 制造业节假日数据获取失败: {str(e)}"
+        print(f"❌ [INTERFACE ERROR] {error_msg}")
+        return error_msg
+
+
+# =================================
+# 制造业数据异步接口函数
+# Async Manufacturing Data Interface Functions
+# =================================
+
+async def aget_manufacturing_weather_interface(
+    city_name: str,
+    curr_date: str,
+) -> str:
+    """
+    get_manufacturing_weather_interface的异步版本，Coze调用不占用线程
+    
+    Args:
+        city_name (str): 城市名称
+        curr_date (str): 当前日期，格式yyyy-mm-dd
+        
+    Returns:
+        str: 天气预报数据的格式化字符串
+    """
+    print(f"🌤️ [INTERFACE] 异步获取制造业天气数据: {city_name} ({curr_date})")
+    
+    try:
+        from .manufacturing_cache import acached_manufacturing_data
+        
+        coze_api_key = os.getenv('COZE_API_KEY')
+        if not coze_api_key:
+            error_msg = "❌ COZE_API_KEY未配置"
+            print(f"🌤️ [INTERFACE ERROR] {error_msg}")
+            return error_msg
+        
+        api_params = _build_weather_api_params(city_name)
+        data = await acached_manufacturing_data(
+            'weather',
+            {'workflow_id': WEATHER_WORKFLOW_ID, 'parameters': api_params},
+            lambda: _acall_coze_workflow(coze_api_key, WEATHER_WORKFLOW_ID, api_params, "天气"),
+        )
+        
+        formatted_result = f"## {city_name}制造业天气预报数据 ({curr_date})\n\n"
+        formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
+        
+        print(f"✅ [INTERFACE] 天气数据获取成功: {city_name}")
+        return formatted_result
+        
+    except ManufacturingAPIError as e:
+        error_msg = str(e)
+        print(f"🌤️ [INTERFACE ERROR] {error_msg}")
+        return error_msg
+    except Exception as e:
+        error_msg = f"❌ 制造业天气数据获取失败: {str(e)}"
+        print(f"❌ [INTERFACE ERROR] {error_msg}")
+        return error_msg
+
+
+async def aget_manufacturing_news_interface(
+    query_params,
+    curr_date: str,
+) -> str:
+    """
+    get_manufacturing_news_interface的异步版本，Coze调用不占用线程
+    
+    Args:
+        query_params (dict|str): 新闻查询参数，可以是结构化字典或字符串
+        curr_date (str): 当前日期，格式yyyy-mm-dd
+        
+    Returns:
+        str: 新闻数据的格式化字符串
+    """
+    print(f"📰 [INTERFACE] 异步获取制造业新闻数据: {query_params} ({curr_date})")
+    
+    try:
+        from .manufacturing_cache import acached_manufacturing_data
+        
+        coze_api_key = os.getenv('COZE_API_KEY')
+        if not coze_api_key:
+            error_msg = "❌ COZE_API_KEY未配置"
+            print(f"📰 [INTERFACE ERROR] {error_msg}")
+            return error_msg
+        
+        api_params = _build_news_api_params(query_params)
+        data = await acached_manufacturing_data(
+            'news',
+            {'workflow_id': NEWS_WORKFLOW_ID, 'parameters': api_params},
+            lambda: _acall_coze_workflow(coze_api_key, NEWS_WORKFLOW_ID, api_params, "新闻"),
+        )
+        
+        formatted_result = f"## 制造业新闻数据 - {query_params} ({curr_date})\n\n"
+        formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
+        
+        print(f"✅ [INTERFACE] 新闻数据获取成功: {query_params}")
+        return formatted_result
+        
+    except ManufacturingAPIError as e:
+        error_msg = str(e)
+        print(f"📰 [INTERFACE ERROR] {error_msg}")
+        return error_msg
+    except Exception as e:
+        error_msg = f"❌ 制造业新闻数据获取失败: {str(e)}"
+        print(f"❌ [INTERFACE ERROR] {error_msg}")
+        return error_msg
+
+
+async def aget_manufacturing_holiday_interface(
+    date_range: str,
+) -> str:
+    """
+    get_manufacturing_holiday_interface的异步版本，Coze调用不占用线程
+    
+    Args:
+        date_range (str): 日期范围，如'2025-07到2025-10'
+        
+    Returns:
+        str: 节假日数据的格式化字符串
+    """
+    print(f"📅 [INTERFACE] 异步获取制造业节假日数据: {date_range}")
+    
+    try:
+        from .manufacturing_cache import acached_manufacturing_data
+        
+        coze_api_key = os.getenv('COZE_API_KEY')
+        if not coze_api_key:
+            error_msg = "❌ COZE_API_KEY未配置"
             print(f"📅 [INTERFACE ERROR] {error_msg}")
             return error_msg
-            
+        
+        api_params = _build_holiday_api_params()
+        data = await acached_manufacturing_data(
+            'holiday',
+            {'workflow_id': HOLIDAY_WORKFLOW_ID, 'parameters': api_params},
+            lambda: _acall_coze_workflow(coze_api_key, HOLIDAY_WORKFLOW_ID, api_params, "节假日"),
+        )
+        
+        formatted_result = f"## 制造业节假日数据 ({date_range})\n\n"
+        formatted_result += json.dumps(data, ensure_ascii=False, indent=2)
+        
+        print(f"✅ [INTERFACE] 节假日数据获取成功: {date_range}")
+        return formatted_result
+        
+    except ManufacturingAPIError as e:
+        error_msg = str(e)
+        print(f"📅 [INTERFACE ERROR] {error_msg}")
+        return error_msg
     except Exception as e:
-        error_msg = f"制造业节假日数据获取失败: {str(e)}"
+        error_msg = f"❌ 制造业节假日数据获取失败: {str(e)}"
         print(f"❌ [INTERFACE ERROR] {error_msg}")
         return error_msg
+
+
+async def aget_manufacturing_economic_interface(
+    data_type: str,
+    time_range: str,
+    commodity_type: str = None,
+) -> str:
+    """
+    get_manufacturing_economic_interface的异步版本
+    TuShare SDK只提供同步接口，在线程中执行，避免阻塞事件循环
+    
+    Args:
+        data_type (str): 数据类型 - 'pmi', 'ppi', 'commodity'
+        time_range (str): 时间范围描述
+        commodity_type (str): 商品类型（期货数据专用）
+        
+    Returns:
+        str: 经济数据的格式化字符串
+    """
+    import asyncio
+    
+    return await asyncio.to_thread(get_manufacturing_economic_interface, data_type, time_range, commodity_type)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+制造业外部数据缓存
+Manufacturing External Data Cache
+
+为天气、新闻、节假日、PMI/PPI、大宗商品等制造业接口提供读穿透缓存：
+- 缓存键由数据类型和实际API参数的SHA256摘要生成，跨进程稳定（不使用Python加盐的hash()）
+- 按数据类型设置TTL：天气按小时、PMI/PPI按月、节假日按年
+- 存储复用IntegratedCacheManager的后端（Redis / MongoDB / 文件）
+- 相同缓存键的并发请求经单飞合并，只执行一次外部调用（缓存关闭时同样生效）
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from .single_flight import get_async_single_flight, get_single_flight
+
+
+# 固定TTL（秒）
+MANUFACTURING_CACHE_TTL = {
+    "weather": 3600,          # 天气预报按小时更新
+    "news": 4 * 3600,         # 新闻4小时
+    "commodity": 6 * 3600,    # 期货周线数据6小时
+}
+
+# 按自然周期过期的数据类型：PMI/PPI每月发布一次，节假日安排全年固定
+MONTHLY_DATA_TYPES = ("pmi", "ppi")
+YEARLY_DATA_TYPES = ("holiday",)
+
+# 最短TTL，避免临近周期边界时缓存立即失效
+MIN_TTL_SECONDS = 3600
+
+
+def is_manufacturing_cache_enabled() -> bool:
+    """是否启用制造业数据缓存（环境变量 MANUFACTURING_CACHE_ENABLED=false 可关闭）"""
+    return os.getenv("MANUFACTURING_CACHE_ENABLED", "true").lower() not in ("false", "0", "no")
+
+
+def get_manufacturing_ttl(data_type: str, now: datetime = None) -> int:
+    """获取数据类型对应的TTL秒数"""
+    now = now or datetime.now()
+
+    if data_type in MONTHLY_DATA_TYPES:
+        # 缓存到下个月1日
+        if now.month == 12:
+            expires_at = datetime(now.year + 1, 1, 1)
+        else:
+            expires_at = datetime(now.year, now.month + 1, 1)
+    elif data_type in YEARLY_DATA_TYPES:
+        # 缓存到明年1月1日
+        expires_at = datetime(now.year + 1, 1, 1)
+    else:
+        return MANUFACTURING_CACHE_TTL.get(data_type, MIN_TTL_SECONDS)
+
+    return max(int((expires_at - now).total_seconds()), MIN_TTL_SECONDS)
+
+
+def make_manufacturing_cache_key(data_type: str, params: Any) -> str:
+    """由数据类型和API参数生成稳定的缓存键"""
+    params_str = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+    digest = hashlib.sha256(f"{data_type}|{params_str}".encode("utf-8")).hexdigest()[:32]
+    return f"manufacturing_{data_type}_{digest}"
+
+
+def _is_cacheable(data: Any) -> bool:
+    """空结果不写入缓存"""
+    if data is None:
+        return False
+    if hasattr(data, "empty"):
+        return not data.empty
+    return True
+
+
+def _get_cache():
+    try:
+        from .integrated_cache import get_cache
+        return get_cache()
+    except Exception as e:
+        print(f"⚠️ [制造业缓存] 缓存系统不可用，直接调用API: {e}")
+        return None
+
+
+def _load_cached(cache, cache_key: str, data_type: str) -> Any:
+    try:
+        cached_data = cache.load_manufacturing_data(cache_key)
+    except Exception as e:
+        print(f"⚠️ [制造业缓存] 读取缓存失败: {e}")
+        return None
+
+    if cached_data is not None:
+        print(f"💾 [制造业缓存] 命中: {data_type} -> {cache_key}")
+    return cached_data
+
+
+def _store(cache, cache_key: str, data: Any, data_type: str):
+    if not _is_cacheable(data):
+        return
+
+    ttl_seconds = get_manufacturing_ttl(data_type)
+    try:
+        cache.save_manufacturing_data(cache_key, data, data_type, ttl_seconds)
+        print(f"💾 [制造业缓存] 已写入: {data_type} -> {cache_key} (TTL {ttl_seconds}s)")
+    except Exception as e:
+        print(f"⚠️ [制造业缓存] 写入缓存失败: {e}")
+
+
+def cached_manufacturing_data(
+    data_type: str,
+    params: Any,
+    fetch_func: Callable[[], Any],
+    cache: Optional[Any] = None,
+) -> Any:
+    """读穿透缓存：命中时直接返回缓存数据，未命中时调用fetch_func并写入缓存
+
+    Args:
+        data_type: 数据类型 - 'weather', 'news', 'holiday', 'pmi', 'ppi', 'commodity'
+        params: 实际API调用参数，用于生成缓存键
+        fetch_func: 未命中时获取数据的函数，失败时应抛出异常（异常结果不会被缓存）
+        cache: 缓存管理器，默认使用全局IntegratedCacheManager
+
+    Returns:
+        API原始数据（并发的相同请求共享同一对象，调用方不应原地修改）
+    """
+    cache_key = make_manufacturing_cache_key(data_type, params)
+
+    def load_or_fetch():
+        if not is_manufacturing_cache_enabled():
+            return fetch_func()
+
+        manager = cache or _get_cache()
+        if manager is None:
+            return fetch_func()
+
+        cached_data = _load_cached(manager, cache_key, data_type)
+        if cached_data is not None:
+            return cached_data
+
+        data = fetch_func()
+        _store(manager, cache_key, data, data_type)
+        return data
+
+    return get_single_flight().do(cache_key, load_or_fetch)
+
+
+async def acached_manufacturing_data(
+    data_type: str,
+    params: Any,
+    afetch_func: Callable[[], Awaitable[Any]],
+    cache: Optional[Any] = None,
+) -> Any:
+    """cached_manufacturing_data的异步版本：afetch_func为协程函数，缓存读写在线程中执行，不阻塞事件循环"""
+    cache_key = make_manufacturing_cache_key(data_type, params)
+
+    async def aload_or_fetch():
+        if not is_manufacturing_cache_enabled():
+            return await afetch_func()
+
+        manager = cache or await asyncio.to_thread(_get_cache)
+        if manager is None:
+            return await afetch_func()
+
+        cached_data = await asyncio.to_thread(_load_cached, manager, cache_key, data_type)
+        if cached_data is not None:
+            return cached_data
+
+        data = await afetch_func()
+        await asyncio.to_thread(_store, manager, cache_key, data, data_type)
+        return data
+
+    return await get_async_single_flight().do(cache_key, aload_or_fetch)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+进程内价格数据存储
+Price Frame Store
+
+市场分析师一次运行会多次调用技术指标/行情工具，每次都读取同一个{symbol}-YFin-data-*.csv
+并重新计算stockstats指标。本模块在进程内缓存解析后的DataFrame：
+- 按(数据源, 股票代码, 数据范围)缓存，离线文件的键包含mtime，文件更新后自动失效
+- 缓存stockstats包装后的DataFrame，计算过的指标列随之保留，再次查询只取出对应列
+- 按内存预算做LRU淘汰（PRICE_FRAME_STORE_MAX_MB，默认256MB）
+
+返回的DataFrame为共享对象，调用方只能读取，不能原地修改。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import pandas as pd
+
+
+DEFAULT_MAX_MB = 256
+
+
+def _frame_bytes(frame: pd.DataFrame) -> int:
+    try:
+        return int(frame.memory_usage(deep=True).sum())
+    except Exception:
+        return 0
+
+
+class _Entry:
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.size = _frame_bytes(frame)
+        self.lock = threading.Lock()  # 保护stockstats原地计算指标列
+
+
+class PriceFrameStore:
+    """线程安全的LRU价格数据存储"""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_bytes: 内存预算（字节），默认读取环境变量PRICE_FRAME_STORE_MAX_MB
+        """
+        if max_bytes is None:
+            try:
+                max_mb = float(os.getenv("PRICE_FRAME_STORE_MAX_MB", DEFAULT_MAX_MB))
+            except ValueError:
+                max_mb = DEFAULT_MAX_MB
+            max_bytes = int(max_mb * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get_frame(self, key: Hashable, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """获取缓存的DataFrame，未命中时调用loader加载"""
+        return self._get_entry(key, loader).frame
+
+    def get_indicator_frame(self, key: Hashable, loader: Callable[[], pd.DataFrame],
+                            indicator: str) -> pd.DataFrame:
+        """从缓存的stockstats DataFrame中取出Date和指标两列（新DataFrame）
+
+        指标列在缓存的DataFrame上只计算一次；stockstats会原地添加列，计算和读取都在该项的锁内进行。
+        """
+        entry = self._get_entry(key, loader)
+        with entry.lock:
+            if indicator not in entry.frame.columns:
+                entry.frame[indicator]  # trigger stockstats to calculate the indicator
+                self._resize(key, entry)
+            return entry.frame[["Date", indicator]]
+
+    def _get_entry(self, key: Hashable, loader: Callable[[], pd.DataFrame]) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            self._misses += 1
+
+        # 在锁外加载，加载失败不缓存；并发加载同一键时保留先写入的结果
+        entry = _Entry(loader())
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing
+            self._entries[key] = entry
+            self._total_bytes += entry.size
+            self._evict()
+        return entry
+
+    def _resize(self, key: Hashable, entry: _Entry):
+        size = _frame_bytes(entry.frame)
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self._total_bytes += size - entry.size
+                self._evict()
+            entry.size = size
+
+    def _evict(self):
+        # 至少保留最近使用的一项，即使其本身超过预算
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            _key, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.size
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self) -> dict:
+        """缓存统计"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_mb": round(self._total_bytes / 1024 / 1024, 2),
+                "max_memory_mb": round(self.max_bytes / 1024 / 1024, 2),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+_price_frame_store: Optional[PriceFrameStore] = None
+_price_frame_store_lock = threading.Lock()
+
+
+def get_price_frame_store() -> PriceFrameStore:
+    """获取全局价格数据存储"""
+    global _price_frame_store
+    if _price_frame_store is None:
+        with _price_frame_store_lock:
+            if _price_frame_store is None:
+                _price_frame_store = PriceFrameStore()
+    return _price_frame_store
+
+
+def offline_price_data_key(path: str) -> tuple:
+    """离线价格文件的缓存键，包含mtime，文件更新后自动失效"""
+    return ("offline", os.path.abspath(path), os.stat(path).st_mtime_ns)
@@ -1,8 +1,10 @@
 import requests
 import time
 import json
+import threading
 from datetime import datetime, timedelta
 from contextlib import contextmanager
+from functools import lru_cache
 from typing import Annotated
 import os
 import re
@@ -49,6 +51,85 @@ ticker_to_company = {
 }
 
 
+class RedditIndex:
+    """
+    In-process index of the offline reddit corpus: for every .jsonl file (one
+    subreddit of a category), the byte offsets of its lines grouped by post date.
+    Each file is parsed once; lookups then read only the lines of the requested
+    date. A file is re-indexed when its size or mtime changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files = {}
+
+    @staticmethod
+    def _build(path):
+        lines_by_date = {}
+        offset = 0
+        with open(path, "rb") as f:
+            for line in f:
+                length = len(line)
+                # skip empty lines
+                if line.strip():
+                    parsed_line = json.loads(line)
+                    post_date = datetime.utcfromtimestamp(
+                        parsed_line["created_utc"]
+                    ).strftime("%Y-%m-%d")
+                    lines_by_date.setdefault(post_date, []).append((offset, length))
+                offset += length
+        return lines_by_date
+
+    def get_lines(self, path, date):
+        """(offset, length) of the lines of a .jsonl file posted on date, in file order."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._files.get(path)
+        if cached is None or cached[0] != version:
+            # build outside the lock; failed builds are not cached
+            cached = (version, self._build(path))
+            with self._lock:
+                self._files[path] = cached
+        return cached[1].get(date, [])
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+
+
+_reddit_index = None
+_reddit_index_lock = threading.Lock()
+
+
+def get_reddit_index():
+    """Get the global reddit corpus index."""
+    global _reddit_index
+    if _reddit_index is None:
+        with _reddit_index_lock:
+            if _reddit_index is None:
+                _reddit_index = RedditIndex()
+    return _reddit_index
+
+
+@lru_cache(maxsize=None)
+def _company_matcher(query):
+    """
+    Compiled case-insensitive pattern matching any of the company's search terms
+    (its names from ticker_to_company and the ticker itself).
+    """
+    if "OR" in ticker_to_company[query]:
+        search_terms = ticker_to_company[query].split(" OR ")
+    else:
+        search_terms = [ticker_to_company[query]]
+
+    search_terms.append(query)
+
+    return re.compile("|".join(f"(?:{term})" for term in search_terms), re.IGNORECASE)
+
+
 def fetch_top_from_category(
     category: Annotated[
         str, "Category to fetch top post from. Collection of subreddits."
@@ -74,6 +155,9 @@ def fetch_top_from_category(
         os.listdir(os.path.join(base_path, category))
     )
 
+    index = get_reddit_index()
+    matcher = None
+
     for data_file in os.listdir(os.path.join(base_path, category)):
         # check if data_file is a .jsonl file
         if not data_file.endswith(".jsonl"):
@@ -81,40 +165,25 @@ def fetch_top_from_category(
 
         all_content_curr_subreddit = []
 
-        with open(os.path.join(base_path, category, data_file), "rb") as f:
-            for i, line in enumerate(f):
-                # skip empty lines
-                if not line.strip():
-                    continue
-
-                parsed_line = json.loads(line)
+        file_path = os.path.join(base_path, category, data_file)
+        # only read the lines posted on the date
+        lines = index.get_lines(file_path, date)
+        if not lines:
+            continue
 
-                # select only lines that are from the date
-                post_date = datetime.utcfromtimestamp(
-                    parsed_line["created_utc"]
-                ).strftime("%Y-%m-%d")
-                if post_date != date:
-                    continue
+        with open(file_path, "rb") as f:
+            for offset, length in lines:
+                f.seek(offset)
+                parsed_line = json.loads(f.read(length))
 
                 # if is company_news, check that the title or the content has the company's name (query) mentioned
                 if "company" in category and query:
-                    search_terms = []
-                    if "OR" in ticker_to_company[query]:
-                        search_terms = ticker_to_company[query].split(" OR ")
-                    else:
-                        search_terms = [ticker_to_company[query]]
-
-                    search_terms.append(query)
-
-                    found = False
-                    for term in search_terms:
-                        if re.search(
-                            term, parsed_line["title"], re.IGNORECASE
-                        ) or re.search(term, parsed_line["selftext"], re.IGNORECASE):
-                            found = True
-                            break
-
-                    if not found:
+                    if matcher is None:
+                        matcher = _company_matcher(query)
+                    if not (
+                        matcher.search(parsed_line["title"])
+                        or matcher.search(parsed_line["selftext"])
+                    ):
                         continue
 
                 post = {
@@ -122,7 +191,7 @@ def fetch_top_from_category(
                     "content": parsed_line["selftext"],
                     "url": parsed_line["url"],
                     "upvotes": parsed_line["ups"],
-                    "posted_date": post_date,
+                    "posted_date": date,
                 }
 
                 all_content_curr_subreddit.append(post)
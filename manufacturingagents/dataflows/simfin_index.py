@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SimFin财报索引
+SimFin Fundamentals Index
+
+基本面分析师每只股票调用三张财报，回测会扫描成千上万个(股票, 日期)组合；原实现每次对全部美股公司做
+df["Ticker"] == ticker布尔扫描再idxmax。本模块为每个财报文件建立进程内共享索引：
+- 股票代码 -> 按Publish Date排序的该股票全部报告
+- 查询curr_date当天或之前最新的报告为一次二分查找
+- 已转换为列式分区（见columnar_store）时按需加载单只股票，否则首次查询时整体解析CSV一次
+- 源CSV或列式数据更新后自动重建
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from .columnar_store import (
+    MANIFEST_FILE, load_simfin_partition, parse_simfin_dates, simfin_partition_dir, simfin_partitions_available
+)
+
+
+_Reports = Tuple[pd.DataFrame, pd.DatetimeIndex]
+
+
+def _build_reports(df: pd.DataFrame) -> _Reports:
+    """按Publish Date稳定排序（保留原行号），没有发布日期的报告不参与查询"""
+    df = df[df["Publish Date"].notna()].sort_values("Publish Date", kind="stable")
+    return df, pd.DatetimeIndex(df["Publish Date"])
+
+
+class _StatementIndex:
+    """单个财报文件的索引"""
+
+    def __init__(self, csv_path: str, version: tuple):
+        self.csv_path = csv_path
+        self.version = version
+        self.columnar = version[-1]  # 已转换为列式分区时按股票加载
+        self._lock = threading.Lock()
+        self._reports: Dict[str, Optional[_Reports]] = {}
+        self._loaded_all = False
+
+    def get_reports(self, ticker: str) -> Optional[_Reports]:
+        with self._lock:
+            if ticker in self._reports or self._loaded_all:
+                return self._reports.get(ticker)
+
+            if self.columnar:
+                df = load_simfin_partition(self.csv_path, ticker)
+                self._reports[ticker] = _build_reports(df) if len(df) else None
+            else:
+                # 未转换时整体解析一次CSV，按股票代码拆分
+                df = parse_simfin_dates(pd.read_csv(self.csv_path, sep=";"))
+                for name, group in df.groupby("Ticker", sort=False):
+                    self._reports[name] = _build_reports(group)
+                self._loaded_all = True
+            return self._reports.get(ticker)
+
+
+class SimFinIndex:
+    """按财报文件缓存的SimFin索引（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _StatementIndex] = {}
+
+    @staticmethod
+    def _version(csv_path: str) -> tuple:
+        """源CSV和列式数据的版本，任一变化都重建索引"""
+        manifest_path = os.path.join(simfin_partition_dir(csv_path), MANIFEST_FILE)
+        return tuple(
+            os.stat(path).st_mtime_ns if os.path.exists(path) else None
+            for path in (csv_path, manifest_path)
+        ) + (simfin_partitions_available(csv_path),)
+
+    def _get_statement(self, csv_path: str) -> _StatementIndex:
+        version = self._version(csv_path)
+        with self._lock:
+            statement = self._statements.get(csv_path)
+            if statement is None or statement.version != version:
+                statement = _StatementIndex(csv_path, version)
+                self._statements[csv_path] = statement
+            return statement
+
+    def latest_report(self, csv_path: str, ticker: str, curr_date: str) -> Optional[pd.Series]:
+        """
+        curr_date当天或之前发布的最新报告
+
+        Returns:
+            报告行（Name为原CSV行号）；没有可用报告时返回None
+        """
+        reports = self._get_statement(csv_path).get_reports(ticker)
+        if reports is None:
+            return None
+
+        df, publish_dates = reports
+        curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
+        position = publish_dates.searchsorted(curr_date_dt, side="right") - 1
+        if position < 0:
+            return None
+        # 同一天发布多份报告时取原文件中的第一份（与idxmax一致）
+        position = publish_dates.searchsorted(publish_dates[position], side="left")
+        return df.iloc[position]
+
+    def clear(self):
+        """清空索引"""
+        with self._lock:
+            self._statements.clear()
+
+
+_simfin_index: Optional[SimFinIndex] = None
+_simfin_index_lock = threading.Lock()
+
+
+def get_simfin_index() -> SimFinIndex:
+    """获取全局SimFin索引"""
+    global _simfin_index
+    if _simfin_index is None:
+        with _simfin_index_lock:
+            if _simfin_index is None:
+                _simfin_index = SimFinIndex()
+    return _simfin_index
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+单飞请求合并
+Single-Flight Request Coalescing
+
+多个并发分析（Web用户、批量任务）请求同一城市天气、同一季度PMI/PPI时，
+相同键的请求只执行一次外部调用，其余调用方等待并共享该结果（或异常）：
+- SingleFlight: 线程版本，等待方阻塞在threading.Event上
+- AsyncSingleFlight: asyncio版本，等待方await同一个Future，按事件循环隔离
+
+调用完成后立即移除键，不缓存结果；结果缓存由manufacturing_cache负责。
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """线程安全的单飞调用合并器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        执行func，相同key的并发调用共享同一次执行结果
+
+        Args:
+            key: 请求键，相同键视为相同请求
+            func: 实际执行的函数
+
+        Returns:
+            func的返回值；func抛出的异常会传递给所有等待方
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            print(f"🔗 [单飞合并] 等待进行中的请求: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """当前进行中的请求数量"""
+        with self._lock:
+            return len(self._calls)
+
+
+class _LeaderCancelled(Exception):
+    """执行方被取消：等待方不应随之取消，而是重新发起调用"""
+
+
+class AsyncSingleFlight:
+    """asyncio单飞调用合并器，每个事件循环独立维护进行中的请求"""
+
+    def __init__(self):
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: str, afunc: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行协程函数afunc，相同key的并发调用共享同一次执行结果
+
+        Args:
+            key: 请求键，相同键视为相同请求
+            afunc: 实际执行的协程函数
+
+        Returns:
+            afunc的返回值；afunc抛出的异常会传递给所有等待方。
+            执行方被取消时等待方不会被取消，而是重新发起调用（其中一个成为新的执行方）
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+
+        future = calls.get(key)
+        while future is not None:
+            print(f"🔗 [单飞合并] 等待进行中的请求: {key}")
+            try:
+                # shield: 某个等待方被取消时不影响执行方和其他等待方
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                print(f"🔁 [单飞合并] 执行方已取消，重新发起请求: {key}")
+                future = calls.get(key)
+
+        future = loop.create_future()
+        calls[key] = future
+        try:
+            result = await afunc()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.set_exception(_LeaderCancelled(key))
+            else:
+                future.set_exception(e)
+            # 没有等待方时避免"exception was never retrieved"警告
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """当前事件循环中进行中的请求数量"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return 0
+        return len(self._calls.get(loop, {}))
+
+
+# 全局单飞合并器
+_single_flight = SingleFlight()
+_async_single_flight = AsyncSingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """获取全局线程单飞合并器"""
+    return _single_flight
+
+
+def get_async_single_flight() -> AsyncSingleFlight:
+    """获取全局asyncio单飞合并器"""
+    return _async_single_flight
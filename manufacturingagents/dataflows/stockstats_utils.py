@@ -1,21 +1,46 @@
 import pandas as pd
 import yfinance as yf
 from stockstats import wrap
-from typing import Annotated
+from typing import Annotated, Any, Dict
 import os
 from .config import get_config
+from .price_frame_store import get_price_frame_store, offline_price_data_key
+from .columnar_store import read_price_data, resolve_price_data_path
+
+
+def get_offline_price_data_path(data_dir: str, symbol: str) -> str:
+    """Offline price file: the converted Feather file when available, else the CSV"""
+    return resolve_price_data_path(
+        os.path.join(data_dir, f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv")
+    )
+
+
+def load_offline_price_data(
+    symbol: Annotated[str, "ticker symbol for the company"],
+    data_dir: Annotated[str, "directory where the stock data is stored."],
+) -> pd.DataFrame:
+    """
+    Read the offline YFin data (CSV or converted Feather) through the shared
+    in-process price frame store.
+    The returned DataFrame is shared: read it, never modify it in place.
+    """
+    path = get_offline_price_data_path(data_dir, symbol)
+    return get_price_frame_store().get_frame(
+        ("raw",) + offline_price_data_key(path), lambda: read_price_data(path)
+    )
+
+
+def _online_price_data_range():
+    """15 years up to today, which is also the range of the cached YFin CSV"""
+    today_date = pd.Timestamp.today()
+    start_date = today_date - pd.DateOffset(years=15)
+    return start_date.strftime("%Y-%m-%d"), today_date.strftime("%Y-%m-%d")
 
 
 class StockstatsUtils:
     @staticmethod
-    def get_stock_stats(
+    def _load_stock_stats_frame(
         symbol: Annotated[str, "ticker symbol for the company"],
-        indicator: Annotated[
-            str, "quantitative indicators based off of the stock data for the company"
-        ],
-        curr_date: Annotated[
-            str, "curr date for retrieving stock price data, YYYY-mm-dd"
-        ],
         data_dir: Annotated[
             str,
             "directory where the stock data is stored.",
@@ -25,59 +50,89 @@ class StockstatsUtils:
             "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
         ] = False,
     ):
-        df = None
-        data = None
-
+        """Load the price data for a symbol and wrap it with stockstats."""
         if not online:
             try:
-                data = pd.read_csv(
-                    os.path.join(
-                        data_dir,
-                        f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-                    )
-                )
-                df = wrap(data)
+                # stockstats adds indicator columns in place, so wrap a copy of the shared frame
+                return wrap(load_offline_price_data(symbol, data_dir).copy())
             except FileNotFoundError:
                 raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+
+        # Get today's date as YYYY-mm-dd to add to cache
+        start_date, end_date = _online_price_data_range()
+
+        # Get config and ensure cache directory exists
+        config = get_config()
+        os.makedirs(config["data_cache_dir"], exist_ok=True)
+
+        data_file = os.path.join(
+            config["data_cache_dir"],
+            f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+        )
+
+        if os.path.exists(data_file):
+            data = pd.read_csv(data_file)
+            data["Date"] = pd.to_datetime(data["Date"])
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
-
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+            data = yf.download(
+                symbol,
+                start=start_date,
+                end=end_date,
+                multi_level_index=False,
+                progress=False,
+                auto_adjust=True,
             )
+            data = data.reset_index()
+            data.to_csv(data_file, index=False)
+
+        df = wrap(data)
+        df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
+        return df
 
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
+    @staticmethod
+    def _get_indicator_frame(symbol, indicator, data_dir, online=False) -> pd.DataFrame:
+        """
+        Date and indicator columns of the stockstats frame. The wrapped frame is kept
+        in the price frame store, so each indicator is computed once per data file.
+        """
+        if not online:
+            try:
+                key = ("stockstats",) + offline_price_data_key(
+                    get_offline_price_data_path(data_dir, symbol)
                 )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
+            except FileNotFoundError:
+                raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+        else:
+            key = ("stockstats", "yfin", symbol) + _online_price_data_range()
 
-            df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
+        return get_price_frame_store().get_indicator_frame(
+            key,
+            lambda: StockstatsUtils._load_stock_stats_frame(symbol, data_dir, online),
+            indicator,
+        )
+
+    @staticmethod
+    def get_stock_stats(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+        curr_date: Annotated[
+            str, "curr date for retrieving stock price data, YYYY-mm-dd"
+        ],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ):
+        df = StockstatsUtils._get_indicator_frame(symbol, indicator, data_dir, online)
+        if online:
+            curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
 
-        df[indicator]  # trigger stockstats to calculate the indicator
         matching_rows = df[df["Date"].str.startswith(curr_date)]
 
         if not matching_rows.empty:
@@ -85,3 +140,33 @@ class StockstatsUtils:
             return indicator_value
         else:
             return "N/A: Not a trading day (weekend or holiday)"
+
+    @staticmethod
+    def get_stock_stats_window(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+        start_date: Annotated[str, "first date of the window, YYYY-mm-dd"],
+        end_date: Annotated[str, "last date of the window, YYYY-mm-dd"],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ) -> Dict[str, Any]:
+        """
+        Compute the indicator once over the whole price history and return the
+        values of the trading days in [start_date, end_date] as {YYYY-mm-dd: value}.
+        """
+        df = StockstatsUtils._get_indicator_frame(symbol, indicator, data_dir, online)
+
+        values = df[indicator]
+        dates = df["Date"].astype(str).str[:10]
+        # Keep the first row of each date, like the single-day lookup
+        in_window = (dates >= start_date) & (dates <= end_date) & ~dates.duplicated()
+
+        return dict(zip(dates[in_window], values[in_window].values))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+TuShare客户端管理
+TuShare Client Manager
+
+进程内共享一个TuShare pro_api客户端：
+- 首次调用时才创建客户端，之后复用（不再每次调用ts.set_token写token文件）
+- TUSHARE_TOKEN变化时自动重建客户端
+- 按接口的令牌桶限流，匹配TuShare每分钟调用配额，避免批量任务触发限频
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+# TuShare按接口限制每分钟调用次数（2000积分账户默认每分钟200次）
+DEFAULT_RATE_LIMIT_PER_MINUTE = 200
+TUSHARE_ENDPOINT_RATE_LIMITS = {
+    "cn_pmi": 200,
+    "cn_ppi": 200,
+    "fut_weekly_monthly": 200,
+}
+
+
+def _default_rate_limit() -> int:
+    try:
+        return int(os.getenv("TUSHARE_RATE_LIMIT_PER_MINUTE", DEFAULT_RATE_LIMIT_PER_MINUTE))
+    except (TypeError, ValueError):
+        return DEFAULT_RATE_LIMIT_PER_MINUTE
+
+
+class TokenBucket:
+    """线程安全的令牌桶：容量为每分钟配额，按配额匀速补充"""
+
+    def __init__(self, rate_per_minute: int, capacity: Optional[int] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated_at = now
+
+    def acquire(self) -> float:
+        """获取一个令牌，配额用尽时阻塞等待，返回等待的秒数"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate_per_second
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimitedProApi:
+    """pro_api客户端代理：每次接口调用前先从该接口的令牌桶获取令牌"""
+
+    def __init__(self, api: Any, manager: "TushareClientManager"):
+        self._api = api
+        self._manager = manager
+
+    def __getattr__(self, endpoint: str):
+        method = getattr(self._api, endpoint)
+        if not callable(method):
+            return method
+
+        def call(*args, **kwargs):
+            waited = self._manager.get_rate_limiter(endpoint).acquire()
+            if waited > 0:
+                print(f"⏳ [TuShare] {endpoint} 达到每分钟调用配额，等待 {waited:.1f}s")
+            return method(*args, **kwargs)
+
+        return call
+
+
+class TushareClientManager:
+    """进程级TuShare客户端管理器"""
+
+    def __init__(self, rate_limits: Optional[Dict[str, int]] = None, default_rate_limit: Optional[int] = None):
+        """
+        Args:
+            rate_limits: 各接口每分钟调用上限，默认TUSHARE_ENDPOINT_RATE_LIMITS
+            default_rate_limit: 未单独配置接口的每分钟上限 (TUSHARE_RATE_LIMIT_PER_MINUTE，默认200)
+        """
+        self.rate_limits = dict(TUSHARE_ENDPOINT_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.default_rate_limit = default_rate_limit or _default_rate_limit()
+        self._lock = threading.Lock()
+        # (token, 客户端) 作为一个整体原子替换，无锁读取时不会读到不匹配的组合
+        self._current: Optional[Tuple[str, RateLimitedProApi]] = None
+        self._limiters: Dict[str, TokenBucket] = {}
+
+    def _create_api(self, token: str):
+        import tushare as ts
+        return ts.pro_api(token)
+
+    def get_pro_api(self, token: Optional[str] = None) -> RateLimitedProApi:
+        """
+        获取pro_api客户端，token变化时重建
+
+        Args:
+            token: TuShare token，默认读取环境变量TUSHARE_TOKEN
+
+        Raises:
+            ValueError: token未配置
+        """
+        token = token or os.getenv("TUSHARE_TOKEN")
+        if not token:
+            raise ValueError("TUSHARE_TOKEN未配置")
+
+        current = self._current
+        if current is not None and current[0] == token:
+            return current[1]
+
+        with self._lock:
+            current = self._current
+            if current is None or current[0] != token:
+                action = "重建" if current is not None else "初始化"
+                current = (token, RateLimitedProApi(self._create_api(token), self))
+                self._current = current
+                print(f"🔌 [TuShare] pro_api客户端{action}完成")
+            return current[1]
+
+    def get_rate_limiter(self, endpoint: str) -> TokenBucket:
+        """获取接口对应的令牌桶（限流与token无关，重建客户端不重置配额）"""
+        limiter = self._limiters.get(endpoint)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(endpoint)
+                if limiter is None:
+                    limiter = TokenBucket(self.rate_limits.get(endpoint, self.default_rate_limit))
+                    self._limiters[endpoint] = limiter
+        return limiter
+
+    def reset(self):
+        """丢弃当前客户端，下次调用时重新创建"""
+        with self._lock:
+            self._current = None
+
+
+# 全局TuShare客户端管理器
+_tushare_client_manager = None
+_tushare_client_manager_lock = threading.Lock()
+
+def get_tushare_client_manager() -> TushareClientManager:
+    """获取全局TuShare客户端管理器"""
+    global _tushare_client_manager
+    if _tushare_client_manager is None:
+        with _tushare_client_manager_lock:
+            if _tushare_client_manager is None:
+                _tushare_client_manager = TushareClientManager()
+    return _tushare_client_manager
@@ -11,6 +11,7 @@ from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.language_models.chat_models import BaseChatModel
 from manufacturingagents.llm_adapters import ChatDashScope
+from manufacturingagents.llm_adapters.response_cache import create_llm_cache
 
 from langgraph.prebuilt import ToolNode
 
@@ -120,7 +121,8 @@ class TradingAgentsGraph:
             return ChatDashScope(
                 model=model_name,
                 temperature=config.get("temperature", 0.1),
-                max_tokens=config.get("max_tokens", 2000)
+                max_tokens=config.get("max_tokens", 2000),
+                cache=create_llm_cache(config)
             )
         else:
             raise ValueError(f"Unsupported LLM provider: {provider}")
@@ -142,8 +144,8 @@ class TradingAgentsGraph:
         # Initialize ReAct LLM for DashScope if needed
         provider_lower = self.config.get("llm_provider", "").lower()
         if "dashscope" in provider_lower or "阿里百炼" in provider_lower:
-            from langchain_community.llms import Tongyi
-            self.react_llm = Tongyi()
+            from manufacturingagents.llm_adapters.tongyi_adapter import TongyiLLM
+            self.react_llm = TongyiLLM(cache=create_llm_cache(self.config))
             quick_model = self.config["quick_think_llm"]
             if quick_model in ["gpt-4o-mini", "o4-mini"]:
                 quick_model = "qwen-turbo"
@@ -1,23 +1,76 @@
 """
 阿里百炼大模型 (DashScope) 适配器
 为 TradingAgents 提供阿里百炼大模型的 LangChain 兼容接口
+
+支持流式输出（stream/astream）：使用DashScope增量输出模式逐段返回文本，
+流结束时返回并记录token使用量。
+异步调用（ainvoke/astream）使用DashScope原生异步接口，不阻塞事件循环，
+同一事件循环内共享一个有界连接池，并发请求数受DASHSCOPE_MAX_CONCURRENCY限制。
 """
 
+import asyncio
 import os
 import json
+import weakref
 from typing import Any, Dict, List, Optional, Union, Iterator, AsyncIterator, Sequence
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 from langchain_core.callbacks.manager import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
 from langchain_core.tools import BaseTool
 from langchain_core.utils.function_calling import convert_to_openai_tool
 from pydantic import Field, SecretStr
 import dashscope
-from dashscope import Generation
+import aiohttp
+from dashscope import AioGeneration, Generation
 from ..config.config_manager import token_tracker
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class AsyncDashScopePool:
+    """DashScope异步调用连接池：aiohttp连接池 + asyncio并发限制
+
+    aiohttp.ClientSession和asyncio.Semaphore绑定创建时的事件循环，请通过get_async_dashscope_pool()获取当前循环的实例。
+    """
+
+    def __init__(self, max_concurrency: int = None, pool_size: int = None):
+        """
+        Args:
+            max_concurrency: 同时进行的DashScope请求上限 (DASHSCOPE_MAX_CONCURRENCY，默认8)
+            pool_size: 连接池大小 (DASHSCOPE_POOL_SIZE，默认与并发上限一致)
+        """
+        self.max_concurrency = max_concurrency or _env_int("DASHSCOPE_MAX_CONCURRENCY", 8)
+        self.pool_size = pool_size or _env_int("DASHSCOPE_POOL_SIZE", self.max_concurrency)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size),
+            trust_env=True,
+        )
+
+    async def aclose(self):
+        """关闭连接池"""
+        await self.session.close()
+
+
+# 每个事件循环一个DashScope异步连接池
+_async_dashscope_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncDashScopePool]" = weakref.WeakKeyDictionary()
+
+def get_async_dashscope_pool() -> AsyncDashScopePool:
+    """获取当前事件循环的DashScope异步连接池（需在协程中调用）"""
+    loop = asyncio.get_running_loop()
+    pool = _async_dashscope_pools.get(loop)
+    if pool is None or pool.session.closed:
+        pool = AsyncDashScopePool()
+        _async_dashscope_pools[loop] = pool
+    return pool
+
+
 class ChatDashScope(BaseChatModel):
     """阿里百炼大模型的 LangChain 适配器"""
     
@@ -88,14 +141,13 @@ class ChatDashScope(BaseChatModel):
         
         return dashscope_messages
     
-    def _generate(
+    def _build_request_params(
         self,
         messages: List[BaseMessage],
         stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
-    ) -> ChatResult:
-        """生成聊天回复"""
+    ) -> Dict[str, Any]:
+        """构建 DashScope 请求参数"""
         
         # 转换消息格式
         dashscope_messages = self._convert_messages_to_dashscope_format(messages)
@@ -116,68 +168,194 @@ class ChatDashScope(BaseChatModel):
         
         # 合并额外参数
         request_params.update(kwargs)
+        return request_params
+    
+    @staticmethod
+    def _pop_tracking_params(messages: List[BaseMessage], kwargs: Dict[str, Any]) -> Dict[str, str]:
+        """取出Token跟踪参数（会话ID、分析类型），不传给 DashScope API"""
+        return {
+            "session_id": kwargs.pop('session_id', None) or f"dashscope_{hash(str(messages))%10000}",
+            "analysis_type": kwargs.pop('analysis_type', None) or 'stock_analysis',
+        }
+    
+    @staticmethod
+    def _extract_usage(response: Any) -> tuple:
+        """从响应中提取(输入token, 输出token)"""
+        input_tokens = 0
+        output_tokens = 0
+        
+        # DashScope API响应中包含usage信息
+        if hasattr(response, 'usage') and response.usage:
+            usage = response.usage
+            # 根据API文档，usage可能包含input_tokens和output_tokens
+            if hasattr(usage, 'input_tokens'):
+                input_tokens = usage.input_tokens
+            if hasattr(usage, 'output_tokens'):
+                output_tokens = usage.output_tokens
+            # 有些情况下可能是total_tokens
+            elif hasattr(usage, 'total_tokens'):
+                # 估算输入和输出token（如果没有分别提供）
+                total_tokens = usage.total_tokens
+                # 简单估算：假设输入占30%，输出占70%
+                input_tokens = int(total_tokens * 0.3)
+                output_tokens = int(total_tokens * 0.7)
+        
+        return input_tokens or 0, output_tokens or 0
+    
+    def _track_usage(self, input_tokens: int, output_tokens: int, tracking: Dict[str, str]):
+        """记录token使用量"""
+        if input_tokens > 0 or output_tokens > 0:
+            try:
+                # 使用TokenTracker记录使用量
+                token_tracker.track_usage(
+                    provider="dashscope",
+                    model_name=self.model,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    session_id=tracking["session_id"],
+                    analysis_type=tracking["analysis_type"]
+                )
+            except Exception as track_error:
+                # 记录失败不应该影响主要功能
+                print(f"Token tracking failed: {track_error}")
+    
+    @staticmethod
+    def _check_response(response: Any):
+        if response.status_code != 200:
+            raise Exception(f"DashScope API error: {response.code} - {response.message}")
+    
+    @staticmethod
+    def _usage_metadata(input_tokens: int, output_tokens: int) -> Dict[str, int]:
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+    
+    def _chat_result(self, response: Any, tracking: Dict[str, str]) -> ChatResult:
+        """解析非流式响应并记录token使用量"""
+        self._check_response(response)
+        
+        # 解析响应
+        output = response.output
+        message_content = output.choices[0].message.content
+        
+        # 提取并记录token使用量
+        input_tokens, output_tokens = self._extract_usage(response)
+        self._track_usage(input_tokens, output_tokens, tracking)
+        
+        # 创建 AI 消息
+        ai_message = AIMessage(
+            content=message_content,
+            usage_metadata=self._usage_metadata(input_tokens, output_tokens),
+        )
+        
+        # 创建生成结果
+        generation = ChatGeneration(message=ai_message)
+        
+        return ChatResult(generations=[generation])
+    
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """生成聊天回复"""
+        tracking = self._pop_tracking_params(messages, kwargs)
+        request_params = self._build_request_params(messages, stop, **kwargs)
         
         try:
             # 调用 DashScope API
             response = Generation.call(**request_params)
-            
-            if response.status_code == 200:
-                # 解析响应
-                output = response.output
-                message_content = output.choices[0].message.content
-                
-                # 提取token使用量信息
-                input_tokens = 0
-                output_tokens = 0
-                
-                # DashScope API响应中包含usage信息
-                if hasattr(response, 'usage') and response.usage:
-                    usage = response.usage
-                    # 根据API文档，usage可能包含input_tokens和output_tokens
-                    if hasattr(usage, 'input_tokens'):
-                        input_tokens = usage.input_tokens
-                    if hasattr(usage, 'output_tokens'):
-                        output_tokens = usage.output_tokens
-                    # 有些情况下可能是total_tokens
-                    elif hasattr(usage, 'total_tokens'):
-                        # 估算输入和输出token（如果没有分别提供）
-                        total_tokens = usage.total_tokens
-                        # 简单估算：假设输入占30%，输出占70%
-                        input_tokens = int(total_tokens * 0.3)
-                        output_tokens = int(total_tokens * 0.7)
-                
-                # 记录token使用量
-                if input_tokens > 0 or output_tokens > 0:
-                    try:
-                        # 生成会话ID（如果没有提供）
-                        session_id = kwargs.get('session_id', f"dashscope_{hash(str(messages))%10000}")
-                        analysis_type = kwargs.get('analysis_type', 'stock_analysis')
-                        
-                        # 使用TokenTracker记录使用量
-                        token_tracker.track_usage(
-                            provider="dashscope",
-                            model_name=self.model,
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
-                            session_id=session_id,
-                            analysis_type=analysis_type
-                        )
-                    except Exception as track_error:
-                        # 记录失败不应该影响主要功能
-                        print(f"Token tracking failed: {track_error}")
-                
-                # 创建 AI 消息
-                ai_message = AIMessage(content=message_content)
-                
-                # 创建生成结果
-                generation = ChatGeneration(message=ai_message)
-                
-                return ChatResult(generations=[generation])
-            else:
-                raise Exception(f"DashScope API error: {response.code} - {response.message}")
-                
+            return self._chat_result(response, tracking)
+        except Exception as e:
+            raise Exception(f"Error calling DashScope API: {str(e)}")
+    
+    def _stream_chunk(self, response: Any) -> Optional[ChatGenerationChunk]:
+        """将一段增量输出转换为生成块，空内容返回None"""
+        self._check_response(response)
+        choice = response.output.choices[0]
+        content = choice.message.content or ""
+        if not content:
+            return None
+        return ChatGenerationChunk(message=AIMessageChunk(content=content))
+    
+    def _final_stream_chunk(self, last_response: Any, tracking: Dict[str, str]) -> ChatGenerationChunk:
+        """流结束块：携带usage和结束原因，并记录token使用量"""
+        input_tokens, output_tokens = self._extract_usage(last_response) if last_response is not None else (0, 0)
+        self._track_usage(input_tokens, output_tokens, tracking)
+        
+        finish_reason = None
+        if last_response is not None:
+            finish_reason = getattr(last_response.output.choices[0], "finish_reason", None)
+        
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                usage_metadata=self._usage_metadata(input_tokens, output_tokens),
+                response_metadata={"model_name": self.model, "finish_reason": finish_reason},
+            ),
+            generation_info={"finish_reason": finish_reason},
+        )
+    
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """流式生成聊天回复（增量输出模式）"""
+        tracking = self._pop_tracking_params(messages, kwargs)
+        request_params = self._build_request_params(messages, stop, **kwargs)
+        request_params.update(stream=True, incremental_output=True)
+        
+        last_response = None
+        try:
+            for response in Generation.call(**request_params):
+                chunk = self._stream_chunk(response)
+                last_response = response
+                if chunk is None:
+                    continue
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+        except Exception as e:
+            raise Exception(f"Error calling DashScope API: {str(e)}")
+        
+        yield self._final_stream_chunk(last_response, tracking)
+    
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """异步流式生成聊天回复（增量输出模式）"""
+        tracking = self._pop_tracking_params(messages, kwargs)
+        request_params = self._build_request_params(messages, stop, **kwargs)
+        request_params.update(stream=True, incremental_output=True)
+        
+        last_response = None
+        try:
+            # 流式请求在整个输出期间占用一个并发名额
+            pool = get_async_dashscope_pool()
+            async with pool.semaphore:
+                async for response in await AioGeneration.call(session=pool.session, **request_params):
+                    chunk = self._stream_chunk(response)
+                    last_response = response
+                    if chunk is None:
+                        continue
+                    if run_manager:
+                        await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
         except Exception as e:
             raise Exception(f"Error calling DashScope API: {str(e)}")
+        
+        yield self._final_stream_chunk(last_response, tracking)
     
     async def _agenerate(
         self,
@@ -186,9 +364,22 @@ class ChatDashScope(BaseChatModel):
         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> ChatResult:
-        """异步生成聊天回复"""
-        # 目前使用同步方法，后续可以实现真正的异步
-        return self._generate(messages, stop, run_manager, **kwargs)
+        """异步生成聊天回复（DashScope原生异步接口，受并发上限限制）"""
+        tracking = self._pop_tracking_params(messages, kwargs)
+        request_params = self._build_request_params(messages, stop, **kwargs)
+        
+        try:
+            pool = get_async_dashscope_pool()
+            async with pool.semaphore:
+                response = await AioGeneration.call(session=pool.session, **request_params)
+        except Exception as e:
+            raise Exception(f"Error calling DashScope API: {str(e)}")
+        
+        try:
+            # 响应解析和Token记录（可能写文件/数据库）在线程中执行，不阻塞事件循环
+            return await asyncio.to_thread(self._chat_result, response, tracking)
+        except Exception as e:
+            raise Exception(f"Error calling DashScope API: {str(e)}")
     
     def bind_tools(
         self,
@@ -223,11 +414,18 @@ class ChatDashScope(BaseChatModel):
             temperature=self.temperature,
             max_tokens=self.max_tokens,
             top_p=self.top_p,
+            cache=self.cache,
             **kwargs
         )
         new_instance._tools = formatted_tools
         return new_instance
 
+    def _get_llm_string(self, stop: Optional[List[str]] = None, **kwargs: Any) -> str:
+        """响应缓存使用的模型标识：会话ID和分析类型只用于Token记录，不参与缓存键"""
+        kwargs.pop('session_id', None)
+        kwargs.pop('analysis_type', None)
+        return super()._get_llm_string(stop=stop, **kwargs)
+
     @property
     def _identifying_params(self) -> Dict[str, Any]:
         """返回标识参数"""
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+LLM响应缓存
+LLM Response Cache
+
+顾问、协调员、风险评估、结论提取等节点基于相同报告构建确定性的长提示词，
+重跑、调试和批量评估时会反复为相同的回复付费。本模块提供可选的持久化响应缓存，
+作为LangChain的BaseCache挂在ChatDashScope和Tongyi实例上（cache=...）：
+- 缓存键为(模型, 消息, temperature, top_p, max_tokens, stop)的SHA256摘要，
+  即LangChain传入的提示词和llm_string
+- sqlite: 本地SQLite文件（无额外依赖）
+- redis: 复用DatabaseManager的Redis连接（不可用时回退到sqlite）
+- 每条记录带TTL，超过条目上限时淘汰最久未访问的记录
+- 命中/未命中计数写入TokenTracker的缓存统计，命中时不产生Token费用
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from ..config.config_manager import token_tracker
+
+
+DEFAULT_LLM_CACHE_TTL = 7 * 24 * 3600     # 默认缓存7天
+DEFAULT_LLM_CACHE_MAX_ENTRIES = 10000
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def make_llm_cache_key(prompt: str, llm_string: str) -> str:
+    """由提示词（序列化后的消息）和llm_string（模型及采样参数、stop）生成缓存键"""
+    return hashlib.sha256(f"{llm_string}|{prompt}".encode("utf-8")).hexdigest()
+
+
+def _dump_generations(generations: Sequence[Generation]) -> str:
+    """序列化生成结果（只保存文本、消息和generation_info，读取时不反序列化任意对象）"""
+    return json.dumps([
+        {
+            "text": generation.text,
+            "generation_info": generation.generation_info,
+            "message": message_to_dict(generation.message) if isinstance(generation, ChatGeneration) else None,
+        }
+        for generation in generations
+    ], ensure_ascii=False)
+
+
+def _load_generations(value: str) -> list:
+    """反序列化生成结果，generation_info标记from_cache，Token统计回调据此不重复计入用量"""
+    generations = []
+    for item in json.loads(value):
+        generation_info = {**(item.get("generation_info") or {}), "from_cache": True}
+        if item.get("message") is not None:
+            message = messages_from_dict([item["message"]])[0]
+            generations.append(ChatGeneration(message=message, generation_info=generation_info))
+        else:
+            generations.append(Generation(text=item["text"], generation_info=generation_info))
+    return generations
+
+
+def _generation_usage(generation: Any) -> tuple:
+    """读取缓存回复原本消耗的(输入token, 输出token)"""
+    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    token_usage = (generation.generation_info or {}).get("token_usage") or {}
+    return token_usage.get("input_tokens", 0), token_usage.get("output_tokens", 0)
+
+
+class SQLiteResponseStore:
+    """SQLite响应存储：按TTL过期，超过条目上限时淘汰最久未访问的记录"""
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str, ttl_seconds: int):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl_seconds, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+        excess = self._count() - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN "
+                "(SELECT key FROM llm_responses ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def size(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+
+class RedisResponseStore:
+    """Redis响应存储：记录由Redis按TTL过期，有序集合记录访问时间用于淘汰最久未访问的记录"""
+
+    def __init__(self, client: Any, max_entries: int = DEFAULT_LLM_CACHE_MAX_ENTRIES,
+                 prefix: str = "llm_response:"):
+        self.client = client
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.index_key = f"{prefix}__index__"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.client.zrem(self.index_key, key)
+            return None
+        self.client.zadd(self.index_key, {key: time.time()})
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl_seconds: int):
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, value, ex=ttl_seconds)
+        pipe.zadd(self.index_key, {key: time.time()})
+        pipe.execute()
+
+        excess = self.client.zcard(self.index_key) - self.max_entries
+        if excess > 0:
+            evicted = [k.decode("utf-8") if isinstance(k, bytes) else k
+                       for k, _ in self.client.zpopmin(self.index_key, excess)]
+            if evicted:
+                self.client.delete(*[self.prefix + k for k in evicted])
+
+    def size(self) -> int:
+        return self.client.zcard(self.index_key)
+
+    def clear(self):
+        keys = [k.decode("utf-8") if isinstance(k, bytes) else k
+                for k in self.client.zrange(self.index_key, 0, -1)]
+        if keys:
+            self.client.delete(*[self.prefix + k for k in keys])
+        self.client.delete(self.index_key)
+
+
+class LLMResponseCache(BaseCache):
+    """持久化LLM响应缓存（LangChain BaseCache实现）"""
+
+    def __init__(self, store: Any, ttl_seconds: int = DEFAULT_LLM_CACHE_TTL, tracker: Any = None):
+        """
+        Args:
+            store: 响应存储（SQLiteResponseStore / RedisResponseStore）
+            ttl_seconds: 缓存有效期秒数
+            tracker: 命中统计写入的TokenTracker，默认全局token_tracker
+        """
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.tracker = tracker or token_tracker
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _record(self, hit: bool, generations: Optional[Sequence[Any]] = None):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        saved_input = saved_output = 0
+        for generation in generations or []:
+            input_tokens, output_tokens = _generation_usage(generation)
+            saved_input += input_tokens
+            saved_output += output_tokens
+        try:
+            self.tracker.record_cache_lookup(hit, saved_input, saved_output)
+        except Exception as e:
+            print(f"⚠️ [LLM缓存] 记录缓存统计失败: {e}")
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = make_llm_cache_key(prompt, llm_string)
+        try:
+            value = self.store.get(key)
+            generations = _load_generations(value) if value is not None else None
+        except Exception as e:
+            print(f"⚠️ [LLM缓存] 读取缓存失败: {e}")
+            generations = None
+
+        if generations is None:
+            self._record(False)
+            return None
+
+        print(f"💾 [LLM缓存] 命中: {key[:16]}")
+        self._record(True, generations)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = make_llm_cache_key(prompt, llm_string)
+        try:
+            self.store.set(key, _dump_generations(return_val), self.ttl_seconds)
+        except Exception as e:
+            print(f"⚠️ [LLM缓存] 写入缓存失败: {e}")
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取本实例的命中统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": self.store.size(),
+            }
+
+
+def _create_redis_store(max_entries: int) -> Optional[RedisResponseStore]:
+    try:
+        from ..config.database_manager import get_redis_client
+        client = get_redis_client()
+    except Exception as e:
+        print(f"⚠️ [LLM缓存] 获取Redis连接失败: {e}")
+        client = None
+
+    if client is None:
+        print("⚠️ [LLM缓存] Redis不可用，使用SQLite响应缓存")
+        return None
+    return RedisResponseStore(client, max_entries)
+
+
+# 已创建的响应缓存，相同存储位置的LLM共享同一实例
+_llm_caches: Dict[tuple, LLMResponseCache] = {}
+_llm_caches_lock = threading.Lock()
+
+def create_llm_cache(config: Dict[str, Any]) -> Optional[LLMResponseCache]:
+    """
+    根据配置创建（或复用）LLM响应缓存，默认不启用
+
+    Args:
+        config: 图配置，未设置的项从环境变量读取
+            - llm_cache_backend: 'sqlite' / 'redis' (LLM_CACHE_BACKEND)，未设置时不启用缓存
+            - llm_cache_path: SQLite文件路径 (LLM_CACHE_PATH)，默认 {results_dir}/llm_cache/llm_responses.sqlite
+            - llm_cache_ttl: 缓存有效期秒数 (LLM_CACHE_TTL，默认7天)
+            - llm_cache_max_entries: 最大条目数 (LLM_CACHE_MAX_ENTRIES，默认10000)
+
+    Returns:
+        LLMResponseCache实例，未启用时返回None
+    """
+    backend = (config.get("llm_cache_backend") or os.getenv("LLM_CACHE_BACKEND") or "").lower()
+    if backend in ("", "none", "false"):
+        return None
+    if backend not in ("sqlite", "redis"):
+        raise ValueError(f"不支持的LLM缓存类型: {backend}")
+
+    ttl_seconds = config.get("llm_cache_ttl") or _env_int("LLM_CACHE_TTL", DEFAULT_LLM_CACHE_TTL)
+    max_entries = config.get("llm_cache_max_entries") or _env_int("LLM_CACHE_MAX_ENTRIES", DEFAULT_LLM_CACHE_MAX_ENTRIES)
+    path = config.get("llm_cache_path") or os.getenv("LLM_CACHE_PATH") or os.path.join(
+        config.get("results_dir", "./results"), "llm_cache", "llm_responses.sqlite"
+    )
+
+    with _llm_caches_lock:
+        cache_id = (backend, path if backend == "sqlite" else None)
+        cache = _llm_caches.get(cache_id)
+        if cache is not None:
+            return cache
+
+        store = _create_redis_store(max_entries) if backend == "redis" else None
+        if store is None:
+            store = SQLiteResponseStore(path, max_entries)
+            print(f"💾 [LLM缓存] 使用SQLite响应缓存: {path} (TTL {ttl_seconds}s, 上限 {max_entries}条)")
+        else:
+            print(f"💾 [LLM缓存] 使用Redis响应缓存 (TTL {ttl_seconds}s, 上限 {max_entries}条)")
+
+        cache = LLMResponseCache(store, ttl_seconds)
+        _llm_caches[cache_id] = cache
+        return cache
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+通义千问 Tongyi LLM 适配器
+ReAct图使用的Tongyi补全模型，模型标识包含采样参数，使LLM响应缓存能区分不同参数的调用
+"""
+
+from typing import Any, Mapping
+
+from langchain_community.llms import Tongyi
+
+
+class TongyiLLM(Tongyi):
+    """Tongyi补全模型：标识参数包含top_p及model_kwargs中的temperature、max_tokens等"""
+
+    @property
+    def _identifying_params(self) -> Mapping[str, Any]:
+        # 不包含api_key，避免密钥写入缓存键；更换密钥不影响缓存命中
+        params = {key: value for key, value in self._default_params.items() if key != "api_key"}
+        return {"model_name": self.model_name, **params}
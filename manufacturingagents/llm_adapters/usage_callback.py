@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+LLM调用Token统计回调
+LLM Token Usage Callback Handler
+
+ReAct图中的Tongyi不经过ChatDashScope的Token记录，本回调在LangChain层捕获每次LLM调用的
+实际Token用量和耗时，按图节点(metadata中的langgraph_node)汇总，运行结束后写入TokenTracker：
+- 补全模型读取generation_info["token_usage"]，聊天模型读取usage_metadata或llm_output["token_usage"]
+- 命中响应缓存的回复不计入Token用量
+- 自行记录用量的模型（ChatDashScope）只在节点汇总中统计耗时，不重复写入TokenTracker
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from ..config.config_manager import token_tracker
+
+
+# 自行调用TokenTracker记录用量的模型类型
+SELF_TRACKING_LLM_TYPES = ("dashscope",)
+
+
+def _extract_usage(response: LLMResult) -> Tuple[int, int, bool]:
+    """从LLM结果中提取(输入token, 输出token, 是否来自缓存)"""
+    input_tokens = output_tokens = 0
+    from_cache = False
+
+    for generations in response.generations:
+        for generation in generations:
+            generation_info = generation.generation_info or {}
+            if generation_info.get("from_cache"):
+                from_cache = True
+                continue
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+                continue
+            token_usage = generation_info.get("token_usage") or {}
+            input_tokens += token_usage.get("input_tokens", 0)
+            output_tokens += token_usage.get("output_tokens", 0)
+
+    if not input_tokens and not output_tokens and not from_cache:
+        # OpenAI风格：用量在llm_output中
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        input_tokens = token_usage.get("prompt_tokens", token_usage.get("input_tokens", 0))
+        output_tokens = token_usage.get("completion_tokens", token_usage.get("output_tokens", 0))
+
+    return input_tokens, output_tokens, from_cache
+
+
+class TokenUsageCallbackHandler(BaseCallbackHandler):
+    """按图节点汇总LLM调用的Token用量和耗时（线程安全，并行分析师节点共用一个实例）"""
+
+    def __init__(self, session_id: str, provider: str = "dashscope",
+                 analysis_type: str = "manufacturing_analysis", tracker: Any = None):
+        """
+        Args:
+            session_id: 会话ID，写入TokenTracker的每条记录
+            provider: 供应商，用于计算成本
+            analysis_type: 分析类型
+            tracker: 写入的TokenTracker，默认全局token_tracker
+        """
+        self.session_id = session_id
+        self.provider = provider
+        self.analysis_type = analysis_type
+        self.tracker = tracker or token_tracker
+        self._lock = threading.Lock()
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+        self._usage: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]], invocation_params: Optional[Dict[str, Any]]):
+        metadata = metadata or {}
+        invocation_params = invocation_params or {}
+        with self._lock:
+            self._runs[run_id] = {
+                "started_at": time.perf_counter(),
+                "node": metadata.get("langgraph_node") or "unknown",
+                "model": (metadata.get("ls_model_name") or invocation_params.get("model_name")
+                          or invocation_params.get("model") or "unknown"),
+                "self_tracking": invocation_params.get("_type") in SELF_TRACKING_LLM_TYPES,
+            }
+
+    def _end(self, run_id: UUID, input_tokens: int = 0, output_tokens: int = 0,
+             from_cache: bool = False, error: bool = False):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+            if run is None:
+                return
+            usage = self._usage.setdefault((run["node"], run["model"]), {
+                "requests": 0, "cached": 0, "errors": 0,
+                "input_tokens": 0, "output_tokens": 0, "latency_seconds": 0.0,
+                "self_tracking": run["self_tracking"],
+            })
+            usage["requests"] += 1
+            usage["cached"] += int(from_cache)
+            usage["errors"] += int(error)
+            usage["latency_seconds"] += time.perf_counter() - run["started_at"]
+            if not run["self_tracking"]:
+                usage["input_tokens"] += input_tokens
+                usage["output_tokens"] += output_tokens
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID,
+                     metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._start(run_id, metadata, kwargs.get("invocation_params"))
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._start(run_id, metadata, kwargs.get("invocation_params"))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        input_tokens, output_tokens, from_cache = _extract_usage(response)
+        self._end(run_id, input_tokens, output_tokens, from_cache)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=True)
+
+    def get_node_usage(self) -> Dict[str, Dict[str, Any]]:
+        """按节点汇总的调用次数、Token用量和耗时（尚未写入TokenTracker的部分）"""
+        node_usage = {}
+        with self._lock:
+            for (node, _model), usage in self._usage.items():
+                totals = node_usage.setdefault(node, {
+                    "requests": 0, "cached": 0, "errors": 0,
+                    "input_tokens": 0, "output_tokens": 0, "latency_seconds": 0.0,
+                })
+                for key in totals:
+                    totals[key] += usage[key]
+        return node_usage
+
+    def flush(self) -> List[Any]:
+        """将汇总结果按(节点, 模型)写入TokenTracker并清空，返回写入的使用记录"""
+        with self._lock:
+            usage_items = list(self._usage.items())
+            self._usage.clear()
+
+        records = []
+        for (node, model), usage in usage_items:
+            # ChatDashScope已按调用写入TokenTracker，不重复记录；全部命中缓存的节点没有API调用
+            api_requests = usage["requests"] - usage["cached"]
+            if usage["self_tracking"] or api_requests == 0:
+                continue
+            print(f"📊 [Token统计] {node}: {usage['requests']}次调用, "
+                  f"输入{usage['input_tokens']} / 输出{usage['output_tokens']} tokens, "
+                  f"耗时{usage['latency_seconds']:.1f}s")
+            try:
+                record = self.tracker.track_usage(
+                    provider=self.provider,
+                    model_name=model,
+                    input_tokens=usage["input_tokens"],
+                    output_tokens=usage["output_tokens"],
+                    session_id=self.session_id,
+                    analysis_type=self.analysis_type,
+                    node_name=node,
+                    latency_seconds=usage["latency_seconds"],
+                    request_count=api_requests,
+                )
+            except Exception as e:
+                # 记录失败不应该影响分析结果
+                print(f"⚠️ [Token统计] 写入TokenTracker失败: {e}")
+                continue
+            if record:
+                records.append(record)
+        return records
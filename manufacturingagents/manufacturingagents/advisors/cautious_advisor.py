@@ -4,17 +4,19 @@
 from langchain_core.messages import AIMessage
 import time
 import json
+from langchain_core.runnables import RunnableConfig
 from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+from manufacturingagents.manufacturingagents.utils.manufacturing_states import get_progress_callback
 
 
 def create_cautious_advisor(llm, memory):
     """创建谨慎决策顾问"""
     
-    def cautious_advisor_node(state):
+    def cautious_advisor_node(state, config: RunnableConfig = None):
         print(f"🛡️ [DEBUG] ===== 谨慎决策顾问节点开始 =====")
         
         # 🎯 新增：获取进度追踪器并记录决策阶段
-        progress_callback = state.get('progress_callback')
+        progress_callback = get_progress_callback(state, config)
         if progress_callback:
             progress_callback.update_progress(5)
             progress_callback.log_decision_phase("谨慎决策顾问发言")
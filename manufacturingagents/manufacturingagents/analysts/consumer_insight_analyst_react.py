@@ -7,19 +7,28 @@ Consumer Insight Analyst for Manufacturing - ReAct Agent Version
 专为阿里百炼LLM优化的ReAct Agent实现
 """
 
-from langchain_core.tools import BaseTool
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain import hub
+from langchain_core.runnables import RunnableConfig
 import time
 import json
 # 🎯 新增：导入提示词管理器
 from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+from manufacturingagents.manufacturingagents.analysts.react_agent_factory import ReactAgentFactory, with_async_node
 
 
-def create_consumer_insight_analyst_react(llm, toolkit):
+def create_consumer_insight_analyst_react(llm, toolkit, agent_factory=None):
     """创建ReAct模式的制造业消费者洞察分析师（适用于阿里百炼）"""
     
-    def consumer_insight_analyst_react_node(state):
+    # 🎯 工具和AgentExecutor由工厂统一创建并缓存，节点执行时不再重复构建
+    if agent_factory is None:
+        agent_factory = ReactAgentFactory(llm, toolkit)
+    try:
+        agent_factory.build(["consumer_insight_analyst"])
+    except Exception as e:
+        # 构建失败时推迟到节点执行时再创建，错误由节点统一处理
+        print(f"⚠️ [智能体工厂] 预创建consumer_insight_analyst Agent失败: {e}")
+    
+    def _prepare_analysis(state, config):
+        """读取状态并构建分析任务，返回(运行配置, 进度追踪器, 查询, 预取数据)"""
         print(f"💭 [DEBUG] ===== ReAct消费者洞察分析师节点开始 =====")
         
         current_date = state["analysis_date"]
@@ -28,7 +37,8 @@ def create_consumer_insight_analyst_react(llm, toolkit):
         target_quarter = state["target_quarter"]
         
         # 🎯 新增：获取进度追踪器并记录分析师启动
-        progress_callback = state.get('progress_callback')
+        run_config = agent_factory.build_run_config(state, config)
+        progress_callback = run_config["configurable"].get("progress_callback")
         if progress_callback:
             progress_callback.log_agent_start("💭 消费者洞察分析师")
             progress_callback.update_progress(4)
@@ -36,126 +46,22 @@ def create_consumer_insight_analyst_react(llm, toolkit):
         
         print(f"💭 [DEBUG] 输入参数: product_type={product_type}, company={company_name}, target_quarter={target_quarter}")
         
-        # 创建消费者洞察专用工具：舆情和行为数据
-        class ManufacturingConsumerSentimentTool(BaseTool):
-            name: str = "get_manufacturing_consumer_sentiment"
-            description: str = f"获取消费者舆情数据，分析{product_type}品牌的消费者情绪和品牌偏好。参数：品牌关键词"
-            
-            def _run(self, brand_keyword: str = "") -> str:
-                try:
-                    # 🎯 新增：记录API调用
-                    if progress_callback:
-                        progress_callback.log_api_call("消费者舆情数据", "调用中")
-                    
-                    print(f"💭 [DEBUG] ManufacturingConsumerSentimentTool调用，产品类型: {product_type}")
-                    # 暂时使用模拟数据，后续可接入真实舆情API
-                    if not brand_keyword:
-                        brand_keyword = f"{company_name} {product_type}"
-                    
-                    # 模拟舆情数据
-                    sentiment_data = f"""
-## 消费者舆情分析数据 ({brand_keyword})
-
-### 社交媒体情绪分析 (最近30天)
-- 正面情绪: 68%
-- 中性情绪: 22% 
-- 负面情绪: 10%
-
-### 品牌提及热词
-- 节能: 出现562次
-- 静音: 出现438次
-- 智能: 出现721次
-- 价格: 出现892次
-- 售后: 出现234次
-
-### 竞品对比舆情
-- {company_name}品牌情绪指数: 7.2/10
-- 行业平均情绪指数: 6.8/10
-- 主要优势: 技术创新、性价比
-- 主要问题: 部分用户反馈安装服务
-
-### 购买决策因素分析
-1. 价格敏感度: 中等 (65%)
-2. 品牌忠诚度: 较高 (72%)
-3. 功能需求: 节能环保 (78%)
-4. 购买时机: 夏季促销期 (83%)
-
-### 消费者画像洞察
-- 主力消费群体: 25-45岁家庭用户
-- 购买渠道偏好: 线上63%, 线下37%
-- 决策周期: 平均2.3周
-- 复购意愿: 76%
-"""
-                    # 🎯 新增：记录API调用成功
-                    if progress_callback:
-                        progress_callback.log_api_call("消费者舆情数据", "成功")
-                    
-                    return sentiment_data
-                except Exception as e:
-                    # 🎯 新增：记录API调用失败
-                    if progress_callback:
-                        progress_callback.log_api_call("消费者舆情数据", "失败")
-                    return f"获取消费者舆情数据失败: {str(e)}"
-
-        class ManufacturingConsumerBehaviorTool(BaseTool):
-            name: str = "get_manufacturing_consumer_behavior"  
-            description: str = f"获取消费者行为数据，分析{product_type}的购买模式和市场偏好趋势。参数：行为分析维度"
-            
-            def _run(self, behavior_dimension: str = "") -> str:
-                try:
-                    print(f"💭 [DEBUG] ManufacturingConsumerBehaviorTool调用，产品类型: {product_type}")
-                    
-                    # 模拟消费者行为数据
-                    behavior_data = f"""
-## 消费者行为分析数据 ({company_name} {product_type})
-
-### 购买行为模式分析
-- 首次购买动机: 新装修(45%), 替换旧产品(38%), 功能升级(17%)
-- 平均决策时间: 2.3周
-- 信息搜集渠道: 官网(32%), 电商平台(41%), 社交媒体(27%)
-- 价格对比频次: 平均对比3.7个品牌
-
-### 购买时机分析
-- 旺季购买: 5-8月 (占全年62%)
-- 促销敏感度: 高 (74%用户等待促销)
-- 节假日购买: 五一、国庆期间增长35%
-- 换季购买: 春季(18%), 夏季(52%), 秋季(21%), 冬季(9%)
-
-### 产品偏好特征
-- 功率需求: 1.5匹(38%), 1匹(28%), 2匹(24%), 其他(10%)
-- 功能偏好: 变频(67%), 智能控制(54%), 除湿(41%), 自清洁(33%)
-- 价格区间: 2000-3000元(42%), 3000-5000元(35%), 5000+元(23%)
-
-### 购买决策影响因素
-1. 品牌信任度: 权重25%
-2. 价格合理性: 权重23%  
-3. 节能效果: 权重18%
-4. 售后服务: 权重16%
-5. 外观设计: 权重12%
-6. 朋友推荐: 权重6%
-
-### 忠诚度与复购
-- 品牌忠诚度: 72% (行业平均68%)
-- 推荐意愿: 78%
-- 复购周期: 6-8年
-- 服务满意度: 84%
-"""
-                    return behavior_data
-                except Exception as e:
-                    return f"获取消费者行为数据失败: {str(e)}"
-
-        # 配置消费者洞察专用工具
-        tools = [
-            ManufacturingConsumerSentimentTool(),
-            ManufacturingConsumerBehaviorTool()
-        ]
-        
         # 🎯 关键修复：使用txt文件中的专业提示词
         base_system_prompt = prompt_manager.get_prompt("sentiment_insight_analyst")
         if not base_system_prompt:
             # 降级处理：如果提示词文件不可用，使用简化版本
             base_system_prompt = "你是一位专业的情感洞察分析师，负责收集社交媒体、论坛、搜索指数等数据，从个体消费者视角监控消费者讨论趋势。"
         
+        # 🎯 数据预取阶段已获取全部所需数据时，直接基于数据生成报告，无需调用工具
+        prefetched = agent_factory.get_prefetched("consumer_insight_analyst", state)
+        if prefetched:
+            tool_instructions = """🔧 数据说明：
+- 所需数据已由数据预取阶段获取，见下方“预取数据”，请直接基于数据分析，无需调用工具"""
+        else:
+            tool_instructions = """🔧 工具使用说明：
+- 必须调用get_manufacturing_consumer_sentiment获取消费者舆情数据
+- 必须调用get_manufacturing_consumer_behavior获取消费者行为数据"""
+        
         # 🎯 修复：使用专业提示词 + 具体任务参数
         query = f"""{base_system_prompt}
 
@@ -165,9 +71,7 @@ def create_consumer_insight_analyst_react(llm, toolkit):
 - 分析日期: {current_date}
 - 目标季度: {target_quarter}
 
-🔧 工具使用说明：
-- 必须调用get_manufacturing_consumer_sentiment获取消费者舆情数据
-- 必须调用get_manufacturing_consumer_behavior获取消费者行为数据
+{tool_instructions}
 
 📋 执行要求：
 - 必须严格按照提示词中的报告格式输出
@@ -181,49 +85,58 @@ def create_consumer_insight_analyst_react(llm, toolkit):
 
         print(f"💭 [DEBUG] 执行ReAct Agent查询...")
         
-        try:
-            # 🎯 新增：记录开始分析
-            if progress_callback:
-                progress_callback.log_event("progress", "💭 消费者洞察分析师：开始数据分析...")
-            
-            # 创建ReAct Agent
-            prompt = hub.pull("hwchase17/react")
-            agent = create_react_agent(llm, tools, prompt)
-            agent_executor = AgentExecutor(
-                agent=agent,
-                tools=tools,
-                verbose=True,
-                handle_parsing_errors=True,
-                max_iterations=5,  # 🎯 修复：减少迭代次数，避免重复调用
-                max_execution_time=300,
-                return_intermediate_steps=True
-            )
-            
-            result = agent_executor.invoke({'input': query})
-            
-            report = result.get('output', '分析失败')
-            print(f"💭 [消费者洞察分析师] ReAct Agent完成，报告长度: {len(report)}")
-            
-            # 🎯 新增：记录分析完成
-            if progress_callback:
-                progress_callback.log_agent_complete("💭 消费者洞察分析师", f"生成{len(report)}字分析报告")
-            
-        except Exception as e:
-            print(f"💭 [ERROR] ReAct Agent执行失败: {str(e)}")
-            
-            # 🎯 新增：记录分析失败
-            if progress_callback:
-                progress_callback.log_error(f"💭 消费者洞察分析师失败: {str(e)}")
-            
-            report = f"消费者洞察分析失败：{str(e)}"
+        # 🎯 新增：记录开始分析
+        if progress_callback:
+            progress_callback.log_event("progress", "💭 消费者洞察分析师：开始数据分析...")
+        
+        return run_config, progress_callback, query, prefetched
+    
+    def _report_from_result(result, progress_callback):
+        report = result.get('output', '分析失败')
+        print(f"💭 [消费者洞察分析师] ReAct Agent完成，报告长度: {len(report)}")
+        
+        # 🎯 新增：记录分析完成
+        if progress_callback:
+            progress_callback.log_agent_complete("💭 消费者洞察分析师", f"生成{len(report)}字分析报告")
+        
+        return report
+    
+    def _report_from_error(e, progress_callback):
+        print(f"💭 [ERROR] ReAct Agent执行失败: {str(e)}")
         
+        # 🎯 新增：记录分析失败
+        if progress_callback:
+            progress_callback.log_error(f"💭 消费者洞察分析师失败: {str(e)}")
+        
+        return f"消费者洞察分析失败：{str(e)}"
+    
+    def _finish_analysis(report):
         print(f"💭 [DEBUG] ===== ReAct消费者洞察分析师节点结束 =====")
         
-        # 更新状态
-        new_state = state.copy()
-        new_state["consumer_insight_report"] = report
+        # 更新状态：只返回本分析师负责的报告字段，便于并行分支合并
+        new_state = {"consumer_insight_report": report}
         print(f"💭 [DEBUG] 状态更新完成，报告长度: {len(report)}")
         
         return new_state
     
-    return consumer_insight_analyst_react_node 
\ No newline at end of file
+    def consumer_insight_analyst_react_node(state, config: RunnableConfig = None):
+        run_config, progress_callback, query, prefetched = _prepare_analysis(state, config)
+        try:
+            # 🎯 使用工厂缓存的Agent执行，单次运行参数通过run_config传入工具；有预取数据时直接生成报告
+            result = agent_factory.invoke("consumer_insight_analyst", query, run_config, prefetched=prefetched)
+            report = _report_from_result(result, progress_callback)
+        except Exception as e:
+            report = _report_from_error(e, progress_callback)
+        return _finish_analysis(report)
+    
+    async def aconsumer_insight_analyst_react_node(state, config: RunnableConfig = None):
+        run_config, progress_callback, query, prefetched = _prepare_analysis(state, config)
+        try:
+            result = await agent_factory.ainvoke("consumer_insight_analyst", query, run_config, prefetched=prefetched)
+            report = _report_from_result(result, progress_callback)
+        except Exception as e:
+            report = _report_from_error(e, progress_callback)
+        return _finish_analysis(report)
+    
+    # 同步节点供图的invoke使用，异步节点供ainvoke使用
+    return with_async_node(consumer_insight_analyst_react_node, aconsumer_insight_analyst_react_node)
\ No newline at end of file
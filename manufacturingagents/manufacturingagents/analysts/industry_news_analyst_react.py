@@ -7,19 +7,28 @@ Industry News Analyst for Manufacturing - ReAct Agent Version
 专为阿里百炼LLM优化的ReAct Agent实现
 """
 
-from langchain_core.tools import BaseTool
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain import hub
+from langchain_core.runnables import RunnableConfig
 import time
 import json
 # 🎯 新增：导入提示词管理器
 from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+from manufacturingagents.manufacturingagents.analysts.react_agent_factory import ReactAgentFactory, with_async_node
 
 
-def create_industry_news_analyst_react(llm, toolkit):
+def create_industry_news_analyst_react(llm, toolkit, agent_factory=None):
     """创建ReAct模式的制造业行业资讯分析师（适用于阿里百炼）"""
     
-    def industry_news_analyst_react_node(state):
+    # 🎯 工具和AgentExecutor由工厂统一创建并缓存，节点执行时不再重复构建
+    if agent_factory is None:
+        agent_factory = ReactAgentFactory(llm, toolkit)
+    try:
+        agent_factory.build(["industry_news_analyst"])
+    except Exception as e:
+        # 构建失败时推迟到节点执行时再创建，错误由节点统一处理
+        print(f"⚠️ [智能体工厂] 预创建industry_news_analyst Agent失败: {e}")
+    
+    def _prepare_analysis(state, config):
+        """读取状态并构建分析任务，返回(运行配置, 进度追踪器, 查询, 预取数据)"""
         print(f"📰 [DEBUG] ===== ReAct行业资讯分析师节点开始 =====")
         
         current_date = state["analysis_date"]
@@ -30,7 +39,8 @@ def create_industry_news_analyst_react(llm, toolkit):
         city_name = state["city_name"]  # 如果缺失则报错，避免硬编码
         
         # 🎯 新增：获取进度追踪器并记录分析师启动
-        progress_callback = state.get('progress_callback')
+        run_config = agent_factory.build_run_config(state, config)
+        progress_callback = run_config["configurable"].get("progress_callback")
         if progress_callback:
             progress_callback.log_agent_start("📰 行业资讯分析师")
             progress_callback.update_progress(3)
@@ -38,62 +48,22 @@ def create_industry_news_analyst_react(llm, toolkit):
         
         print(f"📰 [DEBUG] 输入参数: product_type={product_type}, company={company_name}, target_quarter={target_quarter}, city_name={city_name}")
         
-        # 🎯 修复：创建符合预期格式的新闻工具
-        class ManufacturingNewsTool(BaseTool):
-            name: str = "get_manufacturing_news_data"
-            description: str = f"🎯【一次性完整获取】制造业相关新闻数据，包含促销活动、区域新闻、新楼盘、政策动态等全部4类新闻。调用一次即可获得分析所需的所有新闻信息，无需重复调用。直接调用，无需参数。"
-            
-            def _run(self, unused_param: str = "") -> str:
-                try:
-                    # 🎯 新增：记录API调用
-                    if progress_callback:
-                        progress_callback.log_api_call("行业新闻数据", "调用中")
-                    
-                    print(f"📰 [DEBUG] ManufacturingNewsTool调用，城市: {city_name}, 产品: {product_type}")
-                    
-                    # 🎯 修复：回归到统一toolkit架构，传递结构化参数
-                    from datetime import datetime, timedelta
-                    
-                    # 基于当前日期计算未来3个月的时间范围
-                    current_date_obj = datetime.now()
-                    end_date_obj = current_date_obj + timedelta(days=90)
-                    
-                    # 🎯 生成符合预期的结构化查询参数
-                    structured_query = {
-                        "activity_query": f"{city_name}近期有哪些厂商做{product_type}的促销活动",
-                        "area_news_query": f"{company_name}{product_type}",
-                        "new_building_query": f"{city_name}近期有哪些新楼盘交付",
-                        "policy_query": f"2025年{city_name}市{product_type}购买优惠政策"
-                    }
-                    
-                    print(f"📰 [DEBUG] 使用结构化查询: {structured_query}")
-                    
-                    # 🎯 修复：回归统一架构，通过toolkit调用
-                    result = toolkit.get_manufacturing_news_data.invoke({"query_params": structured_query})
-                    
-                    # 🎯 新增：记录API调用成功
-                    if progress_callback:
-                        progress_callback.log_api_call("行业新闻数据", "成功")
-                    
-                    return result
-                        
-                except Exception as e:
-                    # 🎯 新增：记录API调用失败
-                    if progress_callback:
-                        progress_callback.log_api_call("行业新闻数据", "失败")
-                    return f"获取新闻数据失败: {str(e)}"
-
-        # 配置行业资讯专用工具
-        tools = [
-            ManufacturingNewsTool()
-        ]
-        
         # 🎯 关键修复：使用txt文件中的专业提示词
         base_system_prompt = prompt_manager.get_prompt("news_analyst")
         if not base_system_prompt:
             # 降级处理：如果提示词文件不可用，使用简化版本
             base_system_prompt = "你是一位专业的新闻分析师，负责分析制造业相关新闻、政策变化和行业资讯，通过事件驱动分析识别连锁反应。"
         
+        # 🎯 数据预取阶段已获取全部所需数据时，直接基于数据生成报告，无需调用工具
+        prefetched = agent_factory.get_prefetched("industry_news_analyst", state)
+        if prefetched:
+            tool_instructions = """🔧 数据说明：
+- 所需数据已由数据预取阶段获取，见下方“预取数据”，请直接基于数据分析，无需调用工具"""
+        else:
+            tool_instructions = """🔧 工具使用说明：
+- 必须调用get_manufacturing_news_data获取完整新闻数据（只需调用一次）
+- 工具会一次性返回4类新闻：促销活动、区域新闻、新楼盘、政策动态"""
+        
         # 🎯 修复：使用专业提示词 + 具体任务参数
         query = f"""{base_system_prompt}
 
@@ -104,9 +74,7 @@ def create_industry_news_analyst_react(llm, toolkit):
 - 目标季度: {target_quarter}
 - 目标城市: {city_name}
 
-🔧 工具使用说明：
-- 必须调用get_manufacturing_news_data获取完整新闻数据（只需调用一次）
-- 工具会一次性返回4类新闻：促销活动、区域新闻、新楼盘、政策动态
+{tool_instructions}
 
 📋 执行要求：
 - 必须严格按照提示词中的报告格式输出
@@ -126,50 +94,58 @@ def create_industry_news_analyst_react(llm, toolkit):
 
         print(f"📰 [DEBUG] 执行ReAct Agent查询...")
         
-        try:
-            # 🎯 新增：记录开始分析
-            if progress_callback:
-                progress_callback.log_event("progress", "📰 行业资讯分析师：开始数据分析...")
-            
-            # 创建ReAct Agent
-            prompt = hub.pull("hwchase17/react")
-            agent = create_react_agent(llm, tools, prompt)
-            # 🎯 修复：进一步限制迭代次数，避免重复调用
-            agent_executor = AgentExecutor(
-                agent=agent,
-                tools=tools,
-                verbose=True,
-                handle_parsing_errors=True,
-                max_iterations=3,  # 🎯 关键修复：从5减少到3，强制限制调用次数
-                max_execution_time=120,  # 🎯 修复：从300秒减少到120秒，控制时间
-                return_intermediate_steps=True
-            )
-            
-            result = agent_executor.invoke({'input': query})
-            
-            report = result.get('output', '分析失败')
-            print(f"📰 [行业资讯分析师] ReAct Agent完成，报告长度: {len(report)}")
-            
-            # 🎯 新增：记录分析完成
-            if progress_callback:
-                progress_callback.log_agent_complete("📰 行业资讯分析师", f"生成{len(report)}字分析报告")
-            
-        except Exception as e:
-            print(f"📰 [ERROR] ReAct Agent执行失败: {str(e)}")
-            
-            # 🎯 新增：记录分析失败
-            if progress_callback:
-                progress_callback.log_error(f"📰 行业资讯分析师失败: {str(e)}")
-            
-            report = f"行业资讯分析失败：{str(e)}"
+        # 🎯 新增：记录开始分析
+        if progress_callback:
+            progress_callback.log_event("progress", "📰 行业资讯分析师：开始数据分析...")
+        
+        return run_config, progress_callback, query, prefetched
+    
+    def _report_from_result(result, progress_callback):
+        report = result.get('output', '分析失败')
+        print(f"📰 [行业资讯分析师] ReAct Agent完成，报告长度: {len(report)}")
+        
+        # 🎯 新增：记录分析完成
+        if progress_callback:
+            progress_callback.log_agent_complete("📰 行业资讯分析师", f"生成{len(report)}字分析报告")
+        
+        return report
+    
+    def _report_from_error(e, progress_callback):
+        print(f"📰 [ERROR] ReAct Agent执行失败: {str(e)}")
         
+        # 🎯 新增：记录分析失败
+        if progress_callback:
+            progress_callback.log_error(f"📰 行业资讯分析师失败: {str(e)}")
+        
+        return f"行业资讯分析失败：{str(e)}"
+    
+    def _finish_analysis(report):
         print(f"📰 [DEBUG] ===== ReAct行业资讯分析师节点结束 =====")
         
-        # 更新状态
-        new_state = state.copy()
-        new_state["industry_news_report"] = report
+        # 更新状态：只返回本分析师负责的报告字段，便于并行分支合并
+        new_state = {"industry_news_report": report}
         print(f"📰 [DEBUG] 状态更新完成，报告长度: {len(report)}")
         
         return new_state
     
-    return industry_news_analyst_react_node 
\ No newline at end of file
+    def industry_news_analyst_react_node(state, config: RunnableConfig = None):
+        run_config, progress_callback, query, prefetched = _prepare_analysis(state, config)
+        try:
+            # 🎯 使用工厂缓存的Agent执行，单次运行参数通过run_config传入工具；有预取数据时直接生成报告
+            result = agent_factory.invoke("industry_news_analyst", query, run_config, prefetched=prefetched)
+            report = _report_from_result(result, progress_callback)
+        except Exception as e:
+            report = _report_from_error(e, progress_callback)
+        return _finish_analysis(report)
+    
+    async def aindustry_news_analyst_react_node(state, config: RunnableConfig = None):
+        run_config, progress_callback, query, prefetched = _prepare_analysis(state, config)
+        try:
+            result = await agent_factory.ainvoke("industry_news_analyst", query, run_config, prefetched=prefetched)
+            report = _report_from_result(result, progress_callback)
+        except Exception as e:
+            report = _report_from_error(e, progress_callback)
+        return _finish_analysis(report)
+    
+    # 同步节点供图的invoke使用，异步节点供ainvoke使用
+    return with_async_node(industry_news_analyst_react_node, aindustry_news_analyst_react_node)
\ No newline at end of file
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业ReAct智能体工厂
+Manufacturing ReAct Agent Factory
+
+在构建图时一次性创建并缓存各分析师的工具实例和AgentExecutor，
+每次节点执行只需传入运行配置，避免重复构建Agent。
+同时提供异步执行接口(ainvoke/arun_tool)，供图的ainvoke使用。
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from langchain.agents import create_react_agent, AgentExecutor
+from langchain_core.runnables import RunnableLambda
+
+from manufacturingagents.agents.utils.agent_utils import is_manufacturing_error_result
+from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+from manufacturingagents.manufacturingagents.analysts.react_tools import (
+    _current_run_config,
+    ManufacturingPMITool,
+    ManufacturingPPITool,
+    ManufacturingCommodityTool,
+    ManufacturingHolidayTool,
+    ManufacturingWeatherTool,
+    ManufacturingNewsTool,
+    ManufacturingConsumerSentimentTool,
+    ManufacturingConsumerBehaviorTool,
+)
+
+
+# 各分析师的工具和执行参数
+REACT_ANALYST_SPECS = {
+    "market_environment_analyst": {
+        "tools": [ManufacturingPMITool, ManufacturingPPITool, ManufacturingCommodityTool],
+        "max_iterations": 5,  # 🎯 减少迭代次数，避免重复调用
+        "max_execution_time": 180,  # 3分钟超时
+    },
+    "trend_prediction_analyst": {
+        "tools": [ManufacturingHolidayTool, ManufacturingWeatherTool],
+        "max_iterations": 5,
+        "max_execution_time": 300,
+    },
+    "industry_news_analyst": {
+        "tools": [ManufacturingNewsTool],
+        "max_iterations": 3,  # 🎯 强制限制调用次数
+        "max_execution_time": 120,
+    },
+    "consumer_insight_analyst": {
+        "tools": [ManufacturingConsumerSentimentTool, ManufacturingConsumerBehaviorTool],
+        "max_iterations": 5,
+        "max_execution_time": 300,
+    },
+}
+
+# 需要从运行配置传入工具的单次运行参数
+RUN_CONFIG_KEYS = ("product_type", "company_name", "city_name", "target_quarter", "progress_callback")
+
+
+class PrefetchToolError(RuntimeError):
+    """数据预取时工具返回了错误消息（toolkit工具捕获异常后以"❌"开头的错误消息代替数据返回）"""
+
+
+def _checked_result(tool, result: str) -> str:
+    if is_manufacturing_error_result(result):
+        raise PrefetchToolError(f"{tool.name} 返回错误: {result}")
+    return result
+
+
+class ReactAgentFactory:
+    """ReAct智能体工厂：按分析师缓存工具和AgentExecutor"""
+
+    def __init__(self, llm, toolkit):
+        self.llm = llm
+        self.toolkit = toolkit
+        self._executors: Dict[str, AgentExecutor] = {}
+        self._tools: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_prompt(self):
+        """获取ReAct提示词模板（本地模板，无需访问LangChain Hub）"""
+        return prompt_manager.get_react_prompt()
+
+    def build(self, analyst_ids: List[str]):
+        """构建图时预先创建所选分析师的Agent"""
+        for analyst_id in analyst_ids:
+            if analyst_id in REACT_ANALYST_SPECS:
+                self.get_executor(analyst_id)
+
+    def get_tools(self, analyst_id: str) -> List[Any]:
+        """获取缓存的分析师工具实例，不存在时创建"""
+        tools = self._tools.get(analyst_id)
+        if tools is None:
+            with self._lock:
+                tools = self._tools.get(analyst_id)
+                if tools is None:
+                    spec = REACT_ANALYST_SPECS[analyst_id]
+                    tools = [tool_cls(toolkit=self.toolkit) for tool_cls in spec["tools"]]
+                    self._tools[analyst_id] = tools
+        return tools
+
+    def get_executor(self, analyst_id: str) -> AgentExecutor:
+        """获取缓存的AgentExecutor，不存在时创建"""
+        executor = self._executors.get(analyst_id)
+        if executor is not None:
+            return executor
+
+        prompt = self.get_prompt()
+        tools = self.get_tools(analyst_id)
+        with self._lock:
+            executor = self._executors.get(analyst_id)
+            if executor is None:
+                spec = REACT_ANALYST_SPECS[analyst_id]
+                agent = create_react_agent(self.llm, tools, prompt)
+                executor = AgentExecutor(
+                    agent=agent,
+                    tools=tools,
+                    verbose=True,
+                    handle_parsing_errors=True,
+                    max_iterations=spec["max_iterations"],
+                    max_execution_time=spec["max_execution_time"],
+                    return_intermediate_steps=True  # 返回中间步骤便于调试
+                )
+                self._executors[analyst_id] = executor
+                print(f"🏗️ [智能体工厂] 已创建 {analyst_id} 的ReAct Agent")
+        return executor
+
+    @staticmethod
+    def build_run_config(state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """由节点状态和图运行配置生成本次Agent调用的运行配置"""
+        run_config = dict(config or {})
+        configurable = dict(run_config.get("configurable") or {})
+        for key in RUN_CONFIG_KEYS:
+            if key not in configurable and state.get(key) is not None:
+                configurable[key] = state.get(key)
+        run_config["configurable"] = configurable
+        return run_config
+
+    @contextmanager
+    def run_context(self, config: Optional[Dict[str, Any]] = None):
+        """在当前上下文中设置运行配置，使工具可以读取单次运行参数"""
+        token = _current_run_config.set(dict((config or {}).get("configurable") or {}))
+        try:
+            yield
+        finally:
+            _current_run_config.reset(token)
+
+    def run_tool(self, tool, config: Optional[Dict[str, Any]] = None) -> str:
+        """在指定运行配置下直接获取单个工具的数据（供数据预取使用）
+
+        工具抛出异常或返回错误消息时抛出异常，错误消息不会作为数据交给分析师或保存到共享数据。
+        运行配置中带有shared_data（批量分析共享数据）时，相同共享键的工具结果只获取一次。
+        """
+        def fetch():
+            return _checked_result(tool, tool._fetch(""))
+
+        with self.run_context(config):
+            shared_data = _current_run_config.get().get("shared_data")
+            key = tool.shared_data_key() if shared_data is not None else None
+            if key is None:
+                return fetch()
+            return shared_data.get_or_fetch(key, fetch)
+
+    async def arun_tool(self, tool, config: Optional[Dict[str, Any]] = None) -> str:
+        """run_tool的异步版本"""
+        async def afetch():
+            return _checked_result(tool, await tool._afetch(""))
+
+        with self.run_context(config):
+            shared_data = _current_run_config.get().get("shared_data")
+            key = tool.shared_data_key() if shared_data is not None else None
+            if key is None:
+                return await afetch()
+            return await shared_data.aget_or_fetch(key, afetch)
+
+    def get_prefetched(self, analyst_id: str, state: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """获取数据预取阶段为该分析师准备的工具结果，缺少任一工具结果时返回None"""
+        prefetched = (state.get("external_data") or {}).get(analyst_id)
+        if not prefetched:
+            return None
+        tool_names = [tool.name for tool in self.get_tools(analyst_id)]
+        if any(name not in prefetched for name in tool_names):
+            return None
+        return {name: prefetched[name] for name in tool_names}
+
+    @staticmethod
+    def format_prefetched(prefetched: Dict[str, str]) -> str:
+        """将预取的工具结果格式化为提示词中的数据段落"""
+        sections = [f"### {tool_name}\n{result}" for tool_name, result in prefetched.items()]
+        return "\n\n".join(sections)
+
+    def invoke(
+        self,
+        analyst_id: str,
+        query: str,
+        config: Optional[Dict[str, Any]] = None,
+        prefetched: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """执行分析师Agent，运行配置中的configurable参数对工具可见
+
+        已有预取数据时跳过ReAct工具调用循环，直接由LLM基于数据生成报告。
+        """
+        child_config = self._child_config(config)
+
+        if prefetched:
+            response = self.llm.invoke(self._prefetched_prompt(query, prefetched), config=child_config)
+            return self._prefetched_result(response)
+
+        executor = self.get_executor(analyst_id)
+        with self.run_context(config):
+            return executor.invoke({'input': query}, config=child_config)
+
+    async def ainvoke(
+        self,
+        analyst_id: str,
+        query: str,
+        config: Optional[Dict[str, Any]] = None,
+        prefetched: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """invoke的异步版本：LLM和工具均通过ainvoke/_arun调用"""
+        child_config = self._child_config(config)
+
+        if prefetched:
+            response = await self.llm.ainvoke(self._prefetched_prompt(query, prefetched), config=child_config)
+            return self._prefetched_result(response)
+
+        executor = self.get_executor(analyst_id)
+        # ContextVar在协程及其创建的子任务中可见
+        with self.run_context(config):
+            return await executor.ainvoke({'input': query}, config=child_config)
+
+    @staticmethod
+    def _child_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # 只透传回调、标签和元数据，使Agent运行挂在图节点的追踪链路下
+        config = config or {}
+        return {key: config[key] for key in ("callbacks", "tags", "metadata") if key in config}
+
+    def _prefetched_prompt(self, query: str, prefetched: Dict[str, str]) -> str:
+        return f"{query}\n\n📊 预取数据：\n\n{self.format_prefetched(prefetched)}"
+
+    @staticmethod
+    def _prefetched_result(response) -> Dict[str, Any]:
+        output = response.content if hasattr(response, 'content') else str(response)
+        return {'output': output, 'intermediate_steps': []}
+
+
+def with_async_node(node, anode):
+    """为同步节点函数附加异步实现，节点函数本身仍可直接调用"""
+    node.anode = anode
+    return node
+
+
+def as_graph_node(node):
+    """将带有异步实现的节点包装为Runnable，图的invoke走同步实现，ainvoke走异步实现"""
+    anode = getattr(node, "anode", None)
+    if anode is None:
+        return node
+    return RunnableLambda(node, afunc=anode, name=node.__name__)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业ReAct分析师工具
+Manufacturing ReAct Analyst Tools
+
+工具类在模块级定义，由智能体工厂在构建图时实例化一次。
+产品类型、城市、进度追踪器等单次运行参数通过运行配置(configurable)传入，
+不再依赖节点内部的闭包变量。
+工具同时提供同步(_run)和异步(_arun)实现，异步版本调用toolkit工具的ainvoke。
+"""
+
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+
+
+# 当前运行的配置参数（由ReactAgentFactory在执行Agent前设置）
+# AgentExecutor不会把configurable转发给工具，这里用ContextVar在同一次调用内传递，
+# 并行分析师运行在各自的线程上下文中，互不干扰
+_current_run_config: ContextVar[Dict[str, Any]] = ContextVar(
+    "manufacturing_react_run_config", default={}
+)
+
+
+def get_run_value(key: str, default: Any = None) -> Any:
+    """获取当前运行配置中的参数值"""
+    return _current_run_config.get().get(key, default)
+
+
+class ManufacturingReactTool(BaseTool):
+    """制造业ReAct工具基类：提供运行参数读取和API调用进度记录"""
+
+    toolkit: Any = None
+    api_label: str = ""
+    # 工具结果依赖的运行参数；None表示结果随每次分析变化，不在批量分析间共享
+    shared_data_keys: Optional[Tuple[str, ...]] = None
+
+    def _run_value(self, key: str, default: Any = None) -> Any:
+        return get_run_value(key, default)
+
+    def progress_label(self) -> str:
+        """进度追踪中显示的API名称"""
+        return self.api_label
+
+    def _log_api_call(self, status: str):
+        progress_callback = self._run_value("progress_callback")
+        label = self.progress_label()
+        if progress_callback and label:
+            progress_callback.log_api_call(label, status)
+
+    def shared_data_key(self) -> Optional[Tuple]:
+        """批量分析中共享工具结果的键，相同键的分析复用同一份数据"""
+        if self.shared_data_keys is None:
+            return None
+        return (self.name,) + tuple(self._run_value(key) for key in self.shared_data_keys)
+
+    def _toolkit_request(self, query: str):
+        """返回(toolkit工具, 调用参数)，由toolkit提供数据的工具实现此方法"""
+        raise NotImplementedError
+
+    def _fetch(self, query: str) -> str:
+        toolkit_tool, params = self._toolkit_request(query)
+        return toolkit_tool.invoke(params)
+
+    async def _afetch(self, query: str) -> str:
+        toolkit_tool, params = self._toolkit_request(query)
+        return await toolkit_tool.ainvoke(params)
+
+    def _error_message(self, error: Exception) -> str:
+        return f"获取{self.api_label}失败: {str(error)}"
+
+    def _run(self, query: str = "") -> str:
+        try:
+            self._log_api_call("调用中")
+            result = self._fetch(query)
+            self._log_api_call("成功")
+            return result
+        except Exception as e:
+            self._log_api_call("失败")
+            return self._error_message(e)
+
+    async def _arun(self, query: str = "") -> str:
+        try:
+            self._log_api_call("调用中")
+            result = await self._afetch(query)
+            self._log_api_call("成功")
+            return result
+        except Exception as e:
+            self._log_api_call("失败")
+            return self._error_message(e)
+
+
+# === 市场环境分析师工具 ===
+
+class ManufacturingPMITool(ManufacturingReactTool):
+    name: str = "get_manufacturing_pmi_data"
+    description: str = "获取制造业PMI指数数据，分析目标产品行业的宏观经济环境。直接调用，无需参数。"
+    api_label: str = "PMI指数数据"
+    shared_data_keys: Optional[Tuple[str, ...]] = ()
+
+    def _toolkit_request(self, query: str):
+        print(f"🌍 [DEBUG] ManufacturingPMITool调用，产品类型: {self._run_value('product_type')}")
+        return self.toolkit.get_manufacturing_pmi_data, {"time_range": "最近6个月"}
+
+    def _error_message(self, error: Exception) -> str:
+        return f"获取PMI数据失败: {str(error)}"
+
+
+class ManufacturingPPITool(ManufacturingReactTool):
+    name: str = "get_manufacturing_ppi_data"
+    description: str = "获取制造业PPI价格指数数据，分析目标产品行业的成本压力和价格趋势。直接调用，无需参数。"
+    api_label: str = "PPI价格指数"
+    shared_data_keys: Optional[Tuple[str, ...]] = ()
+
+    def _toolkit_request(self, query: str):
+        print(f"🌍 [DEBUG] ManufacturingPPITool调用，产品类型: {self._run_value('product_type')}")
+        return self.toolkit.get_manufacturing_ppi_data, {"time_range": "最近6个月"}
+
+    def _error_message(self, error: Exception) -> str:
+        return f"获取PPI数据失败: {str(error)}"
+
+
+class ManufacturingCommodityTool(ManufacturingReactTool):
+    name: str = "get_manufacturing_commodity_data"
+    description: str = "获取制造业大宗商品价格数据，分析影响目标产品生产成本的原材料价格变化。直接调用，无需参数。"
+    api_label: str = "大宗商品价格"
+    shared_data_keys: Optional[Tuple[str, ...]] = ()
+
+    def _toolkit_request(self, query: str):
+        print(f"🌍 [DEBUG] ManufacturingCommodityTool调用，产品类型: {self._run_value('product_type')}")
+        return self.toolkit.get_manufacturing_commodity_data, {"commodity_type": "铜期货"}
+
+    def _error_message(self, error: Exception) -> str:
+        return f"获取大宗商品数据失败: {str(error)}"
+
+
+# === 趋势预测分析师工具 ===
+
+class ManufacturingHolidayTool(ManufacturingReactTool):
+    name: str = "get_manufacturing_holiday_data"
+    description: str = "获取节假日数据，分析节假日对目标产品需求的季节性影响。自动计算基于当前日期的未来3个月"
+    api_label: str = "节假日数据"
+    shared_data_keys: Optional[Tuple[str, ...]] = ()  # 日期范围按当前日期计算，与分析参数无关
+
+    def _toolkit_request(self, query: str):
+        print(f"📈 [DEBUG] ManufacturingHolidayTool调用，产品类型: {self._run_value('product_type')}")
+
+        # 🎯 基于当前日期动态计算未来3个月
+        current_date_obj = datetime.now()
+        end_date_obj = current_date_obj + timedelta(days=90)
+        dynamic_date_range = f"{current_date_obj.strftime('%Y-%m-%d')} to {end_date_obj.strftime('%Y-%m-%d')}"
+        print(f"📈 [DEBUG] 动态计算日期范围: {dynamic_date_range}")
+
+        return self.toolkit.get_manufacturing_holiday_data, {"date_range": dynamic_date_range}
+
+
+class ManufacturingWeatherTool(ManufacturingReactTool):
+    name: str = "get_manufacturing_weather_data"
+    description: str = "获取天气预报数据，分析天气变化对目标产品需求趋势的影响。直接调用即可，会自动使用用户输入的目标城市"
+    api_label: str = "天气数据"
+    shared_data_keys: Optional[Tuple[str, ...]] = ("city_name",)
+
+    def progress_label(self) -> str:
+        return f"{self._run_value('city_name', '')}天气数据"
+
+    def _toolkit_request(self, query: str):
+        target_city = self._run_value("city_name")
+        print(f"📈 [DEBUG] ManufacturingWeatherTool调用，产品类型: {self._run_value('product_type')}, 目标城市: {target_city}")
+        return self.toolkit.get_manufacturing_weather_data, {"city_name": target_city}
+
+
+# === 行业资讯分析师工具 ===
+
+class ManufacturingNewsTool(ManufacturingReactTool):
+    name: str = "get_manufacturing_news_data"
+    description: str = "🎯【一次性完整获取】制造业相关新闻数据，包含促销活动、区域新闻、新楼盘、政策动态等全部4类新闻。调用一次即可获得分析所需的所有新闻信息，无需重复调用。直接调用，无需参数。"
+    api_label: str = "行业新闻数据"
+    shared_data_keys: Optional[Tuple[str, ...]] = ("city_name", "company_name", "product_type")
+
+    def _toolkit_request(self, query: str):
+        city_name = self._run_value("city_name")
+        product_type = self._run_value("product_type")
+        company_name = self._run_value("company_name")
+        print(f"📰 [DEBUG] ManufacturingNewsTool调用，城市: {city_name}, 产品: {product_type}")
+
+        structured_query = build_news_query_params(city_name, company_name, product_type)
+        print(f"📰 [DEBUG] 使用结构化查询: {structured_query}")
+
+        return self.toolkit.get_manufacturing_news_data, {"query_params": structured_query}
+
+    def _error_message(self, error: Exception) -> str:
+        return f"获取新闻数据失败: {str(error)}"
+
+
+def build_news_query_params(city_name: str, company_name: str, product_type: str) -> Dict[str, str]:
+    """生成行业资讯分析使用的结构化新闻查询参数"""
+    return {
+        "activity_query": f"{city_name}近期有哪些厂商做{product_type}的促销活动",
+        "area_news_query": f"{company_name}{product_type}",
+        "new_building_query": f"{city_name}近期有哪些新楼盘交付",
+        "policy_query": f"2025年{city_name}市{product_type}购买优惠政策"
+    }
+
+
+# === 消费者洞察分析师工具 ===
+
+class ManufacturingMockDataTool(ManufacturingReactTool):
+    """本地生成模拟数据的工具基类：无外部调用，异步版本直接复用同步实现"""
+
+    async def _afetch(self, query: str) -> str:
+        return self._fetch(query)
+
+
+class ManufacturingConsumerSentimentTool(ManufacturingMockDataTool):
+    name: str = "get_manufacturing_consumer_sentiment"
+    description: str = "获取消费者舆情数据，分析目标产品品牌的消费者情绪和品牌偏好。参数：品牌关键词"
+    api_label: str = "消费者舆情数据"
+
+    def _fetch(self, query: str) -> str:
+        product_type = self._run_value("product_type")
+        company_name = self._run_value("company_name")
+        print(f"💭 [DEBUG] ManufacturingConsumerSentimentTool调用，产品类型: {product_type}")
+        # 暂时使用模拟数据，后续可接入真实舆情API
+        brand_keyword = query or f"{company_name} {product_type}"
+
+        # 模拟舆情数据
+        sentiment_data = f"""
+## 消费者舆情分析数据 ({brand_keyword})
+
+### 社交媒体情绪分析 (最近30天)
+- 正面情绪: 68%
+- 中性情绪: 22% 
+- 负面情绪: 10%
+
+### 品牌提及热词
+- 节能: 出现562次
+- 静音: 出现438次
+- 智能: 出现721次
+- 价格: 出现892次
+- 售后: 出现234次
+
+### 竞品对比舆情
+- {company_name}品牌情绪指数: 7.2/10
+- 行业平均情绪指数: 6.8/10
+- 主要优势: 技术创新、性价比
+- 主要问题: 部分用户反馈安装服务
+
+### 购买决策因素分析
+1. 价格敏感度: 中等 (65%)
+2. 品牌忠诚度: 较高 (72%)
+3. 功能需求: 节能环保 (78%)
+4. 购买时机: 夏季促销期 (83%)
+
+### 消费者画像洞察
+- 主力消费群体: 25-45岁家庭用户
+- 购买渠道偏好: 线上63%, 线下37%
+- 决策周期: 平均2.3周
+- 复购意愿: 76%
+"""
+        return sentiment_data
+
+    def _error_message(self, error: Exception) -> str:
+        return f"获取消费者舆情数据失败: {str(error)}"
+
+
+class ManufacturingConsumerBehaviorTool(ManufacturingMockDataTool):
+    name: str = "get_manufacturing_consumer_behavior"
+    description: str = "获取消费者行为数据，分析目标产品的购买模式和市场偏好趋势。参数：行为分析维度"
+
+    def _fetch(self, query: str) -> str:
+        product_type = self._run_value("product_type")
+        company_name = self._run_value("company_name")
+        print(f"💭 [DEBUG] ManufacturingConsumerBehaviorTool调用，产品类型: {product_type}")
+
+        # 模拟消费者行为数据
+        behavior_data = f"""
+## 消费者行为分析数据 ({company_name} {product_type})
+
+### 购买行为模式分析
+- 首次购买动机: 新装修(45%), 替换旧产品(38%), 功能升级(17%)
+- 平均决策时间: 2.3周
+- 信息搜集渠道: 官网(32%), 电商平台(41%), 社交媒体(27%)
+- 价格对比频次: 平均对比3.7个品牌
+
+### 购买时机分析
+- 旺季购买: 5-8月 (占全年62%)
+- 促销敏感度: 高 (74%用户等待促销)
+- 节假日购买: 五一、国庆期间增长35%
+- 换季购买: 春季(18%), 夏季(52%), 秋季(21%), 冬季(9%)
+
+### 产品偏好特征
+- 功率需求: 1.5匹(38%), 1匹(28%), 2匹(24%), 其他(10%)
+- 功能偏好: 变频(67%), 智能控制(54%), 除湿(41%), 自清洁(33%)
+- 价格区间: 2000-3000元(42%), 3000-5000元(35%), 5000+元(23%)
+
+### 购买决策影响因素
+1. 品牌信任度: 权重25%
+2. 价格合理性: 权重23%  
+3. 节能效果: 权重18%
+4. 售后服务: 权重16%
+5. 外观设计: 权重12%
+6. 朋友推荐: 权重6%
+
+### 忠诚度与复购
+- 品牌忠诚度: 72% (行业平均68%)
+- 推荐意愿: 78%
+- 复购周期: 6-8年
+- 服务满意度: 84%
+"""
+        return behavior_data
+
+    def _error_message(self, error: Exception) -> str:
+        return f"获取消费者行为数据失败: {str(error)}"
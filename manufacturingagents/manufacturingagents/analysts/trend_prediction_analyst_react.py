@@ -7,19 +7,28 @@ Trend Prediction Analyst for Manufacturing - ReAct Agent Version
 专为阿里百炼LLM优化的ReAct Agent实现
 """
 
-from langchain_core.tools import BaseTool
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain import hub
+from langchain_core.runnables import RunnableConfig
 import time
 import json
 # 🎯 新增：导入提示词管理器
 from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+from manufacturingagents.manufacturingagents.analysts.react_agent_factory import ReactAgentFactory, with_async_node
 
 
-def create_trend_prediction_analyst_react(llm, toolkit):
+def create_trend_prediction_analyst_react(llm, toolkit, agent_factory=None):
     """创建ReAct模式的制造业趋势预测分析师（适用于阿里百炼）"""
     
-    def trend_prediction_analyst_react_node(state):
+    # 🎯 工具和AgentExecutor由工厂统一创建并缓存，节点执行时不再重复构建
+    if agent_factory is None:
+        agent_factory = ReactAgentFactory(llm, toolkit)
+    try:
+        agent_factory.build(["trend_prediction_analyst"])
+    except Exception as e:
+        # 构建失败时推迟到节点执行时再创建，错误由节点统一处理
+        print(f"⚠️ [智能体工厂] 预创建trend_prediction_analyst Agent失败: {e}")
+    
+    def _prepare_analysis(state, config):
+        """读取状态并构建分析任务，返回(运行配置, 进度追踪器, 查询, 预取数据)"""
         print(f"📈 [DEBUG] ===== ReAct趋势预测分析师节点开始 =====")
         
         current_date = state["analysis_date"]
@@ -30,7 +39,8 @@ def create_trend_prediction_analyst_react(llm, toolkit):
         city_name = state["city_name"]  # 如果缺失则报错，避免硬编码
         
         # 🎯 新增：获取进度追踪器并记录分析师启动
-        progress_callback = state.get('progress_callback')
+        run_config = agent_factory.build_run_config(state, config)
+        progress_callback = run_config["configurable"].get("progress_callback")
         if progress_callback:
             progress_callback.log_agent_start("📈 趋势预测分析师")
             progress_callback.update_progress(2)
@@ -38,82 +48,22 @@ def create_trend_prediction_analyst_react(llm, toolkit):
         
         print(f"📈 [DEBUG] 输入参数: product_type={product_type}, company={company_name}, target_quarter={target_quarter}, city_name={city_name}")
         
-        # 创建趋势预测专用工具：节假日和天气数据
-        class ManufacturingHolidayTool(BaseTool):
-            name: str = "get_manufacturing_holiday_data"
-            description: str = f"获取节假日数据，分析节假日对{product_type}产品需求的季节性影响。自动计算基于当前日期的未来3个月"
-            
-            def _run(self, unused_param: str = "") -> str:
-                try:
-                    # 🎯 新增：记录API调用
-                    if progress_callback:
-                        progress_callback.log_api_call("节假日数据", "调用中")
-                    
-                    print(f"📈 [DEBUG] ManufacturingHolidayTool调用，产品类型: {product_type}")
-                    
-                    # 🎯 修复：基于当前日期动态计算未来3个月
-                    from datetime import datetime, timedelta
-                    current_date_obj = datetime.now()
-                    end_date_obj = current_date_obj + timedelta(days=90)  # 未来3个月
-                    
-                    # 生成符合接口要求的日期格式
-                    dynamic_date_range = f"{current_date_obj.strftime('%Y-%m-%d')} to {end_date_obj.strftime('%Y-%m-%d')}"
-                    print(f"📈 [DEBUG] 动态计算日期范围: {dynamic_date_range}")
-                    
-                    result = toolkit.get_manufacturing_holiday_data.invoke({"date_range": dynamic_date_range})
-                    
-                    # 🎯 新增：记录API调用成功
-                    if progress_callback:
-                        progress_callback.log_api_call("节假日数据", "成功")
-                    
-                    return result
-                except Exception as e:
-                    # 🎯 新增：记录API调用失败
-                    if progress_callback:
-                        progress_callback.log_api_call("节假日数据", "失败")
-                    return f"获取节假日数据失败: {str(e)}"
-
-        class ManufacturingWeatherTool(BaseTool):
-            name: str = "get_manufacturing_weather_data"
-            description: str = f"获取天气预报数据，分析天气变化对{product_type}产品需求趋势的影响。直接调用即可，会自动使用用户输入的城市{city_name}"
-            
-            def _run(self, unused_param: str = "") -> str:
-                try:
-                    # 🎯 新增：记录API调用
-                    if progress_callback:
-                        progress_callback.log_api_call(f"{city_name}天气数据", "调用中")
-                    
-                    # 🎯 修复：回归统一架构，通过toolkit调用
-                    target_city = city_name  # 使用状态中的城市
-                    print(f"📈 [DEBUG] ManufacturingWeatherTool调用，产品类型: {product_type}, 目标城市: {target_city}")
-                    
-                    # 通过统一的toolkit调用，保持架构一致性
-                    result = toolkit.get_manufacturing_weather_data.invoke({"city_name": target_city})
-                    
-                    # 🎯 新增：记录API调用成功
-                    if progress_callback:
-                        progress_callback.log_api_call(f"{city_name}天气数据", "成功")
-                    
-                    return result
-                        
-                except Exception as e:
-                    # 🎯 新增：记录API调用失败
-                    if progress_callback:
-                        progress_callback.log_api_call(f"{city_name}天气数据", "失败")
-                    return f"获取天气数据失败: {str(e)}"
-
-        # 配置趋势预测专用工具
-        tools = [
-            ManufacturingHolidayTool(),
-            ManufacturingWeatherTool()
-        ]
-        
         # 🎯 关键修复：使用txt文件中的专业提示词
         base_system_prompt = prompt_manager.get_prompt("trend_prediction_analyst")
         if not base_system_prompt:
             # 降级处理：如果提示词文件不可用，使用简化版本
             base_system_prompt = "你是一位专业的制造业趋势预测分析师，专门负责基于未来事件预测（天气预报、节假日等），为补货决策提供前瞻性趋势分析支持。"
         
+        # 🎯 数据预取阶段已获取全部所需数据时，直接基于数据生成报告，无需调用工具
+        prefetched = agent_factory.get_prefetched("trend_prediction_analyst", state)
+        if prefetched:
+            tool_instructions = """🔧 数据说明：
+- 所需数据已由数据预取阶段获取，见下方“预取数据”，请直接基于数据分析，无需调用工具"""
+        else:
+            tool_instructions = f"""🔧 工具使用说明：
+- 必须调用get_manufacturing_holiday_data获取节假日数据（自动计算未来3个月）
+- 必须调用get_manufacturing_weather_data获取{city_name}的天气数据"""
+        
         # 🎯 修复：使用专业提示词 + 具体任务参数
         query = f"""{base_system_prompt}
 
@@ -124,9 +74,7 @@ def create_trend_prediction_analyst_react(llm, toolkit):
 - 目标季度: {target_quarter}
 - 目标城市: {city_name}
 
-🔧 工具使用说明：
-- 必须调用get_manufacturing_holiday_data获取节假日数据（自动计算未来3个月）
-- 必须调用get_manufacturing_weather_data获取{city_name}的天气数据
+{tool_instructions}
 
 📋 执行要求：
 - 必须严格按照提示词中的报告格式输出
@@ -140,49 +88,58 @@ def create_trend_prediction_analyst_react(llm, toolkit):
 
         print(f"📈 [DEBUG] 执行ReAct Agent查询...")
         
-        try:
-            # 🎯 新增：记录开始分析
-            if progress_callback:
-                progress_callback.log_event("progress", "📈 趋势预测分析师：开始数据分析...")
-            
-            # 创建ReAct Agent
-            prompt = hub.pull("hwchase17/react")
-            agent = create_react_agent(llm, tools, prompt)
-            agent_executor = AgentExecutor(
-                agent=agent,
-                tools=tools,
-                verbose=True,
-                handle_parsing_errors=True,
-                max_iterations=5,  # 🎯 修复：减少迭代次数，避免重复调用
-                max_execution_time=300,
-                return_intermediate_steps=True
-            )
-            
-            result = agent_executor.invoke({'input': query})
-            
-            report = result.get('output', '分析失败')
-            print(f"📈 [趋势预测分析师] ReAct Agent完成，报告长度: {len(report)}")
-            
-            # 🎯 新增：记录分析完成
-            if progress_callback:
-                progress_callback.log_agent_complete("📈 趋势预测分析师", f"生成{len(report)}字分析报告")
-            
-        except Exception as e:
-            print(f"📈 [ERROR] ReAct Agent执行失败: {str(e)}")
-            
-            # 🎯 新增：记录分析失败
-            if progress_callback:
-                progress_callback.log_error(f"📈 趋势预测分析师失败: {str(e)}")
-            
-            report = f"趋势预测分析失败：{str(e)}"
+        # 🎯 新增：记录开始分析
+        if progress_callback:
+            progress_callback.log_event("progress", "📈 趋势预测分析师：开始数据分析...")
         
+        return run_config, progress_callback, query, prefetched
+    
+    def _report_from_result(result, progress_callback):
+        report = result.get('output', '分析失败')
+        print(f"📈 [趋势预测分析师] ReAct Agent完成，报告长度: {len(report)}")
+        
+        # 🎯 新增：记录分析完成
+        if progress_callback:
+            progress_callback.log_agent_complete("📈 趋势预测分析师", f"生成{len(report)}字分析报告")
+        
+        return report
+    
+    def _report_from_error(e, progress_callback):
+        print(f"📈 [ERROR] ReAct Agent执行失败: {str(e)}")
+        
+        # 🎯 新增：记录分析失败
+        if progress_callback:
+            progress_callback.log_error(f"📈 趋势预测分析师失败: {str(e)}")
+        
+        return f"趋势预测分析失败：{str(e)}"
+    
+    def _finish_analysis(report):
         print(f"📈 [DEBUG] ===== ReAct趋势预测分析师节点结束 =====")
         
-        # 更新状态
-        new_state = state.copy()
-        new_state["trend_prediction_report"] = report
+        # 更新状态：只返回本分析师负责的报告字段，便于并行分支合并
+        new_state = {"trend_prediction_report": report}
         print(f"📈 [DEBUG] 状态更新完成，报告长度: {len(report)}")
         
         return new_state
     
-    return trend_prediction_analyst_react_node 
\ No newline at end of file
+    def trend_prediction_analyst_react_node(state, config: RunnableConfig = None):
+        run_config, progress_callback, query, prefetched = _prepare_analysis(state, config)
+        try:
+            # 🎯 使用工厂缓存的Agent执行，单次运行参数通过run_config传入工具；有预取数据时直接生成报告
+            result = agent_factory.invoke("trend_prediction_analyst", query, run_config, prefetched=prefetched)
+            report = _report_from_result(result, progress_callback)
+        except Exception as e:
+            report = _report_from_error(e, progress_callback)
+        return _finish_analysis(report)
+    
+    async def atrend_prediction_analyst_react_node(state, config: RunnableConfig = None):
+        run_config, progress_callback, query, prefetched = _prepare_analysis(state, config)
+        try:
+            result = await agent_factory.ainvoke("trend_prediction_analyst", query, run_config, prefetched=prefetched)
+            report = _report_from_result(result, progress_callback)
+        except Exception as e:
+            report = _report_from_error(e, progress_callback)
+        return _finish_analysis(report)
+    
+    # 同步节点供图的invoke使用，异步节点供ainvoke使用
+    return with_async_node(trend_prediction_analyst_react_node, atrend_prediction_analyst_react_node)
\ No newline at end of file
@@ -5,17 +5,19 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import AIMessage
 import time
 import json
+from langchain_core.runnables import RunnableConfig
 from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+from manufacturingagents.manufacturingagents.utils.manufacturing_states import get_progress_callback
 
 
 def create_decision_coordinator(llm, memory):
     """创建决策协调员"""
     
-    def decision_coordinator_node(state):
+    def decision_coordinator_node(state, config: RunnableConfig = None):
         print(f"⚖️ [DEBUG] ===== 决策协调员节点开始 =====")
         
         # 🎯 新增：获取进度追踪器并记录决策阶段
-        progress_callback = state.get('progress_callback')
+        progress_callback = get_progress_callback(state, config)
         if progress_callback:
             progress_callback.update_progress(6)
             progress_callback.log_decision_phase("决策协调员综合分析")
@@ -7,12 +7,16 @@ Manufacturing Agents ReAct Graph Workflow System
 使用ReAct Agent模式，适配阿里百炼LLM
 """
 
+import asyncio
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, Iterator, AsyncIterator
 from datetime import datetime
 
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph, START
 
 # 导入ReAct版本的制造业智能体
@@ -20,6 +24,7 @@ from manufacturingagents.manufacturingagents.analysts.market_environment_analyst
 from manufacturingagents.manufacturingagents.analysts.trend_prediction_analyst_react import create_trend_prediction_analyst_react  
 from manufacturingagents.manufacturingagents.analysts.industry_news_analyst_react import create_industry_news_analyst_react
 from manufacturingagents.manufacturingagents.analysts.consumer_insight_analyst_react import create_consumer_insight_analyst_react
+from manufacturingagents.manufacturingagents.analysts.react_agent_factory import ReactAgentFactory, as_graph_node
 
 # 导入决策层智能体
 from manufacturingagents.manufacturingagents.advisors.optimistic_advisor import create_optimistic_advisor
@@ -30,14 +35,39 @@ from manufacturingagents.manufacturingagents.risk_mgmt.risk_assessment import cr
 # 导入结论提取智能体
 from manufacturingagents.manufacturingagents.utils.conclusion_extractor import create_conclusion_extractor
 
+# 导入数据预取节点
+from manufacturingagents.manufacturingagents.utils.data_prefetch import create_data_prefetch, SharedPrefetchStore
+
+# 导入检查点存储
+from manufacturingagents.manufacturingagents.utils.checkpointing import create_checkpointer
+
+# 导入LLM响应缓存和Token统计回调
+from manufacturingagents.llm_adapters.response_cache import create_llm_cache
+from manufacturingagents.llm_adapters.usage_callback import TokenUsageCallbackHandler
+
 # 导入状态和工具
-from manufacturingagents.manufacturingagents.utils.manufacturing_states import ManufacturingState
+from manufacturingagents.manufacturingagents.utils.manufacturing_states import ManufacturingState, get_progress_callback
 from manufacturingagents.agents.utils.agent_utils import Toolkit
 
 # 导入LLM适配器
 from manufacturingagents.llm_adapters.dashscope_adapter import ChatDashScope
 
 
+# 分析师节点 -> (报告字段, 显示名称)
+ANALYST_NODE_REPORTS = {
+    "Market_Environment_Analyst": ("market_environment_report", "市场环境分析师"),
+    "Trend_Prediction_Analyst": ("trend_prediction_report", "趋势预测分析师"),
+    "Industry_News_Analyst": ("industry_news_report", "行业资讯分析师"),
+    "Consumer_Insight_Analyst": ("consumer_insight_report", "消费者洞察分析师"),
+}
+
+# 辩论节点 -> 显示名称
+DEBATE_NODE_NAMES = {
+    "Optimistic_Advisor": "乐观决策顾问",
+    "Cautious_Advisor": "谨慎决策顾问",
+}
+
+
 class ManufacturingAgentsReactGraph:
     """制造业智能体ReAct图工作流系统"""
     
@@ -51,6 +81,10 @@ class ManufacturingAgentsReactGraph:
         self.debug = debug
         self.config = config or {}
         self.selected_analysts = selected_analysts
+        # 并行模式：START同时分发到所有分析师，汇合节点等待全部完成后进入决策层
+        self.parallel_analysts = self.config.get("parallel_analysts", False)
+        # 数据预取：分析师执行前并发获取所有必需的外部数据，分析师直接基于数据生成报告
+        self.data_prefetch = self.config.get("data_prefetch", True)
         
         # 初始化LLM
         self._initialize_llm()
@@ -58,6 +92,12 @@ class ManufacturingAgentsReactGraph:
         # 初始化工具包
         self.toolkit = Toolkit(config=self.config)
         
+        # 初始化ReAct智能体工厂：同一图实例的所有请求复用已构建的Agent
+        self.agent_factory = ReactAgentFactory(self.llm, self.toolkit)
+        
+        # 检查点：每个节点完成后保存状态，失败或中断的分析可按thread_id恢复
+        self.checkpointer = create_checkpointer(self.config)
+        
         # 创建制造业工作流图
         self.graph = self._setup_react_graph()
     
@@ -101,9 +141,9 @@ class ManufacturingAgentsReactGraph:
         llm_model = self.config.get("llm_model", "qwen-turbo")
         
         if llm_provider.lower() in ["dashscope", "alibaba", "阿里百炼"]:
-            # 使用通义千问ReAct专用配置
-            from langchain_community.llms import Tongyi
-            self.llm = Tongyi()
+            # 使用通义千问ReAct专用配置（可选的LLM响应缓存，llm_cache_backend未配置时不启用）
+            from manufacturingagents.llm_adapters.tongyi_adapter import TongyiLLM
+            self.llm = TongyiLLM(cache=create_llm_cache(self.config))
             self.llm.model_name = llm_model
             print(f"🧠 制造业ReAct LLM初始化: {llm_provider} - {llm_model}")
         else:
@@ -131,21 +171,31 @@ class ManufacturingAgentsReactGraph:
         
         return DummyProgressCallback()
     
+    def _analyst_join_node(self, state, config: RunnableConfig = None):
+        """分析师汇合节点：等待所有并行分析师完成后再进入决策层"""
+        completed = [name for field, name in ANALYST_NODE_REPORTS.values() if state.get(field)]
+        message = f"分析师汇合：已完成 {len(completed)} 份分析报告（{'、'.join(completed) or '无'}），进入决策层"
+        print(f"🔗 [分析师汇合] 已完成 {len(completed)} 份分析报告，进入决策层")
+        progress_callback = get_progress_callback(state, config)
+        if progress_callback:
+            progress_callback.log_event("progress", message)
+        return {}
+    
     def _setup_react_graph(self):
         """设置制造业ReAct智能体工作流图"""
         
         # 创建所有四个ReAct分析师节点
         market_environment_analyst_node = create_market_environment_analyst_react(
-            self.llm, self.toolkit
+            self.llm, self.toolkit, self.agent_factory
         )
         trend_prediction_analyst_node = create_trend_prediction_analyst_react(
-            self.llm, self.toolkit
+            self.llm, self.toolkit, self.agent_factory
         )
         industry_news_analyst_node = create_industry_news_analyst_react(
-            self.llm, self.toolkit
+            self.llm, self.toolkit, self.agent_factory
         )
         consumer_insight_analyst_node = create_consumer_insight_analyst_react(
-            self.llm, self.toolkit
+            self.llm, self.toolkit, self.agent_factory
         )
         
         # 创建决策层节点（需要memory参数，这里暂时传None）
@@ -170,19 +220,30 @@ class ManufacturingAgentsReactGraph:
         
         # 根据选择的分析师添加节点
         active_nodes = []
+        active_analyst_ids = []
         for analyst_id in self.selected_analysts:
             if analyst_id in analyst_mapping:
                 node_name, node_func = analyst_mapping[analyst_id]
-                workflow.add_node(node_name, node_func)
+                workflow.add_node(node_name, as_graph_node(node_func))
                 active_nodes.append(node_name)
+                active_analyst_ids.append(analyst_id)
                 print(f"✅ 添加分析师节点: {node_name}")
         
         if not active_nodes:
             # 如果没有选择分析师，默认使用市场环境分析师
-            workflow.add_node("Market_Environment_Analyst", market_environment_analyst_node)
+            workflow.add_node("Market_Environment_Analyst", as_graph_node(market_environment_analyst_node))
             active_nodes = ["Market_Environment_Analyst"]
+            active_analyst_ids = ["market_environment_analyst"]
             print("⚠️ 未选择分析师，使用默认: Market_Environment_Analyst")
         
+        # 添加数据预取节点：作为分析层的入口
+        analyst_entry = START
+        if self.data_prefetch:
+            workflow.add_node("Data_Prefetch", as_graph_node(create_data_prefetch(self.agent_factory, active_analyst_ids)))
+            workflow.add_edge(START, "Data_Prefetch")
+            analyst_entry = "Data_Prefetch"
+            print("✅ 添加数据预取节点: Data_Prefetch")
+        
         # 添加决策层节点
         workflow.add_node("Optimistic_Advisor", optimistic_advisor_node)
         workflow.add_node("Cautious_Advisor", cautious_advisor_node)
@@ -194,11 +255,19 @@ class ManufacturingAgentsReactGraph:
         # 连接工作流 - 分析师层 → 决策层 → 结束
         if len(active_nodes) == 1:
             # 单个分析师：连接到决策层
-            workflow.add_edge(START, active_nodes[0])
+            workflow.add_edge(analyst_entry, active_nodes[0])
             workflow.add_edge(active_nodes[0], "Optimistic_Advisor")
+        elif self.parallel_analysts:
+            # 多个分析师：入口同时分发到所有分析师，汇合后连接到决策层
+            workflow.add_node("Analyst_Join", self._analyst_join_node)
+            for node_name in active_nodes:
+                workflow.add_edge(analyst_entry, node_name)
+            workflow.add_edge(active_nodes, "Analyst_Join")
+            workflow.add_edge("Analyst_Join", "Optimistic_Advisor")
+            print(f"⚡ 并行模式: {len(active_nodes)} 个分析师同时执行")
         else:
             # 多个分析师：串行执行后连接到决策层
-            workflow.add_edge(START, active_nodes[0])
+            workflow.add_edge(analyst_entry, active_nodes[0])
             
             # 串行连接分析师
             for i in range(len(active_nodes) - 1):
@@ -233,7 +302,7 @@ class ManufacturingAgentsReactGraph:
         workflow.add_edge("Conclusion_Extractor", END)
         
         # 编译图
-        compiled_graph = workflow.compile()
+        compiled_graph = workflow.compile(checkpointer=self.checkpointer)
         total_nodes = len(active_nodes) + 5  # 分析师 + 5个决策层节点（乐观、谨慎、协调、风险、结论提取）
         print(f"🏭 制造业ReAct智能体工作流图构建完成")
         print(f"   📊 分析层: {len(active_nodes)} 个分析师")
@@ -242,21 +311,17 @@ class ManufacturingAgentsReactGraph:
         
         return compiled_graph
     
-    def analyze_manufacturing_replenishment(
+    def _build_initial_state(
         self,
         city_name: str,
         brand_name: str,
         product_category: str,
         target_quarter: str,
         special_focus: str = "",
-        progress_callback=None,  # 🎯 新增：进度追踪器参数
+        progress_callback=None,
     ) -> Dict[str, Any]:
-        """执行制造业补货策略分析"""
-        
-        print(f"🏭 开始制造业ReAct补货分析: {brand_name} {product_category} ({target_quarter})")
-        
-        # 初始化状态
-        initial_state = {
+        """构建补货分析的初始状态"""
+        return {
             "city_name": city_name,  # 🎯 修复：添加用户输入的城市到状态
             "product_type": product_category,
             "company_name": brand_name,
@@ -290,25 +355,401 @@ class ManufacturingAgentsReactGraph:
             "risk_level": "中等",
             "progress_callback": progress_callback or self._create_dummy_callback()  # 🎯 新增：传递进度追踪器到状态
         }
+    
+    def _graph_config(self, progress_callback=None, thread_id: str = None, session_id: str = None,
+                      **configurable) -> Dict[str, Any]:
+        """构建图运行配置
+        
+        进度追踪器通过运行配置传入，启用检查点时它不会写入持久化状态，恢复运行时也能重新传入。
+        Token统计回调随运行配置传给所有节点中的LLM调用，按节点汇总实际用量和耗时
+        (config["token_tracking"]=False 可关闭)。
+        """
+        configurable = dict(configurable)
+        if progress_callback is not None:
+            configurable["progress_callback"] = progress_callback
+        if self.checkpointer is not None:
+            configurable["thread_id"] = thread_id or uuid.uuid4().hex
+        config = {"configurable": configurable}
+        
+        if self.config.get("token_tracking", True):
+            session_id = session_id or f"manufacturing_{uuid.uuid4().hex[:8]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            config["callbacks"] = [TokenUsageCallbackHandler(
+                session_id, provider=self.config.get("llm_provider", "dashscope")
+            )]
+            config["metadata"] = {"session_id": session_id}
+        return config
+    
+    @staticmethod
+    def _flush_token_usage(config: Dict[str, Any]):
+        """运行结束（含失败）后将各节点的Token用量写入TokenTracker"""
+        for callback in config.get("callbacks") or []:
+            if isinstance(callback, TokenUsageCallbackHandler):
+                callback.flush()
+    
+    def _graph_input(self, initial_state: Dict[str, Any], snapshot) -> Any:
+        """检查点中存在未完成的运行时从最后完成的节点继续（输入为None），否则重新开始"""
+        if snapshot is not None and snapshot.next:
+            print(f"🔁 从检查点恢复分析，待执行节点: {', '.join(snapshot.next)}")
+            return None
+        return initial_state
+    
+    def _with_thread_id(self, state: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+        thread_id = config["configurable"].get("thread_id")
+        if thread_id is None:
+            return state
+        return {**state, "thread_id": thread_id}
+    
+    def _failed_state(self, initial_state: Dict[str, Any], config: Dict[str, Any], snapshot) -> Dict[str, Any]:
+        """分析失败时返回已完成的工作：启用检查点时为最后一个检查点的状态"""
+        if snapshot is None or not snapshot.values:
+            return self._with_thread_id(initial_state, config)
+        
+        thread_id = config["configurable"]["thread_id"]
+        print(f"💾 已保存完成的节点结果，可使用 thread_id={thread_id} 恢复分析")
+        return self._with_thread_id({**initial_state, **snapshot.values}, config)
+    
+    def analyze_manufacturing_replenishment(
+        self,
+        city_name: str,
+        brand_name: str,
+        product_category: str,
+        target_quarter: str,
+        special_focus: str = "",
+        progress_callback=None,  # 🎯 新增：进度追踪器参数
+        thread_id: str = None,
+        session_id: str = None,
+    ) -> Dict[str, Any]:
+        """执行制造业补货策略分析
+        
+        启用检查点(config["checkpoint_backend"])时，传入之前失败或中断的thread_id
+        将从最后完成的节点继续，返回的状态中包含本次运行的thread_id。
+        各节点LLM调用的实际Token用量和耗时以session_id（未传入时自动生成）写入TokenTracker。
+        """
+        
+        print(f"🏭 开始制造业ReAct补货分析: {brand_name} {product_category} ({target_quarter})")
+        
+        # 初始化状态
+        progress_callback = progress_callback or self._create_dummy_callback()
+        initial_state = self._build_initial_state(
+            city_name, brand_name, product_category, target_quarter, special_focus, progress_callback
+        )
+        config = self._graph_config(progress_callback, thread_id, session_id)
         
         # 执行图工作流
         try:
-            if self.debug:
-                # 调试模式：流式输出 - 使用invoke避免状态累积问题
-                print("🔄 调试模式：使用invoke确保状态正确传递")
-                final_state = self.graph.invoke(initial_state)
-            else:
-                # 标准模式：直接调用
-                final_state = self.graph.invoke(initial_state)
+            snapshot = self.graph.get_state(config) if self.checkpointer is not None else None
+            final_state = self.graph.invoke(self._graph_input(initial_state, snapshot), config)
+            
+            print("✅ 制造业ReAct补货分析完成")
+            return self._with_thread_id(final_state, config)
+            
+        except Exception as e:
+            print(f"❌ 制造业ReAct分析失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            snapshot = self.graph.get_state(config) if self.checkpointer is not None else None
+            return self._failed_state(initial_state, config, snapshot)
+        finally:
+            self._flush_token_usage(config)
+    
+    async def aanalyze_manufacturing_replenishment(
+        self,
+        city_name: str,
+        brand_name: str,
+        product_category: str,
+        target_quarter: str,
+        special_focus: str = "",
+        progress_callback=None,
+        thread_id: str = None,
+        session_id: str = None,
+    ) -> Dict[str, Any]:
+        """异步执行制造业补货策略分析（graph.ainvoke）
+        
+        数据预取和分析师节点使用异步实现，外部数据请求在事件循环中等待，
+        可在同一事件循环中并发运行多个补货分析。检查点恢复与同步版本一致。
+        """
+        
+        print(f"🏭 开始制造业ReAct补货分析(异步): {brand_name} {product_category} ({target_quarter})")
+        
+        progress_callback = progress_callback or self._create_dummy_callback()
+        initial_state = self._build_initial_state(
+            city_name, brand_name, product_category, target_quarter, special_focus, progress_callback
+        )
+        config = self._graph_config(progress_callback, thread_id, session_id)
+        
+        try:
+            snapshot = await self.graph.aget_state(config) if self.checkpointer is not None else None
+            final_state = await self.graph.ainvoke(self._graph_input(initial_state, snapshot), config)
             
             print("✅ 制造业ReAct补货分析完成")
-            return final_state
+            return self._with_thread_id(final_state, config)
             
         except Exception as e:
             print(f"❌ 制造业ReAct分析失败: {str(e)}")
             import traceback
             traceback.print_exc()
-            return initial_state
+            snapshot = await self.graph.aget_state(config) if self.checkpointer is not None else None
+            return self._failed_state(initial_state, config, snapshot)
+        finally:
+            await asyncio.to_thread(self._flush_token_usage, config)
+    
+    @staticmethod
+    def _stream_event(node_name: str, update: Dict[str, Any]) -> Dict[str, Any]:
+        """将节点更新转换为流式事件，不需要对外输出的节点返回None"""
+        update = update or {}
+        
+        if node_name in ANALYST_NODE_REPORTS:
+            field, display_name = ANALYST_NODE_REPORTS[node_name]
+            return {"type": "analyst_report", "node": node_name, "name": display_name,
+                    "field": field, "content": update.get(field, "")}
+        
+        if node_name in DEBATE_NODE_NAMES:
+            debate_state = update.get("decision_debate_state") or {}
+            return {"type": "debate_turn", "node": node_name, "name": DEBATE_NODE_NAMES[node_name],
+                    "round": debate_state.get("count", 0), "content": debate_state.get("current_response", "")}
+        
+        if node_name == "Data_Prefetch":
+            external_data = update.get("external_data") or {}
+            return {"type": "data_prefetch", "node": node_name,
+                    "content": {analyst_id: sorted(results) for analyst_id, results in external_data.items()}}
+        
+        if node_name == "Decision_Coordinator":
+            return {"type": "coordination_plan", "node": node_name,
+                    "content": update.get("decision_coordination_plan", "")}
+        
+        if node_name == "Risk_Assessment":
+            return {"type": "risk_assessment", "node": node_name,
+                    "content": update.get("risk_assessment_report", "")}
+        
+        if node_name == "Conclusion_Extractor":
+            return {"type": "conclusion", "node": node_name,
+                    "content": update.get("conclusion_json"), "raw": update.get("conclusion_raw", "")}
+        
+        return None
+    
+    def _stream_chunk_events(self, mode: str, chunk: Any, latest: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """处理一个stream块：values模式记录最新完整状态，updates模式生成节点事件"""
+        if mode == "values":
+            latest["state"] = chunk
+            return []
+        
+        events = []
+        for node_name, update in (chunk or {}).items():
+            event = self._stream_event(node_name, update)
+            if event is not None:
+                events.append(event)
+        return events
+    
+    def _stream_end_event(self, initial_state: Dict[str, Any], config: Dict[str, Any], latest: Dict[str, Any],
+                          error: Exception = None, snapshot=None) -> Dict[str, Any]:
+        if error is None:
+            print("✅ 制造业ReAct补货分析完成")
+            return {"type": "complete", "state": self._with_thread_id(latest.get("state") or initial_state, config)}
+        
+        print(f"❌ 制造业ReAct分析失败: {str(error)}")
+        if snapshot is None and latest.get("state"):
+            state = self._with_thread_id({**initial_state, **latest["state"]}, config)
+        else:
+            state = self._failed_state(initial_state, config, snapshot)
+        return {"type": "error", "error": str(error), "state": state}
+    
+    def stream_manufacturing_replenishment(
+        self,
+        city_name: str,
+        brand_name: str,
+        product_category: str,
+        target_quarter: str,
+        special_focus: str = "",
+        progress_callback=None,
+        thread_id: str = None,
+        session_id: str = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """流式执行制造业补货策略分析（graph.stream），每个节点完成即返回其结果
+        
+        Yields:
+            事件字典，type为:
+            - data_prefetch: 预取完成，content为各分析师已获取的数据项
+            - analyst_report: 分析师报告（name, field, content）
+            - debate_turn: 辩论发言（name, round, content）
+            - coordination_plan / risk_assessment: 决策协调方案 / 风险评估报告
+            - conclusion: 结构化结论JSON（content）及原始输出（raw）
+            - complete / error: 最后一个事件，state为最终状态（失败时为已完成部分的状态）
+        """
+        
+        print(f"🏭 开始制造业ReAct补货分析(流式): {brand_name} {product_category} ({target_quarter})")
+        
+        progress_callback = progress_callback or self._create_dummy_callback()
+        initial_state = self._build_initial_state(
+            city_name, brand_name, product_category, target_quarter, special_focus, progress_callback
+        )
+        config = self._graph_config(progress_callback, thread_id, session_id)
+        latest = {}
+        
+        error, snapshot = None, None
+        # 调用方提前停止迭代（break/close/请求取消）时也记录已产生的token使用
+        try:
+            try:
+                snapshot = self.graph.get_state(config) if self.checkpointer is not None else None
+                for mode, chunk in self.graph.stream(
+                    self._graph_input(initial_state, snapshot), config, stream_mode=["updates", "values"]
+                ):
+                    yield from self._stream_chunk_events(mode, chunk, latest)
+                snapshot = None
+            except Exception as e:
+                error = e
+                snapshot = self.graph.get_state(config) if self.checkpointer is not None else None
+        finally:
+            self._flush_token_usage(config)
+        
+        yield self._stream_end_event(initial_state, config, latest, error, snapshot)
+    
+    async def astream_manufacturing_replenishment(
+        self,
+        city_name: str,
+        brand_name: str,
+        product_category: str,
+        target_quarter: str,
+        special_focus: str = "",
+        progress_callback=None,
+        thread_id: str = None,
+        session_id: str = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """stream_manufacturing_replenishment的异步版本（graph.astream），事件格式相同"""
+        
+        print(f"🏭 开始制造业ReAct补货分析(异步流式): {brand_name} {product_category} ({target_quarter})")
+        
+        progress_callback = progress_callback or self._create_dummy_callback()
+        initial_state = self._build_initial_state(
+            city_name, brand_name, product_category, target_quarter, special_focus, progress_callback
+        )
+        config = self._graph_config(progress_callback, thread_id, session_id)
+        latest = {}
+        
+        error, snapshot = None, None
+        try:
+            try:
+                snapshot = await self.graph.aget_state(config) if self.checkpointer is not None else None
+                async for mode, chunk in self.graph.astream(
+                    self._graph_input(initial_state, snapshot), config, stream_mode=["updates", "values"]
+                ):
+                    for event in self._stream_chunk_events(mode, chunk, latest):
+                        yield event
+                snapshot = None
+            except Exception as e:
+                error = e
+                snapshot = await self.graph.aget_state(config) if self.checkpointer is not None else None
+        finally:
+            await asyncio.to_thread(self._flush_token_usage, config)
+        
+        yield self._stream_end_event(initial_state, config, latest, error, snapshot)
+    
+    def _batch_config(self, job: Dict[str, Any], shared_data: SharedPrefetchStore) -> Dict[str, Any]:
+        """批量分析任务的图运行配置：所有任务共享同一份预取数据，启用检查点时每个任务独立thread_id"""
+        return self._graph_config(
+            job.get("progress_callback"), job.get("thread_id"), job.get("session_id"), shared_data=shared_data
+        )
+    
+    def _batch_job_state(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return self._build_initial_state(
+            city_name=job["city_name"],
+            brand_name=job["brand_name"],
+            product_category=job["product_category"],
+            target_quarter=job["target_quarter"],
+            special_focus=job.get("special_focus", ""),
+            progress_callback=job.get("progress_callback"),
+        )
+    
+    @staticmethod
+    def _batch_result(index: int, job: Dict[str, Any], state: Dict[str, Any] = None, error: Exception = None) -> Dict[str, Any]:
+        if error is not None:
+            print(f"❌ [批量分析] 任务{index}失败: {job.get('brand_name')} {job.get('product_category')} - {error}")
+        return {
+            "index": index,
+            "job": job,
+            "state": state,
+            "success": error is None,
+            "error": str(error) if error is not None else None,
+        }
+    
+    def _run_batch_job(self, index: int, job: Dict[str, Any], shared_data: SharedPrefetchStore) -> Dict[str, Any]:
+        config = self._batch_config(job, shared_data)
+        try:
+            snapshot = self.graph.get_state(config) if self.checkpointer is not None else None
+            state = self.graph.invoke(self._graph_input(self._batch_job_state(job), snapshot), config)
+            return self._batch_result(index, job, self._with_thread_id(state, config))
+        except Exception as e:
+            return self._batch_result(index, job, error=e)
+        finally:
+            self._flush_token_usage(config)
+    
+    def batch_analyze_replenishment(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        max_concurrency: int = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """批量执行补货策略分析，按完成顺序逐个返回结果
+        
+        所有任务共享同一个已编译的图；PMI/PPI/期货/节假日数据整批只获取一次，
+        天气按城市、新闻按(城市, 品牌, 品类)共享。
+        
+        Args:
+            jobs: 任务列表，每项包含city_name, brand_name, product_category, target_quarter，
+                  可选special_focus, progress_callback, thread_id, session_id
+            max_concurrency: 同时执行的分析数，默认config["batch_max_concurrency"]或4
+            
+        Yields:
+            {"index", "job", "state", "success", "error"}，index为任务在jobs中的位置
+        """
+        jobs = list(jobs)
+        max_concurrency = max_concurrency or self.config.get("batch_max_concurrency", 4)
+        shared_data = SharedPrefetchStore()
+        
+        print(f"🏭 [批量分析] 开始: {len(jobs)} 个任务, 并发 {max_concurrency}")
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="replenishment_batch")
+        try:
+            futures = [
+                executor.submit(self._run_batch_job, index, job, shared_data)
+                for index, job in enumerate(jobs)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的任务
+            executor.shutdown(wait=True, cancel_futures=True)
+            print(f"✅ [批量分析] 结束: 共享数据获取 {shared_data.fetches} 次, 复用 {shared_data.hits} 次")
+    
+    async def abatch_analyze_replenishment(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        max_concurrency: int = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """batch_analyze_replenishment的异步版本（graph.ainvoke），按完成顺序逐个返回结果"""
+        jobs = list(jobs)
+        max_concurrency = max_concurrency or self.config.get("batch_max_concurrency", 4)
+        shared_data = SharedPrefetchStore()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run(index, job):
+            async with semaphore:
+                config = self._batch_config(job, shared_data)
+                try:
+                    snapshot = await self.graph.aget_state(config) if self.checkpointer is not None else None
+                    state = await self.graph.ainvoke(self._graph_input(self._batch_job_state(job), snapshot), config)
+                    return self._batch_result(index, job, self._with_thread_id(state, config))
+                except Exception as e:
+                    return self._batch_result(index, job, error=e)
+                finally:
+                    await asyncio.to_thread(self._flush_token_usage, config)
+        
+        print(f"🏭 [批量分析] 开始(异步): {len(jobs)} 个任务, 并发 {max_concurrency}")
+        tasks = [asyncio.ensure_future(run(index, job)) for index, job in enumerate(jobs)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            print(f"✅ [批量分析] 结束: 共享数据获取 {shared_data.fetches} 次, 复用 {shared_data.hits} 次")
     
     def get_analysis_summary(self, final_state: Dict[str, Any]) -> Dict[str, Any]:
         """获取分析摘要"""
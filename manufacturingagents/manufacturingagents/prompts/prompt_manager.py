@@ -4,10 +4,18 @@
 负责加载、管理和提供所有制造业智能体的提示词模板。
 """
 
+import hashlib
 import os
+import threading
 from typing import Dict, Optional
 from pathlib import Path
 
+from langchain_core.prompts import PromptTemplate
+
+# ReAct Agent提示词框架（原LangChain Hub的hwchase17/react，随代码发布的本地版本）
+REACT_PROMPT_NAME = "react_agent"
+REACT_PROMPT_VERSION = "hwchase17/react@v1"
+
 
 class ManufacturingPromptManager:
     """制造业智能体提示词管理器"""
@@ -15,6 +23,8 @@ class ManufacturingPromptManager:
     def __init__(self):
         self.current_dir = Path(__file__).parent
         self.prompts_cache: Dict[str, str] = {}
+        self._react_prompt: Optional[PromptTemplate] = None
+        self._lock = threading.Lock()
         self._load_all_prompts()
     
     def _load_all_prompts(self):
@@ -38,6 +48,9 @@ class ManufacturingPromptManager:
             self.prompts_cache["preprocessing_assistant"] = self._load_prompt("utils/preprocessing_assistant.txt")
             self.prompts_cache["conclusion_extractor"] = self._load_prompt("utils/conclusion_extractor.txt")
             
+            # 加载ReAct Agent框架提示词
+            self.prompts_cache[REACT_PROMPT_NAME] = self._load_prompt("react/react_agent.txt")
+            
         except Exception as e:
             print(f"加载提示词时发生错误: {e}")
     
@@ -59,9 +72,33 @@ class ManufacturingPromptManager:
         """获取指定智能体的提示词"""
         return self.prompts_cache.get(agent_name)
     
+    def get_prompt_hash(self, agent_name: str) -> Optional[str]:
+        """获取指定提示词内容的哈希，供下游缓存按提示词版本区分"""
+        content = self.prompts_cache.get(agent_name)
+        if content is None:
+            return None
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+    
+    def get_react_prompt(self) -> PromptTemplate:
+        """获取本地ReAct Agent提示词模板（只构建一次，所有智能体共享）"""
+        if self._react_prompt is None:
+            with self._lock:
+                if self._react_prompt is None:
+                    template = self.prompts_cache.get(REACT_PROMPT_NAME)
+                    if not template:
+                        raise ValueError("ReAct提示词模板不可用: react/react_agent.txt")
+                    self._react_prompt = PromptTemplate.from_template(template)
+                    self._react_prompt.metadata = {
+                        "version": REACT_PROMPT_VERSION,
+                        "content_hash": self.get_prompt_hash(REACT_PROMPT_NAME),
+                    }
+        return self._react_prompt
+    
     def update_prompt(self, agent_name: str, prompt_content: str):
         """更新指定智能体的提示词"""
         self.prompts_cache[agent_name] = prompt_content
+        if agent_name == REACT_PROMPT_NAME:
+            self._react_prompt = None
     
     def get_all_prompts(self) -> Dict[str, str]:
         """获取所有提示词"""
@@ -6,17 +6,19 @@ from langchain_core.messages import AIMessage
 import time
 import json
 from datetime import datetime
+from langchain_core.runnables import RunnableConfig
 from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+from manufacturingagents.manufacturingagents.utils.manufacturing_states import get_progress_callback
 
 
 def create_risk_assessment_team(llm, memory):
     """创建风险评估团队"""
     
-    def risk_assessment_node(state):
+    def risk_assessment_node(state, config: RunnableConfig = None):
         print(f"⚠️ [DEBUG] ===== 风险评估团队节点开始 =====")
         
         # 🎯 新增：获取进度追踪器并记录风险评估阶段
-        progress_callback = state.get('progress_callback')
+        progress_callback = get_progress_callback(state, config)
         if progress_callback:
             progress_callback.update_progress(5)
             progress_callback.log_risk_assessment("风险评估团队开始全面评估")
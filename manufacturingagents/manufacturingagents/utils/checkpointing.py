@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业图检查点
+Manufacturing Graph Checkpointing
+
+为ManufacturingAgentsReactGraph提供可离线使用的LangGraph检查点存储：
+- file: 基于InMemorySaver，每个thread_id一个追加写入的本地pickle文件（无额外依赖）
+- sqlite: 使用langgraph-checkpoint-sqlite的SqliteSaver（未安装时回退到file）
+- memory: 仅进程内保存
+
+进度追踪器(progress_callback)等运行时对象不可序列化，写入检查点前从状态中剔除，
+恢复运行时通过运行配置重新传入。
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+# 不写入检查点的状态字段
+UNPERSISTED_STATE_KEYS = ("progress_callback",)
+
+# 文件检查点：线程文件后缀
+THREAD_FILE_SUFFIX = ".pkl"
+
+
+def _strip_checkpoint(checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+    channel_values = checkpoint.get("channel_values") or {}
+    if not any(key in channel_values for key in UNPERSISTED_STATE_KEYS):
+        return checkpoint
+    stripped = dict(checkpoint)
+    stripped["channel_values"] = {
+        key: value for key, value in channel_values.items()
+        if key not in UNPERSISTED_STATE_KEYS
+    }
+    return stripped
+
+
+def _strip_writes(writes: Sequence[Tuple[str, Any]]) -> Sequence[Tuple[str, Any]]:
+    return [(channel, value) for channel, value in writes if channel not in UNPERSISTED_STATE_KEYS]
+
+
+class _StripUnpersistedStateMixin:
+    """写入检查点前剔除运行时对象"""
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return super().put(config, _strip_checkpoint(checkpoint), metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        return super().put_writes(config, _strip_writes(writes), task_id, task_path)
+
+
+class MemoryCheckpointSaver(_StripUnpersistedStateMixin, InMemorySaver):
+    """进程内检查点存储"""
+
+
+class FileCheckpointSaver(_StripUnpersistedStateMixin, InMemorySaver):
+    """文件检查点存储：每个thread_id一个追加写入的pickle文件
+
+    每次写入只追加本次新增的检查点/写入/通道值，代价与单次写入的数据量成正比；
+    线程文件在首次访问该thread_id时才加载。默认不清理线程文件；设置保留天数后，
+    创建时会删除超过保留天数未更新的线程文件（包括其他分析的线程，删除后无法再恢复）。
+    """
+
+    def __init__(self, path: str, retention_days: Optional[float] = None, **kwargs):
+        """
+        Args:
+            path: 检查点路径，线程文件保存在同名目录（去掉扩展名）中
+            retention_days: 线程文件保留天数，默认None表示不清理
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.directory = os.path.splitext(os.path.abspath(path))[0]
+        self._file_lock = threading.RLock()
+        self._loaded_threads = set()
+        self._all_loaded = False
+        os.makedirs(self.directory, exist_ok=True)
+        if retention_days:
+            self._prune(retention_days)
+
+    def _thread_path(self, thread_id: str) -> str:
+        return os.path.join(self.directory, quote(str(thread_id), safe="") + THREAD_FILE_SUFFIX)
+
+    def _thread_ids_on_disk(self):
+        return [
+            unquote(name[:-len(THREAD_FILE_SUFFIX)])
+            for name in os.listdir(self.directory) if name.endswith(THREAD_FILE_SUFFIX)
+        ]
+
+    def _apply(self, record: Dict[str, Any]):
+        for (thread_id, checkpoint_ns, checkpoint_id), value in record.get("storage", {}).items():
+            self.storage[thread_id][checkpoint_ns][checkpoint_id] = value
+        for key, writes in record.get("writes", {}).items():
+            self.writes[key].update(writes)
+        self.blobs.update(record.get("blobs", {}))
+
+    def _ensure_loaded(self, thread_id: str):
+        with self._file_lock:
+            if thread_id in self._loaded_threads:
+                return
+            self._loaded_threads.add(thread_id)
+            path = self._thread_path(thread_id)
+            if not os.path.exists(path):
+                return
+            with open(path, "rb") as f:
+                while True:
+                    try:
+                        record = pickle.load(f)
+                    except EOFError:
+                        break
+                    except Exception as e:
+                        # 进程中断时最后一条记录可能不完整，之前的记录仍然有效
+                        print(f"⚠️ [检查点] 线程 {thread_id} 的检查点文件末尾记录损坏，已忽略: {e}")
+                        break
+                    self._apply(record)
+
+    def _ensure_all_loaded(self):
+        with self._file_lock:
+            if not self._all_loaded:
+                for thread_id in self._thread_ids_on_disk():
+                    self._ensure_loaded(thread_id)
+                self._all_loaded = True
+
+    def _append(self, thread_id: str, record: Dict[str, Any]):
+        with open(self._thread_path(thread_id), "ab") as f:
+            pickle.dump(record, f)
+
+    def _prune(self, retention_days: float):
+        cutoff = time.time() - retention_days * 86400
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(THREAD_FILE_SUFFIX) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        if removed:
+            print(f"🧹 [检查点] 已清理 {removed} 个超过 {retention_days} 天未更新的线程检查点")
+
+    def get_tuple(self, config):
+        self._ensure_loaded(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        if config:
+            self._ensure_loaded(config["configurable"]["thread_id"])
+        else:
+            self._ensure_all_loaded()
+        return super().list(config, filter=filter, before=before, limit=limit)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._file_lock:
+            self._ensure_loaded(thread_id)
+            result = super().put(config, checkpoint, metadata, new_versions)
+            storage_key = (thread_id, checkpoint_ns, checkpoint["id"])
+            blob_keys = [(thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()]
+            self._append(thread_id, {
+                "storage": {storage_key: self.storage[thread_id][checkpoint_ns][checkpoint["id"]]},
+                "blobs": {key: self.blobs[key] for key in blob_keys},
+            })
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._file_lock:
+            self._ensure_loaded(thread_id)
+            super().put_writes(config, writes, task_id, task_path)
+            task_writes = {
+                inner_key: value for inner_key, value in self.writes.get(outer_key, {}).items()
+                if inner_key[0] == task_id
+            }
+            if task_writes:
+                self._append(thread_id, {"writes": {outer_key: task_writes}})
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._file_lock:
+            super().delete_thread(thread_id)
+            self._loaded_threads.add(thread_id)
+            path = self._thread_path(thread_id)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _create_sqlite_saver(path: str):
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        print("⚠️ [检查点] 未安装langgraph-checkpoint-sqlite，使用文件检查点存储")
+        return None
+
+    class SqliteCheckpointSaver(_StripUnpersistedStateMixin, SqliteSaver):
+        """SQLite检查点存储"""
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    return SqliteCheckpointSaver(conn)
+
+
+def create_checkpointer(config: Dict[str, Any]) -> Optional[Any]:
+    """
+    根据配置创建检查点存储
+
+    Args:
+        config: 图配置
+            - checkpoint_backend: 'file' / 'sqlite' / 'memory'，未设置时不启用检查点
+            - checkpoint_path: 检查点文件路径，默认 {results_dir}/checkpoints/manufacturing_graph.{pkl|sqlite}；
+              file存储的线程文件保存在去掉扩展名的同名目录中
+            - checkpoint_retention_days: file存储中线程文件的保留天数，默认不清理；
+              设置后创建存储时删除超过保留天数未更新的线程文件，这些分析将无法再恢复
+
+    Returns:
+        检查点存储实例，未启用时返回None
+    """
+    backend = (config.get("checkpoint_backend") or "").lower()
+    if backend in ("", "none", "false"):
+        return None
+
+    if backend == "memory":
+        print("💾 [检查点] 使用内存检查点存储")
+        return MemoryCheckpointSaver()
+
+    checkpoint_dir = os.path.join(config.get("results_dir", "./results"), "checkpoints")
+
+    if backend == "sqlite":
+        path = config.get("checkpoint_path") or os.path.join(checkpoint_dir, "manufacturing_graph.sqlite")
+        saver = _create_sqlite_saver(path)
+        if saver is not None:
+            print(f"💾 [检查点] 使用SQLite检查点存储: {path}")
+            return saver
+        path = os.path.splitext(path)[0] + ".pkl"
+    elif backend == "file":
+        path = config.get("checkpoint_path") or os.path.join(checkpoint_dir, "manufacturing_graph.pkl")
+    else:
+        raise ValueError(f"不支持的检查点存储类型: {backend}")
+
+    print(f"💾 [检查点] 使用文件检查点存储: {path}")
+    return FileCheckpointSaver(path, retention_days=config.get("checkpoint_retention_days"))
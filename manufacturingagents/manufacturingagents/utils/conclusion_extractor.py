@@ -4,17 +4,19 @@
 from langchain_core.messages import AIMessage
 import time
 import json
+from langchain_core.runnables import RunnableConfig
 from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+from manufacturingagents.manufacturingagents.utils.manufacturing_states import get_progress_callback
 
 
 def create_conclusion_extractor(llm, memory):
     """创建结论提取智能体"""
     
-    def conclusion_extractor_node(state):
+    def conclusion_extractor_node(state, config: RunnableConfig = None):
         print(f"📋 [DEBUG] ===== 结论提取智能体节点开始 =====")
         
         # 🎯 获取进度追踪器并记录阶段
-        progress_callback = state.get('progress_callback')
+        progress_callback = get_progress_callback(state, config)
         if progress_callback:
             progress_callback.update_progress(7)
             progress_callback.log_decision_phase("结论提取智能体生成结构化输出")
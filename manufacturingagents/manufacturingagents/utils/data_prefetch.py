@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业数据预取节点
+Manufacturing Data Prefetch Node
+
+在分析师执行前并发调用各分析师必需的数据工具（PMI、PPI、大宗商品、节假日、
+天气、新闻等），结果写入状态的external_data，分析师可直接基于数据生成报告，
+省去ReAct循环中仅用于触发固定数据获取的LLM轮次。
+
+批量分析时通过运行配置传入SharedPrefetchStore，PMI/PPI/期货/节假日等全局数据
+和同一城市的天气数据在整批分析中只获取一次。
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from langchain_core.runnables import RunnableConfig
+
+from manufacturingagents.dataflows.single_flight import AsyncSingleFlight, SingleFlight
+from manufacturingagents.manufacturingagents.analysts.react_agent_factory import with_async_node
+
+
+class SharedPrefetchStore:
+    """批量分析共享的预取数据：按工具共享键保存成功结果，并发的相同请求合并为一次获取
+
+    失败结果不保存，后续分析会重新获取。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[Tuple, Any] = {}
+        self._single_flight = SingleFlight()
+        self._async_single_flight = AsyncSingleFlight()
+        self.hits = 0
+        self.fetches = 0
+
+    def _lookup(self, key: Tuple):
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                return True, self._results[key]
+            return False, None
+
+    def _save(self, key: Tuple, result: Any):
+        with self._lock:
+            self.fetches += 1
+            self._results[key] = result
+
+    def get_or_fetch(self, key: Tuple, fetch_func: Callable[[], Any]) -> Any:
+        found, result = self._lookup(key)
+        if found:
+            return result
+
+        def fetch():
+            found, result = self._lookup(key)
+            if found:
+                return result
+            result = fetch_func()
+            self._save(key, result)
+            return result
+
+        return self._single_flight.do(str(key), fetch)
+
+    async def aget_or_fetch(self, key: Tuple, afetch_func: Callable[[], Awaitable[Any]]) -> Any:
+        found, result = self._lookup(key)
+        if found:
+            return result
+
+        async def fetch():
+            found, result = self._lookup(key)
+            if found:
+                return result
+            result = await afetch_func()
+            self._save(key, result)
+            return result
+
+        return await self._async_single_flight.do(str(key), fetch)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+
+def create_data_prefetch(agent_factory, analyst_ids: List[str], max_workers: int = 8):
+    """创建数据预取节点
+
+    Args:
+        agent_factory: ReactAgentFactory实例，复用其缓存的分析师工具
+        analyst_ids: 需要预取数据的分析师ID列表
+        max_workers: 并发线程数
+    """
+
+    def _prepare_prefetch(state, config):
+        """返回(运行配置, 进度追踪器, 工作线程运行配置, 待获取的(分析师ID, 工具)列表)"""
+        print(f"📦 [DEBUG] ===== 数据预取节点开始 =====")
+
+        run_config = agent_factory.build_run_config(state, config)
+        progress_callback = run_config["configurable"].get("progress_callback")
+
+        # 工作线程中不传递进度追踪器，API调用进度统一在节点线程中记录
+        worker_config = {
+            "configurable": {
+                key: value for key, value in run_config["configurable"].items()
+                if key != "progress_callback"
+            }
+        }
+
+        tasks = [
+            (analyst_id, tool)
+            for analyst_id in analyst_ids
+            for tool in agent_factory.get_tools(analyst_id)
+        ]
+        if progress_callback:
+            progress_callback.log_event("progress", f"📦 数据预取：并发获取{len(tasks)}项外部数据...")
+
+        return run_config, progress_callback, worker_config, tasks
+
+    def _log_api_call(run_config, progress_callback, tool, status):
+        if progress_callback:
+            with agent_factory.run_context(run_config):
+                label = tool.progress_label()
+            if label:
+                progress_callback.log_api_call(label, status)
+
+    def _finish_prefetch(external_data, tasks):
+        fetched = sum(len(results) for results in external_data.values())
+        print(f"📦 [DEBUG] 数据预取完成: {fetched}/{len(tasks)} 项")
+        print(f"📦 [DEBUG] ===== 数据预取节点结束 =====")
+
+        return {"external_data": external_data}
+
+    def data_prefetch_node(state, config: RunnableConfig = None):
+        run_config, progress_callback, worker_config, tasks = _prepare_prefetch(state, config)
+
+        external_data = {analyst_id: {} for analyst_id in analyst_ids}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="data_prefetch") as executor:
+            futures = {}
+            for analyst_id, tool in tasks:
+                _log_api_call(run_config, progress_callback, tool, "调用中")
+                futures[executor.submit(agent_factory.run_tool, tool, worker_config)] = (analyst_id, tool)
+
+            for future in as_completed(futures):
+                analyst_id, tool = futures[future]
+                try:
+                    external_data[analyst_id][tool.name] = future.result()
+                    status = "成功"
+                except Exception as e:
+                    # 预取失败（异常或工具返回错误消息）的工具不写入结果，对应分析师回退到ReAct模式自行调用
+                    print(f"📦 [ERROR] 预取 {tool.name} 失败: {str(e)}")
+                    status = "失败"
+                _log_api_call(run_config, progress_callback, tool, status)
+
+        return _finish_prefetch(external_data, tasks)
+
+    async def adata_prefetch_node(state, config: RunnableConfig = None):
+        run_config, progress_callback, worker_config, tasks = _prepare_prefetch(state, config)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(analyst_id, tool):
+            async with semaphore:
+                try:
+                    return analyst_id, tool, await agent_factory.arun_tool(tool, worker_config), None
+                except Exception as e:
+                    return analyst_id, tool, None, e
+
+        for analyst_id, tool in tasks:
+            _log_api_call(run_config, progress_callback, tool, "调用中")
+
+        external_data = {analyst_id: {} for analyst_id in analyst_ids}
+        for next_done in asyncio.as_completed([fetch(analyst_id, tool) for analyst_id, tool in tasks]):
+            analyst_id, tool, result, error = await next_done
+            if error is None:
+                external_data[analyst_id][tool.name] = result
+                status = "成功"
+            else:
+                print(f"📦 [ERROR] 预取 {tool.name} 失败: {str(error)}")
+                status = "失败"
+            _log_api_call(run_config, progress_callback, tool, status)
+
+        return _finish_prefetch(external_data, tasks)
+
+    # 同步节点在线程池中并发获取，异步节点在事件循环中并发获取
+    return with_async_node(data_prefetch_node, adata_prefetch_node)
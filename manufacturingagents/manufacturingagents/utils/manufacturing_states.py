@@ -7,10 +7,35 @@ Manufacturing Agents State Management
 定义制造业补货决策分析过程中的状态结构
 """
 
-from typing import TypedDict, List, Any, Dict, Optional
+from typing import Annotated, TypedDict, List, Any, Dict, Optional
 from langchain_core.messages import BaseMessage
 
 
+def merge_report(existing: str, new: str) -> str:
+    """报告字段合并：新报告非空时覆盖，否则保留已有报告
+
+    并行分析师各自只写自己的报告字段，决策层节点会回传完整状态，
+    这里保证空值不会覆盖已经生成的报告。
+    """
+    return new if new else existing
+
+
+def merge_external_data(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """外部数据合并：按键合并多个节点写入的数据"""
+    merged = dict(existing or {})
+    merged.update(new or {})
+    return merged
+
+
+def get_progress_callback(state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Any:
+    """获取进度追踪器：优先使用运行配置中的进度追踪器
+
+    启用检查点时进度追踪器不写入持久化状态，从检查点恢复运行时只能通过运行配置传入。
+    """
+    configurable = (config or {}).get("configurable") or {}
+    return configurable.get("progress_callback") or state.get("progress_callback")
+
+
 class ManufacturingState(TypedDict):
     """制造业智能体状态定义"""
     
@@ -24,13 +49,13 @@ class ManufacturingState(TypedDict):
     
     # === 消息和通信 ===
     messages: List[BaseMessage]          # 智能体间的消息历史
-    external_data: Dict[str, Any]        # 外部数据存储
+    external_data: Annotated[Dict[str, Any], merge_external_data]  # 外部数据存储
     
     # === 分析报告 ===
-    market_environment_report: str       # 市场环境分析报告
-    trend_prediction_report: str         # 趋势预测分析报告
-    industry_news_report: str           # 行业新闻分析报告
-    consumer_insight_report: str        # 消费者洞察报告
+    market_environment_report: Annotated[str, merge_report]  # 市场环境分析报告
+    trend_prediction_report: Annotated[str, merge_report]  # 趋势预测分析报告
+    industry_news_report: Annotated[str, merge_report]  # 行业新闻分析报告
+    consumer_insight_report: Annotated[str, merge_report]  # 消费者洞察报告
     
     # === 决策过程状态 ===
     decision_debate_state: Dict[str, Any] # 决策辩论状态
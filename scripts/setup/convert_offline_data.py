@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+离线数据列式转换脚本
+将离线SimFin财报CSV按股票代码拆分为Feather文件（日期预先解析），将YFin价格CSV和Finnhub JSON转换为Feather文件。
+转换后的数据由dataflows自动优先读取；源CSV更新后需要重新运行本脚本。
+
+用法:
+    python scripts/setup/convert_offline_data.py [--data-dir DATA_DIR] [--skip-price] [--skip-simfin] [--skip-finnhub]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from manufacturingagents.dataflows.columnar_store import (
+    COLUMNAR_AVAILABLE, convert_finnhub_json, convert_price_csv, convert_simfin_csv
+)
+
+
+SIMFIN_STATEMENTS = {
+    "balance_sheet": "us-balance-*.csv",
+    "cash_flow": "us-cashflow-*.csv",
+    "income_statements": "us-income-*.csv",
+}
+
+
+def convert_simfin(data_dir: str) -> int:
+    """转换SimFin财报，返回转换的文件数"""
+    print("📊 转换SimFin财报数据...")
+    converted = 0
+    for statement, pattern in SIMFIN_STATEMENTS.items():
+        statement_dir = os.path.join(data_dir, "fundamental_data", "simfin_data_all", statement, "companies", "us")
+        for csv_path in sorted(glob.glob(os.path.join(statement_dir, pattern))):
+            started = time.time()
+            tickers = convert_simfin_csv(csv_path)
+            print(f"  ✅ {os.path.basename(csv_path)}: {tickers} 只股票, 耗时 {time.time() - started:.1f}s")
+            converted += 1
+    if converted == 0:
+        print("  ⚠️ 未找到SimFin财报CSV")
+    return converted
+
+
+def convert_price(data_dir: str) -> int:
+    """转换YFin价格数据，返回转换的文件数"""
+    print("📈 转换价格数据...")
+    price_dir = os.path.join(data_dir, "market_data", "price_data")
+    converted = 0
+    for csv_path in sorted(glob.glob(os.path.join(price_dir, "*-YFin-data-*.csv"))):
+        rows = convert_price_csv(csv_path)
+        print(f"  ✅ {os.path.basename(csv_path)}: {rows} 行")
+        converted += 1
+    if converted == 0:
+        print("  ⚠️ 未找到价格CSV")
+    return converted
+
+
+def convert_finnhub(data_dir: str) -> int:
+    """转换Finnhub新闻/内部人交易等JSON数据，返回转换的文件数"""
+    print("📰 转换Finnhub数据...")
+    converted = 0
+    pattern = os.path.join(data_dir, "finnhub_data", "*", "*_data_formatted.json")
+    for json_path in sorted(glob.glob(pattern)):
+        dates = convert_finnhub_json(json_path)
+        data_type = os.path.basename(os.path.dirname(json_path))
+        print(f"  ✅ {data_type}/{os.path.basename(json_path)}: {dates} 个日期")
+        converted += 1
+    if converted == 0:
+        print("  ⚠️ 未找到Finnhub JSON")
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将离线SimFin/价格/Finnhub数据转换为列式存储")
+    parser.add_argument("--data-dir", help="离线数据目录，默认使用配置中的data_dir")
+    parser.add_argument("--skip-price", action="store_true", help="不转换价格数据")
+    parser.add_argument("--skip-simfin", action="store_true", help="不转换SimFin财报数据")
+    parser.add_argument("--skip-finnhub", action="store_true", help="不转换Finnhub数据")
+    args = parser.parse_args()
+
+    if not COLUMNAR_AVAILABLE:
+        print("❌ 未安装pyarrow，请先执行: pip install pyarrow")
+        return 1
+
+    data_dir = args.data_dir
+    if not data_dir:
+        from manufacturingagents.dataflows.config import get_config
+        data_dir = get_config()["data_dir"]
+    print(f"📁 数据目录: {data_dir}")
+
+    converted = 0
+    if not args.skip_simfin:
+        converted += convert_simfin(data_dir)
+    if not args.skip_price:
+        converted += convert_price(data_dir)
+    if not args.skip_finnhub:
+        converted += convert_finnhub(data_dir)
+
+    print(f"🎉 转换完成，共 {converted} 个文件")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
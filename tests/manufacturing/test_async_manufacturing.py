@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业异步执行测试
+验证异步数据预取、异步分析师节点、工具_arun、异步Coze客户端和graph.ainvoke
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+from langchain_core.language_models.fake import FakeListLLM
+
+import manufacturingagents.manufacturingagents.graph.manufacturing_graph_react as react_graph_module
+from manufacturingagents.agents.utils.agent_utils import Toolkit
+from manufacturingagents.dataflows.coze_client import AsyncCozeClient
+from manufacturingagents.manufacturingagents.analysts.react_agent_factory import (
+    ReactAgentFactory,
+    with_async_node,
+)
+from manufacturingagents.manufacturingagents.analysts.react_tools import ManufacturingWeatherTool
+from manufacturingagents.manufacturingagents.analysts.trend_prediction_analyst_react import (
+    create_trend_prediction_analyst_react,
+)
+from manufacturingagents.manufacturingagents.utils.data_prefetch import create_data_prefetch
+
+
+class AsyncSlowTool:
+    """模拟耗时的toolkit工具，异步调用不阻塞事件循环"""
+
+    def __init__(self, result, delay=0.3, fail=False):
+        self.result = result
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def invoke(self, params):
+        raise AssertionError("异步路径不应调用同步invoke")
+
+    async def ainvoke(self, params):
+        self.calls.append(params)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("接口超时")
+        return self.result
+
+
+class FakeToolkit:
+    def __init__(self, fail_weather=False):
+        self.get_manufacturing_pmi_data = AsyncSlowTool("PMI 50.2")
+        self.get_manufacturing_ppi_data = AsyncSlowTool("PPI -0.8")
+        self.get_manufacturing_commodity_data = AsyncSlowTool("铜价 78000")
+        self.get_manufacturing_holiday_data = AsyncSlowTool("国庆节")
+        self.get_manufacturing_weather_data = AsyncSlowTool("厦门晴", fail=fail_weather)
+
+
+class RecordingProgress:
+    def __init__(self):
+        self.api_calls = []
+        self.events = []
+
+    def log_api_call(self, api_name, status="调用中"):
+        self.api_calls.append((api_name, status))
+
+    def log_event(self, event_type, message):
+        self.events.append((event_type, message))
+
+
+def _state(progress=None):
+    return {
+        "city_name": "厦门",
+        "product_type": "空调",
+        "company_name": "美的",
+        "analysis_date": "2025-07-01",
+        "target_quarter": "2025Q3",
+        "external_data": {},
+        "progress_callback": progress,
+    }
+
+
+def test_toolkit_tools_have_coroutines():
+    """测试制造业toolkit工具提供原生异步实现"""
+    print("🧰 测试toolkit异步实现")
+
+    for tool_name in [
+        "get_manufacturing_weather_data",
+        "get_manufacturing_news_data",
+        "get_manufacturing_holiday_data",
+        "get_manufacturing_pmi_data",
+        "get_manufacturing_ppi_data",
+        "get_manufacturing_commodity_data",
+    ]:
+        assert getattr(Toolkit, tool_name).coroutine is not None, f"{tool_name} 缺少异步实现"
+
+    print("✅ toolkit异步实现正常")
+
+
+def test_async_prefetch_runs_concurrently():
+    """测试异步数据预取并发执行，失败的数据不写入"""
+    print("📦 测试异步数据预取")
+
+    toolkit = FakeToolkit(fail_weather=True)
+    factory = ReactAgentFactory(FakeListLLM(responses=["报告"]), toolkit)
+    prefetch_node = create_data_prefetch(
+        factory, ["market_environment_analyst", "trend_prediction_analyst"]
+    )
+
+    progress = RecordingProgress()
+    start = time.time()
+    update = asyncio.run(prefetch_node.anode(_state(progress)))
+    elapsed = time.time() - start
+
+    market_data = update["external_data"]["market_environment_analyst"]
+    trend_data = update["external_data"]["trend_prediction_analyst"]
+    assert market_data["get_manufacturing_pmi_data"] == "PMI 50.2"
+    assert trend_data["get_manufacturing_holiday_data"] == "国庆节"
+    assert "get_manufacturing_weather_data" not in trend_data
+    assert ("厦门天气数据", "失败") in progress.api_calls
+
+    # 5个工具各耗时0.3秒，并发执行总耗时应明显小于串行的1.5秒
+    print(f"   异步预取耗时: {elapsed:.2f}s")
+    assert elapsed < 1.0
+
+    print("✅ 异步数据预取正常")
+
+
+def test_async_analyst_uses_prefetched_data():
+    """测试异步分析师节点基于预取数据生成报告"""
+    print("📈 测试异步分析师节点")
+
+    toolkit = FakeToolkit()
+    prompts = []
+
+    class RecordingLLM(FakeListLLM):
+        async def ainvoke(self, input, config=None, **kwargs):
+            prompts.append(input)
+            return await super().ainvoke(input, config, **kwargs)
+
+    llm = RecordingLLM(responses=["趋势预测报告"])
+    factory = ReactAgentFactory(llm, toolkit)
+    state = _state()
+    state["external_data"] = {
+        "trend_prediction_analyst": {
+            "get_manufacturing_holiday_data": "国庆节",
+            "get_manufacturing_weather_data": "厦门晴",
+        }
+    }
+
+    node = create_trend_prediction_analyst_react(llm, toolkit, factory)
+    update = asyncio.run(node.anode(state))
+
+    assert update == {"trend_prediction_report": "趋势预测报告"}
+    assert len(prompts) == 1
+    assert "厦门晴" in prompts[0]
+    assert toolkit.get_manufacturing_weather_data.calls == []
+
+    print("✅ 异步分析师节点正常")
+
+
+def test_react_tool_arun():
+    """测试ReAct工具_arun调用toolkit的ainvoke并记录进度"""
+    print("🌤️ 测试ReAct工具异步调用")
+
+    toolkit = FakeToolkit()
+    factory = ReactAgentFactory(FakeListLLM(responses=["报告"]), toolkit)
+    tool = ManufacturingWeatherTool(toolkit=toolkit)
+    progress = RecordingProgress()
+    config = factory.build_run_config(_state(progress))
+
+    async def run():
+        with factory.run_context(config):
+            return await tool.ainvoke({"query": ""})
+
+    result = asyncio.run(run())
+
+    assert result == "厦门晴"
+    assert toolkit.get_manufacturing_weather_data.calls == [{"city_name": "厦门"}]
+    assert progress.api_calls == [("厦门天气数据", "调用中"), ("厦门天气数据", "成功")]
+
+    print("✅ ReAct工具异步调用正常")
+
+
+def test_async_coze_client_retries():
+    """测试异步Coze客户端退避重试"""
+    print("🔁 测试异步Coze客户端重试")
+
+    async def run():
+        client = AsyncCozeClient(max_concurrency=2, connect_timeout=5, read_timeout=60,
+                                 max_retries=3, backoff_factor=0.5)
+        request = httpx.Request("POST", "https://api.coze.cn/v1/workflow/run")
+        responses = [
+            httpx.ConnectError("connect", request=request),
+            httpx.Response(503, request=request),
+            httpx.Response(200, request=request),
+        ]
+        try:
+            with mock.patch.object(client.client, "post", side_effect=responses) as post, \
+                    mock.patch("manufacturingagents.dataflows.coze_client.random.uniform", return_value=0), \
+                    mock.patch("manufacturingagents.dataflows.coze_client.asyncio.sleep") as sleep:
+                response = await client.run_workflow("key", "wf", {"place": "厦门"})
+        finally:
+            await client.aclose()
+        return response, post, sleep
+
+    response, post, sleep = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert post.call_count == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [0.5, 1.0]
+    assert post.call_args.kwargs["json"] == {"workflow_id": "wf", "parameters": {"place": "厦门"}}
+
+    print("✅ 异步Coze客户端重试正常")
+
+
+def _fake_async_analyst(report_field, delay=0.3):
+    """模拟分析师：异步节点耗时delay秒后返回自己的报告字段"""
+    def factory(llm, toolkit, agent_factory=None):
+        def node(state):
+            time.sleep(delay)
+            return {report_field: f"{report_field}内容"}
+
+        async def anode(state):
+            await asyncio.sleep(delay)
+            return {report_field: f"{report_field}内容(异步)"}
+
+        return with_async_node(node, anode)
+    return factory
+
+
+def _fake_decision_node(llm, memory):
+    """模拟决策层节点：直接结束辩论并回传完整状态"""
+    def node(state):
+        debate_state = dict(state["decision_debate_state"])
+        debate_state["count"] = 4
+        debate_state["current_response"] = "谨慎决策顾问: 结束"
+        state["decision_debate_state"] = debate_state
+        return state
+    return node
+
+
+def test_graph_ainvoke():
+    """测试graph.ainvoke使用分析师的异步节点"""
+    print("⚡ 测试异步补货分析")
+
+    report_fields = [
+        "market_environment_report",
+        "trend_prediction_report",
+        "industry_news_report",
+        "consumer_insight_report",
+    ]
+    patches = [
+        mock.patch.object(react_graph_module.ManufacturingAgentsReactGraph, "_initialize_llm",
+                          lambda self: setattr(self, "llm", None)),
+        mock.patch.object(react_graph_module, "Toolkit", lambda config: None),
+        mock.patch.object(react_graph_module, "create_market_environment_analyst_react",
+                          _fake_async_analyst("market_environment_report")),
+        mock.patch.object(react_graph_module, "create_trend_prediction_analyst_react",
+                          _fake_async_analyst("trend_prediction_report")),
+        mock.patch.object(react_graph_module, "create_industry_news_analyst_react",
+                          _fake_async_analyst("industry_news_report")),
+        mock.patch.object(react_graph_module, "create_consumer_insight_analyst_react",
+                          _fake_async_analyst("consumer_insight_report")),
+        mock.patch.object(react_graph_module, "create_optimistic_advisor", _fake_decision_node),
+        mock.patch.object(react_graph_module, "create_cautious_advisor", _fake_decision_node),
+        mock.patch.object(react_graph_module, "create_decision_coordinator", _fake_decision_node),
+        mock.patch.object(react_graph_module, "create_risk_assessment_team", _fake_decision_node),
+        mock.patch.object(react_graph_module, "create_conclusion_extractor", _fake_decision_node),
+    ]
+    for patcher in patches:
+        patcher.start()
+    try:
+        graph = react_graph_module.ManufacturingAgentsReactGraph(
+            selected_analysts=[
+                "market_environment_analyst",
+                "trend_prediction_analyst",
+                "industry_news_analyst",
+                "consumer_insight_analyst",
+            ],
+            config={"parallel_analysts": True, "data_prefetch": False},
+        )
+    finally:
+        for patcher in patches:
+            patcher.stop()
+
+    start = time.time()
+    final_state = asyncio.run(graph.aanalyze_manufacturing_replenishment(
+        city_name="厦门",
+        brand_name="美的",
+        product_category="空调",
+        target_quarter="2025Q3",
+    ))
+    elapsed = time.time() - start
+
+    for field in report_fields:
+        assert final_state[field] == f"{field}内容(异步)", f"{field} 未使用异步节点"
+
+    print(f"   异步执行耗时: {elapsed:.2f}s")
+    assert elapsed < 1.0
+
+    print("✅ 异步补货分析正常")
+
+
+if __name__ == "__main__":
+    test_toolkit_tools_have_coroutines()
+    test_async_prefetch_runs_concurrently()
+    test_async_analyst_uses_prefetched_data()
+    test_react_tool_arun()
+    test_async_coze_client_retries()
+    test_graph_ainvoke()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量补货分析测试
+验证批量任务共享已编译的图、上游数据去重、并发受限并按完成顺序返回结果
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.language_models.fake import FakeListLLM
+
+import manufacturingagents.manufacturingagents.graph.manufacturing_graph_react as react_graph_module
+from manufacturingagents.manufacturingagents.utils.data_prefetch import SharedPrefetchStore
+
+
+class CountingTool:
+    """记录调用参数的toolkit工具"""
+
+    def __init__(self, result, delay=0.05):
+        self.result = result
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def invoke(self, params):
+        with self._lock:
+            self.calls.append(params)
+        time.sleep(self.delay)
+        return self.result
+
+    async def ainvoke(self, params):
+        with self._lock:
+            self.calls.append(params)
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+class FakeToolkit:
+    def __init__(self, config=None):
+        self.get_manufacturing_pmi_data = CountingTool("PMI 50.2")
+        self.get_manufacturing_ppi_data = CountingTool("PPI -0.8")
+        self.get_manufacturing_commodity_data = CountingTool("铜价 78000")
+        self.get_manufacturing_holiday_data = CountingTool("国庆节")
+        self.get_manufacturing_weather_data = CountingTool("晴")
+
+
+def _fake_decision_node(llm, memory):
+    """模拟决策层节点：直接结束辩论并回传完整状态"""
+    def node(state):
+        debate_state = dict(state["decision_debate_state"])
+        debate_state["count"] = 4
+        debate_state["current_response"] = "谨慎决策顾问: 结束"
+        state["decision_debate_state"] = debate_state
+        return state
+    return node
+
+
+def _build_graph():
+    patches = [
+        mock.patch.object(react_graph_module.ManufacturingAgentsReactGraph, "_initialize_llm",
+                          lambda self: setattr(self, "llm", FakeListLLM(responses=["分析报告"]))),
+        mock.patch.object(react_graph_module, "Toolkit", FakeToolkit),
+        mock.patch.object(react_graph_module, "create_optimistic_advisor", _fake_decision_node),
+        mock.patch.object(react_graph_module, "create_cautious_advisor", _fake_decision_node),
+        mock.patch.object(react_graph_module, "create_decision_coordinator", _fake_decision_node),
+        mock.patch.object(react_graph_module, "create_risk_assessment_team", _fake_decision_node),
+        mock.patch.object(react_graph_module, "create_conclusion_extractor", _fake_decision_node),
+    ]
+    for patcher in patches:
+        patcher.start()
+    try:
+        return react_graph_module.ManufacturingAgentsReactGraph(
+            selected_analysts=["market_environment_analyst", "trend_prediction_analyst"],
+            config={"parallel_analysts": True},
+        )
+    finally:
+        for patcher in patches:
+            patcher.stop()
+
+
+JOBS = [
+    {"city_name": "厦门", "brand_name": "美的", "product_category": "空调", "target_quarter": "2025Q3"},
+    {"city_name": "厦门", "brand_name": "格力", "product_category": "空调", "target_quarter": "2025Q3"},
+    {"city_name": "广州", "brand_name": "美的", "product_category": "冰箱", "target_quarter": "2025Q3"},
+    {"city_name": "广州", "brand_name": "海尔", "product_category": "洗衣机", "target_quarter": "2025Q4"},
+]
+
+
+def test_shared_prefetch_store():
+    """测试共享预取数据：成功结果复用，失败结果不保存"""
+    print("📦 测试共享预取数据")
+
+    store = SharedPrefetchStore()
+    fetch = mock.Mock(return_value="PMI 50.2")
+    assert store.get_or_fetch(("pmi",), fetch) == "PMI 50.2"
+    assert store.get_or_fetch(("pmi",), fetch) == "PMI 50.2"
+    assert fetch.call_count == 1
+    assert (store.fetches, store.hits) == (1, 1)
+
+    failing = mock.Mock(side_effect=RuntimeError("接口超时"))
+    for _ in range(2):
+        try:
+            store.get_or_fetch(("weather", "厦门"), failing)
+            assert False, "获取失败应抛出异常"
+        except RuntimeError:
+            pass
+    assert failing.call_count == 2
+    assert len(store) == 1
+
+    print("✅ 共享预取数据正常")
+
+
+def test_batch_dedupes_upstream_data():
+    """测试批量分析共享图并对上游数据去重，结果按完成顺序流式返回"""
+    print("🏭 测试批量补货分析")
+
+    graph = _build_graph()
+    compiled_graph = graph.graph
+    results = graph.batch_analyze_replenishment(JOBS, max_concurrency=2)
+    assert not isinstance(results, list)
+    results = list(results)
+
+    assert graph.graph is compiled_graph
+    assert sorted(result["index"] for result in results) == [0, 1, 2, 3]
+    for result in results:
+        assert result["success"], result["error"]
+        state = result["state"]
+        assert state["market_environment_report"] == "分析报告"
+        assert state["trend_prediction_report"] == "分析报告"
+        assert state["city_name"] == result["job"]["city_name"]
+
+    toolkit = graph.toolkit
+    # 全局数据整批只获取一次，天气按城市获取
+    assert len(toolkit.get_manufacturing_pmi_data.calls) == 1
+    assert len(toolkit.get_manufacturing_ppi_data.calls) == 1
+    assert len(toolkit.get_manufacturing_commodity_data.calls) == 1
+    assert len(toolkit.get_manufacturing_holiday_data.calls) == 1
+    assert sorted(call["city_name"] for call in toolkit.get_manufacturing_weather_data.calls) == ["厦门", "广州"]
+
+    print("✅ 批量补货分析正常")
+
+
+def test_batch_reports_failed_jobs():
+    """测试单个任务失败不影响其他任务"""
+    print("❌ 测试批量分析任务失败")
+
+    graph = _build_graph()
+    jobs = JOBS[:2] + [{"city_name": "厦门", "brand_name": "美的"}]
+    results = {result["index"]: result for result in graph.batch_analyze_replenishment(jobs)}
+
+    assert results[0]["success"] and results[1]["success"]
+    assert not results[2]["success"]
+    assert "product_category" in results[2]["error"]
+
+    print("✅ 批量分析任务失败处理正常")
+
+
+def test_async_batch():
+    """测试异步批量分析"""
+    print("⚡ 测试异步批量补货分析")
+
+    graph = _build_graph()
+
+    async def run():
+        return [result async for result in graph.abatch_analyze_replenishment(JOBS, max_concurrency=2)]
+
+    results = asyncio.run(run())
+
+    assert sorted(result["index"] for result in results) == [0, 1, 2, 3]
+    assert all(result["success"] for result in results)
+    assert len(graph.toolkit.get_manufacturing_pmi_data.calls) == 1
+    assert len(graph.toolkit.get_manufacturing_weather_data.calls) == 2
+
+    print("✅ 异步批量补货分析正常")
+
+
+if __name__ == "__main__":
+    test_shared_prefetch_store()
+    test_batch_dedupes_upstream_data()
+    test_batch_reports_failed_jobs()
+    test_async_batch()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业图检查点测试
+验证失败的分析按thread_id从最后完成的节点恢复，进度追踪器不写入检查点
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import manufacturingagents.manufacturingagents.graph.manufacturing_graph_react as react_graph_module
+from manufacturingagents.manufacturingagents.utils.checkpointing import (
+    FileCheckpointSaver,
+    create_checkpointer,
+)
+from manufacturingagents.manufacturingagents.utils.manufacturing_states import get_progress_callback
+
+
+class RecordingProgress:
+    def __init__(self):
+        self.phases = []
+
+    def log_decision_phase(self, phase):
+        self.phases.append(phase)
+
+    def __call__(self, message, step=None, total_steps=None):
+        pass
+
+
+def _build_graph(checkpoint_path, calls, fail_risk):
+    def fake_analyst(llm, toolkit, agent_factory=None):
+        def node(state):
+            calls.append("analyst")
+            return {"market_environment_report": "市场环境报告"}
+        return node
+
+    def fake_decision_node(llm, memory):
+        def node(state):
+            calls.append("decision")
+            debate_state = dict(state["decision_debate_state"])
+            debate_state["count"] = 4
+            debate_state["current_response"] = "谨慎决策顾问: 结束"
+            return {"decision_debate_state": debate_state}
+        return node
+
+    def fake_risk_node(llm, memory):
+        def node(state, config=None):
+            calls.append("risk")
+            if fail_risk:
+                raise RuntimeError("风险评估LLM调用超时")
+            get_progress_callback(state, config).log_decision_phase("风险评估")
+            return {"risk_assessment_report": "风险可控"}
+        return node
+
+    patches = [
+        mock.patch.object(react_graph_module.ManufacturingAgentsReactGraph, "_initialize_llm",
+                          lambda self: setattr(self, "llm", None)),
+        mock.patch.object(react_graph_module, "Toolkit", lambda config: None),
+        mock.patch.object(react_graph_module, "create_market_environment_analyst_react", fake_analyst),
+        mock.patch.object(react_graph_module, "create_optimistic_advisor", fake_decision_node),
+        mock.patch.object(react_graph_module, "create_cautious_advisor", fake_decision_node),
+        mock.patch.object(react_graph_module, "create_decision_coordinator", fake_decision_node),
+        mock.patch.object(react_graph_module, "create_risk_assessment_team", fake_risk_node),
+        mock.patch.object(react_graph_module, "create_conclusion_extractor", fake_decision_node),
+    ]
+    for patcher in patches:
+        patcher.start()
+    try:
+        return react_graph_module.ManufacturingAgentsReactGraph(
+            selected_analysts=["market_environment_analyst"],
+            config={
+                "data_prefetch": False,
+                "checkpoint_backend": "file",
+                "checkpoint_path": checkpoint_path,
+            },
+        )
+    finally:
+        for patcher in patches:
+            patcher.stop()
+
+
+def _analyze(graph, progress, thread_id=None):
+    return graph.analyze_manufacturing_replenishment(
+        city_name="厦门",
+        brand_name="美的",
+        product_category="空调",
+        target_quarter="2025Q3",
+        progress_callback=progress,
+        thread_id=thread_id,
+    )
+
+
+def test_create_checkpointer():
+    """测试检查点存储配置"""
+    print("💾 测试检查点存储配置")
+
+    assert create_checkpointer({}) is None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        saver = create_checkpointer({"checkpoint_backend": "file", "results_dir": tmp_dir})
+        assert isinstance(saver, FileCheckpointSaver)
+        assert saver.path == os.path.join(tmp_dir, "checkpoints", "manufacturing_graph.pkl")
+
+        # 未安装SQLite检查点依赖时回退到文件存储
+        saver = create_checkpointer({"checkpoint_backend": "sqlite", "results_dir": tmp_dir})
+        assert saver is not None
+
+    try:
+        create_checkpointer({"checkpoint_backend": "redis"})
+        assert False, "不支持的存储类型应抛出异常"
+    except ValueError:
+        pass
+
+    print("✅ 检查点存储配置正常")
+
+
+def test_failed_run_resumes_from_last_node():
+    """测试风险评估失败后按thread_id恢复，已完成的分析师节点不再执行"""
+    print("🔁 测试检查点恢复")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint_path = os.path.join(tmp_dir, "graph.pkl")
+
+        calls = []
+        graph = _build_graph(checkpoint_path, calls, fail_risk=True)
+        failed_state = _analyze(graph, RecordingProgress())
+
+        thread_id = failed_state["thread_id"]
+        assert failed_state["market_environment_report"] == "市场环境报告"
+        assert calls.count("analyst") == 1 and calls[-1] == "risk"
+
+        # 持久化的状态中不包含进度追踪器
+        saver = FileCheckpointSaver(checkpoint_path)
+        checkpoint = saver.get_tuple({"configurable": {"thread_id": thread_id}}).checkpoint
+        assert checkpoint["channel_values"]["market_environment_report"] == "市场环境报告"
+        assert "progress_callback" not in checkpoint["channel_values"]
+
+        # 新进程（新图实例）按thread_id恢复
+        resumed_calls = []
+        resumed_graph = _build_graph(checkpoint_path, resumed_calls, fail_risk=False)
+        progress = RecordingProgress()
+        final_state = _analyze(resumed_graph, progress, thread_id=thread_id)
+
+        assert resumed_calls == ["risk", "decision"]
+        assert final_state["risk_assessment_report"] == "风险可控"
+        assert final_state["market_environment_report"] == "市场环境报告"
+        assert final_state["thread_id"] == thread_id
+        assert progress.phases == ["风险评估"]
+
+    print("✅ 检查点恢复正常")
+
+
+def test_file_saver_persists_per_thread():
+    """测试文件检查点按线程追加写入，设置保留天数时过期线程被清理"""
+    print("🗂️ 测试按线程保存检查点")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint_path = os.path.join(tmp_dir, "graph.pkl")
+        calls = []
+        first = _analyze(_build_graph(checkpoint_path, calls, fail_risk=True), RecordingProgress())
+        second = _analyze(_build_graph(checkpoint_path, calls, fail_risk=True), RecordingProgress())
+
+        saver = FileCheckpointSaver(checkpoint_path)
+        first_file = saver._thread_path(first["thread_id"])
+        second_file = saver._thread_path(second["thread_id"])
+        assert os.path.exists(first_file) and os.path.exists(second_file)
+        assert not os.path.exists(checkpoint_path)
+
+        # 写入只追加到本线程的文件，不重写其他线程
+        first_size, first_mtime = os.path.getsize(first_file), os.stat(first_file).st_mtime_ns
+        second_size = os.path.getsize(second_file)
+        config = {"configurable": {"thread_id": second["thread_id"]}}
+        latest = saver.get_tuple(config)
+        saver.put(latest.config, latest.checkpoint, latest.metadata, {})
+        assert os.stat(first_file).st_mtime_ns == first_mtime and os.path.getsize(first_file) == first_size
+        assert second_size < os.path.getsize(second_file) < second_size * 2
+        assert first["thread_id"] not in saver.storage
+
+        # 默认不清理线程文件
+        old = time.time() - 8 * 86400
+        os.utime(first_file, (old, old))
+        FileCheckpointSaver(checkpoint_path)
+        assert os.path.exists(first_file)
+
+        # 设置保留天数后，超过保留天数未更新的线程文件被清理
+        saver = FileCheckpointSaver(checkpoint_path, retention_days=7)
+        assert not os.path.exists(first_file) and os.path.exists(second_file)
+        assert saver.get_tuple({"configurable": {"thread_id": first["thread_id"]}}) is None
+
+    print("✅ 按线程保存检查点正常")
+
+
+if __name__ == "__main__":
+    test_create_checkpointer()
+    test_failed_run_resumes_from_last_node()
+    test_file_saver_persists_per_thread()
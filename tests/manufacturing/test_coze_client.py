@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Coze工作流客户端测试
+验证连接复用、退避重试、并发限制和超时设置
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import requests
+
+from manufacturingagents.dataflows.coze_client import CozeClient
+
+
+def _response(status_code, headers=None):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+def _client(**kwargs):
+    params = dict(max_concurrency=2, connect_timeout=5, read_timeout=60, max_retries=3, backoff_factor=0.5)
+    params.update(kwargs)
+    return CozeClient(**params)
+
+
+def test_retry_on_server_errors():
+    """测试429/5xx时指数退避重试，并优先使用Retry-After"""
+    print("🔁 测试退避重试")
+
+    client = _client()
+    responses = [_response(503), _response(429, {"Retry-After": "2"}), _response(200)]
+
+    with mock.patch.object(client.session, "post", side_effect=responses) as post, \
+            mock.patch("manufacturingagents.dataflows.coze_client.random.uniform", return_value=0), \
+            mock.patch("manufacturingagents.dataflows.coze_client.time.sleep") as sleep:
+        response = client.run_workflow("key", "wf", {"place": "厦门"})
+
+    assert response.status_code == 200
+    assert post.call_count == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [0.5, 2.0]
+    assert post.call_args.kwargs["timeout"] == (5, 60)
+    assert post.call_args.kwargs["json"] == {"workflow_id": "wf", "parameters": {"place": "厦门"}}
+
+    print("✅ 退避重试正常")
+
+
+def test_retries_exhausted_and_client_errors():
+    """测试重试耗尽返回最后响应，4xx不重试"""
+    print("🛑 测试重试上限")
+
+    client = _client(max_retries=2)
+    with mock.patch.object(client.session, "post", return_value=_response(502)) as post, \
+            mock.patch("manufacturingagents.dataflows.coze_client.time.sleep"):
+        assert client.run_workflow("key", "wf", {}).status_code == 502
+    assert post.call_count == 3
+
+    with mock.patch.object(client.session, "post", return_value=_response(401)) as post:
+        assert client.run_workflow("key", "wf", {}).status_code == 401
+    assert post.call_count == 1
+
+    print("✅ 重试上限正常")
+
+
+def test_connection_errors_retried_read_timeout_not():
+    """测试连接失败重试，读取超时直接抛出"""
+    print("🔌 测试连接异常处理")
+
+    client = _client()
+    with mock.patch.object(
+        client.session, "post",
+        side_effect=[requests.exceptions.ConnectTimeout("connect"), _response(200)],
+    ) as post, mock.patch("manufacturingagents.dataflows.coze_client.time.sleep"):
+        assert client.run_workflow("key", "wf", {}).status_code == 200
+    assert post.call_count == 2
+
+    with mock.patch.object(
+        client.session, "post", side_effect=requests.exceptions.ReadTimeout("read")
+    ) as post:
+        try:
+            client.run_workflow("key", "wf", {})
+            assert False, "读取超时应抛出异常"
+        except requests.exceptions.ReadTimeout:
+            pass
+    assert post.call_count == 1
+
+    print("✅ 连接异常处理正常")
+
+
+def test_concurrency_is_bounded():
+    """测试同时进行的工作流调用不超过并发上限"""
+    print("🚦 测试并发限制")
+
+    client = _client(max_concurrency=2)
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def slow_post(*args, **kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return _response(200)
+
+    with mock.patch.object(client.session, "post", side_effect=slow_post):
+        threads = [threading.Thread(target=client.run_workflow, args=("key", "wf", {})) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert peak[0] == 2
+
+    print("✅ 并发限制正常")
+
+
+if __name__ == "__main__":
+    test_retry_on_server_errors()
+    test_retries_exhausted_and_client_errors()
+    test_connection_errors_retried_read_timeout_not()
+    test_concurrency_is_bounded()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业数据预取测试
+验证数据预取节点并发获取外部数据，分析师基于预取数据直接生成报告
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.language_models.fake import FakeListLLM
+
+from manufacturingagents.manufacturingagents.analysts.react_agent_factory import ReactAgentFactory
+from manufacturingagents.manufacturingagents.analysts.trend_prediction_analyst_react import (
+    create_trend_prediction_analyst_react,
+)
+from manufacturingagents.manufacturingagents.utils.data_prefetch import create_data_prefetch, SharedPrefetchStore
+
+
+class SlowTool:
+    """模拟耗时的toolkit工具"""
+
+    def __init__(self, result, delay=0.3, fail=False):
+        self.result = result
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def invoke(self, params):
+        self.calls.append(params)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("接口超时")
+        return self.result
+
+    async def ainvoke(self, params):
+        return self.invoke(params)
+
+
+class FakeToolkit:
+    def __init__(self, fail_weather=False, weather_result="厦门晴"):
+        self.get_manufacturing_pmi_data = SlowTool("PMI 50.2")
+        self.get_manufacturing_ppi_data = SlowTool("PPI -0.8")
+        self.get_manufacturing_commodity_data = SlowTool("铜价 78000")
+        self.get_manufacturing_holiday_data = SlowTool("国庆节")
+        self.get_manufacturing_weather_data = SlowTool(weather_result, fail=fail_weather)
+
+
+class RecordingProgress:
+    def __init__(self):
+        self.api_calls = []
+        self.events = []
+
+    def log_api_call(self, api_name, status="调用中"):
+        self.api_calls.append((api_name, status))
+
+    def log_event(self, event_type, message):
+        self.events.append((event_type, message))
+
+
+def _state(progress=None):
+    return {
+        "city_name": "厦门",
+        "product_type": "空调",
+        "company_name": "美的",
+        "analysis_date": "2025-07-01",
+        "target_quarter": "2025Q3",
+        "external_data": {},
+        "progress_callback": progress,
+    }
+
+
+def test_prefetch_runs_concurrently():
+    """测试数据预取并发执行并写入external_data"""
+    print("📦 测试数据预取并发执行")
+
+    toolkit = FakeToolkit()
+    factory = ReactAgentFactory(FakeListLLM(responses=["报告"]), toolkit)
+    prefetch_node = create_data_prefetch(
+        factory, ["market_environment_analyst", "trend_prediction_analyst"]
+    )
+
+    progress = RecordingProgress()
+    start = time.time()
+    update = prefetch_node(_state(progress))
+    elapsed = time.time() - start
+
+    market_data = update["external_data"]["market_environment_analyst"]
+    trend_data = update["external_data"]["trend_prediction_analyst"]
+    assert market_data["get_manufacturing_pmi_data"] == "PMI 50.2"
+    assert market_data["get_manufacturing_commodity_data"] == "铜价 78000"
+    assert trend_data["get_manufacturing_weather_data"] == "厦门晴"
+    assert toolkit.get_manufacturing_weather_data.calls == [{"city_name": "厦门"}]
+    assert ("厦门天气数据", "成功") in progress.api_calls
+
+    # 5个工具各耗时0.3秒，并发执行总耗时应明显小于串行的1.5秒
+    print(f"   预取耗时: {elapsed:.2f}s")
+    assert elapsed < 1.0
+
+    print("✅ 数据预取并发执行正常")
+
+
+def test_failed_prefetch_is_omitted():
+    """测试预取失败的数据不写入，分析师回退到ReAct模式"""
+    print("📦 测试预取失败处理")
+
+    factory = ReactAgentFactory(FakeListLLM(responses=["报告"]), FakeToolkit(fail_weather=True))
+    prefetch_node = create_data_prefetch(factory, ["trend_prediction_analyst"])
+
+    progress = RecordingProgress()
+    update = prefetch_node(_state(progress))
+    trend_data = update["external_data"]["trend_prediction_analyst"]
+
+    assert "get_manufacturing_weather_data" not in trend_data
+    assert ("厦门天气数据", "失败") in progress.api_calls
+    assert factory.get_prefetched("trend_prediction_analyst", update) is None
+
+    print("✅ 预取失败处理正常")
+
+
+def test_error_result_is_omitted():
+    """测试工具返回错误消息（toolkit捕获异常）时视为预取失败，不写入结果也不保存到共享数据"""
+    print("📦 测试预取错误消息处理")
+
+    toolkit = FakeToolkit(weather_result="❌ 天气数据获取失败: 接口超时")
+    factory = ReactAgentFactory(FakeListLLM(responses=["报告"]), toolkit)
+    prefetch_node = create_data_prefetch(factory, ["trend_prediction_analyst"])
+    store = SharedPrefetchStore()
+
+    progress = RecordingProgress()
+    update = prefetch_node(_state(progress), {"configurable": {"shared_data": store}})
+    trend_data = update["external_data"]["trend_prediction_analyst"]
+    assert "get_manufacturing_weather_data" not in trend_data
+    assert trend_data["get_manufacturing_holiday_data"] == "国庆节"
+    assert ("厦门天气数据", "失败") in progress.api_calls
+    assert factory.get_prefetched("trend_prediction_analyst", update) is None
+
+    # 共享数据只保存成功的节假日数据，下一次分析重新获取天气
+    assert len(store) == 1
+    async_update = asyncio.run(prefetch_node.anode(_state(), {"configurable": {"shared_data": store}}))
+    assert "get_manufacturing_weather_data" not in async_update["external_data"]["trend_prediction_analyst"]
+    assert len(toolkit.get_manufacturing_weather_data.calls) == 2
+    assert len(toolkit.get_manufacturing_holiday_data.calls) == 1
+
+    print("✅ 预取错误消息处理正常")
+
+
+def test_payload_mentioning_failure_is_kept():
+    """测试正常数据中出现"失败"、"错误"等字样时仍作为预取数据使用"""
+    print("📦 测试含失败字样的正常数据")
+
+    weather = "厦门晴，此前台风登陆预报失败，气象台已纠正错误"
+    toolkit = FakeToolkit(weather_result=weather)
+    factory = ReactAgentFactory(FakeListLLM(responses=["报告"]), toolkit)
+    prefetch_node = create_data_prefetch(factory, ["trend_prediction_analyst"])
+    store = SharedPrefetchStore()
+
+    progress = RecordingProgress()
+    update = prefetch_node(_state(progress), {"configurable": {"shared_data": store}})
+    trend_data = update["external_data"]["trend_prediction_analyst"]
+    assert trend_data["get_manufacturing_weather_data"] == weather
+    assert ("厦门天气数据", "成功") in progress.api_calls
+    assert factory.get_prefetched("trend_prediction_analyst", update) is not None
+    assert len(store) == 2
+
+    print("✅ 含失败字样的正常数据正确使用")
+
+
+def test_analyst_uses_prefetched_data():
+    """测试分析师基于预取数据直接生成报告，不再调用工具"""
+    print("📈 测试分析师使用预取数据")
+
+    toolkit = FakeToolkit()
+    prompts = []
+
+    class RecordingLLM(FakeListLLM):
+        def invoke(self, input, config=None, **kwargs):
+            prompts.append(input)
+            return super().invoke(input, config, **kwargs)
+
+    llm = RecordingLLM(responses=["趋势预测报告"])
+    factory = ReactAgentFactory(llm, toolkit)
+    state = _state()
+    state["external_data"] = {
+        "trend_prediction_analyst": {
+            "get_manufacturing_holiday_data": "国庆节",
+            "get_manufacturing_weather_data": "厦门晴",
+        }
+    }
+
+    node = create_trend_prediction_analyst_react(llm, toolkit, factory)
+    update = node(state)
+
+    assert update == {"trend_prediction_report": "趋势预测报告"}
+    assert len(prompts) == 1
+    assert "预取数据" in prompts[0] and "厦门晴" in prompts[0]
+    assert toolkit.get_manufacturing_weather_data.calls == []
+
+    print("✅ 分析师使用预取数据正常")
+
+
+if __name__ == "__main__":
+    test_prefetch_runs_concurrently()
+    test_failed_prefetch_is_omitted()
+    test_error_result_is_omitted()
+    test_payload_mentioning_failure_is_kept()
+    test_analyst_uses_prefetched_data()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业外部数据缓存测试
+验证缓存键稳定、按数据类型设置TTL，重复分析不再调用外部API
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from manufacturingagents.dataflows import interface
+from manufacturingagents.dataflows import manufacturing_cache
+from manufacturingagents.dataflows.cache_manager import StockDataCache
+from manufacturingagents.dataflows.manufacturing_cache import (
+    cached_manufacturing_data,
+    get_manufacturing_ttl,
+    make_manufacturing_cache_key,
+)
+
+
+def _coze_response(data):
+    response = mock.Mock()
+    response.status_code = 200
+    response.json.return_value = {"code": 0, "data": json.dumps(data, ensure_ascii=False)}
+    return response
+
+
+def test_cache_key_is_stable():
+    """测试缓存键与参数顺序无关，且不依赖进程级hash()"""
+    print("🔑 测试缓存键稳定性")
+
+    key1 = make_manufacturing_cache_key("weather", {"place": "厦门", "dailyForecast": True})
+    key2 = make_manufacturing_cache_key("weather", {"dailyForecast": True, "place": "厦门"})
+    key3 = make_manufacturing_cache_key("weather", {"dailyForecast": True, "place": "广州"})
+
+    assert key1 == key2
+    assert key1 != key3
+    assert key1.startswith("manufacturing_weather_")
+    assert key1 == "manufacturing_weather_" + hashlib.sha256(
+        'weather|{"dailyForecast": true, "place": "厦门"}'.encode("utf-8")
+    ).hexdigest()[:32]
+
+    print("✅ 缓存键稳定")
+
+
+def test_ttl_by_data_type():
+    """测试不同数据类型的TTL"""
+    print("⏱️ 测试数据类型TTL")
+
+    now = datetime(2025, 7, 15, 12, 0, 0)
+    assert get_manufacturing_ttl("weather", now) == 3600
+    assert get_manufacturing_ttl("pmi", now) == int((datetime(2025, 8, 1) - now).total_seconds())
+    assert get_manufacturing_ttl("ppi", datetime(2025, 12, 20)) == int(timedelta(days=12).total_seconds())
+    assert get_manufacturing_ttl("holiday", now) == int((datetime(2026, 1, 1) - now).total_seconds())
+    # 临近周期边界时至少保留1小时
+    assert get_manufacturing_ttl("pmi", datetime(2025, 7, 31, 23, 59, 0)) == 3600
+
+    print("✅ 数据类型TTL正常")
+
+
+def test_weather_interface_uses_cache():
+    """测试重复获取同一城市天气只调用一次Coze API"""
+    print("🌤️ 测试天气接口读穿透缓存")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = StockDataCache(cache_dir)
+        with mock.patch.object(manufacturing_cache, "_get_cache", return_value=cache), \
+                mock.patch.dict(os.environ, {"COZE_API_KEY": "test-key", "MANUFACTURING_CACHE_ENABLED": "true"}), \
+                mock.patch("requests.Session.post", return_value=_coze_response({"forecast": "晴"})) as post:
+            first = interface.get_manufacturing_weather_interface("厦门", "2025-07-01")
+            second = interface.get_manufacturing_weather_interface("厦门", "2025-07-02")
+            interface.get_manufacturing_weather_interface("广州", "2025-07-01")
+
+        assert post.call_count == 2
+        assert "晴" in first and "晴" in second
+        assert "(2025-07-02)" in second
+
+    print("✅ 天气接口缓存正常")
+
+
+def test_api_errors_are_not_cached():
+    """测试API错误不写入缓存"""
+    print("❌ 测试错误结果不缓存")
+
+    error_response = mock.Mock()
+    error_response.status_code = 401
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = StockDataCache(cache_dir)
+        with mock.patch.object(manufacturing_cache, "_get_cache", return_value=cache), \
+                mock.patch.dict(os.environ, {"COZE_API_KEY": "test-key", "MANUFACTURING_CACHE_ENABLED": "true"}), \
+                mock.patch("requests.Session.post", return_value=error_response) as post:
+            first = interface.get_manufacturing_holiday_interface("2025-07到2025-10")
+            second = interface.get_manufacturing_holiday_interface("2025-07到2025-10")
+
+        assert first == "❌ 节假日API调用失败: HTTP 401"
+        assert second == first
+        assert post.call_count == 2
+
+    print("✅ 错误结果未缓存")
+
+
+def test_expired_entries_are_refetched():
+    """测试过期缓存重新获取，空DataFrame不缓存"""
+    print("🕒 测试缓存过期")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = StockDataCache(cache_dir)
+        fetch = mock.Mock(return_value=pd.DataFrame({"month": ["202506"], "pmi010000": [49.7]}))
+
+        cached_manufacturing_data("weather", {"place": "厦门"}, fetch, cache=cache)
+        cached_manufacturing_data("weather", {"place": "厦门"}, fetch, cache=cache)
+        assert fetch.call_count == 1
+
+        # 将缓存时间回拨到TTL之前
+        cache_key = make_manufacturing_cache_key("weather", {"place": "厦门"})
+        metadata = cache._load_metadata(cache_key)
+        metadata["cached_at"] = (datetime.now() - timedelta(hours=2)).isoformat()
+        with open(cache._get_metadata_path(cache_key), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+        result = cached_manufacturing_data("weather", {"place": "厦门"}, fetch, cache=cache)
+        assert fetch.call_count == 2
+        assert result["pmi010000"].tolist() == [49.7]
+
+        empty_fetch = mock.Mock(return_value=pd.DataFrame())
+        cached_manufacturing_data("pmi", {"start_m": "202501"}, empty_fetch, cache=cache)
+        cached_manufacturing_data("pmi", {"start_m": "202501"}, empty_fetch, cache=cache)
+        assert empty_fetch.call_count == 2
+
+    print("✅ 缓存过期处理正常")
+
+
+if __name__ == "__main__":
+    test_cache_key_is_stable()
+    test_ttl_by_data_type()
+    test_weather_interface_uses_cache()
+    test_api_errors_are_not_cached()
+    test_expired_entries_are_refetched()
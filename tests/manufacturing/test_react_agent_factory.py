@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业ReAct智能体工厂测试
+验证Agent只构建一次，单次运行参数通过运行配置传入工具
+"""
+
+import sys
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.language_models.fake import FakeListLLM
+
+from manufacturingagents.manufacturingagents.analysts.react_agent_factory import ReactAgentFactory
+from manufacturingagents.manufacturingagents.prompts.prompt_manager import prompt_manager
+
+
+class FakeWeatherTool:
+    """模拟toolkit中的天气工具，记录调用参数"""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, params):
+        self.calls.append(params)
+        return f"{params['city_name']}天气晴"
+
+
+class FakeToolkit:
+    def __init__(self):
+        self.get_manufacturing_weather_data = FakeWeatherTool()
+        self.get_manufacturing_holiday_data = mock.Mock()
+        self.get_manufacturing_holiday_data.invoke.return_value = "国庆节"
+
+
+class RecordingProgress:
+    def __init__(self):
+        self.api_calls = []
+
+    def log_api_call(self, api_name, status="调用中"):
+        self.api_calls.append((api_name, status))
+
+
+def _fake_llm():
+    return FakeListLLM(responses=[
+        "Thought: 需要天气数据\nAction: get_manufacturing_weather_data\nAction Input: ",
+        "Final Answer: 天气报告",
+    ] * 4)
+
+
+def test_executor_built_once():
+    """测试同一分析师的Agent只创建一次"""
+    print("🏗️ 测试Agent缓存")
+
+    factory = ReactAgentFactory(_fake_llm(), FakeToolkit())
+    factory.build(["trend_prediction_analyst", "trend_prediction_analyst"])
+    first = factory.get_executor("trend_prediction_analyst")
+    second = factory.get_executor("trend_prediction_analyst")
+
+    assert first is second
+    assert factory.get_prompt() is prompt_manager.get_react_prompt()
+
+    print("✅ Agent缓存正常")
+
+
+def test_run_config_reaches_tools():
+    """测试运行配置中的城市和进度追踪器传递到工具"""
+    print("🔧 测试运行配置传递")
+
+    toolkit = FakeToolkit()
+    factory = ReactAgentFactory(_fake_llm(), toolkit)
+
+    for city in ("厦门", "广州"):
+        progress = RecordingProgress()
+        state = {"city_name": city, "product_type": "空调", "progress_callback": progress}
+        run_config = factory.build_run_config(state)
+        result = factory.invoke("trend_prediction_analyst", "分析天气", run_config)
+
+        assert result["output"] == "天气报告"
+        assert toolkit.get_manufacturing_weather_data.calls[-1] == {"city_name": city}
+        assert (f"{city}天气数据", "成功") in progress.api_calls
+
+    print("✅ 运行配置传递正常")
+
+
+def test_build_run_config_prefers_explicit_configurable():
+    """测试图运行配置中的参数优先于状态"""
+    run_config = ReactAgentFactory.build_run_config(
+        {"city_name": "厦门", "product_type": "空调"},
+        {"configurable": {"city_name": "深圳"}, "tags": ["test"]},
+    )
+
+    assert run_config["configurable"]["city_name"] == "深圳"
+    assert run_config["configurable"]["product_type"] == "空调"
+    assert run_config["tags"] == ["test"]
+
+
+def test_local_react_prompt():
+    """测试本地ReAct提示词模板可离线加载并提供内容哈希"""
+    print("📝 测试本地ReAct提示词")
+
+    react_prompt = prompt_manager.get_react_prompt()
+
+    assert set(react_prompt.input_variables) == {"tools", "tool_names", "input", "agent_scratchpad"}
+    assert react_prompt is prompt_manager.get_react_prompt()
+    assert react_prompt.metadata["content_hash"] == prompt_manager.get_prompt_hash("react_agent")
+    assert prompt_manager.get_prompt_hash("不存在的提示词") is None
+
+    print("✅ 本地ReAct提示词正常")
+
+
+if __name__ == "__main__":
+    test_executor_built_once()
+    test_run_config_reaches_tools()
+    test_build_run_config_prefers_explicit_configurable()
+    test_local_react_prompt()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单飞请求合并测试
+验证并发的相同外部请求只执行一次调用并共享结果
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from manufacturingagents.dataflows import interface
+from manufacturingagents.dataflows.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def _run_threads(target, count):
+    results = [None] * count
+
+    def worker(index):
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_threads_share_one_call():
+    """测试多线程并发的相同请求只执行一次"""
+    print("🔗 测试线程单飞合并")
+
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"pmi": 50.2}
+
+    results = _run_threads(lambda: flight.do("pmi", fetch), 8)
+
+    assert len(calls) == 1
+    assert all(result == {"pmi": 50.2} for result in results)
+    assert flight.in_flight() == 0
+
+    # 调用完成后不保留结果，再次请求会重新执行
+    flight.do("pmi", fetch)
+    assert len(calls) == 2
+
+    print("✅ 线程单飞合并正常")
+
+
+def test_errors_are_shared_and_not_retained():
+    """测试异常传递给所有等待方，且不影响后续请求"""
+    print("❌ 测试单飞异常传递")
+
+    flight = SingleFlight()
+    calls = []
+
+    def failing_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("接口超时")
+
+    def call():
+        try:
+            flight.do("weather", failing_fetch)
+        except RuntimeError as e:
+            return str(e)
+
+    results = _run_threads(call, 5)
+    assert len(calls) == 1
+    assert results == ["接口超时"] * 5
+    assert flight.do("weather", lambda: "晴") == "晴"
+
+    print("✅ 单飞异常传递正常")
+
+
+def test_asyncio_shares_one_call():
+    """测试asyncio并发的相同请求只执行一次，不同键互不影响"""
+    print("⚡ 测试asyncio单飞合并")
+
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.1)
+        return value
+
+    async def run():
+        return await asyncio.gather(
+            *[flight.do("weather_厦门", lambda: fetch("厦门晴")) for _ in range(5)],
+            flight.do("weather_广州", lambda: fetch("广州雨")),
+        )
+
+    results = asyncio.run(run())
+
+    assert results == ["厦门晴"] * 5 + ["广州雨"]
+    assert sorted(calls) == sorted(["厦门晴", "广州雨"])
+
+    print("✅ asyncio单飞合并正常")
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    """测试执行方被取消时等待方不被取消，而是由其中一个重新发起请求"""
+    print("🛑 测试执行方取消")
+
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "厦门晴"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("weather_厦门", fetch))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(flight.do("weather_厦门", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        try:
+            await leader
+            assert False, "执行方应被取消"
+        except asyncio.CancelledError:
+            pass
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == ["厦门晴", "厦门晴"]
+    # 被取消的执行方调用一次，两个等待方合并为一次重新调用
+    assert len(calls) == 2
+
+    print("✅ 执行方取消不影响等待方")
+
+
+def test_weather_interface_coalesces_concurrent_calls():
+    """测试并发分析同一城市天气时只调用一次Coze API（缓存关闭时同样生效）"""
+    print("🌤️ 测试天气接口并发合并")
+
+    def slow_post(*args, **kwargs):
+        time.sleep(0.2)
+        response = mock.Mock()
+        response.status_code = 200
+        response.json.return_value = {"code": 0, "data": json.dumps({"forecast": "晴"}, ensure_ascii=False)}
+        return response
+
+    with mock.patch.dict(os.environ, {"COZE_API_KEY": "test-key", "MANUFACTURING_CACHE_ENABLED": "false"}), \
+            mock.patch("requests.Session.post", side_effect=slow_post) as post:
+        results = _run_threads(
+            lambda: interface.get_manufacturing_weather_interface("厦门", "2025-07-01"), 4
+        )
+
+    assert post.call_count == 1
+    assert all("晴" in result for result in results)
+
+    print("✅ 天气接口并发合并正常")
+
+
+if __name__ == "__main__":
+    test_threads_share_one_call()
+    test_errors_are_shared_and_not_retained()
+    test_asyncio_shares_one_call()
+    test_cancelled_leader_does_not_cancel_waiters()
+    test_weather_interface_coalesces_concurrent_calls()
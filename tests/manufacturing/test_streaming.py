@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业图流式执行测试
+验证每个分析师报告、辩论发言和最终结论在节点完成时即返回
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import manufacturingagents.manufacturingagents.graph.manufacturing_graph_react as react_graph_module
+
+
+def _fake_analyst(report_field, delay):
+    def factory(llm, toolkit, agent_factory=None):
+        def node(state):
+            time.sleep(delay)
+            return {report_field: f"{report_field}内容"}
+        return node
+    return factory
+
+
+def _fake_decision_node(field=None, value=None, fail=False):
+    """模拟决策层节点：结束辩论并写入指定字段"""
+    def factory(llm, memory):
+        def node(state):
+            if fail:
+                raise RuntimeError("风险评估LLM调用超时")
+            time.sleep(0.1)
+            debate_state = dict(state["decision_debate_state"])
+            debate_state["count"] = 4
+            debate_state["current_response"] = "乐观决策顾问: 建议增加备货"
+            state["decision_debate_state"] = debate_state
+            if field:
+                state[field] = value
+            return state
+        return node
+    return factory
+
+
+def _build_graph(fail_risk=False):
+    patches = [
+        mock.patch.object(react_graph_module.ManufacturingAgentsReactGraph, "_initialize_llm",
+                          lambda self: setattr(self, "llm", None)),
+        mock.patch.object(react_graph_module, "Toolkit", lambda config: None),
+        mock.patch.object(react_graph_module, "create_market_environment_analyst_react",
+                          _fake_analyst("market_environment_report", 0.1)),
+        mock.patch.object(react_graph_module, "create_trend_prediction_analyst_react",
+                          _fake_analyst("trend_prediction_report", 0.3)),
+        mock.patch.object(react_graph_module, "create_optimistic_advisor", _fake_decision_node()),
+        mock.patch.object(react_graph_module, "create_cautious_advisor", _fake_decision_node()),
+        mock.patch.object(react_graph_module, "create_decision_coordinator",
+                          _fake_decision_node("decision_coordination_plan", "增加20%备货")),
+        mock.patch.object(react_graph_module, "create_risk_assessment_team",
+                          _fake_decision_node("risk_assessment_report", "风险可控", fail=fail_risk)),
+        mock.patch.object(react_graph_module, "create_conclusion_extractor",
+                          _fake_decision_node("conclusion_json", {"replenishment": "增加20%"})),
+    ]
+    for patcher in patches:
+        patcher.start()
+    try:
+        return react_graph_module.ManufacturingAgentsReactGraph(
+            selected_analysts=["market_environment_analyst", "trend_prediction_analyst"],
+            config={"parallel_analysts": True, "data_prefetch": False},
+        )
+    finally:
+        for patcher in patches:
+            patcher.stop()
+
+
+def _stream_args():
+    return dict(city_name="厦门", brand_name="美的", product_category="空调", target_quarter="2025Q3")
+
+
+def test_stream_yields_node_results_incrementally():
+    """测试流式事件按节点完成顺序返回，首个分析师报告无需等待整个分析结束"""
+    print("📡 测试流式节点结果")
+
+    graph = _build_graph()
+    start = time.time()
+    events = []
+    first_event_at = None
+    for event in graph.stream_manufacturing_replenishment(**_stream_args()):
+        if first_event_at is None:
+            first_event_at = time.time() - start
+        events.append(event)
+    total = time.time() - start
+
+    assert [event["type"] for event in events] == [
+        "analyst_report", "analyst_report", "debate_turn",
+        "coordination_plan", "risk_assessment", "conclusion", "complete",
+    ]
+    assert events[0]["field"] == "market_environment_report"
+    assert events[0]["name"] == "市场环境分析师"
+    assert events[0]["content"] == "market_environment_report内容"
+    assert events[2]["name"] == "乐观决策顾问"
+    assert events[2]["content"] == "乐观决策顾问: 建议增加备货"
+    assert events[3]["content"] == "增加20%备货"
+    assert events[5]["content"] == {"replenishment": "增加20%"}
+    assert events[-1]["state"]["trend_prediction_report"] == "trend_prediction_report内容"
+
+    print(f"   首个事件: {first_event_at:.2f}s, 总耗时: {total:.2f}s")
+    assert first_event_at < total / 2
+
+    print("✅ 流式节点结果正常")
+
+
+def test_stream_reports_error_with_completed_work():
+    """测试节点失败时最后返回error事件，状态中保留已完成的报告"""
+    print("❌ 测试流式执行失败")
+
+    graph = _build_graph(fail_risk=True)
+    events = list(graph.stream_manufacturing_replenishment(**_stream_args()))
+
+    assert events[-1]["type"] == "error"
+    assert "风险评估LLM调用超时" in events[-1]["error"]
+    assert events[-1]["state"]["market_environment_report"] == "market_environment_report内容"
+    assert events[-1]["state"]["decision_coordination_plan"] == "增加20%备货"
+    assert "risk_assessment" not in [event["type"] for event in events]
+
+    print("✅ 流式执行失败处理正常")
+
+
+def test_async_stream():
+    """测试异步流式执行"""
+    print("⚡ 测试异步流式执行")
+
+    graph = _build_graph()
+
+    async def run():
+        return [event async for event in graph.astream_manufacturing_replenishment(**_stream_args())]
+
+    events = asyncio.run(run())
+
+    assert [event["type"] for event in events][:2] == ["analyst_report", "analyst_report"]
+    assert events[-1]["type"] == "complete"
+    assert events[-1]["state"]["conclusion_json"] == {"replenishment": "增加20%"}
+
+    print("✅ 异步流式执行正常")
+
+
+def test_stream_flushes_token_usage_on_early_stop():
+    """测试调用方提前停止迭代时仍记录token使用"""
+    print("🛑 测试提前停止流式执行")
+
+    graph = _build_graph()
+    graph_cls = react_graph_module.ManufacturingAgentsReactGraph
+    with mock.patch.object(graph_cls, "_flush_token_usage") as flush:
+        stream = graph.stream_manufacturing_replenishment(**_stream_args())
+        assert next(stream)["type"] == "analyst_report"
+        assert flush.call_count == 0
+        stream.close()
+    assert flush.call_count == 1
+
+    async def run():
+        stream = graph.astream_manufacturing_replenishment(**_stream_args())
+        async for event in stream:
+            break
+        await stream.aclose()
+        return event
+
+    with mock.patch.object(graph_cls, "_flush_token_usage") as flush:
+        assert asyncio.run(run())["type"] == "analyst_report"
+    assert flush.call_count == 1
+
+    print("✅ 提前停止流式执行正常")
+
+
+if __name__ == "__main__":
+    test_stream_yields_node_results_incrementally()
+    test_stream_reports_error_with_completed_work()
+    test_async_stream()
+    test_stream_flushes_token_usage_on_early_stop()
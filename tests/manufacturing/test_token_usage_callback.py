@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制造业图Token统计测试
+验证每次LLM调用的实际Token用量和耗时按图节点、会话汇总后写入TokenTracker
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.language_models.llms import BaseLLM
+from langchain_core.outputs import Generation, LLMResult
+
+import manufacturingagents.manufacturingagents.graph.manufacturing_graph_react as react_graph_module
+from manufacturingagents.llm_adapters.usage_callback import TokenUsageCallbackHandler
+
+
+class FakeTongyi(BaseLLM):
+    """模拟Tongyi：返回generation_info["token_usage"]"""
+
+    model_name: str = "qwen-turbo"
+    input_tokens: int = 100
+    output_tokens: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tongyi"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name}
+
+    def _generate(self, prompts: List[str], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> LLMResult:
+        time.sleep(0.02)
+        return LLMResult(generations=[
+            [Generation(text="分析完成", generation_info={
+                "token_usage": {"input_tokens": self.input_tokens, "output_tokens": self.output_tokens}
+            })]
+            for _ in prompts
+        ])
+
+
+def _llm_analyst(report_field, calls=1):
+    def factory(llm, toolkit, agent_factory=None):
+        def node(state):
+            for _ in range(calls):
+                llm.invoke(f"{report_field}提示词")
+            return {report_field: f"{report_field}内容"}
+        return node
+    return factory
+
+
+def _llm_decision_node(field=None):
+    def factory(llm, memory):
+        def node(state):
+            llm.invoke("决策提示词")
+            debate_state = dict(state["decision_debate_state"])
+            debate_state["count"] = 4
+            debate_state["current_response"] = "乐观决策顾问: 建议增加备货"
+            state["decision_debate_state"] = debate_state
+            if field:
+                state[field] = f"{field}内容"
+            return state
+        return node
+    return factory
+
+
+def _build_graph(config=None):
+    patches = [
+        mock.patch.object(react_graph_module.ManufacturingAgentsReactGraph, "_initialize_llm",
+                          lambda self: setattr(self, "llm", FakeTongyi())),
+        mock.patch.object(react_graph_module, "Toolkit", lambda config: None),
+        mock.patch.object(react_graph_module, "create_market_environment_analyst_react",
+                          _llm_analyst("market_environment_report", calls=2)),
+        mock.patch.object(react_graph_module, "create_trend_prediction_analyst_react",
+                          _llm_analyst("trend_prediction_report")),
+        mock.patch.object(react_graph_module, "create_optimistic_advisor", _llm_decision_node()),
+        mock.patch.object(react_graph_module, "create_cautious_advisor", _llm_decision_node()),
+        mock.patch.object(react_graph_module, "create_decision_coordinator",
+                          _llm_decision_node("decision_coordination_plan")),
+        mock.patch.object(react_graph_module, "create_risk_assessment_team",
+                          _llm_decision_node("risk_assessment_report")),
+        mock.patch.object(react_graph_module, "create_conclusion_extractor",
+                          _llm_decision_node("conclusion_json")),
+    ]
+    for patcher in patches:
+        patcher.start()
+    try:
+        return react_graph_module.ManufacturingAgentsReactGraph(
+            selected_analysts=["market_environment_analyst", "trend_prediction_analyst"],
+            config={"parallel_analysts": True, "data_prefetch": False, **(config or {})},
+        )
+    finally:
+        for patcher in patches:
+            patcher.stop()
+
+
+def _analysis_args():
+    return dict(city_name="厦门", brand_name="美的", product_category="空调", target_quarter="2025Q3")
+
+
+def _tracked_by_node(tracker):
+    return {call.kwargs["node_name"]: call.kwargs for call in tracker.track_usage.call_args_list}
+
+
+def test_node_usage_flows_into_token_tracker():
+    """测试各节点实际Token用量、调用次数和耗时按会话写入TokenTracker"""
+    print("📊 测试按节点Token统计")
+
+    graph = _build_graph()
+    with mock.patch("manufacturingagents.llm_adapters.usage_callback.token_tracker") as tracker:
+        graph.analyze_manufacturing_replenishment(**_analysis_args(), session_id="session-1")
+
+    tracked = _tracked_by_node(tracker)
+    market = tracked["Market_Environment_Analyst"]
+    assert market["request_count"] == 2
+    assert market["input_tokens"] == 200 and market["output_tokens"] == 80
+    assert market["latency_seconds"] >= 0.04
+    assert market["model_name"] == "qwen-turbo"
+    assert market["session_id"] == "session-1"
+    assert market["analysis_type"] == "manufacturing_analysis"
+
+    assert tracked["Trend_Prediction_Analyst"]["input_tokens"] == 100
+    assert "Risk_Assessment" in tracked
+    # 不再记录按分析师数量估算的用量
+    assert all(call.kwargs["node_name"] for call in tracker.track_usage.call_args_list)
+
+    print(f"✅ 按节点Token统计正常: {sorted(tracked)}")
+
+
+def test_stream_flushes_before_complete():
+    """测试流式执行在最后一个事件之前写入Token用量"""
+    print("📡 测试流式执行的Token统计")
+
+    graph = _build_graph()
+    with mock.patch("manufacturingagents.llm_adapters.usage_callback.token_tracker") as tracker:
+        for event in graph.stream_manufacturing_replenishment(**_analysis_args(), session_id="session-2"):
+            if event["type"] == "complete":
+                assert tracker.track_usage.called
+
+    assert {call.kwargs["session_id"] for call in tracker.track_usage.call_args_list} == {"session-2"}
+
+    print("✅ 流式执行Token统计正常")
+
+
+def test_token_tracking_disabled():
+    """测试config["token_tracking"]=False时不注册回调"""
+    print("🚫 测试关闭Token统计")
+
+    graph = _build_graph({"token_tracking": False})
+    assert "callbacks" not in graph._graph_config()
+
+    with mock.patch("manufacturingagents.llm_adapters.usage_callback.token_tracker") as tracker:
+        graph.analyze_manufacturing_replenishment(**_analysis_args())
+    assert not tracker.track_usage.called
+
+    print("✅ 关闭Token统计正常")
+
+
+def test_cached_and_self_tracking_calls_not_recorded():
+    """测试命中缓存的回复和自行记录用量的ChatDashScope不重复写入TokenTracker"""
+    print("💾 测试缓存/自记录调用的Token统计")
+
+    tracker = mock.Mock()
+    handler = TokenUsageCallbackHandler("session-3", tracker=tracker)
+    cached = LLMResult(generations=[[Generation(text="缓存", generation_info={
+        "from_cache": True, "token_usage": {"input_tokens": 100, "output_tokens": 40}
+    })]])
+
+    handler.on_llm_start({}, ["提示词"], run_id="run-1", metadata={"langgraph_node": "risk_assessment"},
+                         invocation_params={"model_name": "qwen-turbo"})
+    handler.on_llm_end(cached, run_id="run-1")
+    handler.on_chat_model_start({}, [[]], run_id="run-2", metadata={"langgraph_node": "conclusion_extractor"},
+                                invocation_params={"_type": "dashscope", "model": "qwen-plus"})
+    handler.on_llm_end(LLMResult(generations=[[Generation(text="结论")]]), run_id="run-2")
+
+    node_usage = handler.get_node_usage()
+    assert node_usage["risk_assessment"]["cached"] == 1
+    assert node_usage["risk_assessment"]["input_tokens"] == 0
+    assert node_usage["conclusion_extractor"]["requests"] == 1
+
+    assert handler.flush() == []
+    assert not tracker.track_usage.called
+
+    print("✅ 缓存/自记录调用的Token统计正常")
+
+
+if __name__ == "__main__":
+    test_node_usage_flows_into_token_tracker()
+    test_stream_flushes_before_complete()
+    test_token_tracking_disabled()
+    test_cached_and_self_tracking_calls_not_recorded()
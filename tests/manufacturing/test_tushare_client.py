@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TuShare客户端管理测试
+验证客户端复用、token变化重建、按接口限流
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from manufacturingagents.dataflows import interface
+from manufacturingagents.dataflows import tushare_client
+from manufacturingagents.dataflows.tushare_client import TokenBucket, TushareClientManager
+
+
+class FakeProApi:
+    def __init__(self, token):
+        self.token = token
+        self.calls = []
+
+    def cn_pmi(self, **kwargs):
+        self.calls.append(("cn_pmi", kwargs))
+        return pd.DataFrame({"month": ["202506"], "pmi010000": [49.7]})
+
+    def cn_ppi(self, **kwargs):
+        self.calls.append(("cn_ppi", kwargs))
+        return pd.DataFrame({"month": ["202506"], "ppi_yoy": [-3.6], "ppi_mp": [-0.4]})
+
+
+def test_client_reused_and_rebuilt_on_token_change():
+    """测试客户端懒加载复用，token变化时重建"""
+    print("🔌 测试TuShare客户端复用")
+
+    manager = TushareClientManager()
+    with mock.patch("tushare.pro_api", side_effect=FakeProApi) as pro_api:
+        first = manager.get_pro_api("token-a")
+        second = manager.get_pro_api("token-a")
+        third = manager.get_pro_api("token-b")
+
+    assert first is second
+    assert third is not first
+    assert pro_api.call_count == 2
+    assert third._api.token == "token-b"
+
+    try:
+        with mock.patch.dict(os.environ, {"TUSHARE_TOKEN": ""}):
+            manager.get_pro_api()
+        assert False, "token未配置应抛出异常"
+    except ValueError:
+        pass
+
+    print("✅ TuShare客户端复用正常")
+
+
+def test_client_matches_token_under_concurrent_switch():
+    """测试多线程交替切换token时，返回的客户端始终与请求的token一致"""
+    print("🔀 测试并发切换token")
+
+    manager = TushareClientManager()
+    mismatches = []
+
+    def worker(token):
+        for _ in range(200):
+            client = manager.get_pro_api(token)
+            if client._api.token != token:
+                mismatches.append((token, client._api.token))
+
+    with mock.patch("tushare.pro_api", side_effect=FakeProApi):
+        threads = [threading.Thread(target=worker, args=(f"token-{i % 2}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert mismatches == []
+
+    print("✅ 并发切换token时客户端与token一致")
+
+
+def test_token_bucket_waits_when_quota_exhausted():
+    """测试令牌桶配额用尽时按补充速率等待"""
+    print("⏳ 测试令牌桶限流")
+
+    clock = [100.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    with mock.patch.object(tushare_client.time, "monotonic", side_effect=lambda: clock[0]), \
+            mock.patch.object(tushare_client.time, "sleep", side_effect=fake_sleep):
+        bucket = TokenBucket(rate_per_minute=60, capacity=2)
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        waited = bucket.acquire()
+
+    # 每分钟60次即每秒补充1个令牌
+    assert abs(waited - 1.0) < 1e-6
+    assert len(sleeps) == 1
+
+    print("✅ 令牌桶限流正常")
+
+
+def test_rate_limit_is_per_endpoint():
+    """测试每个接口使用独立的令牌桶"""
+    print("🚦 测试按接口限流")
+
+    manager = TushareClientManager(rate_limits={"cn_pmi": 30}, default_rate_limit=120)
+    with mock.patch("tushare.pro_api", side_effect=FakeProApi):
+        pro = manager.get_pro_api("token")
+
+    with mock.patch.object(TokenBucket, "acquire", autospec=True, return_value=0) as acquire:
+        pro.cn_pmi(start_m="202501")
+        pro.cn_ppi(start_m="202501")
+        pro.cn_pmi(start_m="202502")
+
+    assert acquire.call_count == 3
+    assert manager.get_rate_limiter("cn_pmi").capacity == 30
+    assert manager.get_rate_limiter("cn_ppi").capacity == 120
+    assert manager.get_rate_limiter("cn_pmi") is manager.get_rate_limiter("cn_pmi")
+    assert pro._api.calls[0] == ("cn_pmi", {"start_m": "202501"})
+
+    print("✅ 按接口限流正常")
+
+
+def test_economic_interface_reuses_client():
+    """测试多次获取PMI/PPI只创建一次pro_api客户端"""
+    print("📈 测试经济数据接口复用客户端")
+
+    manager = TushareClientManager()
+    with mock.patch.object(tushare_client, "_tushare_client_manager", manager), \
+            mock.patch.dict(os.environ, {"TUSHARE_TOKEN": "token", "MANUFACTURING_CACHE_ENABLED": "false"}), \
+            mock.patch("tushare.pro_api", side_effect=FakeProApi) as pro_api, \
+            mock.patch("tushare.set_token") as set_token:
+        pmi = interface.get_manufacturing_economic_interface("pmi", "最近6个月")
+        ppi = interface.get_manufacturing_economic_interface("ppi", "最近6个月")
+        interface.get_manufacturing_economic_interface("pmi", "最近6个月")
+
+    assert "PMI制造业采购经理指数" in pmi and "49.7" in pmi
+    assert "PPI工业生产者价格指数" in ppi
+    assert pro_api.call_count == 1
+    assert set_token.call_count == 0
+    assert [name for name, _ in manager._current[1]._api.calls] == ["cn_pmi", "cn_ppi", "cn_pmi"]
+
+    print("✅ 经济数据接口复用客户端正常")
+
+
+if __name__ == "__main__":
+    test_client_reused_and_rebuilt_on_token_change()
+    test_client_matches_token_under_concurrent_switch()
+    test_token_bucket_waits_when_quota_exhausted()
+    test_rate_limit_is_per_endpoint()
+    test_economic_interface_reuses_client()
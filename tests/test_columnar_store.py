@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+测试离线数据列式存储：转换后的SimFin/价格数据输出与CSV一致，且不再解析CSV
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from manufacturingagents.dataflows import interface
+from manufacturingagents.dataflows.columnar_store import (
+    COLUMNAR_AVAILABLE, convert_price_csv, convert_simfin_csv
+)
+from manufacturingagents.dataflows.price_frame_store import get_price_frame_store
+from tests.test_stockstats_window import _write_price_csv
+
+
+def _write_balance_csv(data_dir, freq="quarterly"):
+    statement_dir = os.path.join(data_dir, "fundamental_data", "simfin_data_all", "balance_sheet", "companies", "us")
+    os.makedirs(statement_dir, exist_ok=True)
+    rows = []
+    for ticker in ("AAPL", "MSFT", "TSLA"):
+        for quarter, (report, publish) in enumerate([("2023-12-31", "2024-02-02"), ("2024-03-31", "2024-05-03"),
+                                                     ("2024-06-30", "2024-08-02")]):
+            rows.append({
+                "Ticker": ticker, "SimFinId": 100 + quarter, "Currency": "USD", "Fiscal Year": 2024,
+                "Report Date": report, "Publish Date": publish,
+                "Total Assets": 1000.0 * (quarter + 1), "Total Liabilities": 400.0 * (quarter + 1),
+            })
+    csv_path = os.path.join(statement_dir, f"us-balance-{freq}.csv")
+    pd.DataFrame(rows).to_csv(csv_path, sep=";", index=False)
+    return csv_path
+
+
+def test_simfin_partition_matches_csv():
+    """测试SimFin财报转换为按股票分区的Feather后，查询结果与读取CSV一致"""
+    print("🗃️ 测试SimFin列式存储")
+    if not COLUMNAR_AVAILABLE:
+        print("⚠️ 未安装pyarrow，跳过")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.object(interface, "DATA_DIR", tmp_dir):
+        csv_path = _write_balance_csv(tmp_dir)
+        from_csv = interface.get_simfin_balance_sheet("MSFT", "quarterly", "2024-06-01")
+        before_any = interface.get_simfin_balance_sheet("MSFT", "quarterly", "2024-01-01")
+
+        assert convert_simfin_csv(csv_path) == 3
+        with mock.patch.object(pd, "read_csv", side_effect=AssertionError("不应解析CSV")):
+            assert interface.get_simfin_balance_sheet("MSFT", "quarterly", "2024-06-01") == from_csv
+            assert interface.get_simfin_balance_sheet("MSFT", "quarterly", "2024-01-01") == before_any == ""
+            assert interface.get_simfin_balance_sheet("NVDA", "quarterly", "2024-06-01") == ""
+        assert "released on 2024-05-03" in from_csv
+
+        # 源CSV更新后列式数据过期，回退读取CSV
+        stat = os.stat(csv_path)
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with mock.patch.object(pd, "read_csv", wraps=pd.read_csv) as read_csv:
+            assert interface.get_simfin_balance_sheet("MSFT", "quarterly", "2024-06-01") == from_csv
+        assert read_csv.call_count == 1
+
+    print("✅ SimFin列式存储正常")
+
+
+def test_price_feather_matches_csv():
+    """测试价格数据转换为Feather后，行情和指标输出与CSV一致"""
+    print("📈 测试价格数据列式存储")
+    if not COLUMNAR_AVAILABLE:
+        print("⚠️ 未安装pyarrow，跳过")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.object(interface, "DATA_DIR", tmp_dir):
+        _write_price_csv(tmp_dir)
+        get_price_frame_store().clear()
+        raw_window = interface.get_YFin_data_window("TEST", "2024-04-15", 10)
+        rsi_window = interface.get_stock_stats_indicators_window("TEST", "rsi", "2024-04-15", 30, False)
+
+        csv_path = os.path.join(tmp_dir, "market_data", "price_data", "TEST-YFin-data-2015-01-01-2025-03-25.csv")
+        assert convert_price_csv(csv_path) > 0
+        get_price_frame_store().clear()
+        with mock.patch.object(pd, "read_csv", side_effect=AssertionError("不应解析CSV")):
+            assert interface.get_YFin_data_window("TEST", "2024-04-15", 10) == raw_window
+            assert interface.get_stock_stats_indicators_window("TEST", "rsi", "2024-04-15", 30, False) == rsi_window
+
+    print("✅ 价格数据列式存储正常")
+
+
+if __name__ == "__main__":
+    test_simfin_partition_matches_csv()
+    test_price_feather_matches_csv()
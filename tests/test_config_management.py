@@ -239,6 +239,48 @@ def test_usage_statistics():
         print("✅ 使用统计测试通过")
 
 
+
+def test_config_cache():
+    """测试定价和设置缓存：文件未变化时不重新读取，保存或外部修改后自动失效"""
+    print("🗃️ 测试配置缓存")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_manager = ConfigManager(temp_dir)
+        
+        first_cost = config_manager.calculate_cost("dashscope", "qwen-turbo", 1000, 1000)
+        assert first_cost > 0, "默认定价应包含qwen-turbo"
+        
+        # 文件未变化时命中缓存，不重新解析
+        import json as json_module
+        from unittest import mock
+        with mock.patch.object(json_module, "load", side_effect=AssertionError("不应重新读取")):
+            assert config_manager.calculate_cost("dashscope", "qwen-turbo", 1000, 1000) == first_cost
+            config_manager.load_settings()
+        
+        # load_pricing返回副本，修改后通过save_pricing保存才生效
+        pricing = config_manager.load_pricing()
+        for price in pricing:
+            if price.provider == "dashscope" and price.model_name == "qwen-turbo":
+                price.input_price_per_1k *= 2
+                price.output_price_per_1k *= 2
+        assert config_manager.calculate_cost("dashscope", "qwen-turbo", 1000, 1000) == first_cost
+        config_manager.save_pricing(pricing)
+        assert abs(config_manager.calculate_cost("dashscope", "qwen-turbo", 1000, 1000) - 2 * first_cost) < 1e-9
+        
+        # 外部修改设置文件后自动重新读取
+        settings_file = Path(temp_dir) / "settings.json"
+        settings = json_module.loads(settings_file.read_text(encoding="utf-8"))
+        settings["cost_alert_threshold"] = 123.0
+        settings_file.write_text(json_module.dumps(settings), encoding="utf-8")
+        assert config_manager.load_settings()["cost_alert_threshold"] == 123.0
+        
+        # 返回的设置是副本
+        config_manager.load_settings()["cost_alert_threshold"] = 0
+        assert config_manager.load_settings()["cost_alert_threshold"] == 123.0
+        
+        print("✅ 配置缓存测试通过")
+
+
 def main():
     """主测试函数"""
     print("🧪 配置管理功能测试")
@@ -249,6 +291,7 @@ def main():
         test_token_tracker()
         test_pricing_accuracy()
         test_usage_statistics()
+        test_config_cache()
         
         print("\n🎉 所有测试通过！")
         print("=" * 60)
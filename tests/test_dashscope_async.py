@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+测试DashScope适配器的异步调用：原生异步接口、连接池与并发限制
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import HumanMessage
+
+from manufacturingagents.llm_adapters import dashscope_adapter
+from manufacturingagents.llm_adapters.dashscope_adapter import ChatDashScope, get_async_dashscope_pool
+
+
+def _response(content, input_tokens=20, output_tokens=3, status_code=200):
+    return SimpleNamespace(
+        status_code=status_code,
+        code="" if status_code == 200 else "Throttling",
+        message="" if status_code == 200 else "Requests rate limit exceeded",
+        output=SimpleNamespace(choices=[SimpleNamespace(
+            message=SimpleNamespace(content=content),
+            finish_reason="stop",
+        )]),
+        usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens),
+    )
+
+
+def _llm():
+    return ChatDashScope(model="qwen-plus", api_key="test-key")
+
+
+def test_ainvoke_uses_async_api():
+    """测试ainvoke调用DashScope异步接口，不再调用同步接口"""
+    print("⚡ 测试DashScope原生异步调用")
+
+    async def run():
+        result = await _llm().ainvoke([HumanMessage(content="给出补货建议")],
+                                      session_id="session-1", analysis_type="manufacturing_analysis")
+        pool = get_async_dashscope_pool()
+        await pool.aclose()
+        return result, pool
+
+    with mock.patch.object(dashscope_adapter.AioGeneration, "call",
+                           new=mock.AsyncMock(return_value=_response("建议增加备货"))) as acall, \
+            mock.patch.object(dashscope_adapter.Generation, "call") as call, \
+            mock.patch.object(dashscope_adapter, "token_tracker") as tracker:
+        result, pool = asyncio.run(run())
+
+    assert result.content == "建议增加备货"
+    assert not call.called
+    params = acall.call_args.kwargs
+    assert params["session"] is pool.session
+    assert "session_id" not in params
+    tracker.track_usage.assert_called_once_with(
+        provider="dashscope", model_name="qwen-plus", input_tokens=20, output_tokens=3,
+        session_id="session-1", analysis_type="manufacturing_analysis",
+    )
+
+    print("✅ DashScope原生异步调用正常")
+
+
+def test_ainvoke_concurrency_limit():
+    """测试并发请求数不超过DASHSCOPE_MAX_CONCURRENCY，且不阻塞事件循环"""
+    print("🚦 测试DashScope异步并发限制")
+
+    active = 0
+    peak = 0
+
+    async def fake_call(**kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return _response("建议增加备货")
+
+    async def run():
+        llm = _llm()
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            llm.ainvoke([HumanMessage(content=f"产品{i}补货建议")]) for i in range(6)
+        ])
+        elapsed = time.perf_counter() - start
+        pool = get_async_dashscope_pool()
+        await pool.aclose()
+        return results, elapsed, pool
+
+    with mock.patch.dict(os.environ, {"DASHSCOPE_MAX_CONCURRENCY": "2"}), \
+            mock.patch.object(dashscope_adapter.AioGeneration, "call", side_effect=fake_call), \
+            mock.patch.object(dashscope_adapter, "token_tracker"):
+        results, elapsed, pool = asyncio.run(run())
+
+    assert len(results) == 6
+    assert pool.max_concurrency == 2 and pool.pool_size == 2
+    assert peak == 2
+    # 6个请求、并发2、每个50ms：约150ms，串行执行需要300ms
+    assert elapsed < 0.28, elapsed
+
+    print(f"✅ DashScope异步并发限制正常: 峰值并发={peak}, 耗时={elapsed:.2f}s")
+
+
+def test_ainvoke_error_response():
+    """测试异步调用的错误响应"""
+    print("❌ 测试DashScope异步错误")
+
+    async def run():
+        try:
+            await _llm().ainvoke([HumanMessage(content="给出补货建议")])
+        finally:
+            await get_async_dashscope_pool().aclose()
+
+    with mock.patch.object(dashscope_adapter.AioGeneration, "call",
+                           new=mock.AsyncMock(return_value=_response("", status_code=429))), \
+            mock.patch.object(dashscope_adapter, "token_tracker") as tracker:
+        try:
+            asyncio.run(run())
+            assert False, "应抛出异常"
+        except Exception as e:
+            assert "Throttling" in str(e)
+
+    assert not tracker.track_usage.called
+
+    print("✅ DashScope异步错误处理正常")
+
+
+if __name__ == "__main__":
+    test_ainvoke_uses_async_api()
+    test_ainvoke_concurrency_limit()
+    test_ainvoke_error_response()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+测试DashScope适配器的流式输出功能
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import HumanMessage
+
+from manufacturingagents.llm_adapters import dashscope_adapter
+from manufacturingagents.llm_adapters.dashscope_adapter import ChatDashScope
+
+
+def _response(content, input_tokens=0, output_tokens=0, finish_reason="null", status_code=200):
+    return SimpleNamespace(
+        status_code=status_code,
+        code="" if status_code == 200 else "Throttling",
+        message="" if status_code == 200 else "Requests rate limit exceeded",
+        output=SimpleNamespace(choices=[SimpleNamespace(
+            message=SimpleNamespace(content=content),
+            finish_reason=finish_reason,
+        )]),
+        usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens),
+    )
+
+
+STREAM_RESPONSES = [
+    _response("建议", 20, 1),
+    _response("增加", 20, 2),
+    _response("", 20, 2),
+    _response("备货", 20, 3, finish_reason="stop"),
+]
+
+
+def _llm():
+    return ChatDashScope(model="qwen-plus", api_key="test-key")
+
+
+def test_stream_yields_incremental_chunks():
+    """测试流式输出逐段返回文本，流结束时返回并记录usage"""
+    print("📡 测试DashScope流式输出")
+
+    llm = _llm()
+    with mock.patch.object(dashscope_adapter.Generation, "call", return_value=iter(STREAM_RESPONSES)) as call, \
+            mock.patch.object(dashscope_adapter, "token_tracker") as tracker:
+        chunks = list(llm.stream([HumanMessage(content="给出补货建议")],
+                                 session_id="session-1", analysis_type="manufacturing_analysis"))
+
+    assert [chunk.content for chunk in chunks] == ["建议", "增加", "备货", ""]
+    assert chunks[-1].usage_metadata == {"input_tokens": 20, "output_tokens": 3, "total_tokens": 23}
+    assert chunks[-1].response_metadata["finish_reason"] == "stop"
+
+    params = call.call_args.kwargs
+    assert params["stream"] is True and params["incremental_output"] is True
+    assert "session_id" not in params
+
+    tracker.track_usage.assert_called_once_with(
+        provider="dashscope", model_name="qwen-plus", input_tokens=20, output_tokens=3,
+        session_id="session-1", analysis_type="manufacturing_analysis",
+    )
+
+    print("✅ DashScope流式输出正常")
+
+
+def test_stream_error_response():
+    """测试流式输出中的错误响应"""
+    print("❌ 测试DashScope流式错误")
+
+    llm = _llm()
+    responses = iter([_response("建议", 20, 1), _response("", status_code=429)])
+    with mock.patch.object(dashscope_adapter.Generation, "call", return_value=responses), \
+            mock.patch.object(dashscope_adapter, "token_tracker") as tracker:
+        try:
+            list(llm.stream([HumanMessage(content="给出补货建议")]))
+            assert False, "错误响应应抛出异常"
+        except Exception as e:
+            assert "Throttling" in str(e)
+
+    tracker.track_usage.assert_not_called()
+
+    print("✅ DashScope流式错误处理正常")
+
+
+def test_astream_yields_incremental_chunks():
+    """测试异步流式输出"""
+    print("⚡ 测试DashScope异步流式输出")
+
+    async def responses():
+        for response in STREAM_RESPONSES:
+            yield response
+
+    async def fake_call(**kwargs):
+        return responses()
+
+    async def run():
+        return [chunk async for chunk in _llm().astream([HumanMessage(content="给出补货建议")])]
+
+    with mock.patch.object(dashscope_adapter.AioGeneration, "call", side_effect=fake_call), \
+            mock.patch.object(dashscope_adapter, "token_tracker") as tracker:
+        chunks = asyncio.run(run())
+
+    assert "".join(chunk.content for chunk in chunks) == "建议增加备货"
+    assert chunks[-1].usage_metadata["total_tokens"] == 23
+    assert tracker.track_usage.call_count == 1
+
+    print("✅ DashScope异步流式输出正常")
+
+
+def test_invoke_unchanged():
+    """测试非流式调用仍返回完整回复"""
+    print("💬 测试DashScope非流式调用")
+
+    with mock.patch.object(dashscope_adapter.Generation, "call",
+                           return_value=_response("建议增加备货", 20, 3, "stop")) as call, \
+            mock.patch.object(dashscope_adapter, "token_tracker") as tracker:
+        result = _llm().invoke([HumanMessage(content="给出补货建议")])
+
+    assert result.content == "建议增加备货"
+    assert "stream" not in call.call_args.kwargs
+    assert tracker.track_usage.call_count == 1
+
+    print("✅ DashScope非流式调用正常")
+
+
+if __name__ == "__main__":
+    test_stream_yields_incremental_chunks()
+    test_stream_error_response()
+    test_astream_yields_incremental_chunks()
+    test_invoke_unchanged()
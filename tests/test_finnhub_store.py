@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+测试Finnhub离线数据日期索引：多次按日期范围查询只解析一次JSON，结果与逐键比较的原实现一致
+"""
+
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from manufacturingagents.dataflows import finnhub_utils, interface
+from manufacturingagents.dataflows.columnar_store import COLUMNAR_AVAILABLE, convert_finnhub_json
+from manufacturingagents.dataflows.finnhub_utils import get_data_in_range, get_finnhub_store
+
+
+def _write_news_json(data_dir, ticker="TEST"):
+    """按日期倒序写入（与排序后的顺序不同），包含空数据的日期"""
+    news_dir = os.path.join(data_dir, "finnhub_data", "news_data")
+    os.makedirs(news_dir, exist_ok=True)
+    data = {}
+    for day in range(28, 0, -1):
+        date = f"2024-03-{day:02d}"
+        data[date] = [] if day % 5 == 0 else [
+            {"headline": f"{ticker} headline {date}", "summary": f"summary 中文 {day}"}
+        ]
+    path = os.path.join(news_dir, f"{ticker}_data_formatted.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
+
+
+def _scan_range(path, start_date, end_date):
+    """原实现：读取整个JSON后逐键比较"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {key: value for key, value in data.items() if start_date <= key <= end_date and len(value) > 0}
+
+
+RANGES = [("2024-03-01", "2024-03-07"), ("2024-03-10", "2024-03-10"), ("2024-02-01", "2024-04-01"),
+          ("2024-03-15", "2024-03-14"), ("2024-04-01", "2024-04-30"), ("2024-03-2", "2024-03-25")]
+
+
+def test_range_matches_scan():
+    """测试日期范围查询与原实现一致（包括键顺序），且只解析一次JSON"""
+    print("📰 测试Finnhub日期索引")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = _write_news_json(tmp_dir)
+        expected = {bounds: _scan_range(path, *bounds) for bounds in RANGES}
+        get_finnhub_store().clear()
+
+        with mock.patch.object(finnhub_utils._FinnhubDateIndex, "from_json",
+                               wraps=finnhub_utils._FinnhubDateIndex.from_json) as from_json:
+            for (start_date, end_date), result in expected.items():
+                data = get_data_in_range("TEST", start_date, end_date, "news_data", tmp_dir)
+                assert list(data.items()) == list(result.items()), (start_date, end_date)
+        assert from_json.call_count == 1
+
+        # 文件更新后重新加载
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"2024-03-05": [{"headline": "updated", "summary": ""}]}, f)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert get_data_in_range("TEST", "2024-03-01", "2024-03-07", "news_data", tmp_dir) == {
+            "2024-03-05": [{"headline": "updated", "summary": ""}]
+        }
+
+        assert get_data_in_range("NONE", "2024-03-01", "2024-03-07", "news_data", tmp_dir) == {}
+
+    print("✅ Finnhub日期索引正常")
+
+
+def test_feather_matches_json():
+    """测试Finnhub数据转换为Feather后，新闻工具输出与读取JSON一致"""
+    print("🗃️ 测试Finnhub列式存储")
+    if not COLUMNAR_AVAILABLE:
+        print("⚠️ 未安装pyarrow，跳过")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.object(interface, "DATA_DIR", tmp_dir):
+        path = _write_news_json(tmp_dir)
+        get_finnhub_store().clear()
+        from_json = interface.get_finnhub_news("TEST", "2024-03-20", 7)
+        expected = {bounds: _scan_range(path, *bounds) for bounds in RANGES}
+
+        assert convert_finnhub_json(path) == 23
+        with mock.patch.object(finnhub_utils._FinnhubDateIndex, "from_json",
+                               side_effect=AssertionError("不应解析JSON")):
+            assert interface.get_finnhub_news("TEST", "2024-03-20", 7) == from_json
+            for (start_date, end_date), result in expected.items():
+                data = get_data_in_range("TEST", start_date, end_date, "news_data", tmp_dir)
+                assert list(data.items()) == list(result.items()), (start_date, end_date)
+        assert "TEST headline 2024-03-14" in from_json
+
+    print("✅ Finnhub列式存储正常")
+
+
+if __name__ == "__main__":
+    test_range_matches_scan()
+    test_feather_matches_json()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+测试LLM响应缓存：缓存键、SQLite存储的TTL与条目上限、ChatDashScope/Tongyi命中统计
+"""
+
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import HumanMessage
+
+from manufacturingagents.config.config_manager import ConfigManager, TokenTracker
+from manufacturingagents.llm_adapters import dashscope_adapter
+from manufacturingagents.llm_adapters.dashscope_adapter import ChatDashScope
+from manufacturingagents.llm_adapters.response_cache import (
+    LLMResponseCache, SQLiteResponseStore, create_llm_cache
+)
+from manufacturingagents.llm_adapters.tongyi_adapter import TongyiLLM
+
+
+def _response(content, input_tokens=20, output_tokens=3):
+    return SimpleNamespace(
+        status_code=200,
+        output=SimpleNamespace(choices=[SimpleNamespace(
+            message=SimpleNamespace(content=content),
+            finish_reason="stop",
+        )]),
+        usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens),
+    )
+
+
+def _cache(tmp_dir, max_entries=100, ttl_seconds=3600):
+    tracker = TokenTracker(ConfigManager(os.path.join(tmp_dir, "config")))
+    store = SQLiteResponseStore(os.path.join(tmp_dir, "llm_responses.sqlite"), max_entries)
+    return LLMResponseCache(store, ttl_seconds, tracker=tracker)
+
+
+def test_sqlite_store_ttl_and_eviction():
+    """测试SQLite存储的过期和按最久未访问淘汰"""
+    print("🗄️ 测试SQLite响应存储")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SQLiteResponseStore(os.path.join(tmp_dir, "cache.sqlite"), max_entries=2)
+
+        store.set("a", "A", 3600)
+        time.sleep(0.01)
+        store.set("b", "B", 3600)
+        time.sleep(0.01)
+        assert store.get("a") == "A"      # a最近被访问
+        time.sleep(0.01)
+        store.set("c", "C", 3600)         # 超过上限，淘汰最久未访问的b
+
+        assert store.size() == 2
+        assert store.get("b") is None
+        assert store.get("a") == "A" and store.get("c") == "C"
+
+        store.set("d", "D", -1)           # 已过期
+        assert store.get("d") is None
+
+    print("✅ SQLite响应存储正常")
+
+
+def test_chat_dashscope_cache_hit():
+    """测试ChatDashScope相同调用命中缓存，参数不同或会话不同时的行为"""
+    print("💾 测试ChatDashScope响应缓存")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = _cache(tmp_dir)
+        llm = ChatDashScope(model="qwen-plus", api_key="test-key", cache=cache)
+        messages = [HumanMessage(content="基于以上报告给出补货建议")]
+
+        with mock.patch.object(dashscope_adapter.Generation, "call",
+                               return_value=_response("建议增加备货")) as call, \
+                mock.patch.object(dashscope_adapter, "token_tracker") as tracker:
+            first = llm.invoke(messages, session_id="session-1")
+            # 会话ID只用于Token记录，不影响命中
+            second = llm.invoke(messages, session_id="session-2")
+            # 采样参数不同则不命中
+            llm.bind(temperature=0.9).invoke(messages)
+            ChatDashScope(model="qwen-plus", api_key="test-key", temperature=0.5, cache=cache).invoke(messages)
+
+        assert first.content == second.content == "建议增加备货"
+        assert call.call_count == 2 + 1
+        # 命中时不产生Token费用
+        assert tracker.track_usage.call_count == 3
+
+        stats = cache.tracker.get_cache_statistics()
+        assert stats["hits"] == 1 and stats["misses"] == 3
+        assert stats["saved_input_tokens"] == 20 and stats["saved_output_tokens"] == 3
+        assert cache.get_stats()["entries"] == 3
+
+    print("✅ ChatDashScope响应缓存正常")
+
+
+def test_tongyi_cache_key_includes_sampling_params():
+    """测试TongyiLLM的缓存键包含采样参数，不包含API密钥"""
+    print("🔑 测试Tongyi缓存键")
+
+    llm = TongyiLLM(dashscope_api_key="test-key")
+    llm_string = str(sorted(llm.dict().items()))
+    assert "top_p" in llm_string
+    assert "test-key" not in llm_string
+
+    other = TongyiLLM(dashscope_api_key="test-key", model_kwargs={"temperature": 0.9})
+    assert str(sorted(other.dict().items())) != llm_string
+
+    print("✅ Tongyi缓存键正常")
+
+
+def test_create_llm_cache_opt_in():
+    """测试未配置时不启用缓存，相同路径共享缓存实例"""
+    print("⚙️ 测试LLM缓存配置")
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.dict(os.environ, {"LLM_CACHE_BACKEND": ""}):
+        assert create_llm_cache({"results_dir": tmp_dir}) is None
+
+        config = {"llm_cache_backend": "sqlite", "results_dir": tmp_dir, "llm_cache_ttl": 60}
+        cache = create_llm_cache(config)
+        assert cache is create_llm_cache(config)
+        assert cache.ttl_seconds == 60
+        assert os.path.exists(os.path.join(tmp_dir, "llm_cache", "llm_responses.sqlite"))
+
+        try:
+            create_llm_cache({"llm_cache_backend": "mongodb"})
+            assert False, "应抛出ValueError"
+        except ValueError:
+            pass
+
+    print("✅ LLM缓存配置正常")
+
+
+if __name__ == "__main__":
+    test_sqlite_store_ttl_and_eviction()
+    test_chat_dashscope_cache_hit()
+    test_tongyi_cache_key_includes_sampling_params()
+    test_create_llm_cache_opt_in()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+测试进程内价格数据存储：多个行情/指标工具共享一次CSV解析，指标列只计算一次，按内存预算LRU淘汰
+"""
+
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import pandas as pd
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from manufacturingagents.dataflows import interface, stockstats_utils
+from manufacturingagents.dataflows.price_frame_store import PriceFrameStore, get_price_frame_store
+from tests.test_stockstats_window import _write_price_csv
+
+
+def test_tools_share_one_parse():
+    """测试行情窗口、行情区间和多个技术指标只读取一次CSV，每个指标只计算一次"""
+    print("🗂️ 测试价格数据共享")
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.object(interface, "DATA_DIR", tmp_dir):
+        _write_price_csv(tmp_dir)
+        get_price_frame_store().clear()
+
+        with mock.patch.object(pd, "read_csv", wraps=pd.read_csv) as read_csv, \
+                mock.patch.object(stockstats_utils, "wrap", wraps=stockstats_utils.wrap) as wrap:
+            raw_window = interface.get_YFin_data_window("TEST", "2024-04-15", 10)
+            data = interface.get_YFin_data("TEST", "2024-04-01", "2024-04-15")
+            first = interface.get_stock_stats_indicators_window("TEST", "rsi", "2024-04-15", 30, False)
+            interface.get_stock_stats_indicators_window("TEST", "macd", "2024-04-15", 30, False)
+            second = interface.get_stock_stats_indicators_window("TEST", "rsi", "2024-04-15", 30, False)
+
+        assert read_csv.call_count == 1
+        assert wrap.call_count == 1
+        assert first == second
+        assert "2024-04-15" in raw_window and len(data) == 11
+        # 调用方拿到的共享数据没有被修改
+        assert "DateOnly" not in interface.load_offline_price_data(
+            "TEST", os.path.join(tmp_dir, "market_data", "price_data")).columns
+
+        # 文件更新后重新读取
+        time.sleep(0.01)
+        _write_price_csv(tmp_dir)
+        with mock.patch.object(pd, "read_csv", wraps=pd.read_csv) as read_csv:
+            interface.get_YFin_data("TEST", "2024-04-01", "2024-04-15")
+        assert read_csv.call_count == 1
+
+    print("✅ 价格数据共享正常")
+
+
+def test_lru_memory_budget():
+    """测试超过内存预算时淘汰最久未使用的数据"""
+    print("📦 测试价格数据LRU淘汰")
+
+    frame = pd.DataFrame({"Date": ["2024-01-01"] * 1000, "Close": range(1000)})
+    size = int(frame.memory_usage(deep=True).sum())
+    store = PriceFrameStore(max_bytes=int(size * 2.5))
+
+    store.get_frame("a", lambda: frame.copy())
+    store.get_frame("b", lambda: frame.copy())
+    store.get_frame("a", lambda: frame.copy())       # a最近被访问
+    store.get_frame("c", lambda: frame.copy())       # 超过预算，淘汰b
+
+    loader = mock.Mock(return_value=frame.copy())
+    store.get_frame("a", loader)
+    store.get_frame("c", loader)
+    assert not loader.called
+    store.get_frame("b", loader)
+    assert loader.call_count == 1
+
+    stats = store.get_stats()
+    assert stats["entries"] == 2 and stats["misses"] == 4
+
+    print("✅ 价格数据LRU淘汰正常")
+
+
+if __name__ == "__main__":
+    test_tools_share_one_parse()
+    test_lru_memory_budget()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+测试Reddit离线语料索引：回看多天只读取对应日期的行，结果与逐行扫描的原实现一致
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timezone
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from manufacturingagents.dataflows import interface, reddit_utils
+from manufacturingagents.dataflows.reddit_utils import (
+    fetch_top_from_category, get_reddit_index, ticker_to_company
+)
+
+
+def _write_corpus(data_dir):
+    """两个分类各两个subreddit，3月1日至10日每天若干帖子（含空行和非.jsonl文件）"""
+    reddit_dir = os.path.join(data_dir, "reddit_data")
+    titles = ["Apple earnings", "aapl to the moon", "Market update", "Tesla recall", "Microsoft deal"]
+    for category in ("company_news", "global_news"):
+        for subreddit in ("stocks", "investing"):
+            os.makedirs(os.path.join(reddit_dir, category), exist_ok=True)
+            with open(os.path.join(reddit_dir, category, f"{subreddit}.jsonl"), "w", encoding="utf-8") as f:
+                for day in range(1, 11):
+                    for hour, title in enumerate(titles):
+                        created = datetime(2024, 3, day, hour * 5, tzinfo=timezone.utc).timestamp()
+                        f.write(json.dumps({
+                            "created_utc": created, "title": f"{title} {subreddit}",
+                            "selftext": "about APPLE" if (day + hour) % 4 == 0 else "",
+                            "url": f"https://reddit.com/{subreddit}/{day}/{hour}",
+                            "ups": (day * 7 + hour * 3) % 5,
+                        }) + "\n")
+                    f.write("\n")
+        with open(os.path.join(reddit_dir, category, "README.txt"), "w") as f:
+            f.write("not a subreddit")
+    return reddit_dir
+
+
+def _scan_top(category, date, max_limit, query, data_path):
+    """原实现：逐行解析整个分类，逐个检索词未编译地匹配"""
+    files = os.listdir(os.path.join(data_path, category))
+    limit_per_subreddit = max_limit // len(files)
+    all_content = []
+    for data_file in files:
+        if not data_file.endswith(".jsonl"):
+            continue
+        posts = []
+        with open(os.path.join(data_path, category, data_file), "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                parsed_line = json.loads(line)
+                post_date = datetime.utcfromtimestamp(parsed_line["created_utc"]).strftime("%Y-%m-%d")
+                if post_date != date:
+                    continue
+                if "company" in category and query:
+                    search_terms = ticker_to_company[query].split(" OR ") + [query]
+                    if not any(re.search(term, parsed_line["title"], re.IGNORECASE)
+                               or re.search(term, parsed_line["selftext"], re.IGNORECASE)
+                               for term in search_terms):
+                        continue
+                posts.append({"title": parsed_line["title"], "content": parsed_line["selftext"],
+                              "url": parsed_line["url"], "upvotes": parsed_line["ups"], "posted_date": post_date})
+        posts.sort(key=lambda x: x["upvotes"], reverse=True)
+        all_content.extend(posts[:limit_per_subreddit])
+    return all_content
+
+
+def test_fetch_matches_scan():
+    """测试各日期、各分类的查询结果与原实现一致，首次建立索引后只解析对应日期的行"""
+    print("👽 测试Reddit语料索引")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        reddit_dir = _write_corpus(tmp_dir)
+        get_reddit_index().clear()
+        cases = [("company_news", f"2024-03-{day:02d}", 8, query)
+                 for day in range(1, 12) for query in ("AAPL", "MSFT", "TSLA")]
+        cases += [("global_news", f"2024-03-{day:02d}", 6, None) for day in range(1, 12)]
+
+        for category, date, max_limit, query in cases:
+            expected = _scan_top(category, date, max_limit, query, reddit_dir)
+            assert fetch_top_from_category(category, date, max_limit, query, data_path=reddit_dir) == expected
+
+        # 索引已建立：每天只解析两个subreddit当天的5行
+        with mock.patch.object(reddit_utils.json, "loads", wraps=json.loads) as loads:
+            fetch_top_from_category("company_news", "2024-03-05", 8, "AAPL", data_path=reddit_dir)
+        assert loads.call_count == 10
+
+        # 文件更新后重建索引
+        path = os.path.join(reddit_dir, "global_news", "stocks.jsonl")
+        with open(path, "a", encoding="utf-8") as f:
+            created = datetime(2024, 3, 11, tzinfo=timezone.utc).timestamp()
+            f.write(json.dumps({"created_utc": created, "title": "late", "selftext": "", "url": "u", "ups": 1}) + "\n")
+        assert fetch_top_from_category("global_news", "2024-03-11", 6, data_path=reddit_dir) == \
+            _scan_top("global_news", "2024-03-11", 6, None, reddit_dir)
+
+    print("✅ Reddit语料索引正常")
+
+
+def test_company_news_lookback():
+    """测试回看7天的公司新闻只为每个文件建立一次索引"""
+    print("🏢 测试Reddit公司新闻回看")
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.object(interface, "DATA_DIR", tmp_dir):
+        _write_corpus(tmp_dir)
+        get_reddit_index().clear()
+        with mock.patch.object(reddit_utils.RedditIndex, "_build",
+                               wraps=reddit_utils.RedditIndex._build) as build:
+            first = interface.get_reddit_company_news("AAPL", "2024-03-09", 7, 8)
+            assert interface.get_reddit_company_news("AAPL", "2024-03-09", 7, 8) == first
+        assert build.call_count == 2
+        assert "### Apple earnings stocks" in first
+
+    print("✅ Reddit公司新闻回看正常")
+
+
+if __name__ == "__main__":
+    test_fetch_matches_scan()
+    test_company_news_lookback()
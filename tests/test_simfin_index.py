@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+测试SimFin财报索引：多次查询只解析一次CSV，二分查找结果与逐行扫描+idxmax一致
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from manufacturingagents.dataflows import interface
+from manufacturingagents.dataflows.columnar_store import COLUMNAR_AVAILABLE, convert_simfin_csv
+from manufacturingagents.dataflows.simfin_index import SimFinIndex
+from tests.test_columnar_store import _write_balance_csv
+
+
+def _scan_latest(csv_path, ticker, curr_date):
+    """原实现：全表布尔扫描后按Publish Date取idxmax"""
+    df = pd.read_csv(csv_path, sep=";")
+    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
+    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
+    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
+    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
+    if filtered_df.empty:
+        return None
+    return filtered_df.loc[filtered_df["Publish Date"].idxmax()]
+
+
+def test_index_matches_scan():
+    """测试各股票、各日期的查询结果与原实现一致，只解析一次CSV"""
+    print("🔎 测试SimFin财报索引")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = _write_balance_csv(tmp_dir)
+        # 同一天发布两份报告：取原文件中的第一份
+        df = pd.read_csv(csv_path, sep=";")
+        duplicate = df.iloc[[1]].assign(**{"Total Assets": -1.0})
+        pd.concat([df, duplicate], ignore_index=True).to_csv(csv_path, sep=";", index=False)
+
+        index = SimFinIndex()
+        dates = ["2023-12-01", "2024-02-02", "2024-03-15", "2024-05-03", "2024-07-01", "2025-01-01"]
+        expected = {(ticker, date): _scan_latest(csv_path, ticker, date)
+                    for ticker in ("AAPL", "MSFT", "NVDA") for date in dates}
+
+        with mock.patch.object(pd, "read_csv", wraps=pd.read_csv) as read_csv:
+            for (ticker, date), row in expected.items():
+                report = index.latest_report(csv_path, ticker, date)
+                if row is None:
+                    assert report is None, (ticker, date)
+                else:
+                    assert report.name == row.name and report.equals(row), (ticker, date)
+        assert read_csv.call_count == 1
+
+        assert index.latest_report(csv_path, "AAPL", "2024-05-03")["Total Assets"] == 2000.0
+
+    print("✅ SimFin财报索引正常")
+
+
+def test_interface_uses_shared_index():
+    """测试三张财报接口共享索引，列式分区按需加载"""
+    print("📚 测试财报接口索引")
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.object(interface, "DATA_DIR", tmp_dir):
+        csv_path = _write_balance_csv(tmp_dir)
+        first = interface.get_simfin_balance_sheet("TSLA", "quarterly", "2024-09-01")
+        with mock.patch.object(pd, "read_csv", side_effect=AssertionError("不应重新解析CSV")):
+            for date in ("2024-03-01", "2024-06-01", "2024-09-01"):
+                interface.get_simfin_balance_sheet("TSLA", "quarterly", date)
+            assert interface.get_simfin_balance_sheet("AAPL", "quarterly", "2024-01-01") == ""
+        assert "released on 2024-08-02" in first
+
+        if COLUMNAR_AVAILABLE:
+            convert_simfin_csv(csv_path)
+            # 转换后索引重建，按股票加载列式分区
+            with mock.patch.object(pd, "read_csv", side_effect=AssertionError("不应解析CSV")):
+                assert interface.get_simfin_balance_sheet("TSLA", "quarterly", "2024-09-01") == first
+
+    print("✅ 财报接口索引正常")
+
+
+if __name__ == "__main__":
+    test_index_matches_scan()
+    test_interface_uses_shared_index()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+测试技术指标窗口：整个窗口只读取一次价格数据、计算一次指标，结果与逐日查询一致
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from manufacturingagents.dataflows import interface
+from manufacturingagents.dataflows.price_frame_store import get_price_frame_store
+
+
+def _write_price_csv(data_dir, symbol="TEST"):
+    """生成工作日价格数据（跳过周末）"""
+    price_dir = os.path.join(data_dir, "market_data", "price_data")
+    os.makedirs(price_dir, exist_ok=True)
+    dates = pd.bdate_range("2024-01-01", "2024-04-30")
+    steps = np.arange(len(dates))
+    close = 100 + np.cumsum(np.sin(steps / 3.0))
+    pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Open": close - 0.5,
+        "High": close + 1.0,
+        "Low": close - 1.0,
+        "Close": close,
+        "Volume": 1000 + steps * 10,
+    }).to_csv(os.path.join(price_dir, f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv"), index=False)
+
+
+def test_window_matches_daily_lookup():
+    """测试30天RSI窗口只读取一次CSV，输出与逐日计算一致"""
+    print("📈 测试技术指标窗口")
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.object(interface, "DATA_DIR", tmp_dir):
+        _write_price_csv(tmp_dir)
+
+        with mock.patch.object(pd, "read_csv", wraps=pd.read_csv) as read_csv:
+            window = interface.get_stock_stats_indicators_window("TEST", "rsi", "2024-04-15", 30, False)
+        assert read_csv.call_count == 1
+
+        lines = [line for line in window.splitlines() if line.startswith("2024-")]
+        # 只输出交易日（周末跳过），按日期倒序
+        assert lines[0].startswith("2024-04-15:")
+        assert not any(line.startswith(("2024-04-13", "2024-04-14")) for line in lines)
+        assert len(lines) == len(pd.bdate_range("2024-03-16", "2024-04-15"))
+
+        for line in lines[:5]:
+            date, value = line.split(": ", 1)
+            assert value == interface.get_stockstats_indicator("TEST", "rsi", date, False)
+
+    print("✅ 技术指标窗口正常")
+
+
+def test_online_window_lists_calendar_days():
+    """测试在线模式输出每个日历日，非交易日标记为N/A"""
+    print("🌐 测试在线技术指标窗口")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _write_price_csv(tmp_dir)
+        get_price_frame_store().clear()
+        # 在线数据（yfinance缓存）与离线格式相同，直接用离线CSV代替
+        frame = interface.StockstatsUtils._load_stock_stats_frame(
+            "TEST", os.path.join(tmp_dir, "market_data", "price_data"))
+
+        with mock.patch.object(interface.StockstatsUtils, "_load_stock_stats_frame",
+                               return_value=frame) as load:
+            window = interface.get_stock_stats_indicators_window("TEST", "close_10_ema", "2024-04-15", 7, True)
+        assert load.call_count == 1
+
+        lines = [line for line in window.splitlines() if line.startswith("2024-")]
+        assert len(lines) == 8
+        assert "2024-04-14: N/A: Not a trading day (weekend or holiday)" in lines
+
+    print("✅ 在线技术指标窗口正常")
+
+
+if __name__ == "__main__":
+    test_window_matches_daily_lookup()
+    test_online_window_lists_calendar_days()
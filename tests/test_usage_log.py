@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+测试使用记录日志：后台批量写入、汇总表统计、旧usage.json导入、记录上限、今日成本累计
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from manufacturingagents.config.config_manager import ConfigManager, TokenTracker
+from manufacturingagents.config.usage_log import UsageLog
+
+
+def _record(cost, session_id="s1", provider="dashscope", timestamp=None, **extra):
+    return {
+        "timestamp": timestamp or datetime.now().isoformat(),
+        "provider": provider,
+        "model_name": "qwen-turbo",
+        "input_tokens": 100,
+        "output_tokens": 50,
+        "cost": cost,
+        "session_id": session_id,
+        "analysis_type": "manufacturing_analysis",
+        **extra,
+    }
+
+
+def test_batched_append_and_statistics():
+    """测试批量写入后的统计和会话成本"""
+    print("🧾 测试使用记录批量写入")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log = UsageLog(Path(tmp_dir) / "usage.sqlite")
+        old = (datetime.now() - timedelta(days=10)).isoformat()
+
+        for _ in range(20):
+            log.append(_record(0.01))
+        log.append(_record(0.5, session_id="s2", provider="openai", request_count=3))
+        log.append(_record(1.0, timestamp=old))
+        log.flush()
+
+        since = (datetime.now() - timedelta(days=7)).isoformat()
+        stats = log.get_statistics(since)
+        assert stats["records_count"] == 21
+        assert stats["total_requests"] == 23
+        assert stats["total_cost"] == 0.7
+        assert stats["provider_stats"]["openai"]["requests"] == 3
+        assert stats["provider_stats"]["dashscope"]["input_tokens"] == 2000
+
+        assert abs(log.get_session_cost("s1") - 1.2) < 1e-9
+        assert len(log.load_records(session_id="s2")) == 1
+        assert len(log.load_records(since=since)) == 21
+        # 旧记录缺少的字段使用默认值
+        assert log.load_records(session_id="s2")[0]["node_name"] == ""
+
+    print("✅ 使用记录批量写入正常")
+
+
+def test_legacy_import_and_trim():
+    """测试首次启动导入usage.json，写入后按上限删除最早的记录"""
+    print("📥 测试旧记录导入和记录上限")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy = Path(tmp_dir) / "usage.json"
+        legacy.write_text(json.dumps([_record(0.1, session_id=f"old-{i}") for i in range(5)]), encoding="utf-8")
+
+        log = UsageLog(Path(tmp_dir) / "usage.sqlite", legacy_json_path=legacy, max_records=lambda: 6)
+        assert len(log.load_records()) == 5
+
+        for i in range(3):
+            log.append(_record(0.2, session_id=f"new-{i}"))
+        records = log.load_records()
+        assert len(records) == 6
+        assert records[0]["session_id"] == "old-2"
+        assert records[-1]["session_id"] == "new-2"
+
+        # 已有记录时不重复导入
+        reopened = UsageLog(Path(tmp_dir) / "usage.sqlite", legacy_json_path=legacy)
+        assert len(reopened.load_records()) == 6
+
+    print("✅ 旧记录导入和记录上限正常")
+
+
+def test_rollups_maintained_on_write():
+    """测试按小时/按天汇总随写入累加，裁剪明细后统计不变，旧日志自动重建汇总"""
+    print("📊 测试使用记录汇总表")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "usage.sqlite"
+        log = UsageLog(path, max_records=lambda: 2)
+        now = datetime.now()
+        yesterday = (now - timedelta(days=1)).replace(hour=10, minute=30).isoformat()
+
+        log.append(_record(0.1, timestamp=yesterday))
+        log.append(_record(0.2, timestamp=yesterday, provider="openai"))
+        log.append(_record(0.3, session_id="s2"))
+        log.append(_record(0.4, session_id="s2", request_count=2))
+        log.flush()
+
+        # 明细只保留2条，汇总保留全部
+        assert len(log.load_records()) == 2
+        stats = log.get_statistics((now - timedelta(days=7)).isoformat())
+        assert stats["records_count"] == 4 and stats["total_requests"] == 5
+        assert stats["total_cost"] == 1.0
+        assert abs(log.get_session_cost("s1") - 0.3) < 1e-9
+
+        daily = log.get_rollups((now - timedelta(days=7)).isoformat())
+        assert [rollup["bucket"] for rollup in daily] == [yesterday[:10]] * 2 + [now.date().isoformat()]
+        assert abs(daily[-1]["cost"] - 0.7) < 1e-9 and daily[-1]["requests"] == 3
+
+        hourly = log.get_rollups((now - timedelta(days=7)).isoformat(), granularity="hour")
+        assert hourly[0]["bucket"] == yesterday[:13]
+
+        # 起始当天只统计起始小时之后的部分
+        since_noon = (now - timedelta(days=1)).replace(hour=12, minute=0).isoformat()
+        assert abs(log.get_cost_since(since_noon) - 0.7) < 1e-9
+
+        # 升级前的日志（只有明细）打开时重建汇总
+        with sqlite3.connect(str(path)) as conn:
+            conn.execute("DELETE FROM usage_rollup_daily")
+            conn.execute("DELETE FROM usage_rollup_hourly")
+        reopened = UsageLog(path)
+        assert reopened.get_statistics((now - timedelta(days=7)).isoformat())["records_count"] == 2
+
+    print("✅ 使用记录汇总表正常")
+
+
+def test_session_totals_separate_from_rollups():
+    """测试会话汇总单独保存：时间桶汇总行数不随会话数增长，按分析类型细分"""
+    print("🧮 测试会话汇总")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "usage.sqlite"
+        log = UsageLog(path)
+        for i in range(50):
+            log.append(_record(0.01, session_id=f"s{i}"))
+        log.append(_record(0.02, session_id="s0"))
+        log.flush()
+
+        with sqlite3.connect(str(path)) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM usage_rollup_daily").fetchone()[0] == 1
+        assert abs(log.get_session_cost("s0") - 0.03) < 1e-9
+        assert log.get_session_cost("missing") == 0.0
+        daily = log.get_rollups((datetime.now() - timedelta(days=1)).isoformat())
+        assert len(daily) == 1 and daily[0]["records"] == 51
+
+        # 时间桶汇总按分析类型细分
+        log.append(_record(0.5, session_id="s0", analysis_type="stock_analysis"))
+        daily = log.get_rollups((datetime.now() - timedelta(days=1)).isoformat())
+        by_type = {rollup["analysis_type"]: rollup for rollup in daily}
+        assert sorted(by_type) == ["manufacturing_analysis", "stock_analysis"]
+        assert by_type["manufacturing_analysis"]["records"] == 51
+        assert abs(by_type["stock_analysis"]["cost"] - 0.5) < 1e-9
+        assert abs(log.get_session_cost("s0") - 0.53) < 1e-9
+
+    print("✅ 会话汇总正常")
+
+
+def test_config_manager_today_cost():
+    """测试ConfigManager的今日成本在内存中累计，清空记录后重新统计"""
+    print("💰 测试今日成本累计")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_manager = ConfigManager(tmp_dir)
+        config_manager.mongodb_storage = None
+        tracker = TokenTracker(config_manager)
+
+        tracker.track_usage("dashscope", "qwen-turbo", 1000, 500, session_id="s1")
+        first = config_manager.get_today_cost()
+        assert first > 0
+
+        tracker.track_usage("dashscope", "qwen-turbo", 1000, 500, session_id="s1")
+        assert abs(config_manager.get_today_cost() - 2 * first) < 1e-9
+        assert abs(tracker.get_session_cost("s1") - 2 * first) < 1e-9
+        assert config_manager.get_usage_statistics(1)["records_count"] == 2
+
+        config_manager.save_usage_records([])
+        assert config_manager.get_today_cost() == 0
+        assert config_manager.load_usage_records() == []
+
+    print("✅ 今日成本累计正常")
+
+
+if __name__ == "__main__":
+    test_batched_append_and_statistics()
+    test_legacy_import_and_trim()
+    test_rollups_maintained_on_write()
+    test_session_totals_separate_from_rollups()
+    test_config_manager_today_cost()
@@ -10,7 +10,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import os
 from typing import Dict, List, Any
@@ -67,6 +67,8 @@ def render_token_statistics():
     # 获取统计数据
     try:
         stats = config_manager.get_usage_statistics(days)
+        # 图表读按天汇总（与记录数无关），明细表才加载记录
+        rollups = config_manager.get_usage_rollups(days)
         records = load_detailed_records(days)
         
         if not stats or stats.get('total_requests', 0) == 0:
@@ -85,16 +87,23 @@ def render_token_statistics():
         # 显示概览统计
         render_overview_metrics(stats, time_range)
         
+        # 显示LLM响应缓存统计
+        render_llm_cache_statistics()
+        
         # 显示详细图表
-        if records:
-            render_detailed_charts(records, stats)
+        if rollups:
+            render_detailed_charts(rollups, stats)
         
         # 显示供应商统计
         render_provider_statistics(stats)
         
+        # 显示分析类型统计
+        if rollups:
+            render_analysis_type_statistics(rollups)
+        
         # 显示成本趋势
-        if records:
-            render_cost_trends(records)
+        if rollups:
+            render_cost_trends(rollups)
         
         # 显示详细记录表
         render_detailed_records_table(records)
@@ -157,7 +166,30 @@ def render_overview_metrics(stats: Dict[str, Any], time_range: str):
             delta=f"{stats['total_output_tokens']/(stats['total_input_tokens']+stats['total_output_tokens'])*100:.1f}%"
         )
 
-def render_detailed_charts(records: List[UsageRecord], stats: Dict[str, Any]):
+def render_llm_cache_statistics():
+    """渲染LLM响应缓存统计（本进程启动以来）"""
+    cache_stats = token_tracker.get_cache_statistics()
+    if cache_stats["hits"] + cache_stats["misses"] == 0:
+        return
+    
+    st.subheader("💾 LLM响应缓存")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(label="✅ 命中次数", value=f"{cache_stats['hits']:,}")
+    
+    with col2:
+        st.metric(label="❌ 未命中次数", value=f"{cache_stats['misses']:,}")
+    
+    with col3:
+        st.metric(label="🎯 命中率", value=f"{cache_stats['hit_rate']*100:.1f}%")
+    
+    with col4:
+        saved_tokens = cache_stats['saved_input_tokens'] + cache_stats['saved_output_tokens']
+        st.metric(label="💰 节省Token数", value=f"{saved_tokens:,}")
+
+def render_detailed_charts(rollups: List[Dict[str, Any]], stats: Dict[str, Any]):
     """渲染详细图表"""
     st.subheader("📊 详细分析图表")
     
@@ -185,15 +217,16 @@ def render_detailed_charts(records: List[UsageRecord], stats: Dict[str, Any]):
     with col2:
         st.subheader("📈 成本vs Token关系")
         
-        # 创建散点图
+        # 创建散点图（每个点为某天某模型某分析类型的汇总）
         df_records = pd.DataFrame([
             {
-                'total_tokens': record.input_tokens + record.output_tokens,
-                'cost': record.cost,
-                'provider': record.provider,
-                'model': record.model_name
+                'total_tokens': rollup['input_tokens'] + rollup['output_tokens'],
+                'cost': rollup['cost'],
+                'provider': rollup['provider'],
+                'model': rollup['model_name'],
+                'date': rollup['bucket']
             }
-            for record in records
+            for rollup in rollups
         ])
         
         if not df_records.empty:
@@ -202,8 +235,8 @@ def render_detailed_charts(records: List[UsageRecord], stats: Dict[str, Any]):
                 x='total_tokens',
                 y='cost',
                 color='provider',
-                hover_data=['model'],
-                title="成本与Token使用量关系",
+                hover_data=['model', 'date'],
+                title="每日成本与Token使用量关系",
                 labels={'total_tokens': 'Token总数', 'cost': '成本(¥)'}
             )
             st.plotly_chart(fig_scatter, use_container_width=True)
@@ -262,19 +295,56 @@ def render_provider_statistics(stats: Dict[str, Any]):
         )
         st.plotly_chart(fig_requests, use_container_width=True)
 
-def render_cost_trends(records: List[UsageRecord]):
+def render_analysis_type_statistics(rollups: List[Dict[str, Any]]):
+    """渲染分析类型统计（按汇总中的分析类型求和）"""
+    st.subheader("🧭 分析类型统计")
+    
+    df_types = pd.DataFrame([
+        {
+            'analysis_type': rollup.get('analysis_type') or '未分类',
+            'cost': rollup['cost'],
+            'requests': rollup['requests'],
+            'input_tokens': rollup['input_tokens'],
+            'output_tokens': rollup['output_tokens']
+        }
+        for rollup in rollups
+    ])
+    type_stats = df_types.groupby('analysis_type').sum().reset_index().sort_values('cost', ascending=False)
+    
+    type_df = pd.DataFrame([
+        {
+            '分析类型': row['analysis_type'],
+            '成本(¥)': f"{row['cost']:.4f}",
+            '调用次数': int(row['requests']),
+            '输入Token': f"{int(row['input_tokens']):,}",
+            '输出Token': f"{int(row['output_tokens']):,}"
+        }
+        for _, row in type_stats.iterrows()
+    ])
+    st.dataframe(type_df, use_container_width=True)
+    
+    fig_types = px.bar(
+        type_stats,
+        x='analysis_type',
+        y='cost',
+        title="各分析类型成本对比",
+        labels={'analysis_type': '分析类型', 'cost': '成本(¥)'}
+    )
+    st.plotly_chart(fig_types, use_container_width=True)
+
+def render_cost_trends(rollups: List[Dict[str, Any]]):
     """渲染成本趋势图"""
     st.subheader("📈 成本趋势分析")
     
-    # 按日期聚合数据
+    # 按天汇总数据
     df_records = pd.DataFrame([
         {
-            'date': datetime.fromisoformat(record.timestamp).date(),
-            'cost': record.cost,
-            'tokens': record.input_tokens + record.output_tokens,
-            'provider': record.provider
+            'date': rollup['bucket'],
+            'cost': rollup['cost'],
+            'tokens': rollup['input_tokens'] + rollup['output_tokens'],
+            'provider': rollup['provider']
         }
-        for record in records
+        for rollup in rollups
     ])
     
     if df_records.empty:
@@ -367,21 +437,8 @@ def render_detailed_records_table(records: List[UsageRecord]):
 def load_detailed_records(days: int) -> List[UsageRecord]:
     """加载详细记录"""
     try:
-        all_records = config_manager.load_usage_records()
-        
-        # 过滤时间范围
-        cutoff_date = datetime.now() - timedelta(days=days)
-        filtered_records = []
-        
-        for record in all_records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    filtered_records.append(record)
-            except:
-                continue
-        
-        return filtered_records
+        # 按时间范围在存储中过滤（timestamp索引）
+        return config_manager.load_usage_records(days)
     except Exception as e:
         st.error(f"加载记录失败: {e}")
         return []
@@ -395,6 +452,8 @@ def export_statistics_data(days: int):
         # 创建导出数据
         export_data = {
             'summary': stats,
+            'llm_cache': token_tracker.get_cache_statistics(),
+            'daily_rollups': config_manager.get_usage_rollups(days),
             'detailed_records': [
                 {
                     'timestamp': record.timestamp,
@@ -4,6 +4,8 @@
 
 import sys
 import os
+import json
+import threading
 import uuid
 from pathlib import Path
 from datetime import datetime
@@ -24,6 +26,33 @@ except ImportError:
     TOKEN_TRACKING_ENABLED = False
     print("⚠️ Token跟踪功能未启用")
 
+# 已构建的ReAct图：相同分析师和配置的请求复用LLM、Toolkit和已编译的图
+_REACT_GRAPH_CACHE_SIZE = 8
+_react_graphs = {}
+_react_graphs_lock = threading.Lock()
+
+
+def get_manufacturing_react_graph(analysts, config):
+    """获取（必要时创建）指定分析师和配置的制造业ReAct图实例"""
+    from manufacturingagents.manufacturingagents.graph.manufacturing_graph_react import ManufacturingAgentsReactGraph
+
+    cache_key = (tuple(analysts), json.dumps(config, sort_keys=True, default=str))
+    with _react_graphs_lock:
+        react_graph = _react_graphs.get(cache_key)
+        if react_graph is None:
+            react_graph = ManufacturingAgentsReactGraph(
+                selected_analysts=list(analysts),
+                debug=False,
+                config=config
+            )
+            if len(_react_graphs) >= _REACT_GRAPH_CACHE_SIZE:
+                # 淘汰最早创建的图
+                _react_graphs.pop(next(iter(_react_graphs)))
+            _react_graphs[cache_key] = react_graph
+        else:
+            print("♻️ [制造业分析] 复用已构建的ReAct图")
+    return react_graph
+
 def extract_risk_assessment(state):
     """从分析状态中提取风险评估数据"""
     try:
@@ -118,6 +147,7 @@ def run_manufacturing_analysis(city_name, brand_name, product_category, target_q
         config["llm_provider"] = llm_provider
         config["deep_think_llm"] = llm_model
         config["quick_think_llm"] = llm_model
+        config["token_tracking"] = TOKEN_TRACKING_ENABLED
         
         # 根据研究深度调整配置
         if research_depth == 1:
@@ -157,43 +187,33 @@ def run_manufacturing_analysis(city_name, brand_name, product_category, target_q
         # 调试信息：显示选择的分析师
         update_progress(f"选择的分析师: {analysts} (共{len(analysts)}个)")
         
-        # 导入ReAct制造业图
-        from manufacturingagents.manufacturingagents.graph.manufacturing_graph_react import ManufacturingAgentsReactGraph
-        
-        # 创建ReAct图实例
-        react_graph = ManufacturingAgentsReactGraph(
-            selected_analysts=analysts,  # ✅ 传递前端选择的分析师
-            debug=False, 
-            config=config
-        )
+        # 获取ReAct图实例（相同分析师和配置复用已编译的图）
+        react_graph = get_manufacturing_react_graph(analysts, config)  # ✅ 传递前端选择的分析师
         
         # 执行ReAct分析
         update_progress("开始ReAct多智能体协作分析...")
-        state = react_graph.analyze_manufacturing_replenishment(
+        # 流式执行：每个分析师报告、辩论发言完成后立即显示
+        state = None
+        for event in react_graph.stream_manufacturing_replenishment(
             city_name=city_name,  # 🎯 修复：传递用户输入的城市
             brand_name=brand_name,
             product_category=product_category,
             target_quarter=target_quarter,
             special_focus=special_focus,
-            progress_callback=progress_callback  # 🎯 新增：传递进度追踪器
-        )
-
-        # 记录Token使用
+            progress_callback=progress_callback,  # 🎯 新增：传递进度追踪器
+            session_id=session_id
+        ):
+            if progress_callback and hasattr(progress_callback, "log_stream_event"):
+                progress_callback.log_stream_event(event)
+            if event["type"] in ("complete", "error"):
+                state = event["state"]
+
+        # 各节点LLM调用的实际Token用量已由图的Token统计回调按session_id写入TokenTracker
+        node_usage = {}
         if TOKEN_TRACKING_ENABLED:
-            actual_input_tokens = len(analysts) * (2000 if research_depth <= 2 else 3000)
-            actual_output_tokens = len(analysts) * (1000 if research_depth <= 2 else 1500)
-
-            usage_record = token_tracker.track_usage(
-                provider=llm_provider,
-                model_name=llm_model,
-                input_tokens=actual_input_tokens,
-                output_tokens=actual_output_tokens,
-                session_id=session_id,
-                analysis_type="manufacturing_analysis"
-            )
-
-            if usage_record:
-                update_progress(f"记录使用成本: ¥{usage_record.cost:.4f}")
+            node_usage = token_tracker.get_session_node_usage(session_id)
+            session_cost = sum(usage["cost"] for usage in node_usage.values())
+            update_progress(f"记录使用成本: ¥{session_cost:.4f}")
 
         # 生成最终决策
         decision = generate_manufacturing_decision(state, brand_name, product_category, target_quarter)
@@ -211,7 +231,8 @@ def run_manufacturing_analysis(city_name, brand_name, product_category, target_q
             'decision': decision,
             'success': True,
             'error': None,
-            'session_id': session_id if TOKEN_TRACKING_ENABLED else None
+            'session_id': session_id if TOKEN_TRACKING_ENABLED else None,
+            'node_usage': node_usage
         }
 
         update_progress("✅ 制造业补货策略分析完成！")
@@ -61,6 +61,7 @@ class SimpleProgressTracker:
             "debate": "🎭",     # 辩论过程
             "decision": "⚖️",   # 决策过程
             "risk": "⚠️",      # 风险评估
+            "stream": "📡",     # 流式结果
             "complete": "🎉"    # 全部完成
         }
     
@@ -150,6 +151,31 @@ class SimpleProgressTracker:
         """记录错误信息"""
         self.log_event("error", f"错误：{error_message}")
     
+    def log_stream_event(self, event: Dict[str, Any]) -> None:
+        """
+        记录流式分析事件（ManufacturingAgentsReactGraph.stream_manufacturing_replenishment）
+        
+        Args:
+            event: 流式事件字典
+        """
+        event_type = event.get("type")
+        content = event.get("content")
+        preview = content[:60].replace("\n", " ") if isinstance(content, str) else ""
+        
+        if event_type == "analyst_report":
+            # 分析师完成已由节点通过log_agent_complete记录，这里只记录流式输出的报告
+            self.log_event("stream", f"{event.get('name', '')}报告：{preview}...")
+        elif event_type == "debate_turn":
+            self.log_event("debate", f"第{event.get('round', 0)}次发言：{preview}...")
+        elif event_type == "coordination_plan":
+            self.log_event("decision", f"决策协调方案已生成：{preview}...")
+        elif event_type == "risk_assessment":
+            self.log_event("risk", f"风险评估报告已生成：{preview}...")
+        elif event_type == "conclusion":
+            self.log_event("success", "结构化结论已生成" if content else "结论提取未得到有效JSON")
+        elif event_type == "error":
+            self.log_error(event.get("error", ""))
+    
     def _update_log_display(self) -> None:
         """更新日志显示 - 聊天窗口体验"""
         try: